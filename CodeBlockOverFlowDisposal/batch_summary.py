@@ -1,21 +1,55 @@
 #!/usr/bin/env python3
 """
 バッチ処理サマリーツール - 複数PDFのはみ出し検出結果を一覧表示
+
+PDFはファイル単位でプロセスプールに振り分け、終わったものから
+JSONL/CSVへ1行ずつ書き出す（途中で止まってもそれまでの結果は残る）。
+1つのPDFでワーカーが落ちても、他のPDFの結果は失われない。
 """
 
 import argparse
+import contextlib
+import csv
+import io
+import json
+import os
 import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Dict
+from typing import Callable, List, Dict, Optional
 import glob
 
 from overflow_detector_ocr import OCRBasedOverflowDetector
 
 
+# CSVレポートのヘッダー
+CSV_HEADER = ['ファイル名', 'ファイルパス', '総ページ数', 'はみ出しページ数',
+              'はみ出し率(%)', 'はみ出しページリスト', 'ステータス']
+
+# 大きなPDFのページ並列: OCRワーカー1つあたりの最小ページ数
+DEFAULT_PAGES_PER_WORKER = 100
+
+
+def collect_pdf_files(pdf_patterns: List[str]) -> List[Path]:
+    """パターンに一致するPDFファイル（重複除去・ソート済み）"""
+    pdf_files = []
+    for pattern in pdf_patterns:
+        matches = glob.glob(pattern)
+        pdf_files.extend([Path(f) for f in matches if f.lower().endswith('.pdf')])
+    return sorted(list(set(pdf_files)))
+
+
 def analyze_pdf_batch(pdf_patterns: List[str], 
                      min_confidence: int = 30,
                      margin_tolerance: int = 20, 
-                     min_overflow: int = 1) -> Dict:
+                     min_overflow: int = 1,
+                     workers: Optional[int] = None,
+                     page_workers: int = 1,
+                     pages_per_worker: int = DEFAULT_PAGES_PER_WORKER,
+                     jsonl_output: Optional[Path] = None,
+                     csv_output: Optional[Path] = None) -> Dict:
     """
     複数PDFのはみ出し検出を一括実行
     
@@ -24,30 +58,32 @@ def analyze_pdf_batch(pdf_patterns: List[str],
         min_confidence: OCR信頼度閾値
         margin_tolerance: マージン許容範囲
         min_overflow: 最小はみ出し検出量
+        workers: PDF単位の並列プロセス数（Noneで CPU コア数）
+        page_workers: 1つのPDF内のOCR並列プロセス数（大きなPDFのみ）
+        pages_per_worker: page_workers のワーカー1つあたりの最小ページ数
+        jsonl_output: 1ファイル1行で逐次書き出すJSONLファイル
+        csv_output: 1ファイル1行で逐次書き出すCSVファイル
         
     Returns:
         結果辞書
     """
-    # 検出器の初期化
+    # 検出器の設定（ワーカープロセスへはこの検出器ごと渡す）
     detector = OCRBasedOverflowDetector()
     detector.MIN_CONFIDENCE = min_confidence
     detector.MARGIN_TOLERANCE_PX = margin_tolerance
     detector.MIN_OVERFLOW_PX = min_overflow
+    detector.MIN_PAGES_PER_WORKER = max(1, pages_per_worker)
     
     # PDFファイルを収集
-    pdf_files = []
-    for pattern in pdf_patterns:
-        matches = glob.glob(pattern)
-        pdf_files.extend([Path(f) for f in matches if f.lower().endswith('.pdf')])
+    pdf_files = collect_pdf_files(pdf_patterns)
     
     if not pdf_files:
         print("❌ PDFファイルが見つかりません")
         return {}
     
-    # 重複除去とソート
-    pdf_files = sorted(list(set(pdf_files)))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(pdf_files)))
     
-    print(f"📊 バッチ処理開始: {len(pdf_files)}個のPDFファイル")
+    print(f"📊 バッチ処理開始: {len(pdf_files)}個のPDFファイル（並列数: {workers}）")
     print(f"設定 - 信頼度: {min_confidence}, 許容: {margin_tolerance}px, 最小: {min_overflow}px")
     print("=" * 80)
     
@@ -66,56 +102,205 @@ def analyze_pdf_batch(pdf_patterns: List[str],
         }
     }
     
-    for i, pdf_path in enumerate(pdf_files, 1):
-        print(f"\n🔍 [{i}/{len(pdf_files)}] {pdf_path.name}")
-        
-        try:
-            # はみ出し検出実行
-            overflow_pages = detector.detect_file(pdf_path)
-            
-            # 総ページ数を取得
-            import fitz
-            doc = fitz.open(pdf_path)
-            total_pages = len(doc)
-            doc.close()
-            
-            file_result = {
-                'file_name': pdf_path.name,
-                'file_path': str(pdf_path),
-                'total_pages': total_pages,
-                'overflow_pages': overflow_pages,
-                'overflow_count': len(overflow_pages),
-                'success': True
-            }
-            
+    with StreamingReportWriter(jsonl_output, csv_output) as writer:
+        def on_result(file_result: Dict):
             results['files'].append(file_result)
-            results['summary']['total_pages_processed'] += total_pages
+            writer.write(file_result)
+            _print_file_result(len(results['files']), len(pdf_files), file_result)
             
-            if overflow_pages:
+            if not file_result['success']:
+                return
+            results['summary']['total_pages_processed'] += file_result['total_pages']
+            if file_result['overflow_pages']:
                 results['summary']['files_with_overflow'] += 1
-                results['summary']['total_overflow_pages'] += len(overflow_pages)
-                
-                print(f"  ⚠️  はみ出し検出: {len(overflow_pages)}ページ (全{total_pages}ページ中)")
-                if len(overflow_pages) <= 10:
-                    print(f"     対象ページ: {', '.join(map(str, overflow_pages))}")
-                else:
-                    print(f"     対象ページ: {', '.join(map(str, overflow_pages[:10]))}... (他{len(overflow_pages)-10}ページ)")
-            else:
-                print(f"  ✅ はみ出しなし (全{total_pages}ページ)")
-                
-        except Exception as e:
-            print(f"  ❌ エラー: {e}")
-            file_result = {
-                'file_name': pdf_path.name,
-                'file_path': str(pdf_path),
-                'error': str(e),
-                'success': False
-            }
-            results['files'].append(file_result)
+                results['summary']['total_overflow_pages'] += file_result['overflow_count']
+        
+        run_batch(pdf_files, detector, on_result, workers=workers, page_workers=page_workers)
     
+    # 完了順に集めた結果をファイル順に並べ直す
+    results['files'].sort(key=lambda r: r['file_path'])
     return results
 
 
+def run_batch(pdf_files: List[Path], detector: OCRBasedOverflowDetector,
+              on_result: Callable[[Dict], None], workers: int = 1, page_workers: int = 1):
+    """
+    PDFをプロセスプールで解析し、終わったものから on_result に渡す
+    
+    ワーカーが異常終了した場合（プール全体が使えなくなる）、未完了のPDFを
+    並列数1のプールでやり直す。並列数1では投入順に処理されるため、
+    未完了の先頭が異常終了の原因のPDFであり、これだけをエラーとして記録する。
+    
+    Args:
+        pdf_files: 解析対象のPDFファイル
+        detector: 設定済みの検出器（ワーカープロセスへ渡す）
+        on_result: 1ファイル分の結果を受け取る関数（メインプロセスで呼ばれる）
+        workers: PDF単位の並列プロセス数
+        page_workers: 1つのPDF内のOCR並列プロセス数
+    """
+    remaining = list(pdf_files)
+    while remaining:
+        unfinished = _run_pool(remaining, detector, on_result, workers, page_workers)
+        if unfinished and workers == 1:
+            crashed = unfinished.pop(0)
+            on_result(_error_result(crashed, 'ワーカープロセスが異常終了しました'))
+        remaining = unfinished
+        workers = 1
+
+
+def _run_pool(pdf_files: List[Path], detector: OCRBasedOverflowDetector,
+              on_result: Callable[[Dict], None], workers: int, page_workers: int) -> List[Path]:
+    """プール1つ分の実行（ワーカーの異常終了で完了できなかったPDFを投入順に返す）"""
+    finished = set()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker,
+                             initargs=(detector,)) as executor:
+        futures = {executor.submit(_analyze_file, pdf_path, page_workers): pdf_path
+                   for pdf_path in pdf_files}
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            try:
+                file_result = future.result()
+            except BrokenProcessPool:
+                continue
+            except Exception as e:
+                # 引数・結果の受け渡しの失敗など（このPDFのみエラー）
+                file_result = _error_result(pdf_path, str(e))
+            finished.add(pdf_path)
+            on_result(file_result)
+    return [pdf_path for pdf_path in pdf_files if pdf_path not in finished]
+
+
+# ワーカープロセス側の検出器（initializerで1プロセスにつき1回だけ設定）
+_worker_detector = None
+
+
+def _init_batch_worker(detector: OCRBasedOverflowDetector):
+    """ワーカープロセスの初期化（設定値を含む検出器を受け取る）"""
+    global _worker_detector
+    _worker_detector = detector
+
+
+def _analyze_file(pdf_path: Path, page_workers: int = 1) -> Dict:
+    """PDF1つの解析（ワーカープロセスで実行、PDFは1回だけ開く）"""
+    detector = _worker_detector
+    detector.errors = []
+    start = time.perf_counter()
+    
+    # 検出器の進捗表示は並列実行では混ざるため捨てる（結果はメインプロセスで表示）
+    with contextlib.redirect_stdout(io.StringIO()):
+        try:
+            overflow_pages = detector.detect_file(pdf_path, workers=page_workers)
+        except Exception as e:
+            return _error_result(pdf_path, str(e))
+    
+    if detector.errors:
+        return _error_result(pdf_path, detector.errors[-1].removeprefix('エラー: '))
+    
+    return {
+        'file_name': pdf_path.name,
+        'file_path': str(pdf_path),
+        'total_pages': detector.total_pages,
+        'overflow_pages': overflow_pages,
+        'overflow_count': len(overflow_pages),
+        'processing_time': time.perf_counter() - start,
+        'success': True
+    }
+
+
+def _error_result(pdf_path: Path, error: str) -> Dict:
+    return {
+        'file_name': pdf_path.name,
+        'file_path': str(pdf_path),
+        'error': error,
+        'success': False
+    }
+
+
+def _print_file_result(index: int, total: int, file_result: Dict):
+    """1ファイル分の結果を表示（完了順）"""
+    print(f"\n🔍 [{index}/{total}] {file_result['file_name']}")
+    
+    if not file_result['success']:
+        print(f"  ❌ エラー: {file_result['error']}")
+        return
+    
+    overflow_pages = file_result['overflow_pages']
+    total_pages = file_result['total_pages']
+    if overflow_pages:
+        print(f"  ⚠️  はみ出し検出: {len(overflow_pages)}ページ (全{total_pages}ページ中)")
+        if len(overflow_pages) <= 10:
+            print(f"     対象ページ: {', '.join(map(str, overflow_pages))}")
+        else:
+            print(f"     対象ページ: {', '.join(map(str, overflow_pages[:10]))}... (他{len(overflow_pages)-10}ページ)")
+    else:
+        print(f"  ✅ はみ出しなし (全{total_pages}ページ)")
+
+
+class StreamingReportWriter:
+    """1ファイル分の結果ごとにJSONL/CSVへ追記して書き出す"""
+    
+    def __init__(self, jsonl_path: Optional[Path] = None, csv_path: Optional[Path] = None):
+        self.jsonl_path = Path(jsonl_path) if jsonl_path else None
+        self.csv_path = Path(csv_path) if csv_path else None
+        self._jsonl_file = None
+        self._csv_file = None
+        self._csv_writer = None
+    
+    def __enter__(self):
+        if self.jsonl_path:
+            self._jsonl_file = open(self.jsonl_path, 'w', encoding='utf-8')
+        if self.csv_path:
+            self._csv_file = open(self.csv_path, 'w', newline='', encoding='utf-8')
+            self._csv_writer = csv.writer(self._csv_file)
+            self._csv_writer.writerow(CSV_HEADER)
+            self._csv_file.flush()
+        return self
+    
+    def write(self, file_result: Dict):
+        """結果1件を書き出す（すぐにflushする）"""
+        if self._jsonl_file:
+            self._jsonl_file.write(json.dumps(file_result, ensure_ascii=False) + '\n')
+            self._jsonl_file.flush()
+        if self._csv_writer:
+            self._csv_writer.writerow(_csv_row(file_result))
+            self._csv_file.flush()
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        for f in (self._jsonl_file, self._csv_file):
+            if f:
+                f.close()
+        if self.jsonl_path:
+            print(f"📄 JSONLレポート保存: {self.jsonl_path}")
+        if self.csv_path:
+            print(f"📄 CSVレポート保存: {self.csv_path}")
+        return False
+
+
+def _csv_row(file_result: Dict) -> List:
+    """CSVレポートの1行"""
+    if not file_result['success']:
+        return [
+            file_result['file_name'],
+            file_result['file_path'], 
+            'N/A', 'N/A', 'N/A',
+            f"エラー: {file_result['error']}",
+            'ERROR'
+        ]
+    
+    overflow_pages_str = ','.join(map(str, file_result['overflow_pages']))
+    overflow_rate = file_result['overflow_count'] / file_result['total_pages'] * 100 if file_result['total_pages'] > 0 else 0
+    
+    return [
+        file_result['file_name'],
+        file_result['file_path'],
+        file_result['total_pages'],
+        file_result['overflow_count'],
+        f"{overflow_rate:.1f}",
+        overflow_pages_str,
+        'はみ出しあり' if file_result['overflow_count'] > 0 else 'はみ出しなし'
+    ]
+
+
 def print_summary_report(results: Dict):
     """サマリーレポートを表示"""
     print("\n" + "=" * 80)
@@ -164,39 +349,15 @@ def print_summary_report(results: Dict):
 
 def save_csv_report(results: Dict, output_path: Path):
     """CSV形式でレポートを保存"""
-    import csv
-    
     with open(output_path, 'w', newline='', encoding='utf-8') as f:
         writer = csv.writer(f)
         
         # ヘッダー
-        writer.writerow(['ファイル名', 'ファイルパス', '総ページ数', 'はみ出しページ数', 
-                        'はみ出し率(%)', 'はみ出しページリスト', 'ステータス'])
+        writer.writerow(CSV_HEADER)
         
         # データ行
         for file_result in results['files']:
-            if not file_result['success']:
-                writer.writerow([
-                    file_result['file_name'],
-                    file_result['file_path'], 
-                    'N/A', 'N/A', 'N/A',
-                    f"エラー: {file_result['error']}",
-                    'ERROR'
-                ])
-                continue
-            
-            overflow_pages_str = ','.join(map(str, file_result['overflow_pages']))
-            overflow_rate = file_result['overflow_count'] / file_result['total_pages'] * 100 if file_result['total_pages'] > 0 else 0
-            
-            writer.writerow([
-                file_result['file_name'],
-                file_result['file_path'],
-                file_result['total_pages'],
-                file_result['overflow_count'],
-                f"{overflow_rate:.1f}",
-                overflow_pages_str,
-                'はみ出しあり' if file_result['overflow_count'] > 0 else 'はみ出しなし'
-            ])
+            writer.writerow(_csv_row(file_result))
     
     print(f"📄 CSVレポート保存: {output_path}")
 
@@ -216,15 +377,28 @@ def main():
                        help='最小はみ出し検出量px (デフォルト: 1)')
     parser.add_argument('--csv-output', type=str,
                        help='CSV出力ファイル名')
+    parser.add_argument('--jsonl-output', type=str,
+                       help='JSONL出力ファイル名（1ファイル1行、完了順に逐次出力）')
+    parser.add_argument('--workers', type=int, default=0,
+                       help='PDF単位の並列プロセス数 (0でCPUコア数、デフォルト: 0)')
+    parser.add_argument('--page-workers', type=int, default=1,
+                       help='大きなPDF内のOCR並列プロセス数 (デフォルト: 1)')
+    parser.add_argument('--pages-per-worker', type=int, default=DEFAULT_PAGES_PER_WORKER,
+                       help=f'ページ並列のワーカー1つあたりの最小ページ数 (デフォルト: {DEFAULT_PAGES_PER_WORKER})')
     
     args = parser.parse_args()
     
-    # バッチ処理実行
+    # バッチ処理実行（CSVは完了順に逐次書き出し、最後にファイル順で書き直す）
     results = analyze_pdf_batch(
         args.patterns,
         args.min_confidence,
         args.margin_tolerance,
-        args.min_overflow
+        args.min_overflow,
+        workers=args.workers,
+        page_workers=args.page_workers,
+        pages_per_worker=args.pages_per_worker,
+        jsonl_output=Path(args.jsonl_output) if args.jsonl_output else None,
+        csv_output=Path(args.csv_output) if args.csv_output else None
     )
     
     if not results:
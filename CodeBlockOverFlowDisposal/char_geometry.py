@@ -0,0 +1,279 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+文字ジオメトリ カーネル
+page.chars を1回だけ列指向のNumPy配列に変換し、右端はみ出し判定と
+行（丸めたy0）ごとのグループ化をベクトル演算で行う。
+Python側のループは、はみ出した行のテキスト組み立てとフィルタ適用だけになる。
+
+BlockIndex はコードブロック（塗りつぶし矩形）をy区間で引く索引で、
+「文字がどのブロックに入るか」を全ブロック×全文字の走査ではなく二分探索で求める。
+"""
+
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+class OverflowLine(NamedTuple):
+    """右端をはみ出した1行"""
+    y_position: int
+    overflow_text: str
+    overflow_amount: float
+    char_count: int
+
+
+class CharGeometry:
+    """1ページ分の文字を列指向に保持するクラス
+
+    座標列は初回アクセス時に1回だけ配列化する（x0を持たない文字列などにも対応）。
+    """
+
+    def __init__(self, chars: Sequence[Dict]):
+        self.chars = chars
+        self.texts: List[str] = [char['text'] for char in chars]
+        self._columns: Dict[str, np.ndarray] = {}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @classmethod
+    def from_page(cls, page) -> 'CharGeometry':
+        """pdfplumberのページ（またはキャッシュ済みページ）から作成"""
+        # キャッシュ済みページは列をそのまま使う
+        if callable(getattr(type(page), 'char_geometry', None)):
+            return page.char_geometry()
+        return cls(page.chars)
+
+    @classmethod
+    def from_columns(cls, texts: List[str], columns: Dict[str, np.ndarray]) -> 'CharGeometry':
+        """抽出済みの列から作成（x0, x1, y0 を含むこと）"""
+        geometry = cls([])
+        geometry.chars = None
+        geometry.texts = texts
+        geometry._columns = {key: np.asarray(columns[key]) for key in ('x0', 'x1', 'y0')}
+        return geometry
+
+    def _column(self, key: str) -> np.ndarray:
+        column = self._columns.get(key)
+        if column is None:
+            column = np.fromiter((char[key] for char in self.chars), dtype=np.float64, count=len(self.chars))
+            self._columns[key] = column
+        return column
+
+    @property
+    def x0(self) -> np.ndarray:
+        return self._column('x0')
+
+    @property
+    def x1(self) -> np.ndarray:
+        return self._column('x1')
+
+    @property
+    def y0(self) -> np.ndarray:
+        return self._column('y0')
+
+    @property
+    def line_y(self) -> np.ndarray:
+        """行キー（y0を整数に丸めたもの、roundと同じ偶数丸め）"""
+        column = self._columns.get('line_y')
+        if column is None:
+            column = np.rint(self.y0).astype(np.int64)
+            self._columns['line_y'] = column
+        return column
+
+    @property
+    def codepoint(self) -> np.ndarray:
+        """先頭文字のコードポイント（空文字は-1）"""
+        column = self._columns.get('codepoint')
+        if column is None:
+            column = np.fromiter((ord(text[0]) if text else -1 for text in self.texts),
+                                 dtype=np.int64, count=len(self.texts))
+            self._columns['codepoint'] = column
+        return column
+
+    @property
+    def is_ascii(self) -> np.ndarray:
+        """先頭文字がASCIIか（空文字はFalse）"""
+        cp = self.codepoint
+        return (cp >= 0) & (cp < 128)
+
+    @property
+    def is_ascii_printable(self) -> np.ndarray:
+        """全文字がASCII印字可能文字(0x20-0x7E)か（空文字はTrue）"""
+        column = self._columns.get('ascii_printable')
+        if column is None:
+            column = np.fromiter((text.isascii() and text.isprintable() for text in self.texts),
+                                 dtype=bool, count=len(self.texts))
+            self._columns['ascii_printable'] = column
+        return column
+
+    def right_overflow_mask(self, right_edge: float, threshold: float = 0.0) -> np.ndarray:
+        """右端 right_edge + threshold を超える文字のマスク"""
+        return self.x1 > right_edge + threshold
+
+    def group_lines(self, mask: np.ndarray, sort_by: str = 'x1',
+                    require: Optional[np.ndarray] = None) -> List[np.ndarray]:
+        """
+        マスクされた文字を行ごとにまとめる
+
+        Args:
+            mask: 対象文字のマスク
+            sort_by: 行内の並び順に使う座標列（同値は元の順序を保つ）
+            require: 指定時は、このマスクの文字を1つ以上含む行だけを返す
+
+        Returns:
+            行ごとの文字インデックス配列（行は最初に出現した順）
+        """
+        indices = np.flatnonzero(mask)
+        if indices.size == 0:
+            return []
+
+        _, first_seen, inverse = np.unique(self.line_y[indices], return_index=True, return_inverse=True)
+        rank = np.empty(first_seen.size, dtype=np.int64)
+        rank[np.argsort(first_seen, kind='stable')] = np.arange(first_seen.size)
+        line_rank = rank[inverse.ravel()]
+
+        if require is not None:
+            keep = np.zeros(first_seen.size, dtype=bool)
+            keep[line_rank[require[indices]]] = True
+            selected = keep[line_rank]
+            indices, line_rank = indices[selected], line_rank[selected]
+            if indices.size == 0:
+                return []
+
+        order = np.lexsort((indices, self._column(sort_by)[indices], line_rank))
+        indices, line_rank = indices[order], line_rank[order]
+        boundaries = np.flatnonzero(np.diff(line_rank)) + 1
+        return np.split(indices, boundaries)
+
+    def text_of(self, indices: np.ndarray) -> str:
+        """インデックス順に文字を連結"""
+        texts = self.texts
+        return ''.join([texts[i] for i in indices])
+
+
+def find_overflow_lines(geometry: CharGeometry, right_edge: float, threshold: float) -> List[OverflowLine]:
+    """
+    ASCII文字の右端はみ出しを行ごとに集計
+
+    Args:
+        geometry: ページの文字ジオメトリ
+        right_edge: 本文領域の右端(pt)
+        threshold: はみ出しとみなす最小量(pt)
+
+    Returns:
+        はみ出し行のリスト（行は最初に出現した順、行内はx1順）
+    """
+    if len(geometry) == 0:
+        return []
+
+    mask = geometry.is_ascii & geometry.right_overflow_mask(right_edge, threshold)
+    x1 = geometry.x1
+    lines = []
+    for indices in geometry.group_lines(mask, sort_by='x1'):
+        lines.append(OverflowLine(
+            y_position=int(geometry.line_y[indices[0]]),
+            overflow_text=geometry.text_of(indices),
+            overflow_amount=float(x1[indices].max() - right_edge),
+            char_count=int(indices.size),
+        ))
+    return lines
+
+
+def _block_bounds(block) -> Tuple[float, float, float, float]:
+    """ブロックの (x0, y0, x1, y1)（dict、または先頭4要素が座標のタプル）"""
+    if isinstance(block, dict):
+        return block['x0'], block['y0'], block['x1'], block['y1']
+    return block[0], block[1], block[2], block[3]
+
+
+class BlockIndex:
+    """ブロックのy区間索引
+
+    ブロックをy0順に並べ、y1の累積最大値と合わせて保持する。
+    点 y を含むブロックは、y0 <= y の範囲を二分探索で求め、
+    累積最大 y1 が y を下回ったところで打ち切って列挙する。
+    判定はいずれも境界を含む（block.y0 <= y <= block.y1、x も同様）。
+    """
+
+    def __init__(self, blocks: Sequence):
+        """
+        Args:
+            blocks: ブロックのリスト（x0, y0, x1, y1 を持つdict、またはタプル）
+        """
+        self.blocks = blocks
+        bounds = np.array([_block_bounds(block) for block in blocks], dtype=np.float64).reshape(-1, 4)
+        self._x0, self._y0, self._x1, self._y1 = bounds.T
+        self._order = np.argsort(self._y0, kind='stable')
+        self._sorted_y0 = self._y0[self._order]
+        self._sorted_y1 = self._y1[self._order]
+        self._max_y1 = np.maximum.accumulate(self._sorted_y1) if len(blocks) else self._sorted_y1
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def blocks_at(self, y: float, x: Optional[float] = None) -> List[int]:
+        """
+        点を含むブロック
+
+        Args:
+            y: y座標
+            x: x座標（省略時はy区間だけで判定）
+
+        Returns:
+            ブロックのインデックス（元の順序）
+        """
+        found = []
+        j = int(np.searchsorted(self._sorted_y0, y, side='right')) - 1
+        while j >= 0 and self._max_y1[j] >= y:
+            if self._sorted_y1[j] >= y:
+                index = int(self._order[j])
+                if x is None or self._x0[index] <= x <= self._x1[index]:
+                    found.append(index)
+            j -= 1
+        found.sort()
+        return found
+
+    def contains(self, y: float, x: Optional[float] = None) -> bool:
+        """点を含むブロックがあるか"""
+        j = int(np.searchsorted(self._sorted_y0, y, side='right')) - 1
+        while j >= 0 and self._max_y1[j] >= y:
+            if self._sorted_y1[j] >= y:
+                index = self._order[j]
+                if x is None or self._x0[index] <= x <= self._x1[index]:
+                    return True
+            j -= 1
+        return False
+
+    def chars_by_block(self, chars: Sequence[Dict], use_x: bool = False) -> List[List[Dict]]:
+        """
+        ブロックごとに、y0がブロックのy区間に入る文字（ページ内の順序）
+
+        文字をy0でソートし、ブロックごとに区間の両端を二分探索で求める。
+        ブロックが重なる場合、文字はそれぞれのブロックに含まれる。
+
+        Args:
+            chars: page.chars
+            use_x: x0もブロックのx区間に入る文字だけにする
+        """
+        if not len(self):
+            return []
+        y0 = np.fromiter((char['y0'] for char in chars), dtype=np.float64, count=len(chars))
+        order = np.argsort(y0, kind='stable')
+        sorted_y0 = y0[order]
+        lo = np.searchsorted(sorted_y0, self._y0, side='left')
+        hi = np.searchsorted(sorted_y0, self._y1, side='right')
+
+        x0 = None
+        if use_x:
+            x0 = np.fromiter((char['x0'] for char in chars), dtype=np.float64, count=len(chars))
+
+        result = []
+        for i in range(len(self)):
+            indices = np.sort(order[lo[i]:hi[i]]) if hi[i] > lo[i] else order[:0]
+            if use_x and indices.size:
+                xs = x0[indices]
+                indices = indices[(self._x0[i] <= xs) & (xs <= self._x1[i])]
+            result.append([chars[j] for j in indices.tolist()])
+        return result
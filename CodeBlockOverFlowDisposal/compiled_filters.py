@@ -0,0 +1,197 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compiled Filters - 誤検知フィルタの実行エンジン
+フィルタ（述語）を1つのチェーンにまとめ、最初に誤検知と判定したフィルタで打ち切る。
+
+- 述語は (text_content, text_length, overflow_amount, y_position) -> bool
+  （text_content は strip 済み、text_length は strip 前の長さ）
+- フィルタごとの呼び出し数・ヒット数・平均コストを記録
+- adaptive=True の場合、統計に基づいて「安くてよく当たる」フィルタを前に並べ替える
+  （判定結果の真偽は順序によらない。どのフィルタが当たったかは変わり得る）
+
+    chain = CompiledFilters([('measurement_error', pred1), ('page_number', pred2)])
+    chain.is_false_positive(text, amount, y)
+    chain.apply_many([(text, amount, y), ...])
+    chain.get_stats()
+"""
+
+import logging
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+# (text_content, text_length, overflow_amount, y_position) -> 誤検知ならTrue
+FilterPredicate = Callable[[str, int, float, float], bool]
+
+# (overflow_text, overflow_amount, y_position)
+Candidate = Tuple[str, float, float]
+
+
+@dataclass
+class FilterStats:
+    """1フィルタ分の統計"""
+    name: str
+    calls: int = 0
+    hits: int = 0
+    errors: int = 0
+    timed_calls: int = 0
+    total_time: float = 0.0
+
+    @property
+    def hit_rate(self) -> float:
+        """このフィルタまで到達した候補のうち誤検知と判定した割合"""
+        return self.hits / self.calls if self.calls > 0 else 0.0
+
+    @property
+    def mean_cost(self) -> float:
+        """1回あたりの平均処理時間（秒、サンプリング計測）"""
+        return self.total_time / self.timed_calls if self.timed_calls > 0 else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name,
+            'calls': self.calls,
+            'hits': self.hits,
+            'errors': self.errors,
+            'hit_rate': self.hit_rate,
+            'mean_cost_us': self.mean_cost * 1e6
+        }
+
+
+class _CompiledFilter:
+    __slots__ = ('name', 'predicate', 'stats', 'position')
+
+    def __init__(self, name: str, predicate: FilterPredicate, position: int):
+        self.name = name
+        self.predicate = predicate
+        self.stats = FilterStats(name)
+        self.position = position
+
+
+class CompiledFilters:
+    """誤検知フィルタのチェーン（統計・自動並べ替え付き）"""
+
+    # 並べ替えの間隔（評価した候補数）と、並べ替えに使う最小呼び出し数
+    REORDER_INTERVAL = 1024
+    MIN_CALLS_FOR_REORDER = 64
+
+    # 処理時間は TIMING_SAMPLE 回に1回だけ計測する（計測自体のコストを抑える）
+    TIMING_SAMPLE = 8
+
+    def __init__(self, filters: Sequence[Tuple[str, FilterPredicate]], adaptive: bool = True):
+        """
+        Args:
+            filters: (フィルタ名, 述語) のリスト（初期の適用順）
+            adaptive: 統計に基づいて適用順を自動で並べ替えるか
+        """
+        self._filters = [_CompiledFilter(name, predicate, i) for i, (name, predicate) in enumerate(filters)]
+        self.adaptive = adaptive
+        self._evaluated = 0
+
+    @property
+    def order(self) -> List[str]:
+        """現在の適用順"""
+        return [f.name for f in self._filters]
+
+    def first_hit(self, overflow_text: str, overflow_amount: float, y_position: float) -> Optional[str]:
+        """
+        最初に誤検知と判定したフィルタ名
+
+        Returns:
+            フィルタ名（すべて通過した場合はNone）
+        """
+        text_content = overflow_text.strip()
+        text_length = len(overflow_text)
+
+        hit = None
+        for compiled in self._filters:
+            stats = compiled.stats
+            stats.calls += 1
+            try:
+                if stats.calls % self.TIMING_SAMPLE == 0:
+                    start = time.perf_counter()
+                    matched = compiled.predicate(text_content, text_length, overflow_amount, y_position)
+                    stats.total_time += time.perf_counter() - start
+                    stats.timed_calls += 1
+                else:
+                    matched = compiled.predicate(text_content, text_length, overflow_amount, y_position)
+            except Exception as e:
+                # フィルタのエラーは記録し、通過扱いで処理を継続
+                stats.errors += 1
+                if stats.errors == 1:
+                    logger.warning(f"フィルタエラー ({compiled.name}): {e}")
+                continue
+            if matched:
+                stats.hits += 1
+                hit = compiled.name
+                break
+
+        self._evaluated += 1
+        if self.adaptive and self._evaluated % self.REORDER_INTERVAL == 0:
+            self.reorder()
+        return hit
+
+    def is_false_positive(self, overflow_text: str, overflow_amount: float, y_position: float) -> bool:
+        """誤検知か"""
+        return self.first_hit(overflow_text, overflow_amount, y_position) is not None
+
+    def apply_many(self, candidates: Iterable[Candidate]) -> List[Optional[str]]:
+        """
+        ページ内の候補行をまとめて判定
+
+        Args:
+            candidates: (overflow_text, overflow_amount, y_position) のリスト
+
+        Returns:
+            候補ごとの最初に当たったフィルタ名（通過した候補はNone）
+        """
+        first_hit = self.first_hit
+        return [first_hit(text, amount, y) for text, amount, y in candidates]
+
+    def reorder(self):
+        """平均コスト / ヒット率 の小さい順に並べ替え（統計が少ないフィルタは元の順位のまま）"""
+        def key(compiled: _CompiledFilter):
+            stats = compiled.stats
+            if stats.calls < self.MIN_CALLS_FOR_REORDER or stats.timed_calls == 0:
+                return (1, compiled.position)
+            if stats.hits == 0:
+                return (2, compiled.position)
+            return (0, stats.mean_cost / stats.hit_rate)
+
+        self._filters.sort(key=key)
+
+    def get_stats(self) -> List[Dict]:
+        """フィルタごとの統計（現在の適用順）"""
+        return [f.stats.to_dict() for f in self._filters]
+
+    def stats_counters(self) -> Dict[str, Tuple[int, int, int, int, float]]:
+        """フィルタ名 -> (calls, hits, errors, timed_calls, total_time)（プロセス間の受け渡し用）"""
+        return {f.name: (f.stats.calls, f.stats.hits, f.stats.errors, f.stats.timed_calls, f.stats.total_time)
+                for f in self._filters}
+
+    def merge_stats(self, counters: Dict[str, Tuple[int, int, int, int, float]]):
+        """
+        他のチェーン（ワーカープロセスなど）の統計を加算
+
+        Args:
+            counters: stats_counters() の結果（同名のフィルタに加算、未知の名前は無視）
+        """
+        for compiled in self._filters:
+            if compiled.name not in counters:
+                continue
+            calls, hits, errors, timed_calls, total_time = counters[compiled.name]
+            stats = compiled.stats
+            stats.calls += calls
+            stats.hits += hits
+            stats.errors += errors
+            stats.timed_calls += timed_calls
+            stats.total_time += total_time
+
+    def reset_stats(self):
+        """統計をリセット（適用順は維持）"""
+        for compiled in self._filters:
+            compiled.stats = FilterStats(compiled.name)
+        self._evaluated = 0
@@ -0,0 +1,486 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Detector Benchmark - 検出器の精度・速度の回帰チェック
+登録済みの検出器をサンプルPDFに掛け、正解データ（GROUND_TRUTH_PAGES.md /
+visual_judgments.json）と比較した precision/recall/F1 と、処理時間・ページ/秒・
+ピークメモリ・段階別の処理時間をJSONで記録する。
+基準（ベースライン）のJSONと比較し、精度・速度が許容範囲を超えて悪化したら失敗にする。
+
+    python detector_benchmark.py --detectors rect_based v3 --save-baseline benchmark_baseline.json
+    python detector_benchmark.py --detectors rect_based v3 --baseline benchmark_baseline.json
+
+検出器はライブラリの登録簿（overflow_detection_lib.detectors）から取り、検出パイプラインで
+実行する。登録簿にないファイル単位の検出器（ページ画像をOCRする検出器など）だけをここで追加登録する。
+検出器は1つずつ子プロセスで実行する（ピークメモリを検出器ごとに測るため）。
+ページ形状キャッシュは検出器ごとに空のディレクトリを使う（--warm-cache で既定のキャッシュを使う）。
+"""
+
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import logging
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence
+
+from overflow_detection_lib.detectors import DETECTORS as LIBRARY_DETECTORS, DetectionPipeline
+
+logger = logging.getLogger(__name__)
+
+BASE_DIR = Path(__file__).parent
+
+# GROUND_TRUTH_PAGES.md の正解ページ
+GROUND_TRUTH_PAGES = {
+    'sample.pdf': [48],
+    'sample2.pdf': [128, 129],
+    'sample3.pdf': [13, 35, 36, 39, 42, 44, 45, 47, 49, 62, 70, 78, 80, 106, 115, 122, 124],
+    'sample4.pdf': [27, 30, 38, 73, 75, 76],
+    'sample5.pdf': [128]
+}
+
+VISUAL_JUDGMENTS_FILE = BASE_DIR / 'visual_judgments.json'
+
+# 計時する段階の候補（検出器に存在するメソッドだけを計時する。入れ子の場合、内側の時間は外側にも含まれる）
+DEFAULT_STAGES = (
+    'detect_code_blocks',
+    'detect_rect_overflow',
+    'detect_page_overflow',
+    'detect_block_edge_overflow',
+    'detect_coordinate_based',
+    'detect_all_overflows',
+    'check_block_overflow',
+    'detect_overflows',
+    '_check_text_overflow_ocr'
+)
+
+
+@dataclass
+class DetectorSpec:
+    """ベンチマーク対象の検出器"""
+    name: str
+    module: str
+    class_name: str
+    # (検出器, PDFパス) -> 検出ページ番号
+    run: Callable[[object, Path], List[int]]
+    stages: Sequence[str] = DEFAULT_STAGES
+    # 検出器クラスの生成時の引数
+    args: Sequence = ()
+
+    def create(self):
+        """検出器を生成（モジュールはここで初めてimportする）"""
+        return getattr(importlib.import_module(self.module), self.class_name)(*self.args)
+
+
+class RegistryDetector:
+    """
+    ライブラリの登録簿の検出器1つを検出パイプラインで実行する
+
+    PDFを開く時間・ジオメトリの組み立て時間・検出時間を段階別の処理時間として記録する。
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: 登録簿の検出器名
+
+        Raises:
+            ValueError: 未登録の検出器名
+            Exception: 検出器を生成できない（依存パッケージが無いなど）
+        """
+        # 生成できない検出器はここで失敗させる（ベンチマークではスキップ扱い）
+        LIBRARY_DETECTORS.get(name).create()
+        self.name = name
+        self.pipeline = DetectionPipeline([name], LIBRARY_DETECTORS)
+        self.timings: Dict[str, List[float]] = {}
+
+    def detect_pages(self, pdf_path: Path) -> List[int]:
+        """
+        検出ページ番号
+
+        Raises:
+            RuntimeError: 検出器がページでエラーになった
+        """
+        result = self.pipeline.run(pdf_path)
+        for stage, seconds in (('(open)', result.open_seconds), ('(geometry)', result.geometry_seconds),
+                               (self.name, result.seconds[self.name])):
+            timing = self.timings.setdefault(stage, [0, 0.0])
+            timing[0] += 1
+            timing[1] += seconds
+
+        errors = result.errors.get(self.name)
+        if errors:
+            raise RuntimeError(f"ページ {errors[0]['page']}: {errors[0]['error']}")
+        return result.pages(self.name)
+
+    def stage_timings(self) -> Dict[str, Dict]:
+        return {stage: {'calls': calls, 'seconds': seconds} for stage, (calls, seconds) in self.timings.items()}
+
+
+def _run_registry(detector: RegistryDetector, pdf_path: Path) -> List[int]:
+    return detector.detect_pages(pdf_path)
+
+
+def _run_ocr(detector, pdf_path: Path) -> List[int]:
+    pages = detector.detect_file(pdf_path, workers=1)
+    if detector.errors:
+        raise RuntimeError(detector.errors[-1])
+    return pages
+
+
+DETECTORS: Dict[str, DetectorSpec] = {}
+
+
+def register_detector(spec: DetectorSpec):
+    """検出器を登録"""
+    DETECTORS[spec.name] = spec
+
+
+def registry_spec(name: str) -> DetectorSpec:
+    """ライブラリの登録簿の検出器のベンチマーク設定（段階別の処理時間はパイプラインから取る）"""
+    return DetectorSpec(name, __name__, 'RegistryDetector', _run_registry, stages=(), args=(name,))
+
+
+for _name in LIBRARY_DETECTORS.names():
+    register_detector(registry_spec(_name))
+register_detector(DetectorSpec('ocr', 'overflow_detector_ocr', 'OCRBasedOverflowDetector', _run_ocr))
+
+
+def load_ground_truths(visual_judgments_file: Path = VISUAL_JUDGMENTS_FILE) -> Dict[str, Dict[str, List[int]]]:
+    """
+    比較に使う正解データ
+
+    Returns:
+        {'ground_truth_pages': {...}, 'visual_judgments': {...}}（visual_judgments.json がなければ前者のみ）
+    """
+    ground_truths = {'ground_truth_pages': GROUND_TRUTH_PAGES}
+    if visual_judgments_file.exists():
+        data = json.loads(visual_judgments_file.read_text(encoding='utf-8'))
+        ground_truths['visual_judgments'] = data.get('known_overflows', {})
+    return ground_truths
+
+
+def evaluate(detected: Dict[str, List[int]], ground_truth: Dict[str, List[int]]) -> Dict:
+    """
+    検出結果と正解データの比較（両方にあるPDFのみ）
+
+    Returns:
+        true_positives / false_positives / false_negatives / precision / recall / f1
+    """
+    true_positives = false_positives = false_negatives = 0
+    for pdf_name, pages in detected.items():
+        if pdf_name not in ground_truth:
+            continue
+        expected = set(ground_truth[pdf_name])
+        pages = set(pages)
+        true_positives += len(pages & expected)
+        false_positives += len(pages - expected)
+        false_negatives += len(expected - pages)
+
+    precision = true_positives / (true_positives + false_positives) if (true_positives + false_positives) > 0 else 0.0
+    recall = true_positives / (true_positives + false_negatives) if (true_positives + false_negatives) > 0 else 0.0
+    f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
+    return {
+        'true_positives': true_positives,
+        'false_positives': false_positives,
+        'false_negatives': false_negatives,
+        'precision': precision,
+        'recall': recall,
+        'f1': f1
+    }
+
+
+class _StageTimer:
+    """検出器のメソッドを包んで呼び出し回数と処理時間を記録する"""
+
+    def __init__(self, detector, stages: Sequence[str]):
+        self.timings: Dict[str, List[float]] = {}
+        for name in stages:
+            method = getattr(detector, name, None)
+            if callable(method):
+                self.timings[name] = [0, 0.0]
+                setattr(detector, name, self._wrap(name, method))
+
+    def _wrap(self, name: str, method):
+        timing = self.timings[name]
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                timing[0] += 1
+                timing[1] += time.perf_counter() - start
+        return timed
+
+    def to_dict(self) -> Dict[str, Dict]:
+        return {name: {'calls': calls, 'seconds': seconds}
+                for name, (calls, seconds) in self.timings.items() if calls}
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """このプロセスのピークメモリ（MB、取得できなければNone）"""
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linuxは KB、macOSは byte 単位
+        return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+    except ImportError:
+        pass
+    try:
+        import psutil
+        memory = psutil.Process().memory_info()
+        return getattr(memory, 'peak_wset', memory.rss) / (1024 * 1024)
+    except ImportError:
+        return None
+
+
+def page_count(pdf_path: Path) -> int:
+    """PDFの総ページ数（計時の外で数える）"""
+    import fitz
+    with fitz.open(str(pdf_path)) as doc:
+        return len(doc)
+
+
+def benchmark_detector(name: str, pdf_paths: Sequence[Path], cache_dir: Optional[str] = None) -> Dict:
+    """
+    1つの検出器を全PDFに掛けて計測（子プロセスでの実行を想定）
+
+    Args:
+        cache_dir: ページ形状キャッシュの場所（Noneで既定の場所）
+
+    Returns:
+        detected / errors / wall_time / file_times / stages / peak_rss_mb
+    """
+    with _geometry_cache_at(cache_dir):
+        return _benchmark_detector(name, pdf_paths)
+
+
+@contextlib.contextmanager
+def _geometry_cache_at(cache_dir: Optional[str]):
+    """実行中だけ既定のページ形状キャッシュを cache_dir に向ける"""
+    if cache_dir is None:
+        yield
+        return
+    from page_geometry_cache import PageGeometryCache, set_default_cache
+    previous = set_default_cache(PageGeometryCache(cache_dir))
+    try:
+        yield
+    finally:
+        set_default_cache(previous)
+
+
+def _benchmark_detector(name: str, pdf_paths: Sequence[Path]) -> Dict:
+    spec = DETECTORS[name]
+    result = {'detected': {}, 'errors': {}, 'file_times': {}, 'stages': {}, 'wall_time': 0.0}
+
+    try:
+        detector = spec.create()
+    except Exception as e:
+        # 依存パッケージが無い検出器など
+        result['skipped'] = f"{type(e).__name__}: {e}"
+        return result
+    timer = _StageTimer(detector, spec.stages)
+
+    wall_start = time.perf_counter()
+    for pdf_path in pdf_paths:
+        start = time.perf_counter()
+        try:
+            # 検出器の進捗表示は計測結果に不要なので捨てる
+            with contextlib.redirect_stdout(io.StringIO()):
+                result['detected'][pdf_path.name] = spec.run(detector, pdf_path)
+        except Exception as e:
+            result['errors'][pdf_path.name] = f"{type(e).__name__}: {e}"
+        result['file_times'][pdf_path.name] = time.perf_counter() - start
+    result['wall_time'] = time.perf_counter() - wall_start
+
+    result['stages'] = timer.to_dict()
+    # 検出器自身が段階別の処理時間を持つ場合（登録簿の検出器）
+    stage_timings = getattr(detector, 'stage_timings', None)
+    if callable(stage_timings):
+        result['stages'].update(stage_timings())
+    result['peak_rss_mb'] = _peak_rss_mb()
+    return result
+
+
+def run_benchmark(detector_names: Sequence[str], pdf_paths: Sequence[Path],
+                  ground_truths: Optional[Dict[str, Dict[str, List[int]]]] = None,
+                  isolate: bool = True, cold_cache: bool = True) -> Dict:
+    """
+    ベンチマークを実行
+
+    Args:
+        detector_names: 検出器名（DETECTORS のキー）
+        pdf_paths: 対象PDF
+        ground_truths: 正解データ名 -> 正解ページ（Noneで load_ground_truths()）
+        isolate: 検出器ごとに子プロセスで実行するか（Falseではピークメモリはプロセス全体の値）
+        cold_cache: 検出器ごとに空のページ形状キャッシュで実行するか
+
+    Returns:
+        ベンチマーク結果（JSONに保存できる辞書）
+    """
+    if ground_truths is None:
+        ground_truths = load_ground_truths()
+    pdf_paths = [Path(p) for p in pdf_paths]
+    pages = {pdf_path.name: page_count(pdf_path) for pdf_path in pdf_paths}
+
+    report = {
+        'created': datetime.now().isoformat(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pdfs': pages,
+        'geometry_cache': 'cold' if cold_cache else 'warm',
+        'detectors': {}
+    }
+
+    for name in detector_names:
+        logger.info(f"ベンチマーク: {name}")
+        with contextlib.ExitStack() as stack:
+            cache_dir = stack.enter_context(tempfile.TemporaryDirectory()) if cold_cache else None
+            if isolate:
+                executor = stack.enter_context(ProcessPoolExecutor(max_workers=1))
+                measured = executor.submit(benchmark_detector, name, pdf_paths, cache_dir).result()
+            else:
+                measured = benchmark_detector(name, pdf_paths, cache_dir)
+
+        if 'skipped' in measured:
+            report['detectors'][name] = {'skipped': measured['skipped']}
+            logger.warning(f"  スキップ: {measured['skipped']}")
+            continue
+
+        processed_pages = sum(pages[pdf_name] for pdf_name in measured['detected'])
+        wall_time = measured['wall_time']
+        measured['pages_per_sec'] = processed_pages / wall_time if wall_time > 0 else 0.0
+        measured['accuracy'] = {gt_name: evaluate(measured['detected'], ground_truth)
+                                for gt_name, ground_truth in ground_truths.items()}
+        report['detectors'][name] = measured
+
+    return report
+
+
+def compare_to_baseline(report: Dict, baseline: Dict,
+                        accuracy_tolerance: float = 0.0,
+                        throughput_tolerance: float = 0.25) -> List[str]:
+    """
+    ベースラインとの比較
+
+    Args:
+        accuracy_tolerance: precision/recall/F1 の許容低下量（絶対値）
+        throughput_tolerance: ページ/秒の許容低下率（0.25で25%まで）
+
+    Returns:
+        悪化の内容（空なら合格）
+    """
+    regressions = []
+    for name, current in report['detectors'].items():
+        previous = baseline.get('detectors', {}).get(name)
+        if not previous or 'skipped' in previous:
+            continue
+        if 'skipped' in current:
+            regressions.append(f"{name}: 実行できません（{current['skipped']}）")
+            continue
+
+        for pdf_name in sorted(set(current['errors']) - set(previous.get('errors', {}))):
+            regressions.append(f"{name}: {pdf_name} でエラー（{current['errors'][pdf_name]}）")
+
+        for gt_name, metrics in current['accuracy'].items():
+            previous_metrics = previous.get('accuracy', {}).get(gt_name)
+            if not previous_metrics:
+                continue
+            for metric in ('precision', 'recall', 'f1'):
+                drop = previous_metrics[metric] - metrics[metric]
+                if drop > accuracy_tolerance + 1e-9:
+                    regressions.append(
+                        f"{name}: {gt_name} の {metric} が低下 "
+                        f"{previous_metrics[metric]:.3f} -> {metrics[metric]:.3f}"
+                    )
+
+        previous_speed = previous.get('pages_per_sec', 0.0)
+        if previous_speed > 0 and current['pages_per_sec'] < previous_speed * (1 - throughput_tolerance):
+            regressions.append(
+                f"{name}: 処理速度が低下 {previous_speed:.1f} -> {current['pages_per_sec']:.1f} ページ/秒"
+            )
+    return regressions
+
+
+def print_report(report: Dict):
+    """結果の一覧表示"""
+    gt_names = sorted({gt for r in report['detectors'].values() for gt in r.get('accuracy', {})})
+    print(f"\n{'検出器':<20} {'ページ/秒':>9} {'時間(秒)':>9} {'メモリ(MB)':>10}  " +
+          '  '.join(f"{gt} P/R/F1" for gt in gt_names))
+    print('-' * 100)
+    for name, result in report['detectors'].items():
+        if 'skipped' in result:
+            print(f"{name:<20} スキップ: {result['skipped']}")
+            continue
+        memory = f"{result['peak_rss_mb']:.0f}" if result.get('peak_rss_mb') is not None else 'N/A'
+        accuracy = '  '.join(
+            f"{m['precision']:.2f}/{m['recall']:.2f}/{m['f1']:.2f}" for m in
+            (result['accuracy'][gt] for gt in gt_names)
+        )
+        print(f"{name:<20} {result['pages_per_sec']:>9.1f} {result['wall_time']:>9.2f} {memory:>10}  {accuracy}")
+        for pdf_name, error in result['errors'].items():
+            print(f"  エラー {pdf_name}: {error}")
+
+
+def main():
+    """コマンドラインエントリーポイント"""
+    parser = argparse.ArgumentParser(description="検出器の精度・速度ベンチマーク")
+    parser.add_argument('--detectors', nargs='+', default=['v3', 'rect_based'],
+                        help=f"検出器名（all で全て）: {', '.join(DETECTORS)}")
+    parser.add_argument('--pdf', nargs='+', help='対象PDF（デフォルト: 正解データのあるサンプルPDF）')
+    parser.add_argument('-o', '--output', help='結果のJSON出力先')
+    parser.add_argument('--baseline', help='比較するベースラインJSON')
+    parser.add_argument('--save-baseline', help='結果をベースラインとして保存するパス')
+    parser.add_argument('--accuracy-tolerance', type=float, default=0.0,
+                        help='precision/recall/F1 の許容低下量（デフォルト: 0.0）')
+    parser.add_argument('--warm-cache', action='store_true',
+                        help='既定のページ形状キャッシュを使う（キャッシュ済みの速度を測る）')
+    parser.add_argument('--throughput-tolerance', type=float, default=0.25,
+                        help='ページ/秒の許容低下率（デフォルト: 0.25）')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+    for noisy in ('pdfminer', 'pdfplumber', 'maximum_ocr_detector_v3', 'visual_hybrid_detector_v8',
+                  'visual_hybrid_detector_v9', 'visual_hybrid_detector_v10'):
+        logging.getLogger(noisy).setLevel(logging.WARNING)
+
+    detector_names = list(DETECTORS) if args.detectors == ['all'] else args.detectors
+    unknown = [name for name in detector_names if name not in DETECTORS]
+    if unknown:
+        parser.error(f"未登録の検出器: {', '.join(unknown)}")
+
+    if args.pdf:
+        pdf_paths = [Path(p) for p in args.pdf]
+    else:
+        pdf_paths = [BASE_DIR / name for name in GROUND_TRUTH_PAGES if (BASE_DIR / name).exists()]
+
+    report = run_benchmark(detector_names, pdf_paths, cold_cache=not args.warm_cache)
+    print_report(report)
+
+    for path in (args.output, args.save_baseline):
+        if path:
+            Path(path).write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding='utf-8')
+            print(f"\n結果を保存しました: {path}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text(encoding='utf-8'))
+        regressions = compare_to_baseline(report, baseline, args.accuracy_tolerance, args.throughput_tolerance)
+        if regressions:
+            print(f"\n❌ ベースラインから悪化しました（{len(regressions)}件）:")
+            for message in regressions:
+                print(f"  - {message}")
+            sys.exit(1)
+        print("\n✅ ベースラインから悪化はありません")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,272 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ページジオメトリ バックエンド
+文字・矩形の抽出元を切り替えるためのインターフェース。
+
+- pdfplumber: 従来どおり（pdfminerによる解析、既定）
+- pymupdf: PyMuPDF (fitz) の rawdict / get_drawings による高速抽出
+
+どちらも pdfplumber と同じキーの chars / rects を返すので、検出器側は変更不要。
+実行ごとに backend 引数、または環境変数 OVERFLOW_GEOMETRY_BACKEND で選択する。
+
+    from page_geometry_cache import open_pdf
+
+    with open_pdf(pdf_path, backend='pymupdf') as pdf:
+        for page in pdf.pages:
+            page.width, page.chars, page.rects
+"""
+
+import os
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+from page_geometry_cache import (CHAR_FLOAT_FIELDS, RECT_FLOAT_FIELDS, RECT_FLAG_FIELDS,
+                                 CachedPage, PageGeometry, _COLOR_NONE, _COLOR_WIDTH, _encode_color)
+
+BACKEND_ENV = 'OVERFLOW_GEOMETRY_BACKEND'
+DEFAULT_BACKEND = 'pdfplumber'
+
+# 軸平行とみなす座標の誤差（PyMuPDFの座標はfloat32精度）
+_AXIS_TOLERANCE = 1e-3
+
+
+class GeometryBackend(ABC):
+    """ジオメトリ抽出バックエンドの基底クラス"""
+
+    name = ''
+
+    @abstractmethod
+    def open(self, pdf_path: Path):
+        """PDFを開く（pages, close を持ち、with文で使えるオブジェクト）"""
+        pass
+
+    @abstractmethod
+    def page_geometry(self, page) -> PageGeometry:
+        """open() で開いたPDFのページを列指向のジオメトリに変換"""
+        pass
+
+    def extract(self, pdf_path: Path) -> List[PageGeometry]:
+        """PDF全ページのジオメトリを抽出"""
+        pages = []
+        with self.open(pdf_path) as pdf:
+            for page in pdf.pages:
+                pages.append(self.page_geometry(page))
+                page.close()
+        return pages
+
+
+class PdfplumberBackend(GeometryBackend):
+    """pdfplumberによる抽出（既定）"""
+
+    name = 'pdfplumber'
+
+    def open(self, pdf_path: Path):
+        import pdfplumber
+        return pdfplumber.open(pdf_path)
+
+    def page_geometry(self, page) -> PageGeometry:
+        return PageGeometry.from_plumber_page(page)
+
+
+class FitzPage(CachedPage):
+    """PyMuPDFのページ（初回アクセス時に文字・矩形を抽出）"""
+
+    def __init__(self, backend: 'PyMuPDFBackend', fitz_page, page_number: int):
+        self._backend = backend
+        self._fitz_page = fitz_page
+        self._geometry: Optional[PageGeometry] = None
+        self.page_number = page_number
+        self.width = float(fitz_page.rect.width)
+        self.height = float(fitz_page.rect.height)
+        self._chars = None
+        self._rects = None
+
+    @property
+    def geometry(self) -> PageGeometry:
+        if self._geometry is None:
+            self._geometry = self._backend.extract_page(self._fitz_page, self.page_number)
+        return self._geometry
+
+    def close(self):
+        """抽出済みの情報を解放（pdfplumberの page.close と同じ扱い）"""
+        self._geometry = None
+        self._chars = None
+        self._rects = None
+
+
+class FitzPDF:
+    """PyMuPDFで開いたPDF（with文で使用）"""
+
+    def __init__(self, backend: 'PyMuPDFBackend', pdf_path: Path):
+        import fitz
+        self.document = fitz.open(str(pdf_path))
+        self.pages = [FitzPage(backend, self.document[i], i + 1) for i in range(len(self.document))]
+
+    def __enter__(self) -> 'FitzPDF':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        self.pages = []
+        self.document.close()
+
+
+class PyMuPDFBackend(GeometryBackend):
+    """PyMuPDF (fitz) による高速抽出
+
+    pdfplumberとの違い:
+    - 座標はfloat32精度（差は1e-4pt程度）
+    - fontname にサブセット接頭辞（'ABCDEF+'）が付かない
+    - 矩形の non_stroking_color は常にRGB、塗りのみの矩形の linewidth は0
+    """
+
+    name = 'pymupdf'
+
+    def open(self, pdf_path: Path) -> FitzPDF:
+        return FitzPDF(self, pdf_path)
+
+    def page_geometry(self, page: FitzPage) -> PageGeometry:
+        return page.geometry
+
+    def extract_page(self, fitz_page, page_number: int) -> PageGeometry:
+        """PyMuPDFのページから抽出"""
+        height = float(fitz_page.rect.height)
+        chars = self.extract_chars(fitz_page, height)
+        rects = self.extract_rects(fitz_page, height)
+
+        char_columns = {key: np.array([c[key] for c in chars], dtype=np.float64) for key in CHAR_FLOAT_FIELDS}
+        char_texts = {
+            'text': [c['text'] for c in chars],
+            'fontname': [c['fontname'] for c in chars],
+        }
+
+        rect_columns = {}
+        for key in RECT_FLOAT_FIELDS:
+            rect_columns[key] = np.array([r[key] for r in rects], dtype=np.float64)
+        for key in RECT_FLAG_FIELDS:
+            rect_columns[key] = np.array([r[key] for r in rects], dtype=bool)
+        color_kind = np.full(len(rects), _COLOR_NONE, dtype=np.int8)
+        color_values = np.full((len(rects), _COLOR_WIDTH), np.nan, dtype=np.float64)
+        for i, rect in enumerate(rects):
+            kind, values = _encode_color(rect['non_stroking_color'])
+            color_kind[i] = kind
+            color_values[i, :len(values)] = values
+        rect_columns['color_kind'] = color_kind
+        rect_columns['color'] = color_values
+
+        return PageGeometry(page_number, float(fitz_page.rect.width), height,
+                            char_columns, char_texts, rect_columns)
+
+    @staticmethod
+    def extract_chars(fitz_page, height: float) -> List[Dict]:
+        """rawdictから文字を抽出（事前選別などPyMuPDFのページを直接扱う処理からも使う）
+
+        PyMuPDFが補う空白は抑止し（pdfplumberには現れない）、ページ外の文字も残す。
+        文字の上下端はpdfminerと同じくフォントのディセンダとサイズから求め、
+        y0/y1 はpdfplumberと同じくページ下端基準にする。
+        """
+        import fitz
+
+        flags = (fitz.TEXTFLAGS_RAWDICT & ~fitz.TEXT_MEDIABOX_CLIP) | fitz.TEXT_INHIBIT_SPACES
+        raw = fitz_page.get_text('rawdict', flags=flags, clip=fitz.INFINITE_RECT())
+
+        chars = []
+        for block in raw['blocks']:
+            for line in block.get('lines', []):
+                for span in line['spans']:
+                    size = span['size']
+                    descent = span['descender'] * size
+                    for char in span['chars']:
+                        x0, _, x1, _ = char['bbox']
+                        bottom = char['origin'][1] - descent
+                        chars.append({
+                            'text': char['c'],
+                            'fontname': span['font'],
+                            'x0': x0,
+                            'x1': x1,
+                            'y0': height - bottom,
+                            'y1': height - bottom + size,
+                            'top': bottom - size,
+                            'bottom': bottom,
+                            'size': size,
+                        })
+        return chars
+
+    @classmethod
+    def extract_rects(cls, fitz_page, height: float) -> List[Dict]:
+        """get_drawingsから矩形を抽出（'re'、軸平行な 'qu'、4辺の 'l' で閉じたパス）"""
+        rects = []
+        for path in fitz_page.get_drawings():
+            path_type = path.get('type') or ''
+            fill = 'f' in path_type and path.get('fill') is not None
+            stroke = 's' in path_type
+            for rect in cls._path_rects(path):
+                rects.append({
+                    'x0': rect.x0,
+                    'x1': rect.x1,
+                    'y0': height - rect.y1,
+                    'y1': height - rect.y0,
+                    'top': rect.y0,
+                    'bottom': rect.y1,
+                    'linewidth': path.get('width') or 0.0,
+                    'fill': fill,
+                    'stroke': stroke,
+                    'non_stroking_color': path.get('fill') if fill else None,
+                })
+        return rects
+
+    @staticmethod
+    def _path_rects(path) -> List:
+        items = path['items']
+        rects = [item[1] for item in items if item[0] == 're']
+        rects += [item[1].rect for item in items if item[0] == 'qu' and item[1].is_rectangular
+                  and abs(item[1].ul.y - item[1].ur.y) < _AXIS_TOLERANCE]
+        if rects or not items:
+            return rects
+
+        # 線分だけで閉じた軸平行の四角形（pdfminerが矩形として扱う形）
+        if 3 <= len(items) <= 4 and all(item[0] == 'l' for item in items):
+            points = [item[1] for item in items] + [items[-1][2]]
+            closed = path.get('closePath') or (abs(points[0].x - points[-1].x) < _AXIS_TOLERANCE
+                                               and abs(points[0].y - points[-1].y) < _AXIS_TOLERANCE)
+            axis_aligned = all(abs(a.x - b.x) < _AXIS_TOLERANCE or abs(a.y - b.y) < _AXIS_TOLERANCE
+                               for a, b in zip(points, points[1:] + points[:1]))
+            rect = path['rect']
+            if closed and axis_aligned and rect.width > 0 and rect.height > 0:
+                return [rect]
+        return []
+
+
+BACKENDS = {
+    PdfplumberBackend.name: PdfplumberBackend,
+    PyMuPDFBackend.name: PyMuPDFBackend,
+}
+
+# 別名
+_ALIASES = {'fitz': PyMuPDFBackend.name, 'plumber': PdfplumberBackend.name}
+
+
+def get_backend(backend: Union[str, GeometryBackend, None] = None) -> GeometryBackend:
+    """
+    バックエンドを取得
+
+    Args:
+        backend: バックエンド名またはインスタンス（省略時は環境変数、なければpdfplumber）
+
+    Raises:
+        ValueError: 未知のバックエンド名
+    """
+    if isinstance(backend, GeometryBackend):
+        return backend
+    name = (backend or os.environ.get(BACKEND_ENV) or DEFAULT_BACKEND).lower()
+    name = _ALIASES.get(name, name)
+    if name not in BACKENDS:
+        raise ValueError(f"unknown geometry backend: {name} (choices: {', '.join(BACKENDS)})")
+    return BACKENDS[name]()
@@ -6,9 +6,12 @@ Maximum OCR Detector V3 - 構造改善版
 Sequential Thinking批判的検証の結果を反映
 """
 
+import functools
 import logging
+import math
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, List, Optional, Tuple
 import statistics
 import sys
 import os
@@ -24,12 +27,42 @@ except ImportError:
     print("Install pdfplumber: pip install pdfplumber")
     sys.exit(1)
 
+from char_geometry import CharGeometry, find_overflow_lines
+from page_geometry_cache import CachedPage, CachedPDF, PageGeometry, get_default_cache
+from geometry_backend import get_backend
+from compiled_filters import CompiledFilters
+
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
+
+# フィルタの述語を CompiledFilters の引数 (text, length, amount, y) に合わせるアダプタ
+# （ワーカープロセスに検出器ごと渡すため、ラムダではなくモジュール関数 + partial で組み立てる）
+def _amount_filter(predicate, text_content: str, text_length: int, overflow_amount: float, y_position: float) -> bool:
+    return predicate(overflow_amount)
+
+
+def _text_filter(predicate, text_content: str, text_length: int, overflow_amount: float, y_position: float) -> bool:
+    return predicate(text_content)
+
+
+def _text_length_filter(predicate, text_content: str, text_length: int, overflow_amount: float,
+                        y_position: float) -> bool:
+    return predicate(text_content, text_length)
+
+
 class FalsePositiveFilters:
     """誤検知フィルタ群（分割された実装）"""
     
+    # 重要な記号は保護（コードでよく使用される）
+    PROTECTED_SYMBOLS = frozenset({
+        '"', "'", '(', ')', '[', ']', '{', '}', '<', '>', 
+        '=', '+', '-', '*', '/', '\\', '|', '&', '%', 
+        '$', '#', '@', '!', '?', '.', ',', ';', ':'
+    })
+    # 2文字で両方とも制御記号の場合のみ除外（これらは制御記号に含めない）
+    PAIR_EXCLUDED_SYMBOLS = frozenset({'"', "'", '(', ')', '[', ']', '{', '}', '<', '>', '=', '+', '-'})
+    
     @staticmethod
     def is_measurement_error(overflow_amount: float) -> bool:
         """測定誤差の可能性があるはみ出し量かチェック"""
@@ -48,12 +81,13 @@ class FalsePositiveFilters:
     @staticmethod
     def is_japanese_only(text_content: str) -> bool:
         """日本語文字のみかチェック（ASCII対象外）"""
-        if not text_content:
-            return False
-        printable_chars = [c for c in text_content if c.isprintable()]
-        if not printable_chars:
-            return False
-        return all(ord(c) > 127 for c in printable_chars)
+        has_printable = False
+        for c in text_content:
+            if c.isprintable():
+                if ord(c) <= 127:
+                    return False
+                has_printable = True
+        return has_printable
     
     @staticmethod
     def is_powershell_pattern(text_content: str, text_length: int) -> bool:
@@ -70,16 +104,9 @@ class FalsePositiveFilters:
         """短い記号ノイズかチェック（改良版）"""
         if text_length == 1:
             char = text_content[0]
-            # 重要な記号は保護（コードでよく使用される）
-            protected_symbols = {
-                '"', "'", '(', ')', '[', ']', '{', '}', '<', '>', 
-                '=', '+', '-', '*', '/', '\\', '|', '&', '%', 
-                '$', '#', '@', '!', '?', '.', ',', ';', ':'
-            }
-            return char not in protected_symbols and not char.isalnum()
+            return char not in FalsePositiveFilters.PROTECTED_SYMBOLS and not char.isalnum()
         elif text_length == 2:
-            # 2文字で両方とも制御記号の場合のみ除外
-            excluded_symbols = {'"', "'", '(', ')', '[', ']', '{', '}', '<', '>', '=', '+', '-'}
+            excluded_symbols = FalsePositiveFilters.PAIR_EXCLUDED_SYMBOLS
             return all(not c.isalnum() and c not in excluded_symbols for c in text_content)
         return False
     
@@ -94,6 +121,25 @@ class FalsePositiveFilters:
     def is_index_pattern(text_content: str) -> bool:
         """目次・索引特有のパターンかチェック"""
         return '……' in text_content or '・・・' in text_content
+    
+    @classmethod
+    def compiled(cls, adaptive: bool = True) -> CompiledFilters:
+        """全フィルタを1つのチェーンにまとめる（適用順は is_likely_false_positive と同じ、pickle可能）"""
+        amount, text, text_length = _amount_filter, _text_filter, _text_length_filter
+        return CompiledFilters([
+            (name, functools.partial(adapter, getattr(cls, 'is_' + name)))
+            for name, adapter in (
+                ('measurement_error', amount),
+                ('pdf_internal_encoding', text),
+                ('page_number', text),
+                ('japanese_only', text),
+                ('powershell_pattern', text_length),
+                ('file_extension', text),
+                ('short_symbol_noise', text_length),
+                ('image_element_tag', text),
+                ('index_pattern', text),
+            )
+        ], adaptive=adaptive)
 
 class MaximumOCRDetectorV3:
     """構造改善版OCR検出器"""
@@ -101,6 +147,12 @@ class MaximumOCRDetectorV3:
     def __init__(self):
         self.mm_to_pt = 2.83465
         self.filters = FalsePositiveFilters()
+        # フィルタの実行エンジン（ヒット率・コストの統計を取り、安くてよく当たる順に並べ替える）
+        self.filter_chain = FalsePositiveFilters.compiled()
+        # 抽出済みページジオメトリのディスクキャッシュを使う（同じPDFの再解析を省略）
+        self.use_geometry_cache = True
+        # 文字・矩形の抽出バックエンド（'pdfplumber' / 'pymupdf'、Noneで環境変数または既定）
+        self.geometry_backend = None
         self.quality_metrics = {
             'total_pages_processed': 0,
             'total_detections': 0,
@@ -114,39 +166,12 @@ class MaximumOCRDetectorV3:
         return ord(char[0]) < 128
     
     def is_likely_false_positive(self, overflow_text: str, overflow_amount: float, y_position: float) -> bool:
-        """改良版誤検知フィルタリング（分割された実装）"""
-        text_content = overflow_text.strip()
-        text_length = len(overflow_text)
-        
-        # 各フィルタを順次適用（複雑度を分散）
-        if self.filters.is_measurement_error(overflow_amount):
-            return True
-        
-        if self.filters.is_pdf_internal_encoding(text_content):
-            return True
-        
-        if self.filters.is_page_number(text_content):
-            return True
-        
-        if self.filters.is_japanese_only(text_content):
-            return True
-        
-        if self.filters.is_powershell_pattern(text_content, text_length):
-            return True
-        
-        if self.filters.is_file_extension(text_content):
-            return True
-        
-        if self.filters.is_short_symbol_noise(text_content, text_length):
-            return True
-        
-        if self.filters.is_image_element_tag(text_content):
-            return True
-        
-        if self.filters.is_index_pattern(text_content):
-            return True
-        
-        return False
+        """改良版誤検知フィルタリング（分割された実装、いずれかのフィルタに当たれば誤検知）"""
+        return self.filter_chain.is_false_positive(overflow_text, overflow_amount, y_position)
+    
+    def get_filter_stats(self) -> List[Dict]:
+        """フィルタごとのヒット率・平均コスト（チューニング用）"""
+        return self.filter_chain.get_stats()
     
     def detect_overflows(self, page, page_number: int) -> List[Dict]:
         """確実なはみ出し検出"""
@@ -160,48 +185,51 @@ class MaximumOCRDetectorV3:
         
         text_right_edge = page.width - right_margin_pt
         
-        # 行ごとのはみ出し文字収集
-        line_overflows = {}
+        # 行ごとのはみ出し文字収集（0.1pt閾値、ベクトル演算）
+        geometry = CharGeometry.from_page(page)
         
-        for char in page.chars:
-            if self.is_ascii_char(char['text']):
-                char_x1 = char['x1']
-                if char_x1 > text_right_edge + 0.1:  # 0.1pt閾値
-                    y_pos = round(char['y0'])
-                    overflow_amount = char_x1 - text_right_edge
-                    
-                    if y_pos not in line_overflows:
-                        line_overflows[y_pos] = []
-                    
-                    line_overflows[y_pos].append({
-                        'char': char['text'],
-                        'x1': char['x1'],
-                        'overflow': overflow_amount
-                    })
-        
-        # 行ごとに集計し、改良版誤検知フィルタリング適用
-        for y_pos, chars_in_line in line_overflows.items():
-            chars_in_line.sort(key=lambda x: x['x1'])
-            overflow_text = ''.join([c['char'] for c in chars_in_line])
-            max_overflow = max(c['overflow'] for c in chars_in_line)
-            
-            # 改良版誤検知フィルタリング適用
-            if not self.is_likely_false_positive(overflow_text, max_overflow, y_pos):
+        # はみ出した行だけに改良版誤検知フィルタリング適用（ページ内の候補行をまとめて判定）
+        lines = find_overflow_lines(geometry, text_right_edge, 0.1)
+        hits = self.filter_chain.apply_many(
+            (line.overflow_text, line.overflow_amount, line.y_position) for line in lines
+        )
+        for line, hit in zip(lines, hits):
+            if hit is None:
                 overflows.append({
-                    'y_position': y_pos,
-                    'overflow_text': overflow_text,
-                    'overflow_amount': max_overflow,
-                    'char_count': len(chars_in_line)
+                    'y_position': line.y_position,
+                    'overflow_text': line.overflow_text,
+                    'overflow_amount': line.overflow_amount,
+                    'char_count': line.char_count
                 })
         
         return overflows
     
-    def process_pdf_comprehensive(self, pdf_path: Path) -> List[Dict]:
-        """PDF全体の処理（V3版）"""
+    def process_pdf_comprehensive(self, pdf_path: Path, workers: Optional[int] = 1,
+                                  progress_callback: Optional[Callable[[int, int], None]] = None) -> List[Dict]:
+        """PDF全体の処理（V3版）
+        
+        Args:
+            pdf_path: PDFファイルパス
+            workers: 並列プロセス数（1で逐次処理、Noneで CPU コア数）
+            progress_callback: 進捗コールバック progress_callback(処理済みページ数, 総ページ数)
+        
+        Returns:
+            はみ出しのあるページの結果（ページ順、逐次処理と同一）
+        """
         results = []
+        page_records: Dict[int, List[Dict]] = {}
+        cache = get_default_cache() if self.use_geometry_cache else None
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
+            backend = get_backend(self.geometry_backend)
+            
+            # 逐次処理、またはキャッシュ済み（解析が不要なので並列化しない）の場合はキャッシュ経由で開く
+            if cache is not None and (workers == 1 or cache.contains(pdf_path, backend)):
+                pdf_context = cache.open(pdf_path, backend)
+            else:
+                pdf_context = backend.open(pdf_path)
+            
+            with pdf_context as pdf:
                 total_pages = len(pdf.pages)
                 self.quality_metrics['total_pages_processed'] = total_pages
                 
@@ -209,28 +237,90 @@ class MaximumOCRDetectorV3:
                 logger.info(f"Maximum OCR Detection V3: {pdf_path.name} ({total_pages}ページ)")
                 logger.info(f"{'='*80}")
                 
-                for i, page in enumerate(pdf.pages):
-                    page_number = i + 1
-                    page_results = self.detect_overflows(page, page_number)
-                    
-                    if page_results:
-                        result = {
-                            'page': page_number,
-                            'overflows': page_results,
-                            'overflow_count': len(page_results)
-                        }
-                        results.append(result)
-                        
-                        logger.info(f"\nPage {page_number}: {len(page_results)}個の検出")
-                        for overflow in page_results:
-                            logger.info(f"  - '{overflow['overflow_text'][:50]}' ({overflow['overflow_amount']:.2f}pt)")
+                if isinstance(pdf, CachedPDF):
+                    workers = 1
+                workers = self._resolve_workers(workers, total_pages)
+                if workers <= 1:
+                    for i, page in enumerate(pdf.pages):
+                        page_number = i + 1
+                        page_results = self.detect_overflows(page, page_number)
+                        if page_results:
+                            page_records[page_number] = page_results
+                        if progress_callback:
+                            progress_callback(page_number, total_pages)
+            
+            if workers > 1:
+                self._detect_pages_parallel(pdf_path, total_pages, workers, progress_callback,
+                                            page_records, cache, backend.name)
         
         except Exception as e:
             logger.error(f"エラー: {pdf_path} - {str(e)}")
             self.quality_metrics['quality_warnings'].append(f"Processing error: {str(e)}")
         
+        # ページ順に結果を組み立て（並列時もログ・順序は逐次処理と同じ）
+        for page_number in sorted(page_records):
+            page_results = page_records[page_number]
+            result = {
+                'page': page_number,
+                'overflows': page_results,
+                'overflow_count': len(page_results)
+            }
+            results.append(result)
+            
+            logger.info(f"\nPage {page_number}: {len(page_results)}個の検出")
+            for overflow in page_results:
+                logger.info(f"  - '{overflow['overflow_text'][:50]}' ({overflow['overflow_amount']:.2f}pt)")
+        
         return results
     
+    # 1ワーカーあたりのページ範囲の数（細かく分けて処理の偏りをならす）
+    CHUNKS_PER_WORKER = 4
+    
+    @staticmethod
+    def _resolve_workers(workers: Optional[int], total_pages: int) -> int:
+        """実際に使うプロセス数（ページ数を超えない）"""
+        if workers is None:
+            workers = os.cpu_count() or 1
+        return max(1, min(workers, total_pages))
+    
+    def _detect_pages_parallel(self, pdf_path: Path, total_pages: int, workers: int,
+                               progress_callback: Optional[Callable[[int, int], None]],
+                               page_records: Dict[int, List[Dict]], cache=None,
+                               backend_name: str = 'pdfplumber'):
+        """ページ範囲ごとにプロセスプールで検出し、page_recordsに格納
+        
+        各ワーカーはPDFを自分で開き、担当範囲の検出結果を
+        コンパクトなタプルで返す。cache指定時はワーカーが抽出した
+        ページジオメトリも受け取り、全ページ揃ったらキャッシュに保存する。
+        フィルタの統計はワーカーから受け取って合算する（適用順の並べ替えはワーカーごと）。
+        """
+        chunk_size = max(1, math.ceil(total_pages / (workers * self.CHUNKS_PER_WORKER)))
+        ranges = [(start, min(start + chunk_size, total_pages))
+                  for start in range(0, total_pages, chunk_size)]
+        
+        pages_done = 0
+        geometries: Dict[int, PageGeometry] = {}
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker,
+                                 initargs=(str(pdf_path), self, cache is not None, backend_name)) as executor:
+            futures = {executor.submit(_detect_page_range, start, end): (start, end)
+                       for start, end in ranges}
+            for future in as_completed(futures):
+                start, end = futures[future]
+                range_results, filter_counters = future.result()
+                # ワーカーで集計したフィルタ統計を合算（get_filter_stats は逐次処理と同じ件数になる）
+                self.filter_chain.merge_stats(filter_counters)
+                for page_number, records, geometry in range_results:
+                    if records:
+                        page_records[page_number] = [_record_to_overflow(r) for r in records]
+                    if geometry is not None:
+                        geometries[page_number] = geometry
+                pages_done += end - start
+                if progress_callback:
+                    progress_callback(pages_done, total_pages)
+        
+        if cache is not None and len(geometries) == total_pages:
+            cache.store(pdf_path, [geometries[n] for n in range(1, total_pages + 1)], backend=backend_name)
+    
     def print_quality_report(self, results: List[Dict], pdf_path: Path):
         """品質レポートの出力"""
         logger.info(f"\n{'='*80}")
@@ -256,9 +346,75 @@ class MaximumOCRDetectorV3:
         
         logger.info("="*80)
 
-def run_comprehensive_test():
+# ワーカープロセス側の状態（initializerで1プロセスにつき1回だけ設定）
+_worker_pdf = None
+_worker_backend = None
+_worker_detector = None
+_worker_collect_geometry = False
+
+
+def _init_page_worker(pdf_path: str, detector: 'MaximumOCRDetectorV3', collect_geometry: bool = False,
+                      backend_name: str = 'pdfplumber'):
+    """ワーカープロセスの初期化（PDFはワーカーごとに開く）"""
+    global _worker_pdf, _worker_backend, _worker_detector, _worker_collect_geometry
+    _worker_backend = get_backend(backend_name)
+    _worker_pdf = _worker_backend.open(pdf_path)
+    _worker_detector = detector
+    _worker_collect_geometry = collect_geometry
+
+
+def _detect_page_range(start: int, end: int) -> Tuple[List[Tuple[int, List[Tuple], Optional[PageGeometry]]], Dict]:
+    """
+    担当ページ範囲 [start, end) の検出（ワーカープロセスで実行）
+
+    Returns:
+        (ページごとの結果, この範囲で増えたフィルタ統計)
+    """
+    chain = _worker_detector.filter_chain
+    counters_before = chain.stats_counters()
+    page_results = []
+    for i in range(start, end):
+        page = _worker_pdf.pages[i]
+        geometry = None
+        target = page
+        if _worker_collect_geometry:
+            geometry = _worker_backend.page_geometry(page)
+            target = CachedPage(geometry)
+        overflows = _worker_detector.detect_overflows(target, i + 1)
+        records = [_overflow_to_record(o) for o in overflows]
+        if records or geometry is not None:
+            page_results.append((i + 1, records, geometry))
+        # 解析済みの文字情報を解放してワーカーのメモリ増加を抑える
+        page.close()
+    
+    counters = {
+        name: tuple(after - before for after, before in zip(values, counters_before.get(name, (0, 0, 0, 0, 0.0))))
+        for name, values in chain.stats_counters().items()
+    }
+    return page_results, counters
+
+
+def _overflow_to_record(overflow: Dict) -> Tuple:
+    """はみ出し情報をプロセス間転送用のタプルに変換"""
+    return (overflow['y_position'], overflow['overflow_text'],
+            overflow['overflow_amount'], overflow['char_count'])
+
+
+def _record_to_overflow(record: Tuple) -> Dict:
+    """転送用タプルをはみ出し情報に戻す"""
+    y_position, overflow_text, overflow_amount, char_count = record
+    return {
+        'y_position': y_position,
+        'overflow_text': overflow_text,
+        'overflow_amount': overflow_amount,
+        'char_count': char_count
+    }
+
+
+def run_comprehensive_test(backend: Optional[str] = None):
     """全PDFでの包括的テスト（V3実装）"""
     detector = MaximumOCRDetectorV3()
+    detector.geometry_backend = backend
     pdf_files = ['sample.pdf', 'sample2.pdf', 'sample3.pdf', 'sample4.pdf', 'sample5.pdf']
     
     all_results = {}
@@ -369,13 +525,17 @@ def main():
     
     parser = argparse.ArgumentParser(description='Maximum OCR Detector V3')
     parser.add_argument('--test', action='store_true', help='包括的テストを実行')
+    parser.add_argument('--workers', type=int, default=1, help='並列プロセス数（0でCPUコア数）')
+    parser.add_argument('--backend', choices=['pdfplumber', 'pymupdf'], default=None,
+                        help='文字・矩形の抽出バックエンド（省略時は環境変数 OVERFLOW_GEOMETRY_BACKEND または pdfplumber）')
     parser.add_argument('pdf_files', nargs='*', help='処理するPDFファイル')
     args = parser.parse_args()
     
     if args.test:
-        run_comprehensive_test()
+        run_comprehensive_test(args.backend)
     else:
         detector = MaximumOCRDetectorV3()
+        detector.geometry_backend = args.backend
         
         for pdf_file in args.pdf_files:
             pdf_path = Path(pdf_file)
@@ -383,7 +543,7 @@ def main():
                 logger.error(f"ファイルが見つかりません: {pdf_path}")
                 continue
             
-            results = detector.process_pdf_comprehensive(pdf_path)
+            results = detector.process_pdf_comprehensive(pdf_path, workers=args.workers or None)
             detector.print_quality_report(results, pdf_path)
 
 if __name__ == "__main__":
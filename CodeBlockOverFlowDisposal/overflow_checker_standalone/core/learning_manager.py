@@ -15,8 +15,20 @@ import logging
 
 from utils.windows_utils import normalize_path, ensure_utf8_encoding, get_default_db_path
 
+# ページ番号リストの種別 -> 累計カラム
+PAGE_KINDS = {
+    'detected_pages': 'total_detected',
+    'confirmed_pages': 'total_confirmed',
+    'additional_pages': 'total_additional',
+    'false_positives': 'total_false_positives'
+}
+
 class WindowsLearningDataManager:
-    """Windows環境対応学習データ管理"""
+    """Windows環境対応学習データ管理
+    
+    統計は保存のたびに累計（learning_totals）を同じトランザクションで更新し、
+    取得時に全件を読み直さない。ページ番号は learning_pages に1行1ページで持つ。
+    """
     
     def __init__(self, db_path: Optional[Path] = None):
         self.logger = logging.getLogger(__name__)
@@ -80,6 +92,35 @@ class WindowsLearningDataManager:
                     )
                 """)
                 
+                # ページ番号（learning_data の JSON配列を1行1ページに正規化）
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS learning_pages (
+                        learning_id INTEGER NOT NULL REFERENCES learning_data(id),
+                        pdf_name TEXT NOT NULL,
+                        kind TEXT NOT NULL,   -- detected_pages / confirmed_pages / ...
+                        page_number INTEGER NOT NULL
+                    )
+                """)
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_pdf_name ON learning_pages(pdf_name, kind)")
+                cursor.execute("CREATE INDEX IF NOT EXISTS idx_pages_learning_id ON learning_pages(learning_id)")
+                
+                # 累計（1行のみ）
+                cursor.execute("""
+                    CREATE TABLE IF NOT EXISTS learning_totals (
+                        id INTEGER PRIMARY KEY CHECK (id = 1),
+                        total_cases INTEGER NOT NULL DEFAULT 0,
+                        total_detected INTEGER NOT NULL DEFAULT 0,
+                        total_confirmed INTEGER NOT NULL DEFAULT 0,
+                        total_false_positives INTEGER NOT NULL DEFAULT 0,
+                        total_additional INTEGER NOT NULL DEFAULT 0,
+                        last_updated TEXT
+                    )
+                """)
+                
+                cursor.execute("SELECT 1 FROM learning_totals WHERE id = 1")
+                if cursor.fetchone() is None:
+                    self._backfill_aggregates(cursor)
+                
                 conn.commit()
                 self.logger.info(f"学習データベース初期化完了: {self.db_path}")
                 
@@ -87,6 +128,48 @@ class WindowsLearningDataManager:
             self.logger.error(f"データベース初期化エラー: {e}", exc_info=True)
             raise
     
+    def _backfill_aggregates(self, cursor):
+        """累計とページ番号テーブルを既存の learning_data から作成（初回のみ）"""
+        cursor.execute("BEGIN IMMEDIATE")
+        try:
+            # 他のプロセスが先に作成していれば何もしない
+            cursor.execute("SELECT 1 FROM learning_totals WHERE id = 1")
+            if cursor.fetchone() is not None:
+                cursor.execute("COMMIT")
+                return
+            cursor.execute("INSERT INTO learning_totals (id) VALUES (1)")
+            rows = cursor.execute(f"""
+                SELECT id, pdf_name, timestamp, {', '.join(PAGE_KINDS)} FROM learning_data
+            """).fetchall()
+            for row in rows:
+                learning_id, pdf_name, timestamp = row[:3]
+                pages = {kind: json.loads(value) if value else [] for kind, value in zip(PAGE_KINDS, row[3:])}
+                self._insert_pages(cursor, learning_id, pdf_name, pages)
+                self._add_to_totals(cursor, pages, timestamp)
+            cursor.execute("COMMIT")
+        except Exception:
+            cursor.execute("ROLLBACK")
+            raise
+        if rows:
+            self.logger.info(f"学習データの累計を作成: {len(rows)}件")
+    
+    @staticmethod
+    def _insert_pages(cursor, learning_id: int, pdf_name: str, pages: Dict[str, List[int]]):
+        cursor.executemany("""
+            INSERT INTO learning_pages (learning_id, pdf_name, kind, page_number) VALUES (?, ?, ?, ?)
+        """, [(learning_id, pdf_name, kind, page_number)
+              for kind in PAGE_KINDS for page_number in pages.get(kind, [])])
+    
+    @staticmethod
+    def _add_to_totals(cursor, pages: Dict[str, List[int]], timestamp: str):
+        cursor.execute(f"""
+            UPDATE learning_totals SET
+                total_cases = total_cases + 1,
+                {', '.join(f'{column} = {column} + ?' for column in PAGE_KINDS.values())},
+                last_updated = MAX(COALESCE(last_updated, ''), ?)
+            WHERE id = 1
+        """, [len(pages.get(kind, [])) for kind in PAGE_KINDS] + [timestamp])
+    
     def save_learning_data(self, learning_data: Dict) -> bool:
         """学習データ保存（Windows環境対応）"""
         try:
@@ -100,6 +183,10 @@ class WindowsLearningDataManager:
                 'powershell_version': self._get_powershell_version()
             }
             
+            timestamp = datetime.now().isoformat()
+            pdf_name = ensure_utf8_encoding(learning_data['pdf_name'])
+            
+            # 学習データ・ページ番号・累計・統計履歴を1つのトランザクションで更新
             with sqlite3.connect(str(self.db_path)) as conn:
                 cursor = conn.cursor()
                 
@@ -111,23 +198,26 @@ class WindowsLearningDataManager:
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     ensure_utf8_encoding(str(learning_data['pdf_path'])),
-                    ensure_utf8_encoding(learning_data['pdf_name']),
+                    pdf_name,
                     json.dumps(learning_data['detected_pages'], ensure_ascii=False),
                     json.dumps(learning_data['confirmed_pages'], ensure_ascii=False),
                     json.dumps(learning_data['additional_pages'], ensure_ascii=False),
                     json.dumps(learning_data['false_positives'], ensure_ascii=False),
-                    datetime.now().isoformat(),
+                    timestamp,
                     json.dumps(os_info, ensure_ascii=False),
                     learning_data.get('app_version', '1.0.0'),
                     ensure_utf8_encoding(learning_data.get('user_notes', '')),
                     learning_data.get('processing_time', 0.0)
                 ))
                 
-                conn.commit()
-                self.logger.info(f"学習データ保存完了: {learning_data['pdf_name']}")
+                self._insert_pages(cursor, cursor.lastrowid, pdf_name, learning_data)
+                self._add_to_totals(cursor, learning_data, timestamp)
                 
                 # 統計情報の更新
-                self._update_statistics()
+                self._update_statistics(cursor)
+                
+                conn.commit()
+                self.logger.info(f"学習データ保存完了: {learning_data['pdf_name']}")
                 
                 return True
                 
@@ -140,71 +230,57 @@ class WindowsLearningDataManager:
         try:
             with sqlite3.connect(str(self.db_path)) as conn:
                 cursor = conn.cursor()
-                
-                # 基本統計
-                cursor.execute("SELECT COUNT(*) FROM learning_data")
-                total_cases = cursor.fetchone()[0]
-                
-                if total_cases == 0:
-                    return {
-                        'total_cases': 0,
-                        'database_path': str(self.db_path),
-                        'database_size_mb': 0,
-                        'last_updated': None
-                    }
-                
-                # 詳細統計計算
-                cursor.execute("""
-                    SELECT detected_pages, confirmed_pages, false_positives, additional_pages
-                    FROM learning_data
-                """)
-                
-                total_detected = 0
-                total_confirmed = 0
-                total_false_positives = 0
-                total_additional = 0
-                
-                for row in cursor.fetchall():
-                    detected = json.loads(row[0]) if row[0] else []
-                    confirmed = json.loads(row[1]) if row[1] else []
-                    false_pos = json.loads(row[2]) if row[2] else []
-                    additional = json.loads(row[3]) if row[3] else []
-                    
-                    total_detected += len(detected)
-                    total_confirmed += len(confirmed)
-                    total_false_positives += len(false_pos)
-                    total_additional += len(additional)
-                
-                # 精度計算
-                precision = total_confirmed / total_detected if total_detected > 0 else 0
-                recall = total_confirmed / (total_confirmed + total_additional) if (total_confirmed + total_additional) > 0 else 0
-                f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
-                
-                # データベースサイズ
-                db_size_mb = self.db_path.stat().st_size / (1024 * 1024)
-                
-                # 最終更新日時
-                cursor.execute("SELECT MAX(timestamp) FROM learning_data")
-                last_updated = cursor.fetchone()[0]
-                
+                stats = self._read_totals(cursor)
+            
+            if stats['total_cases'] == 0:
                 return {
-                    'total_cases': total_cases,
-                    'total_detected': total_detected,
-                    'total_confirmed': total_confirmed,
-                    'total_false_positives': total_false_positives,
-                    'total_additional': total_additional,
-                    'precision': precision,
-                    'recall': recall,
-                    'f1_score': f1_score,
+                    'total_cases': 0,
                     'database_path': str(self.db_path),
-                    'database_size_mb': round(db_size_mb, 2),
-                    'last_updated': last_updated
+                    'database_size_mb': 0,
+                    'last_updated': None
                 }
+            
+            # データベースサイズ
+            db_size_mb = self.db_path.stat().st_size / (1024 * 1024)
+            
+            stats.update({
+                'database_path': str(self.db_path),
+                'database_size_mb': round(db_size_mb, 2)
+            })
+            return stats
                 
         except Exception as e:
             self.logger.error(f"統計取得エラー: {e}", exc_info=True)
             return {'error': str(e)}
     
+    @staticmethod
+    def _read_totals(cursor) -> Dict:
+        """累計と精度（learning_totals の1行から計算）"""
+        cursor.execute("""
+            SELECT total_cases, total_detected, total_confirmed, total_false_positives,
+                   total_additional, last_updated
+            FROM learning_totals WHERE id = 1
+        """)
+        total_cases, total_detected, total_confirmed, total_false_positives, total_additional, last_updated = \
+            cursor.fetchone() or (0, 0, 0, 0, 0, None)
+        
+        # 精度計算
+        precision = total_confirmed / total_detected if total_detected > 0 else 0
+        recall = total_confirmed / (total_confirmed + total_additional) if (total_confirmed + total_additional) > 0 else 0
+        f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+        
+        return {
+            'total_cases': total_cases,
+            'total_detected': total_detected,
+            'total_confirmed': total_confirmed,
+            'total_false_positives': total_false_positives,
+            'total_additional': total_additional,
+            'precision': precision,
+            'recall': recall,
+            'f1_score': f1_score,
+            'last_updated': last_updated
+        }
+    
     def get_recent_learning_data(self, limit: int = 10) -> List[Dict]:
         """最近の学習データを取得"""
         try:
@@ -212,23 +288,35 @@ class WindowsLearningDataManager:
                 cursor = conn.cursor()
                 
                 cursor.execute("""
-                    SELECT pdf_name, timestamp, detected_pages, confirmed_pages, 
-                           false_positives, additional_pages, user_notes
+                    SELECT id, pdf_name, timestamp, user_notes
                     FROM learning_data 
                     ORDER BY timestamp DESC 
                     LIMIT ?
                 """, (limit,))
+                rows = cursor.fetchall()
+                if not rows:
+                    return []
+                
+                # ページ数は learning_pages から件数だけを数える（JSONは読まない）
+                counts = {}
+                cursor.execute(f"""
+                    SELECT learning_id, kind, COUNT(*) FROM learning_pages
+                    WHERE learning_id IN ({', '.join('?' * len(rows))})
+                    GROUP BY learning_id, kind
+                """, [row[0] for row in rows])
+                for learning_id, kind, count in cursor.fetchall():
+                    counts[(learning_id, kind)] = count
                 
                 results = []
-                for row in cursor.fetchall():
+                for learning_id, pdf_name, timestamp, user_notes in rows:
                     data = {
-                        'pdf_name': row[0],
-                        'timestamp': row[1],
-                        'detected_count': len(json.loads(row[2])) if row[2] else 0,
-                        'confirmed_count': len(json.loads(row[3])) if row[3] else 0,
-                        'false_positive_count': len(json.loads(row[4])) if row[4] else 0,
-                        'additional_count': len(json.loads(row[5])) if row[5] else 0,
-                        'has_notes': bool(row[6] and row[6].strip())
+                        'pdf_name': pdf_name,
+                        'timestamp': timestamp,
+                        'detected_count': counts.get((learning_id, 'detected_pages'), 0),
+                        'confirmed_count': counts.get((learning_id, 'confirmed_pages'), 0),
+                        'false_positive_count': counts.get((learning_id, 'false_positives'), 0),
+                        'additional_count': counts.get((learning_id, 'additional_pages'), 0),
+                        'has_notes': bool(user_notes and user_notes.strip())
                     }
                     results.append(data)
                 
@@ -238,38 +326,27 @@ class WindowsLearningDataManager:
             self.logger.error(f"最近のデータ取得エラー: {e}", exc_info=True)
             return []
     
-    def _update_statistics(self):
-        """統計情報を更新"""
-        try:
-            stats = self.get_learning_statistics()
-            if 'error' in stats:
-                return
-            
-            with sqlite3.connect(str(self.db_path)) as conn:
-                cursor = conn.cursor()
-                
-                cursor.execute("""
-                    INSERT INTO learning_stats (
-                        stat_date, total_cases, total_detected, total_confirmed,
-                        total_false_positives, total_additional, precision_rate,
-                        recall_rate, f1_score
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    datetime.now().isoformat(),
-                    stats['total_cases'],
-                    stats['total_detected'],
-                    stats['total_confirmed'],
-                    stats['total_false_positives'],
-                    stats['total_additional'],
-                    stats['precision'],
-                    stats['recall'],
-                    stats['f1_score']
-                ))
-                
-                conn.commit()
-                
-        except Exception as e:
-            self.logger.warning(f"統計更新エラー: {e}")
+    def _update_statistics(self, cursor):
+        """統計情報の履歴を追加（保存と同じトランザクション内で累計から作成）"""
+        stats = self._read_totals(cursor)
+        
+        cursor.execute("""
+            INSERT INTO learning_stats (
+                stat_date, total_cases, total_detected, total_confirmed,
+                total_false_positives, total_additional, precision_rate,
+                recall_rate, f1_score
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, (
+            datetime.now().isoformat(),
+            stats['total_cases'],
+            stats['total_detected'],
+            stats['total_confirmed'],
+            stats['total_false_positives'],
+            stats['total_additional'],
+            stats['precision'],
+            stats['recall'],
+            stats['f1_score']
+        ))
     
     def _get_powershell_version(self) -> str:
         """PowerShellバージョンを取得"""
@@ -296,20 +373,21 @@ class WindowsLearningDataManager:
                 """)
                 
                 columns = [description[0] for description in cursor.description]
-                data = []
-                
-                for row in cursor.fetchall():
-                    row_dict = dict(zip(columns, row))
-                    # JSON文字列をパース
-                    for json_field in ['detected_pages', 'confirmed_pages', 'additional_pages', 'false_positives', 'os_info']:
-                        if row_dict[json_field]:
-                            row_dict[json_field] = json.loads(row_dict[json_field])
-                    data.append(row_dict)
                 
-                # ファイルに書き込み
-                export_content = json.dumps(data, ensure_ascii=False, indent=2)
+                # 1行ずつ書き出す（全件をメモリに載せない。出力は json.dumps(list, indent=2) と同じ形式）
                 with open(export_path, 'w', encoding='utf-8') as f:
-                    f.write(export_content)
+                    count = 0
+                    for row in cursor:
+                        row_dict = dict(zip(columns, row))
+                        # JSON文字列をパース
+                        for json_field in ['detected_pages', 'confirmed_pages', 'additional_pages', 'false_positives', 'os_info']:
+                            if row_dict[json_field]:
+                                row_dict[json_field] = json.loads(row_dict[json_field])
+                        
+                        item = json.dumps(row_dict, ensure_ascii=False, indent=2).replace('\n', '\n  ')
+                        f.write(('[\n  ' if count == 0 else ',\n  ') + item)
+                        count += 1
+                    f.write('\n]' if count else '[]')
                 
                 self.logger.info(f"学習データエクスポート完了: {export_path}")
                 return True
@@ -0,0 +1,155 @@
+# -*- coding: utf-8 -*-
+"""
+ページ単位の指紋による差分再チェック
+
+修正版のPDFが再提出されたとき、前回と内容が変わっていないページは
+前回の検出結果をそのまま使い、変わったページだけを検出器に掛ける。
+
+ページの指紋はコンテンツストリームのハッシュに、ページサイズ・回転、
+参照しているフォーム XObject のストリーム、フォント名を加えたもの
+（文字の位置・幅が変わり得る要素）。画像の中身は含めない。
+
+前回の結果はアプリ（検出器）のバージョンとともに保存し、バージョンが
+変わった場合は再利用しない（検出ロジックの変更を反映するため）。
+"""
+
+import hashlib
+import json
+import logging
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Set
+
+from utils.windows_utils import get_default_page_results_path
+
+
+def app_version() -> str:
+    """
+    前回結果の再利用を判定するアプリのバージョン（version.py、ビルドごとに変わる）
+
+    Returns:
+        'バージョン+ビルド日時.コミット'（version.py がなければ 'unknown'）
+    """
+    try:
+        import version
+    except ImportError:
+        return 'unknown'
+    return (f"{version.VERSION}+{version.BUILD_DATE}T{version.BUILD_TIME}"
+            f".{getattr(version, 'COMMIT_HASH', 'unknown')}")
+
+
+def page_fingerprints(pdf_path: Path) -> List[str]:
+    """
+    全ページの指紋を計算
+
+    Args:
+        pdf_path: PDFファイルパス
+
+    Returns:
+        ページ順の指紋（16進文字列）
+    """
+    import fitz
+
+    doc = fitz.open(str(pdf_path))
+    try:
+        return [_page_fingerprint(doc, page) for page in doc]
+    finally:
+        doc.close()
+
+
+def _page_fingerprint(doc, page) -> str:
+    digest = hashlib.sha1()
+    digest.update(repr((tuple(page.rect), page.rotation)).encode('utf-8'))
+    digest.update(page.read_contents())
+    for xobject in page.get_xobjects():
+        digest.update(doc.xref_stream(xobject[0]) or b'')
+    for font in page.get_fonts():
+        digest.update(font[3].encode('utf-8', errors='replace'))
+    return digest.hexdigest()
+
+
+class PageResultStore:
+    """PDFごとの前回のページ指紋と検出結果（JSONファイル）"""
+
+    VERSION = 1
+
+    # 保存するPDFの上限（古いものから削除）
+    MAX_ENTRIES = 200
+
+    def __init__(self, store_path: Optional[Path] = None, version: Optional[str] = None):
+        """
+        Args:
+            store_path: 保存先（省略時はユーザーデータフォルダ）
+            version: アプリのバージョン（省略時は app_version()、異なるバージョンの結果は再利用しない）
+        """
+        self.logger = logging.getLogger(__name__)
+        self.store_path = Path(store_path) if store_path else get_default_page_results_path()
+        self.app_version = version or app_version()
+        self._entries: Optional[Dict[str, Dict]] = None
+
+    def _load(self) -> Dict[str, Dict]:
+        if self._entries is None:
+            self._entries = {}
+            if self.store_path.exists():
+                try:
+                    data = json.loads(self.store_path.read_text(encoding='utf-8'))
+                    if data.get('version') == self.VERSION:
+                        self._entries = data.get('entries', {})
+                except (OSError, ValueError) as e:
+                    self.logger.warning(f"前回結果の読み込み失敗（破棄）: {e}")
+        return self._entries
+
+    def lookup(self, pdf_name: str, detector: str) -> Optional[Dict]:
+        """
+        前回の結果を取得
+
+        Returns:
+            {'fingerprints': [...], 'overflow_pages': [...]}
+            （同じ検出器・同じアプリのバージョンの結果がなければNone）
+        """
+        entry = self._load().get(pdf_name)
+        if entry is None or entry.get('detector') != detector:
+            return None
+        if entry.get('app_version') != self.app_version:
+            self.logger.info(f"前回結果はバージョンが異なるため再利用しません: "
+                             f"{entry.get('app_version')} → {self.app_version}")
+            return None
+        return entry
+
+    def save(self, pdf_name: str, detector: str, fingerprints: List[str], overflow_pages: List[int]):
+        """今回の結果を保存"""
+        entries = self._load()
+        entries[pdf_name] = {
+            'detector': detector,
+            'app_version': self.app_version,
+            'fingerprints': fingerprints,
+            'overflow_pages': sorted(overflow_pages),
+            'updated': datetime.now().isoformat()
+        }
+        if len(entries) > self.MAX_ENTRIES:
+            oldest = sorted(entries, key=lambda name: entries[name].get('updated', ''))
+            for name in oldest[:len(entries) - self.MAX_ENTRIES]:
+                del entries[name]
+
+        # 書き込み途中で中断しても前回のファイルが壊れないよう置き換える
+        tmp_path = self.store_path.with_suffix(self.store_path.suffix + '.tmp')
+        try:
+            tmp_path.write_text(json.dumps({'version': self.VERSION, 'entries': entries}, ensure_ascii=False),
+                                encoding='utf-8')
+            os.replace(tmp_path, self.store_path)
+        except OSError as e:
+            self.logger.warning(f"前回結果の保存失敗: {e}")
+
+    @staticmethod
+    def unchanged_pages(previous: Optional[Dict], fingerprints: List[str]) -> Set[int]:
+        """
+        前回から変わっていないページ（1-indexed）
+
+        ページ番号が同じで指紋が一致するページのみ（左右ページでマージンが異なるため、
+        ページがずれた場合は再チェックする）。
+        """
+        if not previous:
+            return set()
+        old = previous.get('fingerprints', [])
+        return {i + 1 for i, (new_fp, old_fp) in enumerate(zip(fingerprints, old)) if new_fp == old_fp}
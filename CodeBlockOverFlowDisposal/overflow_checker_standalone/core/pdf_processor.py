@@ -7,6 +7,7 @@ Phase 2C-1 実装
 """
 
 import sys
+import time
 from pathlib import Path
 from datetime import datetime
 from typing import Dict, List, Optional, Callable
@@ -27,6 +28,8 @@ except ImportError:
 
 from utils.windows_utils import ensure_utf8_encoding, is_windows
 from utils.tesseract_config import configure_tesseract
+from core.prescreen import PagePrescreener, StageStats
+from core.page_fingerprint import PageResultStore, page_fingerprints
 # Functions now imported directly above
 
 class ProcessingResult:
@@ -41,6 +44,10 @@ class ProcessingResult:
         self.detection_count = 0
         self.error_message = None
         self.timestamp = datetime.now()
+        # 段ごとの統計（事前選別 → 検出器、各段の入力・出力ページ数と処理時間）
+        self.stage_stats: List[Dict] = []
+        # 前回から変わっておらず、前回の結果を再利用したページ数
+        self.reused_pages = 0
         
     def add_overflow_page(self, page_number: int, overflow_data: Dict):
         """溢れページを追加"""
@@ -62,7 +69,10 @@ class ProcessingResult:
             'overflow_count': self.detection_count,
             'processing_time': self.processing_time,
             'timestamp': self.timestamp.isoformat(),
-            'has_errors': self.error_message is not None
+            'has_errors': self.error_message is not None,
+            'stage_stats': self.stage_stats,
+            'reused_pages': self.reused_pages,
+            'reused_summary': f"{self.total_pages}ページ中{self.reused_pages}ページを再利用"
         }
 
 class PDFOverflowProcessor:
@@ -100,10 +110,61 @@ class PDFOverflowProcessor:
             self.logger.error(f"検出器初期化エラー: {e}")
             raise
         
+        # 事前選別（候補ページだけを検出器に渡す）
+        self.prescreener = self._create_prescreener(config.get('prescreen', 'auto'))
+        
+        # 差分再チェック（前回から変わっていないページは前回の結果を再利用）
+        self.page_store = None
+        if config.get('incremental', False):
+            self.page_store = PageResultStore(config.get('page_results_path'))
+            self.logger.info(f"差分再チェック: 有効（{self.page_store.store_path}）")
+        
         # Windows環境対応
         if config.get('windows_environment', False):
             self.logger.info("Windows環境での処理を開始")
     
+    def _create_prescreener(self, mode) -> Optional[PagePrescreener]:
+        """事前選別器の作成
+        
+        Args:
+            mode: 'auto'（検出器に合わせて選択）, 'geometry', 'pixel', 'off'/None/False
+            
+        Returns:
+            PagePrescreener（無効の場合はNone）
+        """
+        if not mode or mode == 'off':
+            return None
+        
+        if USE_RECT_BASED:
+            # 矩形ベース検出器: 奇数ページ右10mm / 偶数ページ右18mm、コードブロック右端も対象
+            detector = self.detector
+            def right_margin_pt(page_number):
+                margins = detector.odd_page_margins if page_number % 2 == 1 else detector.even_page_margins
+                return margins['right'] * detector.mm_to_pt
+            use_code_blocks = True
+            default_method = PagePrescreener.METHOD_GEOMETRY
+        else:
+            # OCR検出器: 右ページ（奇数）と左ページ（偶数）で右マージンが異なる
+            detector = self.detector
+            def right_margin_pt(page_number):
+                if page_number % 2 == 1:
+                    margin_mm = detector.RIGHT_PAGE_RIGHT_MARGIN_MM
+                else:
+                    margin_mm = detector.LEFT_PAGE_RIGHT_MARGIN_MM
+                return margin_mm * 72 / 25.4
+            use_code_blocks = False
+            default_method = PagePrescreener.METHOD_PIXEL
+        
+        method = default_method if mode == 'auto' else mode
+        try:
+            prescreener = PagePrescreener(method, right_margin_pt, use_code_blocks=use_code_blocks)
+        except ValueError as e:
+            self.logger.warning(f"事前選別の設定が不正です（無効化）: {e}")
+            return None
+        
+        self.logger.info(f"事前選別: {method}（候補ページのみ検出器で処理）")
+        return prescreener
+    
     def process_pdf(self, pdf_path: Path, progress_callback: Optional[Callable] = None) -> ProcessingResult:
         """PDFファイルを処理
         
@@ -162,6 +223,15 @@ class PDFOverflowProcessor:
                 if progress_callback:
                     progress_callback(result.total_pages, result.total_pages, 0)
             
+            # 段ごとの統計
+            result.stage_stats = overflow_data.get('stage_stats', []) if overflow_data else []
+            result.reused_pages = overflow_data.get('reused_pages', 0) if overflow_data else 0
+            for stage in result.stage_stats:
+                self.logger.info(
+                    f"  {stage['name']}: {stage['pages_in']}→{stage['pages_out']}ページ "
+                    f"（除外 {stage['eliminated']}ページ, {stage['elapsed']:.2f}秒）"
+                )
+            
             # 処理時間の計算
             result.processing_time = (datetime.now() - start_time).total_seconds()
             
@@ -193,25 +263,89 @@ class PDFOverflowProcessor:
         """
         try:
             self.logger.info(f"検出器でPDF処理開始: {pdf_path}")
+            stage_stats = []
+            detector_name = 'rect_based' if USE_RECT_BASED else 'ocr'
+            
+            # 第0段: 差分再チェック（前回から変わっていないページは前回の結果を使う）
+            fingerprints = None
+            pages_to_check = None
+            reused_pages = set()
+            reused_overflow = []
+            if self.page_store is not None:
+                try:
+                    reuse_start = time.perf_counter()
+                    fingerprints = page_fingerprints(pdf_path)
+                    previous = self.page_store.lookup(pdf_path.name, detector_name)
+                    reused_pages = self.page_store.unchanged_pages(previous, fingerprints)
+                    if previous:
+                        reused_overflow = [n for n in previous['overflow_pages'] if n in reused_pages]
+                    pages_to_check = [n for n in range(1, len(fingerprints) + 1) if n not in reused_pages]
+                    stage_stats.append(StageStats(
+                        name='reuse',
+                        pages_in=len(fingerprints),
+                        pages_out=len(pages_to_check),
+                        elapsed=time.perf_counter() - reuse_start
+                    ).to_dict())
+                    self.logger.info(f"前回結果の再利用: {len(reused_pages)}/{len(fingerprints)}ページ")
+                except Exception as reuse_error:
+                    # 指紋が取れなくても全ページを処理する
+                    self.logger.warning(f"差分再チェックエラー（全ページを処理）: {reuse_error}")
+                    fingerprints = None
+                    pages_to_check = None
+                    reused_pages = set()
+                    reused_overflow = []
             
-            # OCRBasedOverflowDetectorのdetect_fileメソッドを使用
-            overflow_page_numbers = self.detector.detect_file(pdf_path)
+            # 第1段: 事前選別（はみ出しの可能性があるページだけを残す）
+            candidates = pages_to_check
+            total_pages = len(fingerprints) if fingerprints is not None else None
+            if self.prescreener is not None and candidates != []:
+                try:
+                    screen = self.prescreener.screen(pdf_path, pages=pages_to_check)
+                    candidates = screen.candidates
+                    total_pages = screen.total_pages
+                    stage_stats.append(screen.stats.to_dict())
+                    self.logger.info(f"事前選別: {len(candidates)}/{screen.stats.pages_in}ページが候補")
+                except Exception as screen_error:
+                    # 事前選別に失敗しても全ページを検出器で処理する
+                    self.logger.warning(f"事前選別エラー（全ページを処理）: {screen_error}")
+            
+            # 第2段: 検出器（候補ページのみ）
+            detector_start = time.perf_counter()
+            errors_before = len(getattr(self.detector, 'errors', []))
+            if candidates is None:
+                detected_page_numbers = self.detector.detect_file(pdf_path)
+            elif candidates:
+                detected_page_numbers = self.detector.detect_file(pdf_path, pages=candidates)
+            else:
+                detected_page_numbers = []
+            detector_elapsed = time.perf_counter() - detector_start
+            
+            overflow_page_numbers = sorted(set(detected_page_numbers) | set(reused_overflow))
+            # 検出器がエラーを記録した場合（OCR失敗など）は、判定できなかったページを
+            # はみ出しなしとして再利用しないよう結果を保存しない
+            detector_failed = len(getattr(self.detector, 'errors', [])) > errors_before
+            if fingerprints is not None and detector_failed:
+                self.logger.warning("検出器のエラーのため、今回の結果は差分再チェックに保存しません")
+            elif fingerprints is not None:
+                self.page_store.save(pdf_path.name, detector_name, fingerprints, overflow_page_numbers)
             
             self.logger.info(f"検出結果: {len(overflow_page_numbers)}ページで溢れを検出")
             if overflow_page_numbers:
                 self.logger.info(f"検出ページ: {overflow_page_numbers}")
             
-            # PDFの総ページ数を取得
-            try:
-                import pypdf
-                with open(pdf_path, 'rb') as file:
-                    reader = pypdf.PdfReader(file)
-                    total_pages = len(reader.pages)
-            except ImportError:
-                import PyPDF2
-                with open(pdf_path, 'rb') as file:
-                    reader = PyPDF2.PdfReader(file)
-                    total_pages = len(reader.pages)
+            # PDFの総ページ数（指紋・事前選別・検出器で開いたときの値を使い、開き直さない）
+            if total_pages is None and candidates != []:
+                total_pages = self._detector_total_pages()
+            if total_pages is None:
+                total_pages = self._get_total_pages_fallback(pdf_path)
+            
+            detector_stats = StageStats(
+                name=f'detector:{detector_name}',
+                pages_in=total_pages if candidates is None else len(candidates),
+                pages_out=len(detected_page_numbers),
+                elapsed=detector_elapsed
+            )
+            stage_stats.append(detector_stats.to_dict())
             
             # 検出結果を辞書形式に変換
             overflow_pages = []
@@ -226,7 +360,9 @@ class PDFOverflowProcessor:
             
             return {
                 'total_pages': total_pages,
-                'overflow_pages': overflow_pages
+                'overflow_pages': overflow_pages,
+                'stage_stats': stage_stats,
+                'reused_pages': len(reused_pages)
             }
             
         except Exception as e:
@@ -236,6 +372,14 @@ class PDFOverflowProcessor:
                 'overflow_pages': []
             }
     
+    def _detector_total_pages(self) -> Optional[int]:
+        """検出器が直近に開いたPDFの総ページ数（取得できなければNone）"""
+        if USE_RECT_BASED:
+            total_pages = self.detector.stats.get('total_pages')
+        else:
+            total_pages = getattr(self.detector, 'total_pages', None)
+        return total_pages or None
+    
     def _get_total_pages_fallback(self, pdf_path: Path) -> int:
         """総ページ数の取得（フォールバック）"""
         try:
@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+はみ出し候補ページの事前選別
+
+検出器（矩形ベース / OCR）を全ページに掛ける前に、PyMuPDFで
+「本文右端（またはコードブロック右端）より右に何かがあるか」だけを高速に調べ、
+候補ページだけを後段の検出器に渡す。
+
+- geometry: 文字のbbox（rawdict）と塗りつぶし矩形で判定（テキスト層のあるPDF向け）
+  文字・矩形の抽出は geometry_backend（PyMuPDFバックエンド）と共通
+- pixel: 右余白の帯だけを低解像度で描画し、NumPyでインクの有無を判定（OCR検出器向け）
+
+どちらも見逃しを出さない側に倒した判定で、候補から外れたページは
+後段の検出器でも検出されない。
+"""
+
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+
+import numpy as np
+
+
+@dataclass
+class StageStats:
+    """1段分の処理統計"""
+    name: str
+    pages_in: int = 0
+    pages_out: int = 0
+    elapsed: float = 0.0
+
+    @property
+    def eliminated(self) -> int:
+        """この段で除外したページ数"""
+        return self.pages_in - self.pages_out
+
+    def to_dict(self) -> dict:
+        return {
+            'name': self.name,
+            'pages_in': self.pages_in,
+            'pages_out': self.pages_out,
+            'eliminated': self.eliminated,
+            'elapsed': self.elapsed
+        }
+
+
+@dataclass
+class PrescreenResult:
+    """事前選別の結果"""
+    total_pages: int
+    candidates: List[int] = field(default_factory=list)
+    stats: Optional[StageStats] = None
+
+
+class PagePrescreener:
+    """はみ出し候補ページの事前選別クラス"""
+
+    METHOD_GEOMETRY = 'geometry'
+    METHOD_PIXEL = 'pixel'
+
+    # コードブロックとみなす塗りつぶし矩形の最小サイズ（pt、矩形ベース検出器と同じ）
+    CODE_BLOCK_MIN_WIDTH = 100
+    CODE_BLOCK_MIN_HEIGHT = 10
+
+    # 座標の誤差の吸収（pt、候補を広めに取る側）
+    EDGE_SLACK_PT = 0.05
+
+    # コードブロックの上下方向の許容範囲（pt、文字の下端位置の求め方の差を吸収）
+    BLOCK_Y_SLACK_PT = 1.0
+
+    # pixelモードの描画解像度とインク判定（0-255、これより暗い画素をインクとみなす）
+    PIXEL_DPI = 150
+    INK_THRESHOLD = 200
+
+    def __init__(self, method: str, right_margin_pt: Callable[[int], float],
+                 use_code_blocks: bool = True):
+        """
+        Args:
+            method: 'geometry' または 'pixel'
+            right_margin_pt: ページ番号 -> 本文右マージン(pt)
+            use_code_blocks: コードブロック右端からのはみ出しも候補にするか
+        """
+        if method not in (self.METHOD_GEOMETRY, self.METHOD_PIXEL):
+            raise ValueError(f"unknown prescreen method: {method}")
+        self.method = method
+        self.right_margin_pt = right_margin_pt
+        self.use_code_blocks = use_code_blocks
+
+    def screen(self, pdf_path: Path, pages: Optional[Iterable[int]] = None) -> PrescreenResult:
+        """
+        候補ページを選別
+
+        Args:
+            pdf_path: PDFファイルパス
+            pages: 対象ページ番号（1-indexed、省略時は全ページ）
+
+        Returns:
+            PrescreenResult: 候補ページ（1-indexed、昇順）と統計
+        """
+        import fitz
+
+        start = time.perf_counter()
+        doc = fitz.open(str(pdf_path))
+        try:
+            result = PrescreenResult(total_pages=len(doc))
+            if pages is None:
+                page_numbers = range(1, len(doc) + 1)
+            else:
+                page_numbers = sorted(n for n in set(pages) if 1 <= n <= len(doc))
+            for page_number in page_numbers:
+                if self._is_candidate(doc[page_number - 1], page_number):
+                    result.candidates.append(page_number)
+        finally:
+            doc.close()
+
+        result.stats = StageStats(
+            name=f"prescreen:{self.method}",
+            pages_in=len(page_numbers),
+            pages_out=len(result.candidates),
+            elapsed=time.perf_counter() - start
+        )
+        return result
+
+    def _regions(self, page, page_number: int) -> List:
+        """
+        何かあれば候補とする領域（ページ座標、上端基準）
+
+        - 本文右端より右（上下は無制限）
+        - 各コードブロックの右端より右（上下はブロックの範囲）
+        """
+        import fitz
+
+        far = fitz.INFINITE_RECT()
+        body_edge = page.rect.width - self.right_margin_pt(page_number) - self.EDGE_SLACK_PT
+        regions = [fitz.Rect(body_edge, far.y0, far.x1, far.y1)]
+        if self.use_code_blocks:
+            for block in self._code_blocks(page):
+                if block.x1 - self.EDGE_SLACK_PT < body_edge:
+                    regions.append(fitz.Rect(block.x1 - self.EDGE_SLACK_PT, block.y0 - self.BLOCK_Y_SLACK_PT,
+                                             far.x1, block.y1 + self.BLOCK_Y_SLACK_PT))
+        return regions
+
+    def _code_blocks(self, page) -> List:
+        """塗りつぶし矩形（コードブロック、パス内の矩形ごと）"""
+        import fitz
+        from geometry_backend import PyMuPDFBackend
+
+        blocks = []
+        for rect in PyMuPDFBackend.extract_rects(page, page.rect.height):
+            if not rect['fill']:
+                continue
+            if rect['x1'] - rect['x0'] > self.CODE_BLOCK_MIN_WIDTH and \
+                    rect['bottom'] - rect['top'] > self.CODE_BLOCK_MIN_HEIGHT:
+                blocks.append(fitz.Rect(rect['x0'], rect['top'], rect['x1'], rect['bottom']))
+        return blocks
+
+    def _is_candidate(self, page, page_number: int) -> bool:
+        regions = self._regions(page, page_number)
+        if self.method == self.METHOD_GEOMETRY:
+            return self._has_chars_in(page, regions)
+        return any(self._has_ink_in(page, region) for region in regions)
+
+    @staticmethod
+    def _has_chars_in(page, regions: List) -> bool:
+        """文字の右端が領域に入るか（ページ外の文字も含む）
+
+        文字の縦位置はpdfplumberと同じ下端（基準線 - ディセンダ）で判定する。
+        """
+        from geometry_backend import PyMuPDFBackend
+
+        min_x = min(region.x0 for region in regions)
+        for char in PyMuPDFBackend.extract_chars(page, page.rect.height):
+            x1 = char['x1']
+            if x1 <= min_x:
+                continue
+            for region in regions:
+                if x1 > region.x0 and region.y0 <= char['bottom'] <= region.y1:
+                    return True
+        return False
+
+    def _has_ink_in(self, page, region) -> bool:
+        """領域のページ内の部分を描画し、インク（暗い画素）があるか"""
+        import fitz
+
+        clip = fitz.Rect(region) & page.rect
+        if clip.is_empty:
+            return False
+        zoom = self.PIXEL_DPI / 72
+        pix = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), clip=clip,
+                              colorspace=fitz.csGRAY, alpha=False)
+        if pix.width == 0 or pix.height == 0:
+            return False
+        pixels = np.frombuffer(pix.samples, dtype=np.uint8)
+        return bool((pixels < self.INK_THRESHOLD).any())
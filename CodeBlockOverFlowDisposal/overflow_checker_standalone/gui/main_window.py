@@ -403,7 +403,9 @@ class OverflowCheckerMainWindow(QMainWindow):
             'detection_sensitivity': 'medium',
             'enable_learning': True,
             'save_intermediate_results': True,
-            'windows_environment': is_windows()
+            'windows_environment': is_windows(),
+            'prescreen': 'auto',
+            'incremental': True
         }
     
     @pyqtSlot(int, str)
@@ -418,6 +420,8 @@ class OverflowCheckerMainWindow(QMainWindow):
         """処理完了"""
         self.set_processing_state(False)
         self.add_log(f"処理完了: {len(result.overflow_pages) if hasattr(result, 'overflow_pages') else 0}件の溢れを検出")
+        for stage in getattr(result, 'stage_stats', []):
+            self.add_log(f"  {stage['name']}: {stage['pages_in']}→{stage['pages_out']}ページ（{stage['elapsed']:.2f}秒）")
         
         # 結果ダイアログ表示
         dialog = OverflowResultDialog(result, self)
@@ -10,10 +10,12 @@ from PyQt6.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QLabel,
                              QPushButton, QTextEdit, QCheckBox, QGroupBox,
                              QScrollArea, QWidget, QGridLayout, QMessageBox,
                              QPlainTextEdit, QSplitter, QFrame)
-from PyQt6.QtCore import Qt, pyqtSignal, QTimer, QSize
-from PyQt6.QtGui import QFont, QPixmap, QPainter, QPen, QColor
+from PyQt6.QtCore import Qt, QThread, pyqtSignal, QTimer, QSize
+from PyQt6.QtGui import QFont, QImage, QPixmap, QPainter, QPen, QColor
+from collections import OrderedDict
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Tuple
+import threading
 import fitz  # PyMuPDF
 from PIL import Image
 import io
@@ -21,17 +23,106 @@ import io
 from core.learning_manager import WindowsLearningDataManager
 from utils.windows_utils import is_windows
 
+MM_TO_PT = 72 / 25.4
+
+
+class PageImageRenderThread(QThread):
+    """ページ画像の描画用ワーカースレッド
+    
+    PDFはこのスレッド内で1回だけ開き、要求されたページの右端3分の1だけを描画する。
+    新しい要求が来たら、まだ描画していない古い要求（先読み）は捨てる。
+    """
+    
+    page_rendered = pyqtSignal(int, QImage, int)  # ページ番号, 画像, 本文幅右端のx座標(px)
+    render_failed = pyqtSignal(int, str)
+    
+    ZOOM = 3.0  # 3倍ズームで高解像度
+    CROP_START_RATIO = 2 / 3  # 左から3分の2の位置から右端まで
+    
+    def __init__(self, pdf_path, parent=None):
+        super().__init__(parent)
+        self.pdf_path = pdf_path
+        self._pending: List[int] = []
+        self._condition = threading.Condition()
+        self._stopped = False
+    
+    def request(self, page_numbers: List[int]):
+        """描画するページを要求（先頭から順に描画、未着手の前回の要求は破棄）"""
+        with self._condition:
+            self._pending = list(page_numbers)
+            self._condition.notify()
+    
+    def stop(self):
+        """描画中のページが終わりしだい終了"""
+        with self._condition:
+            self._stopped = True
+            self._pending = []
+            self._condition.notify()
+    
+    def run(self):
+        try:
+            doc = fitz.open(str(self.pdf_path))
+        except Exception as e:
+            self.render_failed.emit(0, str(e))
+            return
+        
+        try:
+            while True:
+                with self._condition:
+                    while not self._pending and not self._stopped:
+                        self._condition.wait()
+                    if self._stopped:
+                        return
+                    page_number = self._pending.pop(0)
+                
+                if not 1 <= page_number <= len(doc):
+                    continue
+                try:
+                    image, text_right_edge = self._render(doc[page_number - 1], page_number)
+                except Exception as e:
+                    self.render_failed.emit(page_number, str(e))
+                    continue
+                self.page_rendered.emit(page_number, image, text_right_edge)
+        finally:
+            doc.close()
+    
+    def _render(self, page, page_number: int) -> Tuple[QImage, int]:
+        """ページの右端3分の1を描画（PNGを経由せず、画素バッファから直接QImageにする）"""
+        rect = page.rect
+        clip = fitz.Rect(rect.x0 + rect.width * self.CROP_START_RATIO, rect.y0, rect.x1, rect.y1)
+        pix = page.get_pixmap(matrix=fitz.Matrix(self.ZOOM, self.ZOOM), clip=clip, alpha=False)
+        
+        # samples はこの関数を抜けると解放されるため copy() で画素を持たせる
+        image = QImage(pix.samples, pix.width, pix.height, pix.stride,
+                       QImage.Format.Format_RGB888).copy()
+        
+        # 右ページ（奇数）か左ページ（偶数）かで右マージンが異なる
+        right_margin_mm = 20 if page_number % 2 == 1 else 15
+        text_right_edge_pt = rect.x1 - right_margin_mm * MM_TO_PT
+        text_right_edge = int(round((text_right_edge_pt - clip.x0) * self.ZOOM))
+        
+        return image, text_right_edge
+
+
 class OverflowResultDialog(QDialog):
     """溢れチェック結果表示・学習ダイアログ（ページ画像表示機能付き）"""
     
     learning_data_saved = pyqtSignal(dict)
     
+    # ページ画像のキャッシュ上限（古く表示したものから破棄）
+    MAX_CACHED_PAGES = 8
+    
+    # 表示ページの前後に先読みするページ数（検出ページのリスト上で）
+    PREFETCH_NEIGHBORS = 1
+    
     def __init__(self, result, parent=None):
         super().__init__(parent)
         self.result = result
         self.page_checkboxes = {}
-        self.page_images = {}  # ページ番号 -> QPixmap のキャッシュ
+        self.page_images = OrderedDict()  # ページ番号 -> QPixmap のキャッシュ（LRU）
         self.current_page_display = None  # 現在表示中のページ画像ラベル
+        self.render_thread = None
+        self._waiting_page = None  # 描画待ちで表示予定のページ
         self.learning_manager = WindowsLearningDataManager()
         
         self.setup_ui()
@@ -336,58 +427,75 @@ class OverflowResultDialog(QDialog):
         return group_box
     
     def _load_page_images(self):
-        """PDFからページ画像を読み込み（バックグラウンド処理）"""
+        """ページ画像の描画スレッドを開始（最初の検出ページとその次を先読み）"""
         if not hasattr(self.result, 'pdf_path') or not self.result.pdf_path:
             return
         
-        try:
-            # PyMuPDFでPDFを開く
-            doc = fitz.open(str(self.result.pdf_path))
-            
-            # 検出されたページの画像のみ読み込み
-            for page_data in self.result.overflow_pages:
-                page_number = page_data['page_number']
-                
-                if page_number <= len(doc):
-                    page = doc[page_number - 1]  # 0-indexed
-                    
-                    # 高解像度で画像変換（より鮮明に）
-                    mat = fitz.Matrix(3.0, 3.0)  # 3倍ズームで高解像度
-                    pix = page.get_pixmap(matrix=mat, alpha=False)  # アルファチャンネル無効でより鮮明
-                    
-                    # QPixmapに変換
-                    img_data = pix.pil_tobytes(format="PNG")
-                    pixmap = QPixmap()
-                    pixmap.loadFromData(img_data)
-                    
-                    # ページの右端3分の1のみを切り出し（溢れ確認用）
-                    pixmap = self._crop_right_third(pixmap)
-                    
-                    # 本文幅の線を描画
-                    pixmap = self._draw_text_boundary(pixmap, page_number)
-                    
-                    self.page_images[page_number] = pixmap
-            
-            doc.close()
-            
-        except Exception as e:
-            print(f"ページ画像読み込みエラー: {e}")
+        self.render_thread = PageImageRenderThread(self.result.pdf_path, self)
+        self.render_thread.page_rendered.connect(self._on_page_rendered)
+        self.render_thread.render_failed.connect(self._on_render_failed)
+        self.render_thread.start()
+        
+        page_numbers = self._detected_page_numbers()
+        if page_numbers:
+            self._request_pages(page_numbers[0])
     
-    def _crop_right_third(self, pixmap: QPixmap) -> QPixmap:
-        """ページ画像の右端3分の1を切り出し（溢れ確認用）"""
-        img_width = pixmap.width()
-        img_height = pixmap.height()
+    def _detected_page_numbers(self) -> List[int]:
+        return sorted(p['page_number'] for p in self.result.overflow_pages)
+    
+    def _request_pages(self, page_number: int):
+        """指定ページと前後の検出ページの描画を要求（キャッシュ済みのページは除く）"""
+        if self.render_thread is None:
+            return
+        
+        order = [page_number]
+        page_numbers = self._detected_page_numbers()
+        if page_number in page_numbers:
+            index = page_numbers.index(page_number)
+            for offset in range(1, self.PREFETCH_NEIGHBORS + 1):
+                # Spaceで次へ進むことが多いため、次のページを先に描画する
+                if index + offset < len(page_numbers):
+                    order.append(page_numbers[index + offset])
+                if index - offset >= 0:
+                    order.append(page_numbers[index - offset])
+        
+        self.render_thread.request([n for n in order if n not in self.page_images])
+    
+    def _on_page_rendered(self, page_number: int, image: QImage, text_right_edge: int):
+        """描画スレッドからの画像を受け取る（メインスレッド）"""
+        pixmap = QPixmap.fromImage(image)
         
-        # 右端3分の1の範囲を計算
-        crop_start_x = int(img_width * 2 / 3)  # 左から3分の2の位置から開始
-        crop_width = img_width - crop_start_x  # 右端まで
+        # 本文幅の線を描画
+        pixmap = self._draw_text_boundary(pixmap, text_right_edge)
         
-        # 切り出し実行
-        cropped_pixmap = pixmap.copy(crop_start_x, 0, crop_width, img_height)
-        return cropped_pixmap
+        self.page_images[page_number] = pixmap
+        self.page_images.move_to_end(page_number)
+        while len(self.page_images) > self.MAX_CACHED_PAGES:
+            self.page_images.popitem(last=False)
+        
+        if page_number == self._waiting_page:
+            self.display_page_image(page_number)
+    
+    def _on_render_failed(self, page_number: int, error: str):
+        print(f"ページ画像読み込みエラー: {error}")
+        if page_number == self._waiting_page or page_number == 0:
+            self.current_page_display.setText(f"ページ画像を読み込めませんでした: {error}")
+    
+    def done(self, result_code):
+        """ダイアログを閉じる前に描画スレッドを止める"""
+        if self.render_thread is not None:
+            self.render_thread.stop()
+            self.render_thread.wait()
+            self.render_thread = None
+        super().done(result_code)
     
-    def _draw_text_boundary(self, pixmap: QPixmap, page_number: int) -> QPixmap:
-        """ページ画像に本文幅の境界線を描画（切り出し後の座標系に対応）"""
+    def _draw_text_boundary(self, pixmap: QPixmap, text_right_edge: int) -> QPixmap:
+        """ページ画像に本文幅の境界線を描画
+        
+        Args:
+            pixmap: 右端3分の1の画像
+            text_right_edge: 本文幅右端のx座標（この画像上のpx）
+        """
         painter = QPainter(pixmap)
         painter.setRenderHint(QPainter.RenderHint.Antialiasing)
         
@@ -395,47 +503,23 @@ class OverflowResultDialog(QDialog):
         pen = QPen(QColor(255, 0, 0), 5)  # 赤、5px幅に拡大
         painter.setPen(pen)
         
-        # 切り出し後の画像サイズ
         img_width = pixmap.width()
         img_height = pixmap.height()
-        
-        # 右ページ（奇数）か左ページ（偶数）かで右マージンが異なる
-        is_right_page = (page_number % 2 == 1)
-        
-        # マージン設定（mm -> px, 3x zoom適用）
-        dpi = 300 * 3  # 3倍ズーム
-        mm_to_px = dpi / 25.4
-        
-        if is_right_page:
-            right_margin_mm = 20  # 右ページの右マージン
-        else:
-            right_margin_mm = 15  # 左ページの右マージン
-        
-        right_margin_px = int(right_margin_mm * mm_to_px)
-        
-        # 元のページ幅（3倍ズーム）を計算
-        original_page_width = int(182 * mm_to_px)  # B5判幅182mm
-        
-        # 切り出し開始位置（元ページの3分の2地点）
-        crop_start_x = int(original_page_width * 2 / 3)
-        
-        # 本文幅右端の位置（切り出し後の座標系で）
-        text_right_edge_original = original_page_width - right_margin_px
-        text_right_edge_in_crop = text_right_edge_original - crop_start_x
+        mm_to_px = MM_TO_PT * PageImageRenderThread.ZOOM
         
         # 境界線が切り出し範囲内にある場合のみ描画
-        if 0 <= text_right_edge_in_crop <= img_width:
+        if 0 <= text_right_edge <= img_width:
             # 垂直線を描画（上下に余白を設ける）
             margin_top = int(20 * mm_to_px)  # 上マージン
             margin_bottom = int(20 * mm_to_px)  # 下マージン
             
             painter.drawLine(
-                text_right_edge_in_crop, margin_top,
-                text_right_edge_in_crop, img_height - margin_bottom
+                text_right_edge, margin_top,
+                text_right_edge, img_height - margin_bottom
             )
             
             # 境界線の説明テキスト（背景付きで視認性向上）
-            text_x = text_right_edge_in_crop + 10
+            text_x = text_right_edge + 10
             text_y = margin_top + 30
             
             # 白い背景の矩形を描画
@@ -453,8 +537,16 @@ class OverflowResultDialog(QDialog):
         return pixmap
     
     def display_page_image(self, page_number: int):
-        """指定ページの画像を表示"""
+        """指定ページの画像を表示（未描画なら描画を要求し、届いたら表示）"""
+        # グループボックスのタイトルを更新
+        for widget in self.findChildren(QGroupBox):
+            if "ページ画像表示" in widget.title():
+                widget.setTitle(f"ページ画像表示 - ページ {page_number}")
+                break
+        
         if page_number in self.page_images:
+            self._waiting_page = None
+            self.page_images.move_to_end(page_number)
             pixmap = self.page_images[page_number]
             
             # スケール調整（より大きく表示、高品質変換）
@@ -468,15 +560,12 @@ class OverflowResultDialog(QDialog):
             )
             
             self.current_page_display.setPixmap(scaled_pixmap)
-            self.current_page_display.setText("")  # プレースホルダーテキストを削除
-            
-            # グループボックスのタイトルを更新
-            for widget in self.findChildren(QGroupBox):
-                if "ページ画像表示" in widget.title():
-                    widget.setTitle(f"ページ画像表示 - ページ {page_number}")
-                    break
         else:
+            self._waiting_page = page_number
             self.current_page_display.setText(f"ページ {page_number} の画像を読み込み中...")
+        
+        # 表示ページと前後のページを描画（キャッシュ済みなら先読みのみ）
+        self._request_pages(page_number)
     
     def keyPressEvent(self, event):
         """キーボードショートカット処理"""
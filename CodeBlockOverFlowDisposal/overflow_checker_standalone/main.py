@@ -8,6 +8,7 @@ Phase 2C-1 実装
 独立した溢れチェックアプリケーション
 """
 
+import multiprocessing
 import sys
 import os
 from pathlib import Path
@@ -64,4 +65,6 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    # PyInstallerで凍結した実行ファイルでOCRのプロセスプールを使うため
+    multiprocessing.freeze_support()
     sys.exit(main())
\ No newline at end of file
@@ -12,6 +12,9 @@ from pathlib import Path
 ROOT_DIR = Path('.').resolve()
 sys.path.insert(0, str(ROOT_DIR))
 
+# 共通モジュール（geometry_backend など）のあるディレクトリ
+SHARED_DIR = ROOT_DIR.parent
+
 block_cipher = None
 
 # データファイルとアセット
@@ -63,6 +66,10 @@ hiddenimports = [
     'numpy',
     'pytesseract',
     
+    # 事前選別で使う共通モジュール
+    'geometry_backend',
+    'page_geometry_cache',
+    
     # データベース
     'sqlite3',
     
@@ -117,7 +124,7 @@ excludes = [
 # PyInstallerの解析設定
 a = Analysis(
     ['run_ultimate.py'],
-    pathex=[str(ROOT_DIR)],
+    pathex=[str(ROOT_DIR), str(SHARED_DIR)],
     binaries=binaries,
     datas=datas,
     hiddenimports=hiddenimports,
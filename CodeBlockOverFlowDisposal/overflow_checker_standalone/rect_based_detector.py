@@ -6,8 +6,9 @@
 """
 
 import sys
+from bisect import bisect_left, bisect_right
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Iterable
 import pdfplumber
 import logging
 import os
@@ -76,26 +77,27 @@ class RectBasedOverflowDetector:
         if not code_blocks:
             return overflows
         
+        # 各ブロックに入る文字（y0がブロックのy区間内）をまとめて求める
+        block_chars = self._chars_by_block(page.chars, code_blocks)
+        
         # 各コードブロックに対してチェック
         for block_idx, block in enumerate(code_blocks):
             block_overflows = []
             
             # ブロック内の文字をチェック
-            for char in page.chars:
-                # 文字がブロック内に含まれるかチェック（Y座標）
-                if block['y0'] <= char['y0'] <= block['y1']:
-                    # ASCII文字のみ対象
-                    if self.is_ascii_printable(char['text']):
-                        # 文字の右端がブロックの右端を超えているか
-                        if char['x1'] > block['x1']:
-                            overflow_amount = char['x1'] - block['x1']
-                            block_overflows.append({
-                                'char': char['text'],
-                                'x0': char['x0'],
-                                'x1': char['x1'],
-                                'y0': char['y0'],
-                                'overflow_amount': overflow_amount
-                            })
+            for char in block_chars[block_idx]:
+                # ASCII文字のみ対象
+                if self.is_ascii_printable(char['text']):
+                    # 文字の右端がブロックの右端を超えているか
+                    if char['x1'] > block['x1']:
+                        overflow_amount = char['x1'] - block['x1']
+                        block_overflows.append({
+                            'char': char['text'],
+                            'x0': char['x0'],
+                            'x1': char['x1'],
+                            'y0': char['y0'],
+                            'overflow_amount': overflow_amount
+                        })
             
             if block_overflows:
                 # 行ごとにグループ化
@@ -131,6 +133,20 @@ class RectBasedOverflowDetector:
         
         return overflows
     
+    @staticmethod
+    def _chars_by_block(chars: List[Dict], code_blocks: List[Dict]) -> List[List[Dict]]:
+        """ブロックごとに、y0がブロックのy区間に入る文字（ページ内の順序）
+        
+        文字をy0でソートし、ブロックごとに区間の両端を二分探索で求める
+        （全ブロック×全文字の走査をしない）。
+        """
+        order = sorted(range(len(chars)), key=lambda i: chars[i]['y0'])
+        sorted_y0 = [chars[i]['y0'] for i in order]
+        return [
+            [chars[i] for i in sorted(order[bisect_left(sorted_y0, block['y0']):bisect_right(sorted_y0, block['y1'])])]
+            for block in code_blocks
+        ]
+    
     def detect_page_overflow(self, page, page_number: int) -> List[Dict]:
         """ページからのはみ出しを検出（英数字のみ）"""
         overflows = []
@@ -181,17 +197,19 @@ class RectBasedOverflowDetector:
         
         return overflows
     
-    def detect_file(self, pdf_path: Path) -> List[int]:
+    def detect_file(self, pdf_path: Path, pages: Optional[Iterable[int]] = None) -> List[int]:
         """
         PDFファイルを解析して、溢れページを検出
         
         Args:
             pdf_path: 解析対象のPDFファイルパス
+            pages: 解析するページ番号（1-indexed、Noneで全ページ）
             
         Returns:
             溢れが検出されたページ番号のリスト（1-indexed）
         """
         overflow_pages = set()
+        target_pages = set(pages) if pages is not None else None
         
         try:
             with pdfplumber.open(str(pdf_path)) as pdf:
@@ -200,6 +218,10 @@ class RectBasedOverflowDetector:
                 for page_idx, page in enumerate(pdf.pages):
                     page_number = page_idx + 1
                     
+                    # 対象外のページは解析しない（文字・矩形の抽出も行われない）
+                    if target_pages is not None and page_number not in target_pages:
+                        continue
+                    
                     if page_idx % 10 == 0:
                         logger.info(f"処理中: {page_idx}/{len(pdf.pages)} ページ...")
                     
@@ -8,6 +8,7 @@ Phase 2C-1 実装
 完全な名前空間解決済み実行ファイル
 """
 
+import multiprocessing
 import sys
 import os
 from pathlib import Path
@@ -206,4 +207,6 @@ def main():
         return 1
 
 if __name__ == "__main__":
+    # PyInstallerで凍結した実行ファイルでOCRのプロセスプールを使うため
+    multiprocessing.freeze_support()
     sys.exit(main())
\ No newline at end of file
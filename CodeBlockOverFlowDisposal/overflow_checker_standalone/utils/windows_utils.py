@@ -103,6 +103,14 @@ def get_default_db_path() -> Path:
     """
     return get_user_data_dir() / "learning_data.db"
 
+def get_default_page_results_path() -> Path:
+    """前回のページ指紋・検出結果ファイルパスを取得
+    
+    Returns:
+        ページ結果ファイルのPath
+    """
+    return get_user_data_dir() / "page_results.json"
+
 def safe_file_write(file_path: Path, content: str, encoding: str = 'utf-8'):
     """安全なファイル書き込み（Windows BOM対応）
     
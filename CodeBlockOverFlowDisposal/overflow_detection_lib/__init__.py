@@ -17,6 +17,7 @@ from .core.detector import OCRBasedOverflowDetector, FalsePositiveFilters
 from .core.config import DetectionConfig, ConfigManager
 from .models.result import DetectionResult, OverflowDetail, ConfidenceLevel
 from .models.settings import PDFSize, MarginSettings
+from .detectors import DETECTORS, DetectionPipeline, PageContext, PipelineResult, register_detector
 
 __all__ = [
     # Core classes
@@ -32,6 +33,13 @@ __all__ = [
     'PDFSize',
     'MarginSettings',
     
+    # Detector registry
+    'DETECTORS',
+    'DetectionPipeline',
+    'PageContext',
+    'PipelineResult',
+    'register_detector',
+    
     # Version info
     '__version__',
 ]
\ No newline at end of file
@@ -6,11 +6,8 @@ Advanced detection modules for Phase 2
 """
 
 from .adaptive_margin import AdaptiveMarginCalculator
-from .context_filter import ContextAwareFilter
-from .image_detector import ImageElementDetector
 
+# ContextAwareFilter / ImageElementDetector は未実装（PHASE2_IMPLEMENTATION_PLAN.md）
 __all__ = [
     'AdaptiveMarginCalculator',
-    'ContextAwareFilter', 
-    'ImageElementDetector'
 ]
\ No newline at end of file
@@ -5,20 +5,37 @@ Adaptive margin calculation for Phase 2
 動的マージン計算モジュール - ページレイアウトに応じた精密なマージン調整
 """
 
+import hashlib
 import logging
+import weakref
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Dict, List, Tuple, Optional
 from pathlib import Path
-import statistics
+
+import numpy as np
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class _CharColumns:
+    """空白以外の文字の位置（列指向）"""
+    texts: List[str]
+    x: np.ndarray
+    y: np.ndarray
+
+
 class AdaptiveMarginCalculator:
     """
     動的マージン計算クラス
     ページレイアウトを解析し、最適なマージンを計算
     """
     
-    def __init__(self, config_manager=None):
+    # キャッシュするページ数の既定上限
+    DEFAULT_CACHE_SIZE = 512
+    
+    def __init__(self, config_manager=None, cache_size: int = DEFAULT_CACHE_SIZE):
         self.config_manager = config_manager
         self.mm_to_pt = 2.83465
         
@@ -27,16 +44,21 @@ class AdaptiveMarginCalculator:
         self.footer_detection_threshold = 50.0  # フッター検出閾値 (pt)
         self.column_detection_min_gap = 20.0    # 段組み検出の最小間隔 (pt)
         
-        # キャッシュ
-        self._layout_cache = {}
+        # キャッシュ（(文書の指紋, ページ番号, 設定) をキーにしたLRU）
+        self.cache_size = cache_size
+        self._layout_cache: 'OrderedDict[Tuple, Dict]' = OrderedDict()
+        # pdfplumberのPDFオブジェクトごとの文書の指紋
+        self._document_fingerprints = weakref.WeakKeyDictionary()
     
-    def calculate_adaptive_margin(self, page, page_num: int) -> Dict[str, float]:
+    def calculate_adaptive_margin(self, page, page_num: int,
+                                  document_fingerprint: Optional[str] = None) -> Dict[str, float]:
         """
         ページレイアウトに応じた動的マージン計算
         
         Args:
             page: pdfplumber page object
             page_num: ページ番号
+            document_fingerprint: 文書の指紋（省略時はページの属するPDFの内容から計算）
             
         Returns:
             Dict: 計算されたマージン情報
@@ -45,11 +67,15 @@ class AdaptiveMarginCalculator:
                 - layout_type: 検出されたレイアウトタイプ
                 - adjustments: 適用された調整項目
         """
-        page_id = f"page_{page_num}"
+        if document_fingerprint is None:
+            document_fingerprint = self._document_fingerprint(page)
+        cache_key = (document_fingerprint, page_num, self._config_key())
         
         # キャッシュチェック
-        if page_id in self._layout_cache:
-            return self._layout_cache[page_id]
+        cached = self._layout_cache.get(cache_key)
+        if cached is not None:
+            self._layout_cache.move_to_end(cache_key)
+            return cached
         
         # 基本マージン取得
         base_margin = self._get_base_margin(page_num)
@@ -70,11 +96,59 @@ class AdaptiveMarginCalculator:
             'base_margin_pt': base_margin
         }
         
-        # キャッシュに保存
-        self._layout_cache[page_id] = result
+        # キャッシュに保存（上限を超えたら最も古いものから削除）
+        self._layout_cache[cache_key] = result
+        while len(self._layout_cache) > self.cache_size:
+            self._layout_cache.popitem(last=False)
         
         return result
     
+    def _config_key(self) -> Tuple:
+        """結果に影響する設定（閾値と奇数・偶数ページの基本マージン）"""
+        return (
+            self.mm_to_pt,
+            self.header_detection_threshold,
+            self.footer_detection_threshold,
+            self.column_detection_min_gap,
+            self._get_base_margin(1),
+            self._get_base_margin(2)
+        )
+    
+    def _document_fingerprint(self, page) -> str:
+        """
+        ページの属する文書の指紋
+        
+        pdfplumberのページはPDFファイルの内容のハッシュ（PDFごとに1回だけ計算）、
+        それ以外はページの文字の内容のハッシュ。
+        """
+        pdf = getattr(page, 'pdf', None)
+        stream = getattr(pdf, 'stream', None)
+        if stream is not None:
+            fingerprint = self._document_fingerprints.get(pdf)
+            if fingerprint is None:
+                fingerprint = self._stream_digest(stream)
+                self._document_fingerprints[pdf] = fingerprint
+            return fingerprint
+        
+        digest = hashlib.sha1()
+        digest.update(repr((page.width, page.height)).encode('utf-8'))
+        for char in page.chars:
+            digest.update(repr((char.get('text', ''), char.get('x0', 0), char.get('y0', 0))).encode('utf-8'))
+        return 'page:' + digest.hexdigest()
+    
+    @staticmethod
+    def _stream_digest(stream) -> str:
+        """ファイルオブジェクトの内容のハッシュ（読み取り位置は元に戻す）"""
+        digest = hashlib.sha1()
+        position = stream.tell()
+        try:
+            stream.seek(0)
+            for chunk in iter(lambda: stream.read(1024 * 1024), b''):
+                digest.update(chunk)
+        finally:
+            stream.seek(position)
+        return digest.hexdigest()
+    
     def _get_base_margin(self, page_num: int) -> float:
         """基本マージンの取得"""
         if self.config_manager:
@@ -100,16 +174,15 @@ class AdaptiveMarginCalculator:
         page_width = page.width
         page_height = page.height
         
-        # 文字配置解析
-        chars = page.chars
-        text_positions = self._extract_text_positions(chars)
+        # 文字配置解析（空白以外の文字の位置を1回だけ列にまとめる）
+        columns = self._extract_char_columns(page.chars)
         
         # レイアウトパターン検出
         layout_patterns = {
-            'single_column': self._detect_single_column(text_positions, page_width),
-            'two_column': self._detect_two_column(text_positions, page_width),
-            'code_heavy': self._detect_code_heavy_layout(chars),
-            'header_footer': self._detect_header_footer(text_positions, page_height)
+            'single_column': self._detect_single_column(columns.x, page_width),
+            'two_column': self._detect_two_column(columns.x, page_width),
+            'code_heavy': self._detect_code_heavy_layout(columns.texts),
+            'header_footer': self._detect_header_footer(columns.y, page_height)
         }
         
         # 最も確からしいレイアウト選択
@@ -120,41 +193,36 @@ class AdaptiveMarginCalculator:
             'confidence': primary_layout[1]['confidence'],
             'adjustments': primary_layout[1]['adjustments'],
             'details': layout_patterns,
-            'text_distribution': self._analyze_text_distribution(text_positions, page_width)
+            'text_distribution': self._analyze_text_distribution(columns.x, page_width)
         }
     
-    def _extract_text_positions(self, chars: List[Dict]) -> List[Dict]:
-        """文字位置情報の抽出と整理"""
-        positions = []
+    def _extract_char_columns(self, chars: List[Dict]) -> '_CharColumns':
+        """空白以外の文字の位置を列（NumPy配列）にまとめる（4つの検出で共用）"""
+        texts = []
+        x0 = []
+        y0 = []
         for char in chars:
-            if char.get('text', '').strip():
-                positions.append({
-                    'x': char.get('x0', 0),
-                    'y': char.get('y0', 0),
-                    'text': char.get('text', ''),
-                    'width': char.get('x1', 0) - char.get('x0', 0),
-                    'height': char.get('y1', 0) - char.get('y0', 0)
-                })
-        return positions
+            text = char.get('text', '')
+            if text.strip():
+                texts.append(text)
+                x0.append(char.get('x0', 0))
+                y0.append(char.get('y0', 0))
+        return _CharColumns(
+            texts=texts,
+            x=np.array(x0, dtype=np.float64),
+            y=np.array(y0, dtype=np.float64)
+        )
     
-    def _detect_single_column(self, positions: List[Dict], page_width: float) -> Dict:
+    def _detect_single_column(self, x_coords: np.ndarray, page_width: float) -> Dict:
         """単一段組みレイアウトの検出"""
-        if not positions:
+        total_count = len(x_coords)
+        if total_count == 0:
             return {'confidence': 0.0, 'adjustments': []}
         
-        # X座標の分布を解析
-        x_coords = [pos['x'] for pos in positions]
-        
         # 95%の文字が左寄せされている場合は単一段組み
         left_boundary = page_width * 0.1  # 10%位置
-        right_boundary = page_width * 0.8  # 80%位置
-        
-        left_aligned_count = sum(1 for x in x_coords if x < left_boundary + 50)
-        total_count = len(x_coords)
-        
-        if total_count == 0:
-            return {'confidence': 0.0, 'adjustments': []}
         
+        left_aligned_count = int(np.count_nonzero(x_coords < left_boundary + 50))
         left_ratio = left_aligned_count / total_count
         
         confidence = min(left_ratio * 1.2, 1.0)  # 最大1.0
@@ -169,32 +237,26 @@ class AdaptiveMarginCalculator:
             'left_ratio': left_ratio
         }
     
-    def _detect_two_column(self, positions: List[Dict], page_width: float) -> Dict:
+    def _detect_two_column(self, x_coords: np.ndarray, page_width: float) -> Dict:
         """2段組みレイアウトの検出"""
-        if not positions:
+        if len(x_coords) == 0:
             return {'confidence': 0.0, 'adjustments': []}
         
         # X座標でクラスタリング
-        x_coords = [pos['x'] for pos in positions]
-        x_coords.sort()
+        sorted_x = np.sort(x_coords)
         
         # 中央付近の大きな空白を検出
         center_region = (page_width * 0.3, page_width * 0.7)
-        gaps = []
-        
-        for i in range(len(x_coords) - 1):
-            gap_size = x_coords[i + 1] - x_coords[i]
-            gap_center = (x_coords[i] + x_coords[i + 1]) / 2
-            
-            if (center_region[0] < gap_center < center_region[1] and 
-                gap_size > self.column_detection_min_gap):
-                gaps.append(gap_size)
+        gap_sizes = np.diff(sorted_x)
+        gap_centers = (sorted_x[:-1] + sorted_x[1:]) / 2
+        gaps = gap_sizes[(center_region[0] < gap_centers) & (gap_centers < center_region[1]) &
+                         (gap_sizes > self.column_detection_min_gap)]
         
         confidence = 0.0
         adjustments = []
+        max_gap = float(gaps.max()) if len(gaps) else 0
         
-        if gaps:
-            max_gap = max(gaps)
+        if len(gaps):
             if max_gap > self.column_detection_min_gap * 2:
                 confidence = min(max_gap / (page_width * 0.1), 1.0)
                 adjustments.append('narrow_margin')  # 狭いマージン適用
@@ -202,33 +264,23 @@ class AdaptiveMarginCalculator:
         return {
             'confidence': confidence,
             'adjustments': adjustments,
-            'max_gap': max(gaps) if gaps else 0
+            'max_gap': max_gap
         }
     
-    def _detect_code_heavy_layout(self, chars: List[Dict]) -> Dict:
+    CODE_INDICATORS = frozenset({'{', '}', '(', ')', '[', ']', ';', ':', '=', '<', '>'})
+    MONOSPACE_INDICATORS = frozenset({'|', '_', '`', '#'})
+    
+    def _detect_code_heavy_layout(self, texts: List[str]) -> Dict:
         """コード中心レイアウトの検出"""
-        if not chars:
-            return {'confidence': 0.0, 'adjustments': []}
-        
-        code_indicators = {'{', '}', '(', ')', '[', ']', ';', ':', '=', '<', '>'}
-        monospace_indicators = {'|', '_', '`', '#'}
-        
-        code_char_count = 0
-        monospace_count = 0
-        total_chars = 0
-        
-        for char in chars:
-            text = char.get('text', '')
-            if text.strip():
-                total_chars += 1
-                if text in code_indicators:
-                    code_char_count += 1
-                if text in monospace_indicators:
-                    monospace_count += 1
-        
+        total_chars = len(texts)
         if total_chars == 0:
             return {'confidence': 0.0, 'adjustments': []}
         
+        code_indicators = self.CODE_INDICATORS
+        monospace_indicators = self.MONOSPACE_INDICATORS
+        code_char_count = sum(1 for text in texts if text in code_indicators)
+        monospace_count = sum(1 for text in texts if text in monospace_indicators)
+        
         code_ratio = code_char_count / total_chars
         monospace_ratio = monospace_count / total_chars
         
@@ -246,21 +298,16 @@ class AdaptiveMarginCalculator:
             'monospace_ratio': monospace_ratio
         }
     
-    def _detect_header_footer(self, positions: List[Dict], page_height: float) -> Dict:
+    def _detect_header_footer(self, y_coords: np.ndarray, page_height: float) -> Dict:
         """ヘッダー・フッター検出"""
-        if not positions:
-            return {'confidence': 0.0, 'adjustments': []}
-        
-        y_coords = [pos['y'] for pos in positions]
-        
-        # ページ上部・下部の文字数カウント
-        header_count = sum(1 for y in y_coords if y > page_height - self.header_detection_threshold)
-        footer_count = sum(1 for y in y_coords if y < self.footer_detection_threshold)
         total_count = len(y_coords)
-        
         if total_count == 0:
             return {'confidence': 0.0, 'adjustments': []}
         
+        # ページ上部・下部の文字数カウント
+        header_count = int(np.count_nonzero(y_coords > page_height - self.header_detection_threshold))
+        footer_count = int(np.count_nonzero(y_coords < self.footer_detection_threshold))
+        
         header_ratio = header_count / total_count
         footer_ratio = footer_count / total_count
         
@@ -279,25 +326,24 @@ class AdaptiveMarginCalculator:
             'footer_ratio': footer_ratio
         }
     
-    def _analyze_text_distribution(self, positions: List[Dict], page_width: float) -> Dict:
+    def _analyze_text_distribution(self, x_coords: np.ndarray, page_width: float) -> Dict:
         """テキスト分布の解析"""
-        if not positions:
+        total_count = len(x_coords)
+        if total_count == 0:
             return {'right_edge_density': 0.0, 'density_score': 0.0}
         
         # 右端近くのテキスト密度を計算
         right_region_start = page_width * 0.8
-        right_edge_chars = [pos for pos in positions if pos['x'] > right_region_start]
-        
-        right_edge_density = len(right_edge_chars) / len(positions)
+        right_edge_density = int(np.count_nonzero(x_coords > right_region_start)) / total_count
         
-        # X座標の標準偏差（レイアウトの整然性指標）
-        x_coords = [pos['x'] for pos in positions]
-        density_score = 1.0 / (1.0 + statistics.stdev(x_coords) / page_width)
+        # X座標の標準偏差（レイアウトの整然性指標、1文字だけのページは0）
+        stdev = float(np.std(x_coords, ddof=1)) if total_count > 1 else 0.0
+        density_score = 1.0 / (1.0 + stdev / page_width)
         
         return {
             'right_edge_density': right_edge_density,
             'density_score': density_score,
-            'total_chars': len(positions)
+            'total_chars': total_count
         }
     
     def _calculate_margin_adjustments(self, base_margin: float, layout_info: Dict, page) -> float:
@@ -0,0 +1,19 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Detector plugins - 共有ページジオメトリ上の検出器の登録とパイプライン
+"""
+
+from .registry import DETECTORS, DetectorPlugin, DetectorRegistry, PageContext, register_detector
+from .pipeline import DetectionPipeline, PipelineResult
+from . import builtin  # noqa: F401  既定の検出器を登録
+
+__all__ = [
+    'DETECTORS',
+    'DetectorPlugin',
+    'DetectorRegistry',
+    'PageContext',
+    'register_detector',
+    'DetectionPipeline',
+    'PipelineResult',
+]
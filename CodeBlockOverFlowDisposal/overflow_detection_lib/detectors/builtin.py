@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Built-in detectors - 既定の登録簿に登録する検出器
+
+- code_block_edge / text_area_edge: 共有ジオメトリ上の純粋関数
+  （スタンドアロン版の矩形基準検出器の2つの判定。両方の和が同検出器の結果になる）
+- それ以外: 既存の検出器クラスのページ単位のメソッドをそのまま取り込んだもの
+  （PDFを開く・ページをループする処理はパイプラインが1回だけ行う）
+
+検出器ベンチマーク（detector_benchmark）もこの登録簿の検出器を計測する。
+"""
+
+import importlib
+from typing import Dict, List
+
+from .registry import DETECTORS, PageContext, PageDetector
+
+# ページからのはみ出しとみなす最小量(pt)
+TEXT_AREA_MIN_OVERFLOW = 1.0
+
+
+@DETECTORS.register('code_block_edge', description='コードブロック（塗りつぶし矩形）の右端を超えたASCII文字')
+def code_block_edge(ctx: PageContext) -> List[Dict]:
+    blocks = ctx.filled_rects()
+    geometry = ctx.char_geometry
+    if not blocks or len(geometry) == 0:
+        return []
+
+    printable = geometry.is_ascii_printable
+    x1, y0 = geometry.x1, geometry.y0
+    findings = []
+    for block_index, block in enumerate(blocks):
+        # y0がブロックのy区間に入り、右端がブロックの右端を超える文字
+        mask = printable & (y0 >= block['y0']) & (y0 <= block['y1']) & (x1 > block['x1'])
+        for indices in geometry.group_lines(mask, sort_by='x0'):
+            findings.append({
+                'type': 'rect_overflow',
+                'block_index': block_index,
+                'y_position': int(geometry.line_y[indices[0]]),
+                'overflow_text': geometry.text_of(indices),
+                'overflow_amount': float(x1[indices].max() - block['x1'])
+            })
+    return findings
+
+
+@DETECTORS.register('text_area_edge', description='本文領域の右端を1pt以上超えたASCII文字の行')
+def text_area_edge(ctx: PageContext) -> List[Dict]:
+    geometry = ctx.char_geometry
+    if len(geometry) == 0:
+        return []
+
+    right_edge = ctx.text_right_edge()
+    x1 = geometry.x1
+    findings = []
+    for indices in geometry.group_lines(geometry.is_ascii_printable & (x1 > right_edge), sort_by='x0'):
+        overflow_amount = float(x1[indices].max() - right_edge)
+        if overflow_amount >= TEXT_AREA_MIN_OVERFLOW:
+            findings.append({
+                'type': 'page_overflow',
+                'y_position': int(geometry.line_y[indices[0]]),
+                'overflow_text': geometry.text_of(indices),
+                'overflow_amount': overflow_amount,
+                'text_right_edge': right_edge
+            })
+    return findings
+
+
+def _findings(page_result) -> List[Dict]:
+    """既存の検出器のページ単位の結果をはみ出しのリストにそろえる"""
+    if not page_result:
+        return []
+    if isinstance(page_result, list):
+        return page_result
+    if isinstance(page_result, dict) and 'has_overflow' in page_result:
+        if not page_result['has_overflow']:
+            return []
+        return page_result.get('overflows') or [page_result]
+    return [page_result]
+
+
+def page_method_factory(module: str, class_name: str, method: str, with_pdf_name: bool = False):
+    """
+    既存の検出器クラスのページ単位のメソッドを検出関数にするファクトリ
+
+    検出器は実行ごとに生成する（統計などの状態が実行をまたがない）。
+    モジュールは生成時に初めてimportする。
+
+    Args:
+        module: モジュール名
+        class_name: 検出器クラス名
+        method: method(page, page_number[, pdf_name]) の形のメソッド名
+        with_pdf_name: PDFファイル名も渡すか
+    """
+    def factory() -> PageDetector:
+        detector = getattr(importlib.import_module(module), class_name)()
+        bound = getattr(detector, method)
+        if with_pdf_name:
+            return lambda ctx: _findings(bound(ctx.page, ctx.page_number, ctx.pdf_name))
+        return lambda ctx: _findings(bound(ctx.page, ctx.page_number))
+    return factory
+
+
+# (名前, モジュール, クラス, メソッド, PDFファイル名を渡すか, pdfplumber本来のページが必要か)
+_PAGE_METHOD_DETECTORS = [
+    ('v3', 'maximum_ocr_detector_v3', 'MaximumOCRDetectorV3', 'detect_overflows', False, False),
+    ('maximum_ocr', 'maximum_ocr_detector', 'MaximumOCRDetector', 'detect_comprehensive', False, False),
+    ('maximum_ocr_v2', 'maximum_ocr_detector_v2', 'MaximumOCRDetectorV2', 'detect_overflows', False, False),
+    ('maximum_ocr_fixed', 'maximum_ocr_detector_fixed', 'MaximumOCRDetectorFixed', 'detect_overflows',
+     False, False),
+    ('perfect', 'perfect_overflow_detector', 'PerfectOverflowDetector', 'detect_overflows', False, False),
+    ('precise', 'precise_overflow_detector', 'PreciseOverflowDetector', 'process_page', False, False),
+    ('pure_algorithmic', 'pure_algorithmic_detector', 'PureAlgorithmicDetector', 'detect_overflows',
+     False, False),
+    ('simple', 'simple_overflow_detector', 'SimpleOverflowDetector', 'process_page', False, False),
+    ('rect_based', 'rect_based_visual_detector', 'RectBasedVisualDetector', 'process_page', False, False),
+    ('visual_hybrid', 'visual_hybrid_detector', 'VisualHybridDetector', 'process_page', True, True),
+]
+# v8 は pdfplumber のページにない extract_text_blocks を呼び、全ページでエラーになるため登録しない
+for _version in (2, 3, 4, 5, 6, 7, 9, 10):
+    _PAGE_METHOD_DETECTORS.append((
+        f'visual_hybrid_v{_version}', f'visual_hybrid_detector_v{_version}', f'VisualHybridDetectorV{_version}',
+        'detect_page' if _version >= 8 else 'process_page', True, _version <= 3
+    ))
+
+for _name, _module, _class_name, _method, _with_pdf_name, _plumber_pages in _PAGE_METHOD_DETECTORS:
+    DETECTORS.register_factory(_name, page_method_factory(_module, _class_name, _method, _with_pdf_name),
+                               description=f'{_class_name}.{_method}', plumber_pages=_plumber_pages)
@@ -0,0 +1,187 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Detection pipeline - 1回の解析で複数の検出器を実行するパイプライン
+PDFを1回だけ開き（ジオメトリキャッシュ経由）、ページごとに PageContext を作って
+選択した検出器すべてに渡す。検出器ごとの検出ページ・処理時間・エラーを記録し、
+多数決（アンサンブル）で検出ページをまとめることもできる。
+
+    pipeline = DetectionPipeline(['v3', 'rect_based', 'code_block_edge'])
+    result = pipeline.run(pdf_path)
+    result.pages('v3')
+    result.ensemble(min_votes=2)
+    result.timings()
+"""
+
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .registry import DETECTORS, DetectorRegistry, PageContext
+
+# プロジェクトルートのジオメトリキャッシュを使用（V3検出器と共通）
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from geometry_backend import get_backend
+from page_geometry_cache import PageGeometryCache, open_pdf
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class PipelineResult:
+    """1つのPDFに対する全検出器の結果"""
+    pdf_name: str
+    detectors: List[str]
+    total_pages: int = 0
+    pages_processed: int = 0
+    # 検出器名 -> ページ番号 -> はみ出しのリスト
+    findings: Dict[str, Dict[int, List[Dict]]] = field(default_factory=dict)
+    # 検出器名 -> 処理時間（秒、全ページ合計）
+    seconds: Dict[str, float] = field(default_factory=dict)
+    # 検出器名 -> [{'page': ページ番号（0は検出器の生成時）, 'error': メッセージ}, ...]
+    errors: Dict[str, List[Dict]] = field(default_factory=dict)
+    # PDFを開く（ジオメトリの抽出またはキャッシュの読み込み）時間
+    open_seconds: float = 0.0
+    # page.chars / page.rects の組み立て時間
+    geometry_seconds: float = 0.0
+
+    def pages(self, name: str) -> List[int]:
+        """検出器が検出したページ番号"""
+        return sorted(self.findings.get(name, {}))
+
+    def votes(self, names: Optional[Sequence[str]] = None) -> Dict[int, List[str]]:
+        """ページごとに、そのページを検出した検出器"""
+        votes: Dict[int, List[str]] = {}
+        for name in names or self.detectors:
+            for page_number in self.pages(name):
+                votes.setdefault(page_number, []).append(name)
+        return dict(sorted(votes.items()))
+
+    def ensemble(self, min_votes: Optional[int] = None, names: Optional[Sequence[str]] = None) -> List[int]:
+        """
+        多数決で検出ページを決める
+
+        Args:
+            min_votes: 検出とみなす最小の票数（省略時は過半数、1でいずれかの検出器）
+            names: 投票する検出器（省略時は全検出器）
+
+        Returns:
+            検出ページ番号
+        """
+        names = list(names or self.detectors)
+        if min_votes is None:
+            min_votes = len(names) // 2 + 1
+        return [page_number for page_number, voters in self.votes(names).items() if len(voters) >= min_votes]
+
+    def timings(self) -> Dict[str, Dict]:
+        """検出器ごとの処理時間（PDFを開く時間・ジオメトリ組み立て時間は別枠）"""
+        timings = {
+            name: {
+                'seconds': seconds,
+                'pages_per_sec': self.pages_processed / seconds if seconds > 0 else 0.0,
+                'detected_pages': len(self.findings.get(name, {})),
+                'errors': len(self.errors.get(name, []))
+            }
+            for name, seconds in self.seconds.items()
+        }
+        timings['(open)'] = {'seconds': self.open_seconds}
+        timings['(geometry)'] = {'seconds': self.geometry_seconds}
+        return timings
+
+
+class DetectionPipeline:
+    """共有ジオメトリで複数の検出器を1パスで実行するパイプライン"""
+
+    def __init__(self, detectors: Optional[Sequence[str]] = None, registry: Optional[DetectorRegistry] = None,
+                 backend=None, cache: Optional[PageGeometryCache] = None):
+        """
+        Args:
+            detectors: 実行する検出器名（省略時は登録済みの全検出器）
+            registry: 検出器の登録簿（省略時は既定の登録簿）
+            backend: ジオメトリ抽出バックエンド名またはインスタンス
+            cache: ジオメトリキャッシュ（省略時は既定のキャッシュ）
+        """
+        self.registry = registry or DETECTORS
+        self.detectors = list(detectors or self.registry.names())
+        self.plugins = [self.registry.get(name) for name in self.detectors]
+        self.backend = backend
+        self.cache = cache
+
+    def run(self, pdf_path: Path, pages: Optional[Iterable[int]] = None) -> PipelineResult:
+        """
+        PDFを1回解析して全検出器を実行
+
+        Args:
+            pdf_path: PDFファイルパス
+            pages: 対象ページ番号（1-indexed、Noneで全ページ）
+
+        Returns:
+            検出器ごとの結果
+        """
+        pdf_path = Path(pdf_path)
+        result = PipelineResult(pdf_path.name, list(self.detectors))
+        target_pages = set(pages) if pages is not None else None
+
+        # 検出関数は実行ごとに作る（生成に失敗した検出器はエラーを記録して除外）
+        functions = {}
+        for plugin in self.plugins:
+            result.findings[plugin.name] = {}
+            result.seconds[plugin.name] = 0.0
+            try:
+                functions[plugin.name] = plugin.create()
+            except Exception as e:
+                self._record_error(result, plugin.name, 0, e)
+        active = [plugin for plugin in self.plugins if plugin.name in functions]
+        plumber_pages = any(plugin.plumber_pages for plugin in active)
+        uses_page_dicts = plumber_pages or any(plugin.uses_page_dicts for plugin in active)
+
+        # pdfplumber本来のページが必要な検出器があれば、キャッシュを使わずpdfplumberで開く
+        # （文字・矩形の解析は最初の参照時に行われ、ジオメトリ組み立て時間に含まれる）
+        start = time.perf_counter()
+        if plumber_pages:
+            pdf_context = get_backend('pdfplumber').open(pdf_path)
+        else:
+            pdf_context = open_pdf(pdf_path, cache=self.cache, backend=self.backend)
+        with pdf_context as pdf:
+            result.open_seconds = time.perf_counter() - start
+            result.total_pages = len(pdf.pages)
+
+            for i, page in enumerate(pdf.pages):
+                page_number = i + 1
+                if target_pages is not None and page_number not in target_pages:
+                    continue
+
+                context = PageContext(page, page_number, pdf_path.name)
+                if uses_page_dicts:
+                    start = time.perf_counter()
+                    _ = (page.chars, page.rects)
+                    result.geometry_seconds += time.perf_counter() - start
+
+                for name, detect in functions.items():
+                    start = time.perf_counter()
+                    try:
+                        found = detect(context)
+                    except Exception as e:
+                        found = None
+                        self._record_error(result, name, page_number, e)
+                    result.seconds[name] += time.perf_counter() - start
+                    if found:
+                        result.findings[name][page_number] = list(found)
+
+                result.pages_processed += 1
+                page.close()
+
+        return result
+
+    @staticmethod
+    def _record_error(result: PipelineResult, name: str, page_number: int, error: Exception):
+        errors = result.errors.setdefault(name, [])
+        if not errors:
+            logger.warning(f"検出器エラー ({name}, ページ {page_number}): {error}")
+        errors.append({'page': page_number, 'error': f"{type(error).__name__}: {error}"})
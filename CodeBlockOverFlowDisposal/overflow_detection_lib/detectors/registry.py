@@ -0,0 +1,208 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Detector registry - 検出器プラグインの登録
+検出器は「ページのジオメトリ (PageContext) -> はみ出しのリスト」の関数として登録する。
+PDFの解析・ページのループはパイプライン (DetectionPipeline) が1回だけ行い、
+同じ PageContext を全検出器に渡す。
+
+    from overflow_detection_lib.detectors import register_detector
+
+    @register_detector('my_detector', description='...')
+    def my_detector(ctx):
+        edge = ctx.text_right_edge()
+        return [{'y_position': y} for y in ...]
+"""
+
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional
+
+# プロジェクトルートの共通カーネルを使用（V3検出器と共通）
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from char_geometry import CharGeometry
+
+MM_TO_PT = 2.83465
+
+# ページごとの検出関数: PageContext -> はみ出しのリスト（空ならはみ出しなし）
+PageDetector = Callable[['PageContext'], List[Dict]]
+
+
+class PageContext:
+    """1ページ分の共有ジオメトリ
+
+    検出器間で共有する派生データ（文字ジオメトリ、コードブロックなど）は
+    最初に参照したときに1回だけ作る。検出器はこのオブジェクトを変更しないこと。
+    """
+
+    def __init__(self, page, page_number: int, pdf_name: str = ''):
+        """
+        Args:
+            page: pdfplumberのページ（またはキャッシュ済みページ）
+            page_number: ページ番号（1-indexed）
+            pdf_name: PDFファイル名
+        """
+        self.page = page
+        self.page_number = page_number
+        self.pdf_name = pdf_name
+        self._shared: Dict[Hashable, Any] = {}
+
+    @property
+    def width(self) -> float:
+        return self.page.width
+
+    @property
+    def height(self) -> float:
+        return self.page.height
+
+    @property
+    def is_odd(self) -> bool:
+        return self.page_number % 2 == 1
+
+    @property
+    def chars(self) -> List[Dict]:
+        """文字のリスト（pdfplumberと同じキー）"""
+        return self.page.chars
+
+    @property
+    def rects(self) -> List[Dict]:
+        """矩形のリスト（pdfplumberと同じキー）"""
+        return self.page.rects
+
+    def shared(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        検出器間で共有する派生データ（初回のみ factory() で作成）
+
+        Args:
+            key: データのキー（検出器をまたいで同じものを指すキーにする）
+            factory: データを作る関数
+        """
+        if key not in self._shared:
+            self._shared[key] = factory()
+        return self._shared[key]
+
+    @property
+    def char_geometry(self) -> CharGeometry:
+        """文字ジオメトリ（列指向）"""
+        return self.shared('char_geometry', lambda: CharGeometry.from_page(self.page))
+
+    def text_right_edge(self, odd_margin_mm: float = 10, even_margin_mm: float = 18) -> float:
+        """本文領域の右端(pt)（既定は奇数ページ10mm、偶数ページ18mm）"""
+        margin_mm = odd_margin_mm if self.is_odd else even_margin_mm
+        return self.width - margin_mm * MM_TO_PT
+
+    def filled_rects(self, min_width: float = 100, min_height: float = 10) -> List[Dict]:
+        """
+        塗りつぶし矩形（コードブロックの背景）
+
+        Args:
+            min_width: 最小幅(pt、これを超えるもの)
+            min_height: 最小高さ(pt、これを超えるもの)
+
+        Returns:
+            x0, y0, x1, y1, width, height を持つdictのリスト
+        """
+        def build():
+            blocks = []
+            for rect in self.rects:
+                if not rect.get('fill'):
+                    continue
+                width = rect['x1'] - rect['x0']
+                height = rect['y1'] - rect['y0']
+                if width > min_width and height > min_height:
+                    blocks.append({'x0': rect['x0'], 'y0': rect['y0'], 'x1': rect['x1'], 'y1': rect['y1'],
+                                   'width': width, 'height': height})
+            return blocks
+        return self.shared(('filled_rects', min_width, min_height), build)
+
+
+@dataclass
+class DetectorPlugin:
+    """登録済みの検出器"""
+    name: str
+    # 実行ごとに1回呼び、ページごとの検出関数を返す
+    factory: Callable[[], PageDetector]
+    description: str = ''
+    # page.chars / page.rects（dictのリスト）を使うか（パイプラインが解析時間として先に組み立てる）
+    uses_page_dicts: bool = False
+    # pdfplumber本来のページ（within_bbox など）が必要か（キャッシュを使わずpdfplumberで開く）
+    plumber_pages: bool = False
+
+    def create(self) -> PageDetector:
+        return self.factory()
+
+
+class DetectorRegistry:
+    """検出器プラグインの登録簿"""
+
+    def __init__(self):
+        self._plugins: Dict[str, DetectorPlugin] = {}
+
+    def register(self, name: str, detect: Optional[PageDetector] = None, *,
+                 description: str = '', uses_page_dicts: bool = False, plumber_pages: bool = False):
+        """
+        ページごとの検出関数を登録（デコレータとしても使える）
+
+        Args:
+            name: 検出器名
+            detect: 検出関数（PageContext -> はみ出しのリスト）
+            description: 説明
+            uses_page_dicts: page.chars / page.rects を使うか
+            plumber_pages: pdfplumber本来のページが必要か
+        """
+        def decorator(function: PageDetector) -> PageDetector:
+            self.register_factory(name, lambda: function, description=description,
+                                  uses_page_dicts=uses_page_dicts, plumber_pages=plumber_pages)
+            return function
+
+        if detect is None:
+            return decorator
+        return decorator(detect)
+
+    def register_factory(self, name: str, factory: Callable[[], PageDetector], *,
+                         description: str = '', uses_page_dicts: bool = True, plumber_pages: bool = False):
+        """
+        実行ごとに検出関数を作るファクトリを登録（状態を持つ既存の検出器クラスの取り込み用）
+
+        Args:
+            name: 検出器名
+            factory: 検出関数を返す関数
+            description: 説明
+            uses_page_dicts: page.chars / page.rects を使うか
+            plumber_pages: pdfplumber本来のページが必要か
+        """
+        self._plugins[name] = DetectorPlugin(name, factory, description, uses_page_dicts, plumber_pages)
+
+    def unregister(self, name: str):
+        self._plugins.pop(name, None)
+
+    def get(self, name: str) -> DetectorPlugin:
+        """
+        Raises:
+            ValueError: 未登録の検出器名
+        """
+        if name not in self._plugins:
+            raise ValueError(f"unknown detector: {name} (choices: {', '.join(self._plugins)})")
+        return self._plugins[name]
+
+    def names(self) -> List[str]:
+        return list(self._plugins)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._plugins
+
+    def __len__(self) -> int:
+        return len(self._plugins)
+
+
+# 既定の登録簿
+DETECTORS = DetectorRegistry()
+
+
+def register_detector(name: str, detect: Optional[PageDetector] = None, **kwargs):
+    """既定の登録簿に検出関数を登録（デコレータとしても使える）"""
+    return DETECTORS.register(name, detect, **kwargs)
@@ -6,7 +6,7 @@ Filter module for overflow detection
 """
 
 from .base_filter import BaseFilter, FilterResult
-from .filter_chain import FilterChain
+from .filter_chain import FilterChain, CompiledFilterChain
 from .measurement_error_filter import MeasurementErrorFilter
 from .page_number_filter import PageNumberFilter
 from .japanese_text_filter import JapaneseTextFilter
@@ -17,6 +17,7 @@ __all__ = [
     'BaseFilter',
     'FilterResult', 
     'FilterChain',
+    'CompiledFilterChain',
     'MeasurementErrorFilter',
     'PageNumberFilter',
     'JapaneseTextFilter',
@@ -40,6 +40,17 @@ class BaseFilter(ABC):
         """
         pass
     
+    def matches(self, text_content: str, overflow_amount: float, y_position: float) -> bool:
+        """
+        誤検知かどうかだけを判定（FilterResultを作らない高速版、CompiledFilterChain用）
+        
+        Args:
+            text_content: はみ出しテキスト（strip済み）
+            overflow_amount: はみ出し量 (pt)
+            y_position: Y座標
+        """
+        return self.apply(text_content, overflow_amount, y_position).is_false_positive
+    
     def _create_result(self, is_false_positive: bool, confidence: float, reason: str) -> FilterResult:
         """結果生成ヘルパー"""
         return FilterResult(
@@ -4,9 +4,18 @@
 Filter chain implementation
 """
 
-from typing import List, Optional
+import sys
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 from .base_filter import BaseFilter, FilterResult
 
+# プロジェクトルートのフィルタ実行エンジンを使用（V3検出器と共通）
+project_root = Path(__file__).parent.parent.parent
+if str(project_root) not in sys.path:
+    sys.path.insert(0, str(project_root))
+
+from compiled_filters import CompiledFilters
+
 class FilterChain:
     """フィルタチェーン実装"""
     
@@ -51,4 +60,85 @@ class FilterChain:
     
     def get_filter_names(self) -> List[str]:
         """登録されているフィルタ名一覧を取得"""
-        return [f.name for f in self.filters]
\ No newline at end of file
+        return [f.name for f in self.filters]
+    
+    def compile(self, adaptive: bool = True) -> 'CompiledFilterChain':
+        """統計・自動並べ替え付きのチェーンに変換"""
+        return CompiledFilterChain(self.filters, adaptive=adaptive)
+
+
+class CompiledFilterChain:
+    """
+    コンパイル済みフィルタチェーン
+    
+    各フィルタの matches（FilterResultを作らない判定）で打ち切り判定を行い、
+    誤検知と判定したフィルタだけ apply で詳細な結果を作る。
+    フィルタごとのヒット率・平均コストを記録し、adaptive=True の場合は
+    安くてよく当たるフィルタを前に並べ替える。
+    """
+    
+    def __init__(self, filters: Iterable[BaseFilter], adaptive: bool = True):
+        self._by_name = {}
+        predicates = []
+        for filter_instance in filters:
+            self._by_name[filter_instance.name] = filter_instance
+            predicates.append((filter_instance.name, self._predicate(filter_instance)))
+        self._engine = CompiledFilters(predicates, adaptive=adaptive)
+    
+    @staticmethod
+    def _predicate(filter_instance: BaseFilter):
+        matches = filter_instance.matches
+        return lambda text_content, text_length, overflow_amount, y_position: \
+            matches(text_content, overflow_amount, y_position)
+    
+    def apply(self, overflow_text: str, overflow_amount: float, y_position: float) -> FilterResult:
+        """FilterChain.apply と同じ形式の結果を返す"""
+        if not self._by_name:
+            return FilterResult(
+                is_false_positive=False,
+                confidence=0.5,
+                reason="フィルタなし",
+                filter_name="NoFilter"
+            )
+        hit = self._engine.first_hit(overflow_text, overflow_amount, y_position)
+        return self._result(hit, overflow_text, overflow_amount, y_position)
+    
+    def is_false_positive(self, overflow_text: str, overflow_amount: float, y_position: float) -> bool:
+        """誤検知か（結果オブジェクトを作らない）"""
+        return self._engine.is_false_positive(overflow_text, overflow_amount, y_position)
+    
+    def apply_many(self, candidates: Iterable[Tuple[str, float, float]]) -> List[FilterResult]:
+        """
+        ページ内の候補行をまとめて判定
+        
+        Args:
+            candidates: (overflow_text, overflow_amount, y_position) のリスト
+        """
+        candidates = list(candidates)
+        if not self._by_name:
+            return [self.apply(*candidate) for candidate in candidates]
+        hits = self._engine.apply_many(candidates)
+        return [self._result(hit, *candidate) for hit, candidate in zip(hits, candidates)]
+    
+    def _result(self, hit: Optional[str], overflow_text: str, overflow_amount: float,
+                y_position: float) -> FilterResult:
+        if hit is None:
+            return FilterResult(
+                is_false_positive=False,
+                confidence=0.8,
+                reason="全フィルタ通過",
+                filter_name="FilterChain"
+            )
+        return self._by_name[hit].apply(overflow_text, overflow_amount, y_position)
+    
+    def reorder(self):
+        """統計に基づいて適用順を並べ替え"""
+        self._engine.reorder()
+    
+    def get_filter_names(self) -> List[str]:
+        """現在の適用順のフィルタ名一覧"""
+        return self._engine.order
+    
+    def get_stats(self) -> List[Dict]:
+        """フィルタごとの呼び出し数・ヒット率・平均コスト（チューニング用）"""
+        return self._engine.get_stats()
\ No newline at end of file
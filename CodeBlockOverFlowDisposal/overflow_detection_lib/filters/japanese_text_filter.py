@@ -18,6 +18,9 @@ class JapaneseTextFilter(BaseFilter):
     def name(self) -> str:
         return "JapaneseText"
     
+    def matches(self, text_content: str, overflow_amount: float, y_position: float) -> bool:
+        return len(text_content) <= 2 and self.japanese_pattern.search(text_content) is not None
+    
     def apply(self, overflow_text: str, overflow_amount: float, y_position: float) -> FilterResult:
         """日本語テキストを誤検知として判定"""
         text_content = overflow_text.strip()
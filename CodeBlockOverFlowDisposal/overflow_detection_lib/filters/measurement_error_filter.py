@@ -16,6 +16,9 @@ class MeasurementErrorFilter(BaseFilter):
     def name(self) -> str:
         return "MeasurementError"
     
+    def matches(self, text_content: str, overflow_amount: float, y_position: float) -> bool:
+        return overflow_amount <= self.threshold_pt
+    
     def apply(self, overflow_text: str, overflow_amount: float, y_position: float) -> FilterResult:
         """微小なはみ出しを測定誤差として判定"""
         if overflow_amount <= self.threshold_pt:
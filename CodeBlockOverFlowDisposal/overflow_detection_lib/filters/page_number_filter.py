@@ -18,6 +18,9 @@ class PageNumberFilter(BaseFilter):
     def name(self) -> str:
         return "PageNumber"
     
+    def matches(self, text_content: str, overflow_amount: float, y_position: float) -> bool:
+        return self.page_number_pattern.match(text_content) is not None
+    
     def apply(self, overflow_text: str, overflow_amount: float, y_position: float) -> FilterResult:
         """ページ番号を誤検知として判定"""
         text_content = overflow_text.strip()
@@ -17,6 +17,10 @@ class PowerShellFilter(BaseFilter):
     def name(self) -> str:
         return "PowerShell"
     
+    def matches(self, text_content: str, overflow_amount: float, y_position: float) -> bool:
+        return (len(text_content) >= self.min_length
+                and any(indicator in text_content for indicator in self.powershell_indicators))
+    
     def apply(self, overflow_text: str, overflow_amount: float, y_position: float) -> FilterResult:
         """PowerShellスクリプト関連をフィルタ"""
         text_content = overflow_text.strip()
@@ -21,6 +21,15 @@ class SymbolOnlyFilter(BaseFilter):
     def name(self) -> str:
         return "SymbolOnly"
     
+    def matches(self, text_content: str, overflow_amount: float, y_position: float) -> bool:
+        text_length = len(text_content)
+        if text_length == 1:
+            char = text_content[0]
+            return char not in self.protected_symbols and not char.isalnum()
+        if text_length == 2 and all(not c.isalnum() for c in text_content):
+            return not all(c in self.protected_symbols for c in text_content)
+        return False
+    
     def apply(self, overflow_text: str, overflow_amount: float, y_position: float) -> FilterResult:
         """記号のみのテキストをフィルタ（保護対象は除く）"""
         text_content = overflow_text.strip()
@@ -6,18 +6,20 @@ OpenCVを使用した画像処理アプローチ
 対応するコードブロック：
 1. 灰色背景タイプ
 2. 白背景・罫線囲みタイプ
+
+ページはグレースケールで描画し、ページ単位のマスク（二値化・モルフォロジーによる
+罫線の抽出・連結成分のラベリング）でコードブロックをまとめて検出する。
+本文右端より外側のインクが少ないページは、コードブロックの検出自体を省略する。
 """
 
 import argparse
 import sys
-import io
 from pathlib import Path
 from datetime import datetime
 from typing import List, Optional, Dict, Tuple
 import cv2
 import numpy as np
 import fitz  # PyMuPDF
-from PIL import Image
 
 
 class ImageBasedOverflowDetector:
@@ -25,10 +27,17 @@ class ImageBasedOverflowDetector:
     
     # 定数定義
     DPI = 300  # PDF→画像変換の解像度
-    GRAY_THRESHOLD = (200, 230)  # 灰色の閾値範囲（RGB値）
+    GRAY_THRESHOLD = (200, 230)  # 灰色の閾値範囲（輝度）
     MIN_BLOCK_WIDTH = 100  # 最小コードブロック幅（ピクセル）
     MIN_BLOCK_HEIGHT = 50  # 最小コードブロック高さ（ピクセル）
     
+    INK_THRESHOLD = 200  # この輝度以下をテキスト・罫線（インク）とみなす
+    WHITE_THRESHOLD = 250  # この輝度より明るい領域を白背景とみなす
+    MIN_LINE_LENGTH = 100  # 罫線とみなす最小の長さ（ピクセル）
+    BORDER_TOLERANCE = 10  # 矩形の辺と罫線の位置の許容差（ピクセル）
+    MIN_OVERFLOW_PIXELS = 50  # はみ出しと判定する本文幅外のインクのピクセル数
+    TEXT_MARGIN = 20  # ブロック右端のチェック幅（ピクセル）
+    
     # 本文幅の定義（NextPublishing標準）
     # B4: 257mm × 364mm（JIS B4）
     # 左右マージン各20mm = 本文幅217mm
@@ -74,31 +83,22 @@ class ImageBasedOverflowDetector:
                 if page_num % 10 == 0 and page_num > 0:
                     print(f"  処理中: {page_num}/{total_pages} ページ...")
                 
-                # ページを画像に変換
-                page = doc[page_num]
-                mat = fitz.Matrix(self.DPI/72, self.DPI/72)  # 72 DPI → 指定DPIに変換
-                pix = page.get_pixmap(matrix=mat)
+                # ページをグレースケール画像に変換
+                gray = self.render_page(doc[page_num])
                 
-                # PILイメージに変換
-                img_data = pix.pil_tobytes(format="PNG")
-                image = Image.open(io.BytesIO(img_data))
-                
-                # OpenCV形式に変換
-                img_array = np.array(image)
-                img_cv = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-                    
                 # ページの本文幅を計算
-                page_width = img_cv.shape[1]
+                page_width = gray.shape[1]
                 text_area_right = page_width - self.PAGE_RIGHT_MARGIN
                 
-                # コードブロックを検出
-                code_blocks = self._detect_code_blocks(img_cv)
+                # 本文幅の外側のインクがしきい値以下なら、どのブロックもはみ出し得ない
+                ink = self._ink_mask(gray)
+                if cv2.countNonZero(ink[:, text_area_right:]) <= self.MIN_OVERFLOW_PIXELS:
+                    continue
                 
-                # 各ブロックでテキストオーバーフローをチェック
-                for block in code_blocks:
-                    if self._check_text_overflow_from_page(img_cv, block, text_area_right):
-                        overflow_pages.append(page_num + 1)  # 1-indexed
-                        break  # このページは既に検出済み
+                # コードブロックを検出し、まとめてテキストオーバーフローをチェック
+                code_blocks = self._detect_code_blocks(gray, ink)
+                if self._find_overflowing_blocks(ink, code_blocks, text_area_right).any():
+                    overflow_pages.append(page_num + 1)  # 1-indexed
             
             doc.close()
             
@@ -111,24 +111,66 @@ class ImageBasedOverflowDetector:
         
         return sorted(list(set(overflow_pages)))
     
-    def _detect_code_blocks(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    def render_page(self, page) -> np.ndarray:
+        """
+        ページをグレースケール画像に変換（PIL・PNGを経由せず、ピクセルデータを直接配列にする）
+        
+        Args:
+            page: PyMuPDFのページ
+            
+        Returns:
+            グレースケール画像（uint8, 高さ×幅）
+        """
+        mat = fitz.Matrix(self.DPI/72, self.DPI/72)  # 72 DPI → 指定DPIに変換
+        pix = page.get_pixmap(matrix=mat, colorspace=fitz.csGRAY, alpha=False)
+        samples = np.frombuffer(pix.samples, dtype=np.uint8)
+        return samples.reshape(pix.height, pix.stride)[:, :pix.width]
+    
+    @staticmethod
+    def _to_gray(image: np.ndarray) -> np.ndarray:
+        """OpenCV形式（BGR）の画像ならグレースケールに変換"""
+        if image.ndim == 2:
+            return image
+        return cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+    
+    def _ink_mask(self, gray: np.ndarray) -> np.ndarray:
+        """テキスト・罫線（インク）のマスク（インクが255）"""
+        _, ink = cv2.threshold(gray, self.INK_THRESHOLD, 255, cv2.THRESH_BINARY_INV)
+        return ink
+    
+    def _components(self, mask: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """
+        マスクの連結成分のうち、最小サイズ以上のものの外接矩形
+        
+        Returns:
+            矩形のリスト [(x, y, w, h), ...]
+        """
+        _, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+        boxes = stats[1:, :4]  # 0番は背景（マスク外）
+        keep = (boxes[:, 2] >= self.MIN_BLOCK_WIDTH) & (boxes[:, 3] >= self.MIN_BLOCK_HEIGHT)
+        return [tuple(int(v) for v in box) for box in boxes[keep]]
+    
+    def _detect_code_blocks(self, image: np.ndarray,
+                            ink: Optional[np.ndarray] = None) -> List[Tuple[int, int, int, int]]:
         """
         画像からコードブロック領域を検出
         
         Args:
-            image: OpenCV形式の画像
+            image: グレースケールまたはOpenCV形式の画像
+            ink: インクのマスク（計算済みの場合）
             
         Returns:
             コードブロックの矩形リスト [(x, y, w, h), ...]
         """
+        gray = self._to_gray(image)
         blocks = []
         
         # 1. 灰色背景のコードブロックを検出
-        gray_blocks = self._detect_gray_blocks(image)
+        gray_blocks = self._detect_gray_blocks(gray)
         blocks.extend(gray_blocks)
         
         # 2. 罫線で囲まれたコードブロックを検出
-        bordered_blocks = self._detect_bordered_blocks(image)
+        bordered_blocks = self._detect_bordered_blocks(gray, ink)
         blocks.extend(bordered_blocks)
         
         return blocks
@@ -138,158 +180,122 @@ class ImageBasedOverflowDetector:
         灰色背景のコードブロックを検出
         
         Args:
-            image: OpenCV形式の画像
+            image: グレースケールまたはOpenCV形式の画像
             
         Returns:
             灰色矩形のリスト [(x, y, w, h), ...]
         """
-        blocks = []
-        
-        # グレースケールに変換
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        gray = self._to_gray(image)
         
-        # 灰色の範囲を指定してマスクを作成
-        lower_gray = self.GRAY_THRESHOLD[0]
-        upper_gray = self.GRAY_THRESHOLD[1]
-        mask = cv2.inRange(gray, lower_gray, upper_gray)
-        
-        # 輪郭を検出
-        contours, _ = cv2.findContours(mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
-        
-        # 大きな矩形のみを抽出
-        for contour in contours:
-            x, y, w, h = cv2.boundingRect(contour)
-            
-            # 最小サイズ以上の矩形のみ
-            if w >= self.MIN_BLOCK_WIDTH and h >= self.MIN_BLOCK_HEIGHT:
-                blocks.append((x, y, w, h))
-        
-        return blocks
+        # 灰色の範囲を指定してマスクを作成し、大きな連結成分だけを残す
+        mask = cv2.inRange(gray, self.GRAY_THRESHOLD[0], self.GRAY_THRESHOLD[1])
+        return self._components(mask)
     
-    def _detect_bordered_blocks(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+    def _detect_bordered_blocks(self, image: np.ndarray,
+                                ink: Optional[np.ndarray] = None) -> List[Tuple[int, int, int, int]]:
         """
         罫線で囲まれたコードブロックを検出
         
+        白い領域（外側の輪郭）のうち、4辺のうち3辺以上に罫線があるもの。
+        
         Args:
-            image: OpenCV形式の画像
+            image: グレースケールまたはOpenCV形式の画像
+            ink: インクのマスク（計算済みの場合）
             
         Returns:
             罫線矩形のリスト [(x, y, w, h), ...]
         """
-        blocks = []
-        
-        # グレースケールに変換
-        gray = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
-        
-        # エッジ検出
-        edges = cv2.Canny(gray, 50, 150, apertureSize=3)
+        gray = self._to_gray(image)
+        if ink is None:
+            ink = self._ink_mask(gray)
+        
+        # 長い線分だけが残るよう、横長・縦長の構造要素でオープニング
+        h_lines = cv2.morphologyEx(
+            ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (self.MIN_LINE_LENGTH, 1)))
+        v_lines = cv2.morphologyEx(
+            ink, cv2.MORPH_OPEN, cv2.getStructuringElement(cv2.MORPH_RECT, (1, self.MIN_LINE_LENGTH)))
+        if not cv2.countNonZero(h_lines) and not cv2.countNonZero(v_lines):
+            return []
         
-        # ハフ変換で直線を検出
-        lines = cv2.HoughLinesP(edges, 1, np.pi/180, 100, minLineLength=100, maxLineGap=10)
+        # 白い領域を検出（外側の輪郭のみ。表のセルのように内側に入れ子になった領域は対象外）
+        _, white_mask = cv2.threshold(gray, self.WHITE_THRESHOLD, 255, cv2.THRESH_BINARY)
+        contours, _ = cv2.findContours(white_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
         
-        if lines is not None:
-            # 水平線と垂直線を分類
-            h_lines = []
-            v_lines = []
-            
-            for line in lines:
-                x1, y1, x2, y2 = line[0]
-                
-                # 水平線
-                if abs(y2 - y1) < 5:
-                    h_lines.append((min(x1, x2), y1, max(x1, x2), y1))
-                # 垂直線
-                elif abs(x2 - x1) < 5:
-                    v_lines.append((x1, min(y1, y2), x1, max(y1, y2)))
-            
-            # 矩形を形成する線の組み合わせを探す
-            # （簡易的な実装：より正確な検出は Phase 2 で実装）
-            # ここでは白背景の大きな矩形領域を検出
-            
-            # 白い領域を検出
-            _, white_mask = cv2.threshold(gray, 250, 255, cv2.THRESH_BINARY)
-            
-            # 輪郭を検出
-            contours, _ = cv2.findContours(white_mask, cv2.RETR_EXTERNAL, cv2.CHAIN_APPROX_SIMPLE)
+        blocks = []
+        for contour in contours:
+            x, y, w, h = cv2.boundingRect(contour)
             
-            for contour in contours:
-                x, y, w, h = cv2.boundingRect(contour)
-                
-                # 最小サイズ以上で、罫線が近くにある矩形
-                if w >= self.MIN_BLOCK_WIDTH and h >= self.MIN_BLOCK_HEIGHT:
-                    # 矩形の周囲に罫線があるかチェック（簡易版）
-                    if self._has_border_lines(x, y, w, h, h_lines, v_lines):
-                        blocks.append((x, y, w, h))
+            # 最小サイズ以上で、罫線が近くにある矩形
+            if w >= self.MIN_BLOCK_WIDTH and h >= self.MIN_BLOCK_HEIGHT:
+                if self._has_border_lines(x, y, w, h, h_lines, v_lines, self.BORDER_TOLERANCE):
+                    blocks.append((x, y, w, h))
         
         return blocks
     
-    def _has_border_lines(self, x: int, y: int, w: int, h: int, 
-                         h_lines: List, v_lines: List, tolerance: int = 10) -> bool:
+    def _has_border_lines(self, x: int, y: int, w: int, h: int,
+                          h_lines: np.ndarray, v_lines: np.ndarray, tolerance: int = 10) -> bool:
         """
-        矩形の周囲に罫線があるかチェック（簡易版）
+        矩形の周囲に罫線があるかチェック
+        
+        辺から tolerance 未満の帯の中で、辺の全長にわたって線のピクセルがあれば、その辺に罫線があるとする。
+        
+        Args:
+            x, y, w, h: 矩形
+            h_lines: 水平線のマスク
+            v_lines: 垂直線のマスク
+            tolerance: 辺と罫線の位置の許容差（ピクセル）
         """
-        # 上下左右に線があるかチェック
-        has_top = any(abs(ly - y) < tolerance and lx1 <= x and lx2 >= x + w 
-                     for lx1, ly, lx2, _ in h_lines)
-        has_bottom = any(abs(ly - (y + h)) < tolerance and lx1 <= x and lx2 >= x + w 
-                        for lx1, ly, lx2, _ in h_lines)
-        has_left = any(abs(lx - x) < tolerance and ly1 <= y and ly2 >= y + h 
-                      for lx, ly1, _, ly2 in v_lines)
-        has_right = any(abs(lx - (x + w)) < tolerance and ly1 <= y and ly2 >= y + h 
-                       for lx, ly1, _, ly2 in v_lines)
+        def covered(band: np.ndarray, axis: int) -> bool:
+            # 帯を辺に沿って射影し、辺の全長が線で覆われているか
+            return band.size > 0 and bool(band.any(axis=axis).all())
+        
+        def near(edge: int) -> slice:
+            return slice(max(edge - tolerance + 1, 0), edge + tolerance)
+        
+        has_top = covered(h_lines[near(y), x:x + w], 0)
+        has_bottom = covered(h_lines[near(y + h), x:x + w], 0)
+        has_left = covered(v_lines[y:y + h, near(x)], 1)
+        has_right = covered(v_lines[y:y + h, near(x + w)], 1)
         
         # 4辺のうち3辺以上に線があれば罫線囲みと判定
         return sum([has_top, has_bottom, has_left, has_right]) >= 3
     
-    def _check_text_overflow_from_page(self, image: np.ndarray, block: Tuple[int, int, int, int], 
-                                       text_area_right: int) -> bool:
+    def _find_overflowing_blocks(self, ink: np.ndarray, blocks: List[Tuple[int, int, int, int]],
+                                 text_area_right: int) -> np.ndarray:
         """
-        コードブロック内のテキストが本文幅を超えているかチェック
+        本文幅を超えてテキストがはみ出しているコードブロック
+        
+        本文幅の外側の積分画像を1回作り、各ブロックの超過部分のインク量を定数時間で求める。
         
         Args:
-            image: OpenCV形式の画像
-            block: コードブロックの矩形 (x, y, w, h)
+            ink: インクのマスク
+            blocks: コードブロックの矩形リスト [(x, y, w, h), ...]
             text_area_right: 本文領域の右端のX座標
             
         Returns:
-            本文幅を超えている場合True
+            ブロックごとのはみ出し判定（bool配列）
         """
-        x, y, w, h = block
-        
-        # ブロック内の画像を切り出し
-        block_img = image[y:y+h, x:x+w]
+        if not blocks:
+            return np.zeros(0, dtype=bool)
         
-        # グレースケールに変換
-        gray = cv2.cvtColor(block_img, cv2.COLOR_BGR2GRAY)
+        x, y, w, h = np.array(blocks, dtype=np.int64).T
         
-        # 二値化（テキストを黒、背景を白に）
-        _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV)
+        # ブロックが本文右端をまたいでいるもののみが対象
+        crosses = (x < text_area_right) & (x + w > text_area_right)
         
-        # 本文幅を超える部分があるかチェック
-        block_right = x + w
+        # 超過部分 [y, y+h) × [text_area_right, x+w) のインクのピクセル数
+        integral = cv2.integral(ink[:, text_area_right:] // 255)
+        right = np.clip(x + w - text_area_right, 0, integral.shape[1] - 1)
+        text_pixels = integral[y + h, right] - integral[y, right]
         
-        # コードブロックの右端が本文幅を超えている場合
-        if block_right > text_area_right:
-            # 超過部分にテキストがあるかチェック
-            overflow_start = text_area_right - x
-            if overflow_start < w and overflow_start > 0:
-                overflow_region = binary[:, overflow_start:]
-                
-                # 超過部分にテキストがあるか
-                text_pixels = np.sum(overflow_region == 255)
-                
-                # テキストがある場合は、はみ出しと判定
-                if text_pixels > 50:  # 50ピクセル以上のテキスト
-                    return True
-        
-        return False
+        return crosses & (text_pixels > self.MIN_OVERFLOW_PIXELS)
     
     def _check_text_overflow(self, image: np.ndarray, block: Tuple[int, int, int, int]) -> bool:
         """
         コードブロック内のテキストがはみ出しているかチェック
         
         Args:
-            image: OpenCV形式の画像
+            image: グレースケールまたはOpenCV形式の画像
             block: コードブロックの矩形 (x, y, w, h)
             
         Returns:
@@ -297,33 +303,12 @@ class ImageBasedOverflowDetector:
         """
         x, y, w, h = block
         
-        # ブロック内の画像を切り出し
-        block_img = image[y:y+h, x:x+w]
-        
-        # グレースケールに変換
-        gray = cv2.cvtColor(block_img, cv2.COLOR_BGR2GRAY)
-        
-        # 二値化（テキストを黒、背景を白に）
-        _, binary = cv2.threshold(gray, 200, 255, cv2.THRESH_BINARY_INV)
-        
-        # 右端付近のピクセルをチェック
-        right_margin = self.TEXT_MARGIN
-        right_edge_region = binary[:, -right_margin:]
-        
-        # 右端にテキスト（黒いピクセル）があるかチェック
-        text_pixels = np.sum(right_edge_region == 255)  # 黒いピクセルの数
-        
-        # より厳密な判定：連続した黒ピクセルの行数をカウント
-        rows_with_text = 0
-        for row in right_edge_region:
-            if np.sum(row == 255) > 3:  # 行に3ピクセル以上の黒がある
-                rows_with_text += 1
-        
-        # 複数行にわたってテキストがある場合のみ、はみ出しと判定
-        if rows_with_text >= 3:  # 3行以上
-            return True
+        # ブロック右端付近のインクを行ごとに数える
+        right_edge_region = self._ink_mask(self._to_gray(image[y:y+h, max(x + w - self.TEXT_MARGIN, x):x+w]))
+        ink_per_row = np.count_nonzero(right_edge_region, axis=1)
         
-        return False
+        # 3ピクセル以上のインクがある行が3行以上ある場合のみ、はみ出しと判定
+        return bool(np.count_nonzero(ink_per_row > 3) >= 3)
     
     def generate_report(self, pdf_path: Path, overflow_pages: List[int], 
                        output_path: Optional[Path] = None) -> str:
@@ -5,7 +5,11 @@
 """
 
 import argparse
+import contextlib
+import io
+import os
 import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
 from datetime import datetime
 from typing import List, Optional, Dict, Tuple
@@ -13,7 +17,6 @@ import fitz  # PyMuPDF
 from PIL import Image
 import pytesseract
 import numpy as np
-import io
 
 
 class OCRBasedOverflowDetector:
@@ -43,27 +46,50 @@ class OCRBasedOverflowDetector:
     TOP_MARGIN_MM = 20
     BOTTOM_MARGIN_MM = 20
     
+    # OCR対象は本文右端の手前からページ右端までの帯だけ（はみ出し判定に必要な範囲）
+    OCR_STRIP_MM = 40
+    
+    # ワーカーあたりの先読みページ数（レンダリング済み画像の滞留を抑える）
+    PREFETCH_PER_WORKER = 2
+    
+    # OCRワーカー1つあたりの最小ページ数（これより少ないページ数ならワーカーを増やさない）
+    MIN_PAGES_PER_WORKER = 1
+    
     def __init__(self):
         """初期化"""
         self.results = []
         self.errors = []
         self.start_time = None
         self.end_time = None
+        self.total_pages = 0  # 直近に解析したPDFの総ページ数
+        self.failed_pages = set()  # 直近に解析したPDFでOCRに失敗したページ番号
         
         # mm to pixel conversion (at 300 DPI)
         self.mm_to_px = self.DPI / 25.4
         
-    def detect_file(self, pdf_path: Path) -> List[int]:
+    def detect_file(self, pdf_path: Path, workers: Optional[int] = 1,
+                    pages: Optional[List[int]] = None) -> List[int]:
         """
         PDFファイルを解析して、本文幅からのはみ出しページを検出
         
+        レンダリング（メインプロセス）とOCR（プロセスプール）を並行して行う。
+        ページは右端の帯だけをグレースケールの生バッファとして描画し、
+        PNGを経由せずにワーカーへ渡す。
+        
         Args:
             pdf_path: 解析対象のPDFファイルパス
+            workers: OCRの並列プロセス数（既定の1ではプロセスプールを使わない、Noneで CPU コア数）
+                プロセスプールを使う場合、凍結した実行ファイルのエントリーポイントで
+                multiprocessing.freeze_support() を呼び出しておくこと
+            pages: 解析するページ番号（1-indexed、Noneで全ページ）
             
         Returns:
             はみ出しが検出されたページ番号のリスト（1-indexed）
+            OCRに失敗したページは failed_pages と errors に記録する
         """
         self.start_time = datetime.now()
+        self.total_pages = 0
+        self.failed_pages = set()
         overflow_pages = []
         
         try:
@@ -75,35 +101,23 @@ class OCRBasedOverflowDetector:
             
             # PyMuPDFでPDFを開く
             doc = fitz.open(str(pdf_path))
-            total_pages = len(doc)
-            
-            # 各ページを処理
-            for page_num in range(total_pages):
-                if page_num % 10 == 0 and page_num > 0:
-                    print(f"  処理中: {page_num}/{total_pages} ページ...")
-                
-                # ページを画像に変換
-                page = doc[page_num]
-                
-                # ページ番号（1-indexed）
-                page_number = page_num + 1
-                
-                # 左右ページの判定（奇数ページ=右ページ、偶数ページ=左ページ）
-                is_right_page = (page_number % 2 == 1)
+            try:
+                total_pages = len(doc)
+                self.total_pages = total_pages
+                page_numbers = range(1, total_pages + 1) if pages is None else \
+                    sorted(p for p in set(pages) if 1 <= p <= total_pages)
+                workers = max(1, min(workers or os.cpu_count() or 1,
+                                     len(page_numbers) // self.MIN_PAGES_PER_WORKER))
+                strips = self._render_strips(doc, page_numbers)
                 
-                # ページを画像化
-                mat = fitz.Matrix(self.DPI/72, self.DPI/72)
-                pix = page.get_pixmap(matrix=mat)
-                
-                # PIL形式に変換
-                img_data = pix.pil_tobytes(format="PNG")
-                image = Image.open(io.BytesIO(img_data))
-                
-                # OCRでテキストと位置情報を取得
-                if self._check_text_overflow_ocr(image, is_right_page, page_number):
-                    overflow_pages.append(page_number)
-            
-            doc.close()
+                if workers == 1:
+                    for page_number, detected, failed, log in map(_ocr_strip_with(self), strips):
+                        if self._collect_page(page_number, detected, failed, total_pages, log):
+                            overflow_pages.append(page_number)
+                else:
+                    overflow_pages = self._ocr_strips_parallel(strips, total_pages, workers)
+            finally:
+                doc.close()
             self.end_time = datetime.now()
             
         except Exception as e:
@@ -113,20 +127,98 @@ class OCRBasedOverflowDetector:
         
         return sorted(list(set(overflow_pages)))
     
-    def _check_text_overflow_ocr(self, image: Image.Image, is_right_page: bool, page_number: int) -> bool:
+    def _strip_left_px(self, page_width_px: int, is_right_page: bool) -> int:
+        """OCR対象の帯の左端（ページ画像上のpx）"""
+        right_margin_mm = self.RIGHT_PAGE_RIGHT_MARGIN_MM if is_right_page else self.LEFT_PAGE_RIGHT_MARGIN_MM
+        right_margin_px = int(right_margin_mm * self.mm_to_px)
+        return max(0, page_width_px - right_margin_px - int(self.OCR_STRIP_MM * self.mm_to_px))
+    
+    def _render_strips(self, doc, page_numbers):
+        """
+        指定ページの右端の帯をグレースケールで描画（生成器）
+        
+        Yields:
+            (ページ番号, 右ページか, (幅, 高さ), 画素バイト列, 帯のx座標, ページ画像の幅)
+        """
+        mat = fitz.Matrix(self.DPI/72, self.DPI/72)
+        for page_number in page_numbers:
+            page = doc[page_number - 1]
+            
+            # 左右ページの判定（奇数ページ=右ページ、偶数ページ=左ページ）
+            is_right_page = (page_number % 2 == 1)
+            
+            # ページ全体を描画した場合の画素範囲から帯の範囲を決める
+            page_irect = (page.rect * mat).irect
+            strip_left_px = self._strip_left_px(page_irect.width, is_right_page)
+            clip = fitz.Rect(page_irect.x0 + strip_left_px, page_irect.y0,
+                             page_irect.x1, page_irect.y1) * ~mat
+            
+            pix = page.get_pixmap(matrix=mat, clip=clip, colorspace=fitz.csGRAY, alpha=False)
+            yield (page_number, is_right_page, (pix.width, pix.height), pix.samples,
+                   pix.x - page_irect.x0, page_irect.width)
+    
+    def _ocr_strips_parallel(self, strips, total_pages: int, workers: int) -> List[int]:
+        """帯画像のOCRをプロセスプールで実行（描画と並行、先読みは一定数まで）"""
+        overflow_pages = []
+        max_pending = workers * self.PREFETCH_PER_WORKER
+        
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_ocr_worker,
+                                 initargs=(self,)) as executor:
+            pending = set()
+            
+            def collect(done):
+                for future in done:
+                    page_number, detected, failed, log = future.result()
+                    if self._collect_page(page_number, detected, failed, total_pages, log):
+                        overflow_pages.append(page_number)
+            
+            for strip in strips:
+                if len(pending) >= max_pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(executor.submit(_ocr_strip, strip))
+            
+            done, _ = wait(pending)
+            collect(done)
+        
+        return overflow_pages
+    
+    def _collect_page(self, page_number: int, detected: bool, failed: bool,
+                      total_pages: int, log: str) -> bool:
+        """ワーカーの判定結果を取り込む（OCRに失敗したページを記録し、はみ出しの有無を返す）"""
+        self._report_progress(page_number, total_pages, log)
+        if failed:
+            self.failed_pages.add(page_number)
+            self.errors.append(f"ページ {page_number}: OCRエラー")
+        return detected
+    
+    @staticmethod
+    def _report_progress(page_number: int, total_pages: int, log: str):
+        """ワーカーのログと進捗の表示"""
+        if log:
+            print(log, end='')
+        if page_number % 10 == 0 and page_number < total_pages:
+            print(f"  処理中: {page_number}/{total_pages} ページ...")
+    
+    def _check_text_overflow_ocr(self, image: Image.Image, is_right_page: bool, page_number: int,
+                                 x_offset: int = 0, page_width_px: Optional[int] = None) -> bool:
         """
         OCRでテキストを認識し、本文幅を超えているかチェック
         
         Args:
-            image: PIL形式の画像
+            image: PIL形式の画像（ページ全体、または右端の帯）
             is_right_page: 右ページかどうか（True=右ページ=奇数ページ）
             page_number: ページ番号（デバッグ用）
+            x_offset: 帯画像の場合、ページ画像上での帯の左端（px）
+            page_width_px: 帯画像の場合、ページ画像全体の幅（px）
             
         Returns:
             はみ出しがある場合True
         """
         # 画像サイズを取得
         img_width, img_height = image.size
+        if page_width_px is not None:
+            img_width = page_width_px
         
         # マージンをピクセルに変換（左右ページで異なる）
         if is_right_page:
@@ -151,8 +243,8 @@ class OCRBasedOverflowDetector:
             for i in range(n_boxes):
                 # 空白でないテキストかつ信頼度が高いもののみ処理
                 if data['text'][i].strip() and int(data['conf'][i]) >= self.MIN_CONFIDENCE:
-                    # テキストボックスの右端位置
-                    text_left = data['left'][i]
+                    # テキストボックスの右端位置（ページ画像上の座標）
+                    text_left = data['left'][i] + x_offset
                     text_width = data['width'][i]
                     text_right = text_left + text_width
                     
@@ -177,7 +269,9 @@ class OCRBasedOverflowDetector:
             return overflow_detected
             
         except Exception as e:
+            # 判定できなかったページ（はみ出しなしとは区別する）
             print(f"    ページ {page_number}: OCRエラー - {e}")
+            self.failed_pages.add(page_number)
             return False
     
     def generate_report(self, pdf_path: Path, overflow_pages: List[int], 
@@ -231,6 +325,34 @@ class OCRBasedOverflowDetector:
         return report
 
 
+# ワーカープロセス側の検出器（initializerで1プロセスにつき1回だけ設定）
+_worker_detector = None
+
+
+def _init_ocr_worker(detector: OCRBasedOverflowDetector):
+    """ワーカープロセスの初期化（設定値を含む検出器を受け取る）"""
+    global _worker_detector
+    _worker_detector = detector
+
+
+def _ocr_strip(strip) -> Tuple[int, bool, bool, str]:
+    """帯画像1枚のOCRとはみ出し判定（ワーカープロセスで実行）"""
+    return _ocr_strip_with(_worker_detector)(strip)
+
+
+def _ocr_strip_with(detector: OCRBasedOverflowDetector):
+    """帯画像を判定する関数（表示内容は呼び出し側でまとめて出力する）"""
+    def run(strip) -> Tuple[int, bool, bool, str]:
+        page_number, is_right_page, size, samples, x_offset, page_width_px = strip
+        image = Image.frombytes('L', size, samples)
+        log = io.StringIO()
+        with contextlib.redirect_stdout(log):
+            detected = detector._check_text_overflow_ocr(image, is_right_page, page_number,
+                                                         x_offset, page_width_px)
+        return page_number, detected, page_number in detector.failed_pages, log.getvalue()
+    return run
+
+
 def main():
     """コマンドラインエントリーポイント"""
     parser = argparse.ArgumentParser(
@@ -245,6 +367,8 @@ def main():
                        help='右マージン許容範囲（px、デフォルト: 20）')
     parser.add_argument('--min-overflow', type=int, default=1,
                        help='最小はみ出し検出量（px、デフォルト: 1）')
+    parser.add_argument('--workers', type=int, default=0,
+                       help='OCRの並列プロセス数（0でCPUコア数、デフォルト: 0）')
     
     args = parser.parse_args()
     
@@ -271,7 +395,7 @@ def main():
     
     print(f"解析中: {pdf_path.name}")
     print(f"設定 - 信頼度閾値: {detector.MIN_CONFIDENCE}, マージン許容: {detector.MARGIN_TOLERANCE_PX}px, 最小はみ出し: {detector.MIN_OVERFLOW_PX}px")
-    overflow_pages = detector.detect_file(pdf_path)
+    overflow_pages = detector.detect_file(pdf_path, workers=args.workers or None)
     
     # レポート生成と表示
     report = detector.generate_report(pdf_path, overflow_pages, output_path)
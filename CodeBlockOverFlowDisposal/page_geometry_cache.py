@@ -0,0 +1,422 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ページジオメトリ キャッシュ
+pdfplumberで抽出したページの文字（bbox・テキスト）、矩形、ページサイズを
+PDFの内容ハッシュをキーに列指向の .npy ファイル群としてディスクに保存する。
+2回目以降は memory-map で読み込むだけなので、同じPDFに対する検出や
+閾値スイープでは pdfplumber による解析を完全に省略できる。
+
+使い方:
+    from page_geometry_cache import open_pdf
+
+    with open_pdf(pdf_path) as pdf:      # pdfplumber.open の代わり
+        for page in pdf.pages:
+            page.width, page.chars, page.rects
+
+キャッシュ場所は環境変数 OVERFLOW_GEOMETRY_CACHE_DIR で変更できる。
+抽出バックエンド（pdfplumber / pymupdf）は geometry_backend を参照。
+キャッシュはバックエンドごとに別エントリになる。
+"""
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from char_geometry import CharGeometry
+
+logger = logging.getLogger(__name__)
+
+CACHE_FORMAT_VERSION = 1
+CACHE_DIR_ENV = 'OVERFLOW_GEOMETRY_CACHE_DIR'
+DEFAULT_CACHE_DIR = Path.home() / '.cache' / 'overflow_detection' / 'geometry'
+
+CHAR_FLOAT_FIELDS = ('x0', 'x1', 'y0', 'y1', 'top', 'bottom', 'size')
+CHAR_TEXT_FIELDS = ('text', 'fontname')
+RECT_FLOAT_FIELDS = ('x0', 'x1', 'y0', 'y1', 'top', 'bottom', 'linewidth')
+RECT_FLAG_FIELDS = ('fill', 'stroke')
+
+# 色の格納形式（-1: なし、0: グレー値1つ、1-4: 成分数）
+_COLOR_NONE = -1
+_COLOR_SCALAR = 0
+_COLOR_WIDTH = 4
+
+
+def _encode_color(color):
+    """pdfplumberの色を (種別, 成分) に変換"""
+    if isinstance(color, (int, float)):
+        return _COLOR_SCALAR, [float(color)]
+    if isinstance(color, (list, tuple)) and 0 < len(color) <= _COLOR_WIDTH \
+            and all(isinstance(v, (int, float)) for v in color):
+        return len(color), [float(v) for v in color]
+    return _COLOR_NONE, []
+
+
+def _decode_color(kind: int, values: np.ndarray):
+    """(種別, 成分) をpdfplumberの色に戻す"""
+    if kind == _COLOR_NONE:
+        return None
+    if kind == _COLOR_SCALAR:
+        return float(values[0])
+    return tuple(float(v) for v in values[:kind])
+
+
+def _encode_texts(texts: Sequence[str]):
+    """文字列リストを (UTF-32コード列, オフセット) に変換"""
+    offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(t) for t in texts])
+    codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32)
+    return codes, offsets
+
+
+def _decode_texts(codes: np.ndarray, offsets: np.ndarray) -> List[str]:
+    """(UTF-32コード列, オフセット) を文字列リストに戻す"""
+    if offsets.size <= 1:
+        return []
+    start, end = int(offsets[0]), int(offsets[-1])
+    joined = np.ascontiguousarray(codes[start:end]).tobytes().decode('utf-32-le')
+    bounds = (offsets - start).tolist()
+    return [joined[a:b] for a, b in zip(bounds[:-1], bounds[1:])]
+
+
+class PageGeometry:
+    """1ページ分の抽出結果（列指向）"""
+
+    def __init__(self, page_number: int, width: float, height: float,
+                 char_columns: Dict[str, np.ndarray], char_texts: Dict[str, List[str]],
+                 rect_columns: Dict[str, np.ndarray]):
+        self.page_number = page_number
+        self.width = width
+        self.height = height
+        self.char_columns = char_columns
+        self.char_texts = char_texts
+        self.rect_columns = rect_columns
+
+    @property
+    def char_count(self) -> int:
+        return len(self.char_texts['text'])
+
+    @property
+    def rect_count(self) -> int:
+        return len(self.rect_columns['x0'])
+
+    @classmethod
+    def from_plumber_page(cls, page) -> 'PageGeometry':
+        """pdfplumberのページから抽出"""
+        chars = page.chars
+        rects = page.rects
+
+        char_columns = {
+            key: np.array([char[key] for char in chars], dtype=np.float64)
+            for key in CHAR_FLOAT_FIELDS
+        }
+        char_texts = {key: [char.get(key) or '' for char in chars] for key in CHAR_TEXT_FIELDS}
+
+        rect_columns = {
+            key: np.array([rect.get(key) or 0.0 for rect in rects], dtype=np.float64)
+            for key in RECT_FLOAT_FIELDS
+        }
+        for key in RECT_FLAG_FIELDS:
+            rect_columns[key] = np.array([bool(rect.get(key)) for rect in rects], dtype=bool)
+        color_kind = np.full(len(rects), _COLOR_NONE, dtype=np.int8)
+        color_values = np.full((len(rects), _COLOR_WIDTH), np.nan, dtype=np.float64)
+        for i, rect in enumerate(rects):
+            kind, values = _encode_color(rect.get('non_stroking_color'))
+            color_kind[i] = kind
+            color_values[i, :len(values)] = values
+        rect_columns['color_kind'] = color_kind
+        rect_columns['color'] = color_values
+
+        return cls(page.page_number, float(page.width), float(page.height),
+                   char_columns, char_texts, rect_columns)
+
+
+class CachedPage:
+    """キャッシュから復元したページ（pdfplumberのページと同じ属性で読める）"""
+
+    def __init__(self, geometry: PageGeometry):
+        self.geometry = geometry
+        self.page_number = geometry.page_number
+        self.width = geometry.width
+        self.height = geometry.height
+        self._chars: Optional[List[Dict]] = None
+        self._rects: Optional[List[Dict]] = None
+
+    @property
+    def chars(self) -> List[Dict]:
+        """文字のリスト（pdfplumberと同じキー、初回アクセス時に組み立て）"""
+        if self._chars is None:
+            columns = {key: self.geometry.char_columns[key].tolist() for key in CHAR_FLOAT_FIELDS}
+            texts = self.geometry.char_texts
+            self._chars = []
+            for i in range(self.geometry.char_count):
+                char = {key: columns[key][i] for key in CHAR_FLOAT_FIELDS}
+                char['text'] = texts['text'][i]
+                char['fontname'] = texts['fontname'][i]
+                char['width'] = char['x1'] - char['x0']
+                char['height'] = char['y1'] - char['y0']
+                char['page_number'] = self.page_number
+                char['object_type'] = 'char'
+                self._chars.append(char)
+        return self._chars
+
+    @property
+    def rects(self) -> List[Dict]:
+        """矩形のリスト（pdfplumberと同じキー、初回アクセス時に組み立て）"""
+        if self._rects is None:
+            columns = self.geometry.rect_columns
+            floats = {key: columns[key].tolist() for key in RECT_FLOAT_FIELDS}
+            flags = {key: columns[key].tolist() for key in RECT_FLAG_FIELDS}
+            self._rects = []
+            for i in range(self.geometry.rect_count):
+                rect = {key: floats[key][i] for key in RECT_FLOAT_FIELDS}
+                rect.update({key: flags[key][i] for key in RECT_FLAG_FIELDS})
+                rect['width'] = rect['x1'] - rect['x0']
+                rect['height'] = rect['y1'] - rect['y0']
+                rect['non_stroking_color'] = _decode_color(int(columns['color_kind'][i]), columns['color'][i])
+                rect['page_number'] = self.page_number
+                rect['object_type'] = 'rect'
+                self._rects.append(rect)
+        return self._rects
+
+    def char_geometry(self) -> CharGeometry:
+        """文字ジオメトリ（dictを経由せず列から直接作成）"""
+        return CharGeometry.from_columns(self.geometry.char_texts['text'], self.geometry.char_columns)
+
+    def close(self):
+        """pdfplumberとの互換用（何もしない）"""
+
+
+class CachedPDF:
+    """キャッシュから復元したPDF（with文で使用）"""
+
+    def __init__(self, pages: List[PageGeometry]):
+        self.pages = [CachedPage(geometry) for geometry in pages]
+
+    def __enter__(self) -> 'CachedPDF':
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def close(self):
+        self.pages = []
+
+
+class PageGeometryCache:
+    """PDF内容ハッシュをキーにしたページジオメトリのディスクキャッシュ"""
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """
+        Args:
+            cache_dir: キャッシュディレクトリ（省略時は環境変数または既定の場所）
+        """
+        self.cache_dir = Path(cache_dir or os.environ.get(CACHE_DIR_ENV) or DEFAULT_CACHE_DIR)
+
+    @staticmethod
+    def content_hash(pdf_path: Path) -> str:
+        """PDFの内容ハッシュ（ファイル名・更新日時には依存しない）"""
+        digest = hashlib.sha256()
+        with open(pdf_path, 'rb') as f:
+            for block in iter(lambda: f.read(1024 * 1024), b''):
+                digest.update(block)
+        return digest.hexdigest()
+
+    def entry_dir(self, content_hash: str, backend_name: str = 'pdfplumber') -> Path:
+        name = f"v{CACHE_FORMAT_VERSION}_{content_hash[:32]}"
+        if backend_name != 'pdfplumber':
+            name += f"_{backend_name}"
+        return self.cache_dir / name
+
+    def contains(self, pdf_path: Path, backend=None) -> bool:
+        """キャッシュ済みかどうか"""
+        backend_name = _backend_name(backend)
+        try:
+            return (self.entry_dir(self.content_hash(pdf_path), backend_name) / 'meta.json').exists()
+        except OSError:
+            return False
+
+    def load(self, pdf_path: Path, content_hash: Optional[str] = None,
+             backend=None) -> Optional[List[PageGeometry]]:
+        """
+        キャッシュから読み込み（memory-map）
+
+        Returns:
+            ページごとのジオメトリ（キャッシュがなければNone）
+        """
+        entry = self.entry_dir(content_hash or self.content_hash(pdf_path), _backend_name(backend))
+        if not (entry / 'meta.json').exists():
+            return None
+        try:
+            return self._read_entry(entry)
+        except (OSError, ValueError, KeyError) as e:
+            logger.warning(f"ジオメトリキャッシュ読み込みエラー: {entry.name} - {e}")
+            return None
+
+    def store(self, pdf_path: Path, pages: List[PageGeometry], content_hash: Optional[str] = None,
+              backend=None) -> Optional[Path]:
+        """
+        キャッシュに保存（一時ディレクトリに書いてから置き換え）
+
+        Returns:
+            キャッシュエントリのパス（失敗時はNone）
+        """
+        entry = self.entry_dir(content_hash or self.content_hash(pdf_path), _backend_name(backend))
+        tmp_dir = None
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            tmp_dir = Path(tempfile.mkdtemp(prefix='.tmp_', dir=self.cache_dir))
+            self._write_entry(tmp_dir, pdf_path, pages)
+            if entry.exists():
+                shutil.rmtree(entry, ignore_errors=True)
+            os.replace(tmp_dir, entry)
+            return entry
+        except OSError as e:
+            logger.warning(f"ジオメトリキャッシュ保存エラー: {pdf_path} - {e}")
+            if tmp_dir is not None:
+                shutil.rmtree(tmp_dir, ignore_errors=True)
+            return None
+
+    def open(self, pdf_path: Path, backend=None):
+        """
+        PDFを開く（キャッシュがあればPDFを解析しない）
+
+        Args:
+            pdf_path: PDFファイルパス
+            backend: 抽出バックエンド名またはインスタンス（省略時は既定）
+
+        Returns:
+            CachedPDF（ハッシュを計算できない場合はバックエンドで直接開いたPDF）
+        """
+        from geometry_backend import get_backend
+
+        backend = get_backend(backend)
+        try:
+            content_hash = self.content_hash(pdf_path)
+        except OSError:
+            return backend.open(pdf_path)
+
+        pages = self.load(pdf_path, content_hash, backend)
+        if pages is not None:
+            logger.debug(f"ジオメトリキャッシュ使用: {Path(pdf_path).name} ({backend.name})")
+            return CachedPDF(pages)
+
+        pages = backend.extract(pdf_path)
+        self.store(pdf_path, pages, content_hash, backend)
+        return CachedPDF(pages)
+
+    def clear(self):
+        """キャッシュをすべて削除"""
+        shutil.rmtree(self.cache_dir, ignore_errors=True)
+
+    # --- 保存形式 -------------------------------------------------------
+    # 全ページの列を連結して1列1ファイル(.npy)にし、ページ境界はオフセットで持つ
+
+    @staticmethod
+    def _write_entry(entry: Path, pdf_path: Path, pages: List[PageGeometry]):
+        def offsets(counts):
+            result = np.zeros(len(counts) + 1, dtype=np.int64)
+            result[1:] = np.cumsum(counts)
+            return result
+
+        arrays = {
+            'page_size': np.array([[p.width, p.height] for p in pages], dtype=np.float64).reshape(-1, 2),
+            'page_number': np.array([p.page_number for p in pages], dtype=np.int64),
+            'char_offsets': offsets([p.char_count for p in pages]),
+            'rect_offsets': offsets([p.rect_count for p in pages]),
+        }
+        for key in CHAR_FLOAT_FIELDS:
+            arrays[f'char_{key}'] = np.concatenate([p.char_columns[key] for p in pages] or [np.empty(0)])
+        for key in CHAR_TEXT_FIELDS:
+            codes, text_offsets = _encode_texts([t for p in pages for t in p.char_texts[key]])
+            arrays[f'char_{key}_codes'] = codes
+            arrays[f'char_{key}_offsets'] = text_offsets
+        for key in RECT_FLOAT_FIELDS + RECT_FLAG_FIELDS + ('color_kind',):
+            arrays[f'rect_{key}'] = np.concatenate([p.rect_columns[key] for p in pages] or [np.empty(0)])
+        arrays['rect_color'] = np.concatenate(
+            [p.rect_columns['color'] for p in pages] or [np.empty((0, _COLOR_WIDTH))]
+        ).reshape(-1, _COLOR_WIDTH)
+
+        for name, array in arrays.items():
+            np.save(entry / f'{name}.npy', array, allow_pickle=False)
+        meta = {'version': CACHE_FORMAT_VERSION, 'source': Path(pdf_path).name, 'pages': len(pages)}
+        with open(entry / 'meta.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+    @staticmethod
+    def _read_entry(entry: Path) -> List[PageGeometry]:
+        with open(entry / 'meta.json', 'r', encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != CACHE_FORMAT_VERSION:
+            raise ValueError(f"unsupported cache version: {meta.get('version')}")
+
+        def load(name):
+            return np.load(entry / f'{name}.npy', mmap_mode='r', allow_pickle=False)
+
+        page_size = load('page_size')
+        page_number = load('page_number')
+        char_offsets = load('char_offsets')
+        rect_offsets = load('rect_offsets')
+        char_floats = {key: load(f'char_{key}') for key in CHAR_FLOAT_FIELDS}
+        char_text_columns = {key: (load(f'char_{key}_codes'), load(f'char_{key}_offsets'))
+                             for key in CHAR_TEXT_FIELDS}
+        rect_arrays = {key: load(f'rect_{key}') for key in RECT_FLOAT_FIELDS + RECT_FLAG_FIELDS + ('color_kind', 'color')}
+
+        pages = []
+        for i in range(int(meta['pages'])):
+            c0, c1 = int(char_offsets[i]), int(char_offsets[i + 1])
+            r0, r1 = int(rect_offsets[i]), int(rect_offsets[i + 1])
+            char_texts = {
+                key: _decode_texts(codes, text_offsets[c0:c1 + 1])
+                for key, (codes, text_offsets) in char_text_columns.items()
+            }
+            pages.append(PageGeometry(
+                page_number=int(page_number[i]),
+                width=float(page_size[i, 0]),
+                height=float(page_size[i, 1]),
+                char_columns={key: column[c0:c1] for key, column in char_floats.items()},
+                char_texts=char_texts,
+                rect_columns={key: column[r0:r1] for key, column in rect_arrays.items()},
+            ))
+        return pages
+
+
+def _backend_name(backend) -> str:
+    """バックエンド名（インスタンス・別名・省略時の既定を解決）"""
+    from geometry_backend import get_backend
+    return get_backend(backend).name
+
+
+_default_cache: Optional[PageGeometryCache] = None
+
+
+def get_default_cache() -> PageGeometryCache:
+    """既定のキャッシュインスタンス"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PageGeometryCache()
+    return _default_cache
+
+
+def set_default_cache(cache: Optional[PageGeometryCache]) -> Optional[PageGeometryCache]:
+    """既定のキャッシュインスタンスを差し替え（Noneで次回に作り直す）
+
+    Returns:
+        差し替え前のインスタンス（元に戻すときに渡す）
+    """
+    global _default_cache
+    previous, _default_cache = _default_cache, cache
+    return previous
+
+
+def open_pdf(pdf_path, cache: Optional[PageGeometryCache] = None, backend=None):
+    """pdfplumber.open の代わりに使う（キャッシュ経由でPDFを開く、backendで抽出元を選択）"""
+    return (cache or get_default_cache()).open(Path(pdf_path), backend)
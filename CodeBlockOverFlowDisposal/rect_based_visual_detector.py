@@ -11,6 +11,9 @@ from datetime import datetime
 from typing import List, Dict, Tuple, Optional, Set
 import pdfplumber
 
+from char_geometry import BlockIndex, CharGeometry
+from page_geometry_cache import open_pdf
+
 
 class RectBasedVisualDetector:
     """矩形基準の視覚的検出器"""
@@ -60,31 +63,32 @@ class RectBasedVisualDetector:
         if not code_blocks:
             return overflows
         
+        # 各ブロックに入る文字（y0がブロックのy区間内）を索引でまとめて求める
+        block_chars = BlockIndex(code_blocks).chars_by_block(page.chars)
+        
         # 各コードブロックに対してチェック
         for block_idx, block in enumerate(code_blocks):
             block_overflows = []
             
             # ブロック内の文字をチェック
-            for char in page.chars:
-                # 文字がブロック内に含まれるかチェック（Y座標）
-                if block['y0'] <= char['y0'] <= block['y1']:
-                    # ASCII文字のみ対象
-                    if self.is_ascii_printable(char['text']):
-                        # 文字の右端がブロックの右端を超えているか
-                        if char['x1'] > block['x1']:
-                            overflow_amount = char['x1'] - block['x1']
-                            block_overflows.append({
-                                'char': char['text'],
-                                'x0': char['x0'],
-                                'x1': char['x1'],
-                                'y0': char['y0'],
-                                'overflow_amount': overflow_amount
-                            })
-                    else:
-                        # 統計を更新
-                        char_type = self.classify_character(char['text'])
-                        self.stats['excluded_characters'][char_type] = \
-                            self.stats['excluded_characters'].get(char_type, 0) + 1
+            for char in block_chars[block_idx]:
+                # ASCII文字のみ対象
+                if self.is_ascii_printable(char['text']):
+                    # 文字の右端がブロックの右端を超えているか
+                    if char['x1'] > block['x1']:
+                        overflow_amount = char['x1'] - block['x1']
+                        block_overflows.append({
+                            'char': char['text'],
+                            'x0': char['x0'],
+                            'x1': char['x1'],
+                            'y0': char['y0'],
+                            'overflow_amount': overflow_amount
+                        })
+                else:
+                    # 統計を更新
+                    char_type = self.classify_character(char['text'])
+                    self.stats['excluded_characters'][char_type] = \
+                        self.stats['excluded_characters'].get(char_type, 0) + 1
             
             if block_overflows:
                 # 行ごとにグループ化
@@ -121,43 +125,28 @@ class RectBasedVisualDetector:
         # ページ右端を基準
         page_right_edge = page_width - 10  # 最小マージン10pt
         
-        # 行ごとにグループ化
-        lines = {}
-        for char in page.chars:
-            # ページ番号領域は除外
-            if char['y0'] < 50 or char['y0'] > page.height - 50:
-                continue
-            
-            # ASCII文字のみ対象
-            if self.is_ascii_printable(char['text']):
-                y_pos = round(char['y0'])
-                if y_pos not in lines:
-                    lines[y_pos] = []
-                lines[y_pos].append(char)
+        geometry = CharGeometry.from_page(page)
+        if len(geometry) == 0:
+            return overflows
         
-        # 各行をチェック
-        for y_pos, line_chars in lines.items():
-            line_chars.sort(key=lambda c: c['x0'])
-            
-            # ページ右端を超える文字を探す
-            overflow_chars = []
-            for char in line_chars:
-                if char['x1'] > page_right_edge:
-                    overflow_chars.append(char)
+        # ページ番号領域を除いたASCII文字のみ対象
+        y0 = geometry.y0
+        in_body = (y0 >= 50) & (y0 <= page.height - 50)
+        overflow_mask = geometry.right_overflow_mask(page_right_edge)
+        
+        # ページ右端を超える文字を含む行だけをx0順にまとめる
+        for line in geometry.group_lines(in_body & geometry.is_ascii_printable, sort_by='x0',
+                                         require=overflow_mask):
+            overflow_chars = line[overflow_mask[line]]
             
-            if overflow_chars:
-                line_text = ''.join([c['text'] for c in line_chars])
-                overflow_text = ''.join([c['text'] for c in overflow_chars])
-                max_overflow = max(c['x1'] - page_right_edge for c in overflow_chars)
-                
-                overflows.append({
-                    'type': 'page_overflow',
-                    'y_position': y_pos,
-                    'line_text': line_text[:100],
-                    'overflow_text': overflow_text,
-                    'overflow_amount': max_overflow,
-                    'char_count': len(overflow_chars)
-                })
+            overflows.append({
+                'type': 'page_overflow',
+                'y_position': int(geometry.line_y[line[0]]),
+                'line_text': geometry.text_of(line)[:100],
+                'overflow_text': geometry.text_of(overflow_chars),
+                'overflow_amount': float(geometry.x1[overflow_chars].max() - page_right_edge),
+                'char_count': int(overflow_chars.size)
+            })
         
         return overflows
     
@@ -230,7 +219,7 @@ class RectBasedVisualDetector:
         results = []
         
         try:
-            with pdfplumber.open(str(pdf_path)) as pdf:
+            with open_pdf(str(pdf_path)) as pdf:
                 total_pages = len(pdf.pages)
                 self.stats['total_pages'] = total_pages
                 
@@ -0,0 +1,139 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unit tests for AdaptiveMarginCalculator - 文書・ページ・設定ごとのレイアウトキャッシュ
+"""
+
+import io
+import sys
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from overflow_detection_lib.advanced import AdaptiveMarginCalculator
+
+PAGE_WIDTH = 515.9
+PAGE_HEIGHT = 728.5
+
+
+def _chars(text: str, x0: float = 60.0, y0: float = 300.0):
+    return [{'text': ch, 'x0': x0 + i * 6.0, 'y0': y0} for i, ch in enumerate(text)]
+
+
+def _page(chars, pdf=None):
+    """pdfplumberのページと同じ属性を持つページ"""
+    return SimpleNamespace(width=PAGE_WIDTH, height=PAGE_HEIGHT, chars=chars, pdf=pdf)
+
+
+class _PDF:
+    """pdfplumberのPDFと同じく読み込み元のstreamを持つ文書"""
+
+    def __init__(self, content: bytes):
+        self.stream = io.BytesIO(content)
+
+
+
+class _MarginConfig:
+    def __init__(self, odd: float, even: float):
+        self.odd = odd
+        self.even = even
+
+    def get_margin_for_page(self, page_num: int) -> float:
+        return self.odd if page_num % 2 == 1 else self.even
+
+
+class TestAdaptiveMarginCache(unittest.TestCase):
+    """calculate_adaptive_margin のキャッシュのテスト"""
+
+    def setUp(self):
+        self.calculator = AdaptiveMarginCalculator()
+
+    def _count_analyses(self):
+        calculator = self.calculator
+        return patch.object(calculator, '_analyze_page_layout', wraps=calculator._analyze_page_layout)
+
+    def test_documents_with_same_page_number_are_distinct(self):
+        """2つ目のPDFが1つ目のPDFの同じページ番号のレイアウトを使わないこと"""
+        prose = _page(_chars('plain body text ' * 10), _PDF(b'%PDF-1 prose'))
+        code = _page(_chars('{x=[a];b=(c)<d>};' * 10, x0=300.0), _PDF(b'%PDF-1 code'))
+
+        first = self.calculator.calculate_adaptive_margin(prose, 3)
+        second = self.calculator.calculate_adaptive_margin(code, 3)
+        self.assertNotEqual(first['layout_type'], second['layout_type'])
+        self.assertNotEqual(first['right_margin_pt'], second['right_margin_pt'])
+        self.assertEqual(len(self.calculator._layout_cache), 2)
+
+        # 同じ文書の同じページはキャッシュから返す
+        with self._count_analyses() as analyze:
+            self.assertIs(self.calculator.calculate_adaptive_margin(prose, 3), first)
+        analyze.assert_not_called()
+
+    def test_document_fingerprint(self):
+        pdf = _PDF(b'%PDF-1 same content')
+        pdf.stream.seek(5)
+        fingerprint = self.calculator._document_fingerprint(_page([], pdf))
+        # 読み取り位置は元に戻す
+        self.assertEqual(pdf.stream.tell(), 5)
+        self.assertEqual(self.calculator._document_fingerprint(_page([], _PDF(b'%PDF-1 same content'))),
+                         fingerprint)
+        self.assertNotEqual(self.calculator._document_fingerprint(_page([], _PDF(b'%PDF-1 other'))),
+                            fingerprint)
+
+        # PDFを持たないページは文字の内容から
+        self.assertEqual(self.calculator._document_fingerprint(_page(_chars('abc'))),
+                         self.calculator._document_fingerprint(_page(_chars('abc'))))
+        self.assertNotEqual(self.calculator._document_fingerprint(_page(_chars('abc'))),
+                            self.calculator._document_fingerprint(_page(_chars('abd'))))
+
+    def test_explicit_fingerprint(self):
+        page = _page(_chars('text'), _PDF(b'%PDF-1'))
+        first = self.calculator.calculate_adaptive_margin(page, 1, document_fingerprint='book-a')
+        self.assertIsNot(self.calculator.calculate_adaptive_margin(page, 1, document_fingerprint='book-b'), first)
+        self.assertIs(self.calculator.calculate_adaptive_margin(page, 1, document_fingerprint='book-a'), first)
+
+    def test_config_change_misses_cache(self):
+        page = _page(_chars('text'), _PDF(b'%PDF-1'))
+        self.calculator.calculate_adaptive_margin(page, 1)
+
+        with self._count_analyses() as analyze:
+            self.calculator.header_detection_threshold = 80.0
+            self.calculator.calculate_adaptive_margin(page, 1)
+        analyze.assert_called_once()
+
+        self.calculator.config_manager = _MarginConfig(odd=30.0, even=50.0)
+        first = self.calculator.calculate_adaptive_margin(page, 1)
+        self.assertEqual(first['base_margin_pt'], 30.0)
+        self.calculator.config_manager = _MarginConfig(odd=40.0, even=50.0)
+        self.assertEqual(self.calculator.calculate_adaptive_margin(page, 1)['base_margin_pt'], 40.0)
+
+    def test_least_recently_used_page_is_evicted(self):
+        calculator = AdaptiveMarginCalculator(cache_size=2)
+        self.calculator = calculator
+        pages = {n: _page(_chars(f'page {n}'), _PDF(b'%PDF-1 book')) for n in (1, 2, 3)}
+        results = {n: calculator.calculate_adaptive_margin(pages[n], n) for n in (1, 2)}
+        calculator.calculate_adaptive_margin(pages[1], 1)
+        calculator.calculate_adaptive_margin(pages[3], 3)
+        self.assertEqual(len(calculator._layout_cache), 2)
+
+        with self._count_analyses() as analyze:
+            self.assertIs(calculator.calculate_adaptive_margin(pages[1], 1), results[1])
+            self.assertIsNot(calculator.calculate_adaptive_margin(pages[2], 2), results[2])
+        analyze.assert_called_once()
+
+    def test_single_char_page(self):
+        result = self.calculator.calculate_adaptive_margin(_page(_chars('x'), _PDF(b'%PDF-1')), 2)
+        self.assertGreater(result['right_margin_pt'], 0)
+        layout = self.calculator._analyze_page_layout(_page(_chars('x')))
+        self.assertEqual(layout['text_distribution']['total_chars'], 1)
+
+    def test_clear_cache(self):
+        self.calculator.calculate_adaptive_margin(_page(_chars('text'), _PDF(b'%PDF-1')), 1)
+        self.calculator.clear_cache()
+        self.assertEqual(len(self.calculator._layout_cache), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,112 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+batch_summary のPDF単位の並列処理とワーカー異常終了時の切り分けのテスト
+"""
+
+import csv
+import importlib.util
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+HAS_DEPS = all(importlib.util.find_spec(name) for name in ('fitz', 'pytesseract'))
+
+if HAS_DEPS:
+    from batch_summary import StreamingReportWriter, run_batch
+
+
+class StubDetector:
+    """ファイル名で結果を決める検出器（ワーカーへ渡せるようモジュール直下に定義）
+
+    crash を含むPDFではワーカープロセスごと異常終了し、
+    broken を含むPDFでは OCRBasedOverflowDetector と同様に errors に記録する。
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.total_pages = 0
+
+    def detect_file(self, pdf_path, workers=1):
+        if 'crash' in pdf_path.name:
+            os._exit(3)
+        if 'broken' in pdf_path.name:
+            self.errors.append('エラー: PDFを開けません')
+            return []
+        self.total_pages = len(pdf_path.stem)
+        return [1, 2]
+
+
+@unittest.skipUnless(HAS_DEPS, "PyMuPDF / pytesseract not available")
+class TestRunBatch(unittest.TestCase):
+    """run_batch と StreamingReportWriter のテスト"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        self.jsonl_path = self.folder / 'report.jsonl'
+        self.csv_path = self.folder / 'report.csv'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _run(self, names, workers):
+        pdf_files = [self.folder / name for name in names]
+        received = []
+        with StreamingReportWriter(self.jsonl_path, self.csv_path) as writer:
+            def on_result(file_result):
+                received.append(file_result)
+                writer.write(file_result)
+
+            run_batch(pdf_files, StubDetector(), on_result, workers=workers)
+        return received
+
+    def _reports(self):
+        with open(self.jsonl_path, encoding='utf-8') as f:
+            jsonl = [json.loads(line) for line in f]
+        with open(self.csv_path, newline='', encoding='utf-8') as f:
+            rows = list(csv.reader(f))
+        return jsonl, rows
+
+    def test_crash_is_isolated_to_one_file(self):
+        names = ['a.pdf', 'bb.pdf', 'crash.pdf', 'ddd.pdf', 'eeee.pdf', 'broken.pdf']
+        for workers in (1, 3):
+            with self.subTest(workers=workers):
+                received = self._run(names, workers)
+
+                by_name = {r['file_name']: r for r in received}
+                self.assertEqual(len(received), len(names))
+                self.assertEqual(sorted(by_name), sorted(names))
+                self.assertEqual(sorted(n for n, r in by_name.items() if not r['success']),
+                                 ['broken.pdf', 'crash.pdf'])
+                self.assertEqual(by_name['crash.pdf']['error'], 'ワーカープロセスが異常終了しました')
+                self.assertEqual(by_name['broken.pdf']['error'], 'PDFを開けません')
+                for name in ('a.pdf', 'bb.pdf', 'ddd.pdf', 'eeee.pdf'):
+                    self.assertEqual(by_name[name]['overflow_pages'], [1, 2])
+                    self.assertEqual(by_name[name]['total_pages'], len(Path(name).stem))
+
+                # JSONL/CSVはファイルごとにちょうど1行（完了順）
+                jsonl, rows = self._reports()
+                self.assertEqual(jsonl, received)
+                self.assertEqual(rows[0][0], 'ファイル名')
+                self.assertEqual([row[0] for row in rows[1:]], [r['file_name'] for r in received])
+                status = {row[0]: row[-1] for row in rows[1:]}
+                self.assertEqual((status['crash.pdf'], status['broken.pdf'], status['a.pdf']),
+                                 ('ERROR', 'ERROR', 'はみ出しあり'))
+
+    def test_consecutive_crashes(self):
+        received = self._run(['crash1.pdf', 'crash2.pdf', 'ok.pdf'], workers=2)
+        self.assertEqual(sorted((r['file_name'], r['success']) for r in received),
+                         [('crash1.pdf', False), ('crash2.pdf', False), ('ok.pdf', True)])
+        jsonl, rows = self._reports()
+        self.assertEqual(len(jsonl), 3)
+        self.assertEqual(len(rows), 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
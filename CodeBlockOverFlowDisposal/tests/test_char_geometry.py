@@ -0,0 +1,105 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unit tests for char_geometry - 文字ジオメトリカーネル
+"""
+
+import random
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from char_geometry import BlockIndex, CharGeometry, find_overflow_lines
+
+
+def _char(text, x0, x1, y0):
+    return {'text': text, 'x0': x0, 'x1': x1, 'y0': y0}
+
+
+class TestCharGeometry(unittest.TestCase):
+    """CharGeometryのテスト"""
+
+    def setUp(self):
+        self.chars = [
+            _char('b', 495.0, 501.0, 100.4),
+            _char('あ', 505.0, 515.0, 100.2),
+            _char('a', 490.0, 502.0, 99.6),
+            _char('x', 300.0, 306.0, 200.0),
+            _char('z', 496.0, 510.0, 300.0),
+            _char('c', 494.0, 502.0, 100.0),
+        ]
+        self.geometry = CharGeometry(self.chars)
+
+    def test_find_overflow_lines(self):
+        """ASCII文字のはみ出しが行ごと・x1順にまとまること"""
+        lines = find_overflow_lines(self.geometry, 500.0, 0.1)
+
+        self.assertEqual([line.y_position for line in lines], [100, 300])
+        # x1が同じ文字は元の順序を保つ
+        self.assertEqual(lines[0].overflow_text, 'bac')
+        self.assertEqual(lines[0].char_count, 3)
+        self.assertAlmostEqual(lines[0].overflow_amount, 2.0)
+        self.assertEqual(lines[1].overflow_text, 'z')
+
+    def test_group_lines_require(self):
+        """requireで指定した文字を含む行だけが返ること"""
+        mask = self.geometry.is_ascii
+        require = self.geometry.right_overflow_mask(505.0)
+        lines = self.geometry.group_lines(mask, sort_by='x0', require=require)
+
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(self.geometry.text_of(lines[0]), 'z')
+
+    def test_empty_page(self):
+        """文字のないページでは空になること"""
+        self.assertEqual(find_overflow_lines(CharGeometry([]), 500.0, 0.1), [])
+
+    def test_ascii_columns(self):
+        """ASCII判定列が従来の判定と一致すること"""
+        geometry = CharGeometry([_char(t, 0, 1, 0) for t in ['a', 'あ', '', '(cid:3)', '\x7f']])
+        self.assertEqual(geometry.is_ascii.tolist(), [True, False, False, True, True])
+        self.assertEqual(geometry.is_ascii_printable.tolist(), [True, False, True, True, False])
+
+
+class TestBlockIndex(unittest.TestCase):
+    """BlockIndexのテスト（全ブロック×全文字の走査と一致すること）"""
+
+    def setUp(self):
+        rng = random.Random(0)
+        self.blocks = []
+        for _ in range(40):
+            x0, y0 = rng.uniform(50, 300), float(rng.randint(0, 700))
+            self.blocks.append({'x0': x0, 'x1': x0 + rng.uniform(100, 300),
+                                'y0': y0, 'y1': y0 + rng.choice([0.0, 12.0, 80.0, 300.0])})
+        # 境界ちょうどの文字を含める
+        ys = [b['y0'] for b in self.blocks] + [b['y1'] for b in self.blocks]
+        ys += [float(rng.randint(-10, 1100)) for _ in range(500)]
+        self.chars = [_char('a', x, x + 5.0, y) for x, y in zip((rng.uniform(0, 600) for _ in ys), ys)]
+
+    def test_chars_by_block(self):
+        index = BlockIndex(self.blocks)
+        for use_x in (False, True):
+            expected = [[c for c in self.chars
+                         if b['y0'] <= c['y0'] <= b['y1'] and (not use_x or b['x0'] <= c['x0'] <= b['x1'])]
+                        for b in self.blocks]
+            self.assertEqual(index.chars_by_block(self.chars, use_x=use_x), expected)
+
+    def test_point_queries(self):
+        index = BlockIndex(self.blocks)
+        for c in self.chars:
+            for x in (None, c['x0']):
+                expected = [i for i, b in enumerate(self.blocks)
+                            if b['y0'] <= c['y0'] <= b['y1'] and (x is None or b['x0'] <= x <= b['x1'])]
+                self.assertEqual(index.blocks_at(c['y0'], x), expected)
+                self.assertEqual(index.contains(c['y0'], x), bool(expected))
+
+    def test_empty(self):
+        index = BlockIndex([])
+        self.assertEqual(index.chars_by_block(self.chars), [])
+        self.assertFalse(index.contains(100.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unit tests for detector_benchmark - 検出器ベンチマーク
+"""
+
+import copy
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from detector_benchmark import (DETECTORS, DetectorSpec, RegistryDetector, compare_to_baseline, evaluate,
+                                register_detector, registry_spec, run_benchmark)
+from overflow_detection_lib.detectors import DETECTORS as LIBRARY_DETECTORS
+
+SAMPLE_PDF = Path(__file__).parent.parent / 'sampleOverflow.pdf'
+
+
+class _FakeDetector:
+    """2ページ目だけを検出する検出器"""
+
+    def detect_page(self, page_number):
+        return page_number == 2
+
+    def process_pdf(self, pdf_path):
+        return [{'page': n} for n in (1, 2) if self.detect_page(n)]
+
+
+def _report(pages_per_sec=100.0, f1=0.8, errors=None):
+    return {
+        'detectors': {
+            'rect_based': {
+                'pages_per_sec': pages_per_sec,
+                'errors': errors or {},
+                'accuracy': {'ground_truth_pages': {'precision': f1, 'recall': f1, 'f1': f1}}
+            }
+        }
+    }
+
+
+class TestEvaluate(unittest.TestCase):
+    """正解データとの比較のテスト"""
+
+    def test_counts_only_pdfs_with_ground_truth(self):
+        metrics = evaluate(
+            {'a.pdf': [1, 2, 3], 'unknown.pdf': [5]},
+            {'a.pdf': [2, 3, 4], 'b.pdf': [9]}
+        )
+        self.assertEqual((metrics['true_positives'], metrics['false_positives'], metrics['false_negatives']),
+                         (2, 1, 1))
+        self.assertAlmostEqual(metrics['precision'], 2 / 3)
+        self.assertAlmostEqual(metrics['recall'], 2 / 3)
+        self.assertAlmostEqual(metrics['f1'], 2 / 3)
+
+    def test_empty_detection(self):
+        metrics = evaluate({'a.pdf': []}, {'a.pdf': [1]})
+        self.assertEqual((metrics['precision'], metrics['recall'], metrics['f1']), (0.0, 0.0, 0.0))
+
+
+class TestCompareToBaseline(unittest.TestCase):
+    """ベースライン比較のテスト"""
+
+    def test_no_regression(self):
+        baseline = _report()
+        self.assertEqual(compare_to_baseline(copy.deepcopy(baseline), baseline), [])
+
+    def test_accuracy_regression(self):
+        regressions = compare_to_baseline(_report(f1=0.7), _report(f1=0.8))
+        self.assertEqual(len(regressions), 3)
+        self.assertEqual(compare_to_baseline(_report(f1=0.7), _report(f1=0.8), accuracy_tolerance=0.1), [])
+
+    def test_throughput_regression(self):
+        self.assertEqual(len(compare_to_baseline(_report(pages_per_sec=70.0), _report())), 1)
+        self.assertEqual(compare_to_baseline(_report(pages_per_sec=80.0), _report()), [])
+
+    def test_new_error_is_regression(self):
+        regressions = compare_to_baseline(_report(errors={'a.pdf': 'ValueError: x'}), _report())
+        self.assertEqual(len(regressions), 1)
+
+
+class TestRunBenchmark(unittest.TestCase):
+    """ベンチマーク実行のテスト"""
+
+    def setUp(self):
+        register_detector(DetectorSpec('fake', __name__, '_FakeDetector',
+                                       lambda detector, pdf_path: [r['page'] for r in detector.process_pdf(pdf_path)],
+                                       stages=('detect_page',)))
+
+    def tearDown(self):
+        DETECTORS.pop('fake', None)
+
+    def test_records_accuracy_speed_and_stages(self):
+        pdf_path = Path(__file__).parent.parent / 'sampleOverflow.pdf'
+        if not pdf_path.exists():
+            self.skipTest('sampleOverflow.pdf がありません')
+
+        report = run_benchmark(['fake'], [pdf_path], ground_truths={'gt': {'sampleOverflow.pdf': [1]}},
+                               isolate=False)
+        result = report['detectors']['fake']
+
+        self.assertEqual(report['pdfs'], {'sampleOverflow.pdf': 1})
+        self.assertEqual(result['detected'], {'sampleOverflow.pdf': [2]})
+        self.assertEqual(result['errors'], {})
+        self.assertGreater(result['pages_per_sec'], 0)
+        self.assertEqual(result['stages']['detect_page']['calls'], 2)
+        self.assertEqual(result['accuracy']['gt']['false_positives'], 1)
+        self.assertEqual(result['accuracy']['gt']['false_negatives'], 1)
+
+    def test_missing_dependency_is_skipped(self):
+        register_detector(DetectorSpec('fake', 'no_such_detector_module', 'Detector', lambda d, p: []))
+        pdf_path = Path(__file__).parent.parent / 'sampleOverflow.pdf'
+        if not pdf_path.exists():
+            self.skipTest('sampleOverflow.pdf がありません')
+
+        report = run_benchmark(['fake'], [pdf_path], ground_truths={}, isolate=False)
+        self.assertIn('skipped', report['detectors']['fake'])
+
+
+class TestRegistryDetectors(unittest.TestCase):
+    """ライブラリの登録簿の検出器のベンチマークのテスト"""
+
+    def setUp(self):
+        if not SAMPLE_PDF.exists():
+            self.skipTest('sampleOverflow.pdf がありません')
+
+    def tearDown(self):
+        for name in ('fake_page', 'fake_broken', 'fake_missing'):
+            LIBRARY_DETECTORS.unregister(name)
+            DETECTORS.pop(name, None)
+
+    def _register(self, name, detect=None, factory=None):
+        if factory is not None:
+            LIBRARY_DETECTORS.register_factory(name, factory)
+        else:
+            LIBRARY_DETECTORS.register(name, detect)
+        register_detector(registry_spec(name))
+
+    def test_library_registry_is_the_source(self):
+        for name in LIBRARY_DETECTORS.names():
+            self.assertEqual(DETECTORS[name], registry_spec(name))
+        self.assertEqual(set(DETECTORS) - set(LIBRARY_DETECTORS.names()), {'ocr'})
+
+    def test_runs_through_pipeline(self):
+        self._register('fake_page', lambda ctx: [{'page_width': ctx.width}])
+        report = run_benchmark(['fake_page'], [SAMPLE_PDF], ground_truths={'gt': {'sampleOverflow.pdf': [1]}},
+                               isolate=False)
+        result = report['detectors']['fake_page']
+
+        self.assertEqual(result['detected'], {'sampleOverflow.pdf': [1]})
+        self.assertEqual(result['errors'], {})
+        self.assertEqual(result['accuracy']['gt']['f1'], 1.0)
+        self.assertEqual(set(result['stages']), {'(open)', '(geometry)', 'fake_page'})
+        self.assertEqual(result['stages']['fake_page']['calls'], 1)
+
+    def test_page_error_is_recorded(self):
+        def broken(ctx):
+            raise ValueError('boom')
+        self._register('fake_broken', broken)
+
+        report = run_benchmark(['fake_broken'], [SAMPLE_PDF], ground_truths={}, isolate=False)
+        self.assertIn('ValueError: boom', report['detectors']['fake_broken']['errors']['sampleOverflow.pdf'])
+
+    def test_uncreatable_detector_is_skipped(self):
+        def factory():
+            raise ImportError('no module')
+        self._register('fake_missing', factory=factory)
+
+        with self.assertRaises(ImportError):
+            RegistryDetector('fake_missing')
+        report = run_benchmark(['fake_missing'], [SAMPLE_PDF], ground_truths={}, isolate=False)
+        self.assertIn('skipped', report['detectors']['fake_missing'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unit tests for overflow_detection_lib.detectors - 検出器プラグインとパイプライン
+"""
+
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from overflow_detection_lib.detectors import DETECTORS, DetectionPipeline, DetectorRegistry
+from overflow_detection_lib.detectors.builtin import _findings
+from page_geometry_cache import PageGeometryCache
+
+SAMPLE_PDF = Path(__file__).parent.parent / 'sampleOverflow.pdf'
+
+
+@unittest.skipUnless(SAMPLE_PDF.exists(), 'sampleOverflow.pdf がありません')
+class TestDetectionPipeline(unittest.TestCase):
+    """1パスで複数の検出器を実行するパイプラインのテスト"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache = PageGeometryCache(Path(self.temp_dir.name))
+        self.registry = DetectorRegistry()
+        self.built = []
+
+        @self.registry.register('always')
+        def always(ctx):
+            ctx.shared('counted', lambda: self.built.append(ctx.page_number))
+            return [{'page_width': ctx.width}]
+
+        @self.registry.register('never')
+        def never(ctx):
+            ctx.shared('counted', lambda: self.built.append(ctx.page_number))
+            return []
+
+        @self.registry.register('broken')
+        def broken(ctx):
+            raise ValueError('boom')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_one_context_feeds_all_detectors(self):
+        result = DetectionPipeline(['always', 'never', 'broken'], self.registry, cache=self.cache).run(SAMPLE_PDF)
+
+        self.assertEqual(result.total_pages, 1)
+        self.assertEqual(result.pages('always'), [1])
+        self.assertEqual(result.pages('never'), [])
+        self.assertEqual(self.built, [1])  # 共有データはページごとに1回だけ作られる
+        self.assertEqual(result.errors['broken'], [{'page': 1, 'error': 'ValueError: boom'}])
+        self.assertEqual(set(result.timings()), {'always', 'never', 'broken', '(open)', '(geometry)'})
+
+    def test_ensemble_votes(self):
+        result = DetectionPipeline(['always', 'never', 'broken'], self.registry, cache=self.cache).run(SAMPLE_PDF)
+
+        self.assertEqual(result.votes(), {1: ['always']})
+        self.assertEqual(result.ensemble(), [])
+        self.assertEqual(result.ensemble(min_votes=1), [1])
+        self.assertEqual(result.ensemble(names=['always']), [1])
+
+    def test_factory_failure_is_recorded(self):
+        def factory():
+            raise ImportError('no module')
+        self.registry.register_factory('missing', factory)
+
+        result = DetectionPipeline(['always', 'missing'], self.registry, cache=self.cache).run(SAMPLE_PDF)
+        self.assertEqual(result.pages('always'), [1])
+        self.assertEqual(result.errors['missing'][0]['page'], 0)
+
+    def test_unknown_detector(self):
+        with self.assertRaises(ValueError):
+            DetectionPipeline(['no_such_detector'], self.registry)
+
+    def test_builtin_edges_match_standalone_rect_detector(self):
+        sys.path.insert(0, str(Path(__file__).parent.parent / 'overflow_checker_standalone'))
+        from rect_based_detector import RectBasedOverflowDetector
+
+        names = ['code_block_edge', 'text_area_edge']
+        result = DetectionPipeline(names, DETECTORS, cache=self.cache).run(SAMPLE_PDF)
+        self.assertEqual(result.ensemble(min_votes=1), RectBasedOverflowDetector().detect_file(SAMPLE_PDF))
+
+
+class TestBuiltinRegistry(unittest.TestCase):
+    """既定の登録内容のテスト"""
+
+    def test_broken_v8_is_not_registered(self):
+        names = DETECTORS.names()
+        self.assertNotIn('visual_hybrid_v8', names)
+        self.assertEqual(sorted(n for n in names if n.startswith('visual_hybrid_v')),
+                         sorted(f'visual_hybrid_v{v}' for v in (2, 3, 4, 5, 6, 7, 9, 10)))
+
+
+class TestFindings(unittest.TestCase):
+    """既存の検出器の結果の正規化のテスト"""
+
+    def test_page_results(self):
+        self.assertEqual(_findings(None), [])
+        self.assertEqual(_findings([]), [])
+        self.assertEqual(_findings([{'a': 1}]), [{'a': 1}])
+        self.assertEqual(_findings({'page_number': 3}), [{'page_number': 3}])
+
+    def test_has_overflow_dict(self):
+        self.assertEqual(_findings({'has_overflow': False, 'overflows': []}), [])
+        self.assertEqual(_findings({'has_overflow': True, 'overflows': [{'a': 1}]}), [{'a': 1}])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,11 @@
 Unit tests for MaximumOCRDetectorV3 - TDD validation
 """
 
+import functools
+import multiprocessing
+import pickle
 import unittest
+from concurrent.futures import ProcessPoolExecutor
 from unittest.mock import Mock, patch, MagicMock
 import sys
 from pathlib import Path
@@ -175,6 +179,76 @@ class TestMaximumOCRDetectorV3(unittest.TestCase):
         # 1秒以内での処理を期待
         self.assertLess(processing_time, 1.0)
 
+class TestParallelProcessing(unittest.TestCase):
+    """ページ並列処理のテスト"""
+    
+    def setUp(self):
+        try:
+            import fitz
+        except ImportError:
+            self.skipTest("PyMuPDF not available")
+        import tempfile
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.pdf_path = Path(self.temp_dir.name) / 'pages.pdf'
+        
+        # 一部のページだけ右マージンをはみ出すテキストを配置したPDFを作成
+        doc = fitz.open()
+        for i in range(9):
+            page = doc.new_page(width=515.9, height=728.5)
+            page.insert_text((72, 100), "print('inside')", fontsize=10)
+            if i % 3 == 0:
+                page.insert_text((440, 200 + i), "overflow_text_line_%d" % i, fontsize=10)
+        doc.save(str(self.pdf_path))
+        doc.close()
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_parallel_matches_serial(self):
+        """並列処理の結果が逐次処理と同一であること"""
+        serial_detector = MaximumOCRDetectorV3()
+        serial_detector.use_geometry_cache = False
+        serial = serial_detector.process_pdf_comprehensive(self.pdf_path)
+        
+        progress = []
+        parallel_detector = MaximumOCRDetectorV3()
+        parallel_detector.use_geometry_cache = False
+        parallel = parallel_detector.process_pdf_comprehensive(
+            self.pdf_path, workers=2,
+            progress_callback=lambda done, total: progress.append((done, total))
+        )
+        
+        self.assertEqual([r['page'] for r in serial], [1, 4, 7])
+        self.assertEqual(parallel, serial)
+        self.assertEqual(progress[-1], (9, 9))
+        self.assertEqual([done for done, _ in progress], sorted(done for done, _ in progress))
+    
+    def test_parallel_under_spawn(self):
+        """spawn（Windowsの既定）でも検出器をワーカーに渡せ、フィルタ統計が合算されること"""
+        serial_detector = MaximumOCRDetectorV3()
+        serial_detector.use_geometry_cache = False
+        serial = serial_detector.process_pdf_comprehensive(self.pdf_path)
+        
+        parallel_detector = MaximumOCRDetectorV3()
+        parallel_detector.use_geometry_cache = False
+        spawn_executor = functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+        with patch('maximum_ocr_detector_v3.ProcessPoolExecutor', spawn_executor):
+            parallel = parallel_detector.process_pdf_comprehensive(self.pdf_path, workers=2)
+        
+        self.assertEqual(parallel, serial)
+        self.assertEqual(parallel_detector.quality_metrics['quality_warnings'], [])
+        
+        def counts(detector):
+            return {s['name']: (s['calls'], s['hits']) for s in detector.get_filter_stats()}
+        self.assertEqual(counts(parallel_detector), counts(serial_detector))
+        self.assertGreater(sum(calls for calls, _ in counts(parallel_detector).values()), 0)
+    
+    def test_detector_is_picklable(self):
+        """検出器（フィルタチェーンを含む）をpickleできること"""
+        detector = pickle.loads(pickle.dumps(MaximumOCRDetectorV3()))
+        self.assertTrue(detector.is_likely_false_positive('12', 5.0, 100.0))
+        self.assertFalse(detector.is_likely_false_positive('overflow_text', 5.0, 100.0))
+
 class TestFalsePositiveFiltersUnit(unittest.TestCase):
     """FalsePositiveFiltersの単体テスト"""
     
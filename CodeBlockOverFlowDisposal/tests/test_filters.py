@@ -19,7 +19,8 @@ try:
         JapaneseTextFilter,
         SymbolOnlyFilter,
         PowerShellFilter,
-        FilterChain
+        FilterChain,
+        CompiledFilterChain
     )
 except ImportError:
     # フォールバック：V3実装から直接インポート
@@ -191,6 +192,57 @@ class TestFilterChain(unittest.TestCase):
         self.assertFalse(result.is_false_positive)
         self.assertEqual(result.filter_name, "NoFilter")
 
+class TestCompiledFilterChain(unittest.TestCase):
+    """コンパイル済みフィルタチェーンのテスト"""
+    
+    CANDIDATES = [
+        ("test", 0.3, 100.0), ("123", 1.0, 100.0), ("~", 1.0, 100.0), ("valid_overflow", 1.5, 100.0),
+        ("あ", 2.0, 100.0), ("Get-ChildItem -Path", 3.0, 100.0), ("~^", 1.0, 100.0), ("()", 1.0, 100.0),
+        ("  42 ", 1.0, 100.0), ("", 1.0, 100.0),
+    ]
+    
+    def setUp(self):
+        self.chain = FilterChain()
+        self.chain.add_filter(MeasurementErrorFilter(0.5))
+        self.chain.add_filter(PageNumberFilter(3))
+        self.chain.add_filter(JapaneseTextFilter())
+        self.chain.add_filter(SymbolOnlyFilter())
+        self.chain.add_filter(PowerShellFilter())
+    
+    def test_matches_filter_chain(self):
+        """FilterChain.apply と同じ結果になること"""
+        compiled = self.chain.compile(adaptive=False)
+        for candidate in self.CANDIDATES:
+            self.assertEqual(compiled.apply(*candidate), self.chain.apply(*candidate), candidate)
+        self.assertEqual(compiled.apply_many(self.CANDIDATES), [self.chain.apply(*c) for c in self.CANDIDATES])
+    
+    def test_stats(self):
+        """フィルタごとの呼び出し数・ヒット数が記録されること"""
+        compiled = self.chain.compile(adaptive=False)
+        compiled.apply_many(self.CANDIDATES)
+        stats = {s['name']: s for s in compiled.get_stats()}
+        self.assertEqual(stats['MeasurementError']['calls'], len(self.CANDIDATES))
+        self.assertEqual(stats['MeasurementError']['hits'], 1)
+        self.assertEqual(stats['PageNumber']['calls'], len(self.CANDIDATES) - 1)
+        self.assertEqual(stats['PageNumber']['hits'], 2)
+    
+    def test_reorder_keeps_verdicts(self):
+        """並べ替え後も誤検知かどうかの判定は変わらないこと"""
+        compiled = self.chain.compile(adaptive=True)
+        for _ in range(100):
+            compiled.apply_many(self.CANDIDATES)
+        compiled.reorder()
+        self.assertEqual(sorted(compiled.get_filter_names()), sorted(self.chain.get_filter_names()))
+        for candidate in self.CANDIDATES:
+            self.assertEqual(compiled.is_false_positive(*candidate),
+                             self.chain.apply(*candidate).is_false_positive, candidate)
+    
+    def test_empty_chain(self):
+        """空のチェーンの動作確認"""
+        result = FilterChain().compile().apply("test", 1.0, 100.0)
+        self.assertFalse(result.is_false_positive)
+        self.assertEqual(result.filter_name, "NoFilter")
+
 class TestFalsePositiveFiltersV3(unittest.TestCase):
     """V3実装のフィルタテスト（フォールバック）"""
     
@@ -236,6 +288,33 @@ class TestFalsePositiveFiltersV3(unittest.TestCase):
         self.assertTrue(self.FalsePositiveFilters.is_powershell_pattern("System::Runtime", 15))
         self.assertFalse(self.FalsePositiveFilters.is_powershell_pattern("System::Runtime", 5))
         self.assertFalse(self.FalsePositiveFilters.is_powershell_pattern("normal text", 15))
+    
+    def test_compiled_chain_matches_sequential(self):
+        """コンパイル済みチェーンが各フィルタの順次適用と同じ判定になること"""
+        filters = self.FalsePositiveFilters
+        
+        def sequential(overflow_text, overflow_amount):
+            text_content = overflow_text.strip()
+            text_length = len(overflow_text)
+            return (filters.is_measurement_error(overflow_amount)
+                    or filters.is_pdf_internal_encoding(text_content)
+                    or filters.is_page_number(text_content)
+                    or filters.is_japanese_only(text_content)
+                    or filters.is_powershell_pattern(text_content, text_length)
+                    or filters.is_file_extension(text_content)
+                    or filters.is_short_symbol_noise(text_content, text_length)
+                    or filters.is_image_element_tag(text_content)
+                    or filters.is_index_pattern(text_content))
+        
+        chain = filters.compiled()
+        texts = ['a', '~', '~^', '()', '12', '1234', 'あいう', '(cid:12)', 'System::Runtime::X',
+                 'run.ps1', '[IMAGE:1]', '……', 'hello world', '=>']
+        for _ in range(200):
+            for text in texts:
+                for amount in (0.3, 1.0):
+                    self.assertEqual(chain.is_false_positive(text, amount, 100.0), sequential(text, amount),
+                                     (text, amount))
+        self.assertEqual(sum(s['calls'] for s in chain.get_stats()[:1]), 200 * len(texts) * 2)
 
 if __name__ == '__main__':
     unittest.main(verbosity=2)
\ No newline at end of file
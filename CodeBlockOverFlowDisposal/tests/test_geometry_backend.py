@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unit tests for geometry_backend - pdfplumber / PyMuPDF バックエンドの同等性
+"""
+
+import logging
+import unittest
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from geometry_backend import GeometryBackend, PdfplumberBackend, PyMuPDFBackend, get_backend
+from maximum_ocr_detector_v3 import MaximumOCRDetectorV3
+from page_geometry_cache import CachedPage
+from rect_based_visual_detector import RectBasedVisualDetector
+from threshold_optimizer import ThresholdOptimizer
+
+try:
+    import fitz  # noqa: F401
+    HAS_FITZ = True
+except ImportError:
+    HAS_FITZ = False
+
+SAMPLE_DIR = Path(__file__).parent.parent
+SAMPLE_PDFS = ['sample.pdf', 'sample2.pdf', 'sample5.pdf', 'sampleOverflow.pdf']
+
+
+def _detected_pages(geometries):
+    """各検出器の検出ページ"""
+    v3 = MaximumOCRDetectorV3()
+    optimizer = ThresholdOptimizer()
+    rect_detector = RectBasedVisualDetector()
+
+    pages = [CachedPage(geometry) for geometry in geometries]
+    return {
+        'v3': [p.page_number for p in pages if v3.detect_overflows(p, p.page_number)],
+        'rect_based': [p.page_number for p in pages if rect_detector.process_page(p, p.page_number)],
+        'threshold': {
+            threshold: [p.page_number for p in pages
+                        if optimizer.detect_overflows_with_threshold(p, p.page_number, threshold)]
+            for threshold in (0.01, 0.1, 1.0)
+        },
+    }
+
+
+class TestGetBackend(unittest.TestCase):
+    """バックエンド選択のテスト"""
+
+    def test_names_and_aliases(self):
+        self.assertIsInstance(get_backend('pdfplumber'), PdfplumberBackend)
+        self.assertIsInstance(get_backend('fitz'), PyMuPDFBackend)
+        backend = PyMuPDFBackend()
+        self.assertIs(get_backend(backend), backend)
+
+    def test_unknown_backend(self):
+        with self.assertRaises(ValueError):
+            get_backend('pdfminer')
+
+    def test_abstract_base(self):
+        with self.assertRaises(TypeError):
+            GeometryBackend()
+
+        class OpenOnly(GeometryBackend):
+            def open(self, pdf_path):
+                return None
+
+        with self.assertRaises(TypeError):
+            OpenOnly()
+
+
+@unittest.skipUnless(HAS_FITZ, "PyMuPDF not available")
+class TestBackendParity(unittest.TestCase):
+    """サンプルPDFで両バックエンドの検出ページが一致すること"""
+
+    def setUp(self):
+        logging.disable(logging.CRITICAL)
+
+    def tearDown(self):
+        logging.disable(logging.NOTSET)
+
+    def test_sample_pdfs(self):
+        for name in SAMPLE_PDFS:
+            pdf_path = SAMPLE_DIR / name
+            if not pdf_path.exists():
+                continue
+            with self.subTest(pdf=name):
+                plumber_pages = PdfplumberBackend().extract(pdf_path)
+                fitz_pages = PyMuPDFBackend().extract(pdf_path)
+
+                self.assertEqual(len(plumber_pages), len(fitz_pages))
+                for plumber_page, fitz_page in zip(plumber_pages, fitz_pages):
+                    self.assertEqual(plumber_page.char_count, fitz_page.char_count)
+                    self.assertAlmostEqual(plumber_page.width, fitz_page.width, places=3)
+                self.assertEqual(_detected_pages(plumber_pages), _detected_pages(fitz_pages))
+
+    def test_chars_and_rects_schema(self):
+        """pdfplumberと同じキー・座標系で文字と矩形が読めること"""
+        pdf_path = SAMPLE_DIR / 'sample2.pdf'
+        if not pdf_path.exists():
+            self.skipTest("sample2.pdf not found")
+        with PdfplumberBackend().open(pdf_path) as pdf:
+            plumber_page = pdf.pages[127]
+            plumber_chars, plumber_rects = plumber_page.chars, plumber_page.rects
+        with PyMuPDFBackend().open(pdf_path) as pdf:
+            fitz_page = pdf.pages[127]
+            fitz_chars, fitz_rects = fitz_page.chars, fitz_page.rects
+
+        char_keys = {'text', 'fontname', 'x0', 'x1', 'y0', 'y1', 'top', 'bottom', 'size', 'width', 'height'}
+        rect_keys = {'x0', 'x1', 'y0', 'y1', 'top', 'bottom', 'width', 'height', 'fill', 'stroke',
+                     'non_stroking_color', 'linewidth'}
+        self.assertLessEqual(char_keys, set(plumber_chars[0]) & set(fitz_chars[0]))
+        self.assertLessEqual(rect_keys, set(plumber_rects[0]) & set(fitz_rects[0]))
+        first = plumber_chars[0]
+        match = next(c for c in fitz_chars if c['text'] == first['text'] and abs(c['x0'] - first['x0']) < 0.01)
+        for key in ('x1', 'y0', 'y1', 'top', 'bottom'):
+            self.assertAlmostEqual(match[key], first[key], places=2)
+
+        filled = sorted((round(r['x0'], 1), round(r['top'], 1), round(r['x1'], 1), round(r['bottom'], 1))
+                        for r in plumber_rects if r['fill'])
+        self.assertEqual(filled, sorted((round(r['x0'], 1), round(r['top'], 1), round(r['x1'], 1),
+                                         round(r['bottom'], 1)) for r in fitz_rects if r['fill']))
+
+
+if __name__ == '__main__':
+    unittest.main()
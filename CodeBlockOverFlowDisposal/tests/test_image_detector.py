@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+ImageBasedOverflowDetector のコードブロック検出とはみ出し判定のテスト（合成したページ画像）
+"""
+
+import importlib.util
+import sys
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+HAS_DEPS = all(importlib.util.find_spec(name) for name in ('fitz', 'cv2'))
+
+if HAS_DEPS:
+    from overflow_detector_image import ImageBasedOverflowDetector
+
+PAGE_HEIGHT = 1000
+PAGE_WIDTH = 1200
+TEXT_AREA_RIGHT = 900
+GRAY = 215
+OFF_WHITE = 240  # 白背景（WHITE_THRESHOLD）より暗く、灰色の範囲より明るい紙面
+
+
+def _page(background: int = 255) -> np.ndarray:
+    return np.full((PAGE_HEIGHT, PAGE_WIDTH), background, dtype=np.uint8)
+
+
+def _ink(page: np.ndarray, x: int, y: int, w: int, h: int):
+    page[y:y + h, x:x + w] = 0
+
+
+def _bordered_page(x: int, y: int, w: int, h: int, edges: str, thickness: int = 2) -> np.ndarray:
+    """白い矩形 (x, y, w, h) の外側に、edges（'t', 'b', 'l', 'r'）の罫線を引いたページ"""
+    page = _page(OFF_WHITE)
+    page[y:y + h, x:x + w] = 255
+    if 't' in edges:
+        _ink(page, x - thickness, y - thickness, w + 2 * thickness, thickness)
+    if 'b' in edges:
+        _ink(page, x - thickness, y + h, w + 2 * thickness, thickness)
+    if 'l' in edges:
+        _ink(page, x - thickness, y - thickness, thickness, h + 2 * thickness)
+    if 'r' in edges:
+        _ink(page, x + w, y - thickness, thickness, h + 2 * thickness)
+    return page
+
+
+def _brute_force_overflow(ink: np.ndarray, blocks, text_area_right: int, min_pixels: int):
+    """ブロックごとに超過部分のインクを数えた結果"""
+    result = []
+    for x, y, w, h in blocks:
+        crosses = x < text_area_right < x + w
+        pixels = np.count_nonzero(ink[y:y + h, text_area_right:x + w]) if crosses else 0
+        result.append(crosses and pixels > min_pixels)
+    return result
+
+
+@unittest.skipUnless(HAS_DEPS, "PyMuPDF / OpenCV not available")
+class TestImageDetectorBlocks(unittest.TestCase):
+    """コードブロックの検出とはみ出し判定のテスト"""
+
+    BLOCK = (500, 200, 500, 200)  # 本文右端（900）をまたぐ
+
+    def setUp(self):
+        self.detector = ImageBasedOverflowDetector()
+
+    def _overflowing(self, page: np.ndarray):
+        ink = self.detector._ink_mask(page)
+        blocks = self.detector._detect_code_blocks(page, ink)
+        return blocks, self.detector._find_overflowing_blocks(ink, blocks, TEXT_AREA_RIGHT)
+
+    def _gray_block_page(self) -> np.ndarray:
+        x, y, w, h = self.BLOCK
+        page = _page()
+        page[y:y + h, x:x + w] = GRAY
+        # 本文内のコード
+        _ink(page, x + 20, y + 30, 300, 8)
+        return page
+
+    def test_gray_block_with_ink_past_text_area(self):
+        page = self._gray_block_page()
+        _ink(page, TEXT_AREA_RIGHT + 10, 260, 50, 10)
+
+        blocks, overflowing = self._overflowing(page)
+        self.assertEqual(blocks, [self.BLOCK])
+        self.assertEqual(overflowing.tolist(), [True])
+
+    def test_gray_block_within_text_area(self):
+        blocks, overflowing = self._overflowing(self._gray_block_page())
+        self.assertEqual(blocks, [self.BLOCK])
+        self.assertEqual(overflowing.tolist(), [False])
+
+    def test_min_overflow_pixels_boundary(self):
+        """超過部分のインクが MIN_OVERFLOW_PIXELS を超えたときだけはみ出しとする"""
+        limit = self.detector.MIN_OVERFLOW_PIXELS
+        for pixels, expected in ((limit - 1, False), (limit, False), (limit + 1, True)):
+            with self.subTest(pixels=pixels):
+                page = self._gray_block_page()
+                # 本文右端のすぐ外側の1行とブロック右端の直前の1列（積分画像の端）
+                _ink(page, TEXT_AREA_RIGHT, 250, pixels - 1, 1)
+                _ink(page, 999, 399, 1, 1)
+                _, overflowing = self._overflowing(page)
+                self.assertEqual(overflowing.tolist(), [expected])
+
+    def test_ink_outside_block_is_ignored(self):
+        page = self._gray_block_page()
+        # ブロックの下・右の外側のインク
+        _ink(page, TEXT_AREA_RIGHT + 10, 400, 80, 10)
+        _ink(page, 1000, 250, 80, 10)
+        _, overflowing = self._overflowing(page)
+        self.assertEqual(overflowing.tolist(), [False])
+
+    def test_bordered_block_with_three_edges(self):
+        x, y, w, h = self.BLOCK
+        for edges in ('tbl', 'tlr', 'blr', 'tblr'):
+            with self.subTest(edges=edges):
+                page = _bordered_page(x, y, w, h, edges)
+                self.assertEqual(self.detector._detect_bordered_blocks(page), [self.BLOCK])
+
+                _ink(page, TEXT_AREA_RIGHT + 10, 260, 50, 10)
+                blocks, overflowing = self._overflowing(page)
+                self.assertEqual(blocks, [self.BLOCK])
+                self.assertEqual(overflowing.tolist(), [True])
+
+    def test_bordered_block_needs_three_full_edges(self):
+        x, y, w, h = self.BLOCK
+        self.assertEqual(self.detector._detect_bordered_blocks(_bordered_page(x, y, w, h, 'tb')), [])
+
+        # 辺の途中で途切れた罫線は数えない
+        page = _bordered_page(x, y, w, h, 'bl')
+        _ink(page, x - 2, y - 2, w // 2, 2)
+        self.assertEqual(self.detector._detect_bordered_blocks(page), [])
+
+    def test_border_tolerance(self):
+        x, y, w, h = self.BLOCK
+        tolerance = self.detector.BORDER_TOLERANCE
+        for gap, expected in ((tolerance - 2, [self.BLOCK]), (tolerance + 2, [])):
+            with self.subTest(gap=gap):
+                page = _bordered_page(x, y, w, h, 'tb')
+                # 左の罫線を白い矩形から離して引く（その間は紙面の色）
+                _ink(page, x - gap - 2, y - 2, 2, h + 4)
+                self.assertEqual(self.detector._detect_bordered_blocks(page), expected)
+
+    def test_overflow_matches_brute_force(self):
+        """積分画像による判定がブロックごとに数えた結果と一致すること（端の位置を含む）"""
+        rng = np.random.default_rng(20261019)
+        ink = np.where(rng.random((PAGE_HEIGHT, PAGE_WIDTH)) < 0.02, 255, 0).astype(np.uint8)
+        blocks = [(TEXT_AREA_RIGHT - 1, 0, 2, PAGE_HEIGHT), (TEXT_AREA_RIGHT, 10, 100, 100),
+                  (0, 0, PAGE_WIDTH, PAGE_HEIGHT), (800, PAGE_HEIGHT - 60, PAGE_WIDTH - 800, 60)]
+        for _ in range(300):
+            x = int(rng.integers(0, PAGE_WIDTH - 1))
+            y = int(rng.integers(0, PAGE_HEIGHT - 1))
+            blocks.append((x, y, int(rng.integers(1, PAGE_WIDTH - x + 1)), int(rng.integers(1, PAGE_HEIGHT - y + 1))))
+
+        for min_pixels in (0, 50, 200):
+            with self.subTest(min_pixels=min_pixels):
+                self.detector.MIN_OVERFLOW_PIXELS = min_pixels
+                self.assertEqual(self.detector._find_overflowing_blocks(ink, blocks, TEXT_AREA_RIGHT).tolist(),
+                                 _brute_force_overflow(ink, blocks, TEXT_AREA_RIGHT, min_pixels))
+
+    def test_no_blocks(self):
+        self.assertEqual(self.detector._find_overflowing_blocks(_page(), [], TEXT_AREA_RIGHT).tolist(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
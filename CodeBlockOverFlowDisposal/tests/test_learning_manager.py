@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unit tests for WindowsLearningDataManager - 累計の移行と保存・集計・エクスポート
+"""
+
+import json
+import sqlite3
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'overflow_checker_standalone'))
+
+from core.learning_manager import WindowsLearningDataManager
+
+# 累計テーブル導入前のスキーマ
+BASELINE_SCHEMA = """
+    CREATE TABLE learning_data (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        pdf_path TEXT NOT NULL,
+        pdf_name TEXT NOT NULL,
+        detected_pages TEXT,
+        confirmed_pages TEXT,
+        additional_pages TEXT,
+        false_positives TEXT,
+        timestamp TEXT NOT NULL,
+        os_info TEXT,
+        app_version TEXT,
+        user_notes TEXT,
+        processing_time REAL
+    );
+    CREATE INDEX idx_pdf_name ON learning_data(pdf_name);
+    CREATE INDEX idx_timestamp ON learning_data(timestamp);
+    CREATE TABLE learning_stats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        stat_date TEXT NOT NULL,
+        total_cases INTEGER,
+        total_detected INTEGER,
+        total_confirmed INTEGER,
+        total_false_positives INTEGER,
+        total_additional INTEGER,
+        precision_rate REAL,
+        recall_rate REAL,
+        f1_score REAL
+    );
+"""
+
+# (pdf_name, detected, confirmed, additional, false_positives, timestamp, user_notes)
+BASELINE_ROWS = [
+    ('book1.pdf', [1, 5, 9], [1, 5], [12], [9], '2026-10-01T10:00:00', ''),
+    ('技術書.pdf', [3], [3], [], [], '2026-10-03T09:30:00', '確認済み'),
+    ('book2.pdf', None, [], None, [], '2026-10-02T15:00:00', None),
+    ('book1.pdf', [2, 4], [], [7, 8], [2, 4], '2026-10-04T08:00:00', '  '),
+]
+
+
+def _create_baseline_db(db_path: Path, rows=BASELINE_ROWS):
+    """累計テーブル導入前のコードが作成したのと同じ形のデータベース"""
+    with sqlite3.connect(str(db_path)) as conn:
+        conn.executescript(BASELINE_SCHEMA)
+        for pdf_name, detected, confirmed, additional, false_positives, timestamp, notes in rows:
+            conn.execute("""
+                INSERT INTO learning_data (
+                    pdf_path, pdf_name, detected_pages, confirmed_pages,
+                    additional_pages, false_positives, timestamp,
+                    os_info, app_version, user_notes, processing_time
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                f'C:\\books\\{pdf_name}', pdf_name,
+                *(None if pages is None else json.dumps(pages) for pages in
+                  (detected, confirmed, additional, false_positives)),
+                timestamp, json.dumps({'system': 'Windows'}), '1.0.0', notes, 1.5
+            ))
+    conn.close()
+
+
+def _legacy_statistics(db_path: Path) -> dict:
+    """累計テーブル導入前の get_learning_statistics（全件を読み直す）"""
+    with sqlite3.connect(str(db_path)) as conn:
+        rows = conn.execute("""
+            SELECT detected_pages, confirmed_pages, false_positives, additional_pages FROM learning_data
+        """).fetchall()
+        last_updated = conn.execute("SELECT MAX(timestamp) FROM learning_data").fetchone()[0]
+    conn.close()
+    totals = [sum(len(json.loads(row[i])) if row[i] else 0 for row in rows) for i in range(4)]
+    total_detected, total_confirmed, total_false_positives, total_additional = totals
+    precision = total_confirmed / total_detected if total_detected > 0 else 0
+    recall = total_confirmed / (total_confirmed + total_additional) if (total_confirmed + total_additional) > 0 else 0
+    f1_score = 2 * (precision * recall) / (precision + recall) if (precision + recall) > 0 else 0
+    return {
+        'total_cases': len(rows),
+        'total_detected': total_detected,
+        'total_confirmed': total_confirmed,
+        'total_false_positives': total_false_positives,
+        'total_additional': total_additional,
+        'precision': precision,
+        'recall': recall,
+        'f1_score': f1_score,
+        'last_updated': last_updated
+    }
+
+
+def _legacy_recent(db_path: Path, limit: int) -> list:
+    """累計テーブル導入前の get_recent_learning_data（JSON配列を読んで数える）"""
+    with sqlite3.connect(str(db_path)) as conn:
+        rows = conn.execute("""
+            SELECT pdf_name, timestamp, detected_pages, confirmed_pages,
+                   false_positives, additional_pages, user_notes
+            FROM learning_data ORDER BY timestamp DESC LIMIT ?
+        """, (limit,)).fetchall()
+    conn.close()
+    return [{
+        'pdf_name': row[0],
+        'timestamp': row[1],
+        'detected_count': len(json.loads(row[2])) if row[2] else 0,
+        'confirmed_count': len(json.loads(row[3])) if row[3] else 0,
+        'false_positive_count': len(json.loads(row[4])) if row[4] else 0,
+        'additional_count': len(json.loads(row[5])) if row[5] else 0,
+        'has_notes': bool(row[6] and row[6].strip())
+    } for row in rows]
+
+
+def _legacy_export(db_path: Path) -> str:
+    """累計テーブル導入前の export_learning_data の出力（全件を json.dumps）"""
+    with sqlite3.connect(str(db_path)) as conn:
+        cursor = conn.execute("SELECT * FROM learning_data ORDER BY timestamp DESC")
+        columns = [description[0] for description in cursor.description]
+        data = []
+        for row in cursor.fetchall():
+            row_dict = dict(zip(columns, row))
+            for json_field in ['detected_pages', 'confirmed_pages', 'additional_pages', 'false_positives', 'os_info']:
+                if row_dict[json_field]:
+                    row_dict[json_field] = json.loads(row_dict[json_field])
+            data.append(row_dict)
+    conn.close()
+    return json.dumps(data, ensure_ascii=False, indent=2)
+
+
+class TestLearningDataManager(unittest.TestCase):
+    """WindowsLearningDataManagerのテスト"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        self.db_path = self.folder / 'learning.db'
+        patcher = patch.object(WindowsLearningDataManager, '_get_powershell_version', return_value='Unknown')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _statistics(self, manager):
+        stats = manager.get_learning_statistics()
+        self.assertEqual(stats.pop('database_path'), str(self.db_path))
+        stats.pop('database_size_mb')
+        return stats
+
+    def _export(self, manager) -> str:
+        export_path = self.folder / 'export.json'
+        self.assertTrue(manager.export_learning_data(export_path))
+        return export_path.read_text(encoding='utf-8')
+
+    def _save(self, manager, pdf_name, detected, confirmed, additional, false_positives):
+        self.assertTrue(manager.save_learning_data({
+            'pdf_path': self.folder / pdf_name,
+            'pdf_name': pdf_name,
+            'detected_pages': detected,
+            'confirmed_pages': confirmed,
+            'additional_pages': additional,
+            'false_positives': false_positives,
+            'user_notes': 'メモ'
+        }))
+
+    def test_baseline_database_is_backfilled(self):
+        _create_baseline_db(self.db_path)
+        expected_stats = _legacy_statistics(self.db_path)
+        expected_recent = _legacy_recent(self.db_path, 10)
+        expected_export = _legacy_export(self.db_path)
+
+        manager = WindowsLearningDataManager(self.db_path)
+        self.assertEqual(self._statistics(manager), expected_stats)
+        self.assertEqual(manager.get_recent_learning_data(), expected_recent)
+        self.assertEqual(manager.get_recent_learning_data(limit=2), expected_recent[:2])
+        exported = self._export(manager)
+        self.assertEqual(exported, expected_export)
+        self.assertEqual(json.loads(exported), json.loads(expected_export))
+
+        # 2回目以降の初期化では累計を作り直さない
+        reopened = WindowsLearningDataManager(self.db_path)
+        self.assertEqual(self._statistics(reopened), expected_stats)
+        with sqlite3.connect(str(self.db_path)) as conn:
+            page_rows = conn.execute("SELECT COUNT(*) FROM learning_pages").fetchone()[0]
+        conn.close()
+        self.assertEqual(page_rows, 15)
+
+    def test_save_keeps_totals_in_sync(self):
+        _create_baseline_db(self.db_path)
+        manager = WindowsLearningDataManager(self.db_path)
+        self._save(manager, 'book3.pdf', [1, 2, 3], [1, 2], [5], [3])
+        self._save(manager, 'book4.pdf', [], [], [], [])
+
+        self.assertEqual(self._statistics(manager), _legacy_statistics(self.db_path))
+        self.assertEqual(manager.get_recent_learning_data(), _legacy_recent(self.db_path, 10))
+        self.assertEqual(self._export(manager), _legacy_export(self.db_path))
+
+        # 統計履歴は保存ごとに最新の累計で1行追加される
+        with sqlite3.connect(str(self.db_path)) as conn:
+            history = conn.execute(
+                "SELECT total_cases, total_detected, total_confirmed FROM learning_stats ORDER BY id").fetchall()
+        conn.close()
+        self.assertEqual(history, [(5, 9, 5), (6, 9, 5)])
+
+    def test_empty_database(self):
+        manager = WindowsLearningDataManager(self.db_path)
+        self.assertEqual(manager.get_learning_statistics()['total_cases'], 0)
+        self.assertIsNone(manager.get_learning_statistics()['last_updated'])
+        self.assertEqual(manager.get_recent_learning_data(), [])
+
+        exported = self._export(manager)
+        self.assertEqual(exported, '[]')
+        self.assertEqual(exported, _legacy_export(self.db_path))
+        self.assertEqual(json.loads(exported), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
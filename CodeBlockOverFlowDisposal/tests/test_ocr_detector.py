@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+OCRBasedOverflowDetector のページ並列処理のテスト
+
+OCRの判定は帯画像の画素で代替し、Tesseractなしでプロセスプールの経路を検証する。
+"""
+
+import functools
+import importlib.util
+import multiprocessing
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+HAS_DEPS = all(importlib.util.find_spec(name) for name in ('fitz', 'pytesseract'))
+
+if HAS_DEPS:
+    import fitz
+    import overflow_detector_ocr
+    from overflow_detector_ocr import OCRBasedOverflowDetector
+
+    class PixelOverflowDetector(OCRBasedOverflowDetector):
+        """帯画像に黒い画素があればはみ出しとみなす検出器（ワーカーへ渡せるようモジュール直下に定義）"""
+
+        def _check_text_overflow_ocr(self, image, is_right_page, page_number,
+                                     x_offset=0, page_width_px=None):
+            print(f"    ページ {page_number}: 判定")
+            return image.getextrema()[0] < 128
+
+    class FailingPixelOverflowDetector(PixelOverflowDetector):
+        """指定ページのOCRが失敗する検出器"""
+
+        FAILING_PAGES = (3, 5)
+
+        def _check_text_overflow_ocr(self, image, is_right_page, page_number,
+                                     x_offset=0, page_width_px=None):
+            if page_number in self.FAILING_PAGES:
+                self.failed_pages.add(page_number)
+                return False
+            return super()._check_text_overflow_ocr(image, is_right_page, page_number,
+                                                    x_offset, page_width_px)
+
+
+OVERFLOW_PAGES = [2, 5]
+
+
+@unittest.skipUnless(HAS_DEPS, "PyMuPDF / pytesseract not available")
+class TestOCRDetectorWorkers(unittest.TestCase):
+    """detect_file の直列・並列経路のテスト"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.pdf_path = Path(cls.temp_dir.name) / 'overflow.pdf'
+        doc = fitz.open()
+        for page_number in range(1, 7):
+            page = doc.new_page(width=515.9, height=728.5)
+            if page_number in OVERFLOW_PAGES:
+                # 右マージンにはみ出した黒い矩形
+                page.draw_rect(fitz.Rect(490, 300, 510, 320), color=(0, 0, 0), fill=(0, 0, 0))
+        doc.save(str(cls.pdf_path))
+        doc.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def test_default_does_not_start_pool(self):
+        """既定ではプロセスプールを使わないこと（freeze_supportのない呼び出し元向け）"""
+        detector = PixelOverflowDetector()
+        with patch.object(overflow_detector_ocr, 'ProcessPoolExecutor',
+                          side_effect=AssertionError('pool started')), \
+                patch.object(overflow_detector_ocr.os, 'cpu_count', return_value=4):
+            self.assertEqual(detector.detect_file(self.pdf_path), OVERFLOW_PAGES)
+        self.assertEqual(detector.errors, [])
+        self.assertEqual(detector.total_pages, 6)
+
+    def test_pool_matches_serial(self):
+        """プロセスプール（spawn）の結果が直列実行と一致すること"""
+        serial = PixelOverflowDetector().detect_file(self.pdf_path, workers=1)
+
+        detector = PixelOverflowDetector()
+        detector.PREFETCH_PER_WORKER = 1
+        spawn_pool = functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+        with patch.object(overflow_detector_ocr, 'ProcessPoolExecutor', side_effect=spawn_pool) as pool:
+            pooled = detector.detect_file(self.pdf_path, workers=2)
+
+        pool.assert_called_once()
+        self.assertEqual(detector.errors, [])
+        self.assertEqual(pooled, serial)
+        self.assertEqual(pooled, OVERFLOW_PAGES)
+
+    def test_pool_with_page_subset(self):
+        """ページ指定とプロセスプールの組み合わせ"""
+        detector = PixelOverflowDetector()
+        self.assertEqual(detector.detect_file(self.pdf_path, workers=2, pages=[1, 2, 3, 9]), [2])
+
+    def test_ocr_failure_is_recorded(self):
+        """OCRに失敗したページを、はみ出しなしと区別して記録すること"""
+        detector = OCRBasedOverflowDetector()
+        with patch.object(overflow_detector_ocr.pytesseract, 'image_to_data',
+                          side_effect=RuntimeError('tesseract is not installed')):
+            self.assertEqual(detector.detect_file(self.pdf_path, pages=[1, 2]), [])
+        self.assertEqual(detector.failed_pages, {1, 2})
+        self.assertEqual(len(detector.errors), 2)
+
+    def test_pool_reports_failed_pages(self):
+        """ワーカーで失敗したページが呼び出し側に伝わること"""
+        detector = FailingPixelOverflowDetector()
+        spawn_pool = functools.partial(ProcessPoolExecutor, mp_context=multiprocessing.get_context('spawn'))
+        with patch.object(overflow_detector_ocr, 'ProcessPoolExecutor', side_effect=spawn_pool):
+            self.assertEqual(detector.detect_file(self.pdf_path, workers=2), [2])
+        self.assertEqual(detector.failed_pages, {3, 5})
+        self.assertEqual(len(detector.errors), 2)
+
+        # 次の解析では失敗ページの記録をやり直す
+        detector.detect_file(self.pdf_path, pages=[1, 2])
+        self.assertEqual(detector.failed_pages, set())
+
+
+if __name__ == '__main__':
+    unittest.main()
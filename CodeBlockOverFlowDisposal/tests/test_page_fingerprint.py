@@ -0,0 +1,238 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unit tests for page_fingerprint - ページ指紋による差分再チェック
+"""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'overflow_checker_standalone'))
+
+try:
+    import fitz
+    HAS_FITZ = True
+except ImportError:
+    HAS_FITZ = False
+
+from core.page_fingerprint import PageResultStore, app_version, page_fingerprints
+
+PAGE_WIDTH = 515.9
+PAGE_HEIGHT = 728.5
+
+
+def _build_pdf(pdf_path: Path, texts, rotations=None):
+    """ページごとのテキストからPDFを作成"""
+    doc = fitz.open()
+    for i, text in enumerate(texts):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        page.insert_text((72, 100), text, fontsize=10)
+        if rotations:
+            page.set_rotation(rotations[i])
+    doc.save(str(pdf_path))
+    doc.close()
+
+
+@unittest.skipUnless(HAS_FITZ, "PyMuPDF not available")
+class TestPageFingerprints(unittest.TestCase):
+    """page_fingerprintsのテスト"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _fingerprints(self, name, texts, rotations=None):
+        path = self.folder / name
+        _build_pdf(path, texts, rotations)
+        return page_fingerprints(path)
+
+    def test_same_content_same_fingerprints(self):
+        first = self._fingerprints('a.pdf', ['one', 'two', 'three'])
+        second = self._fingerprints('b.pdf', ['one', 'two', 'three'])
+        self.assertEqual(first, second)
+        self.assertEqual(len(set(first)), 3)
+
+    def test_only_changed_page_differs(self):
+        before = self._fingerprints('a.pdf', ['one', 'two', 'three'])
+        after = self._fingerprints('b.pdf', ['one', 'two (fixed)', 'three'])
+        self.assertEqual([b == a for b, a in zip(before, after)], [True, False, True])
+
+    def test_rotation_changes_fingerprint(self):
+        before = self._fingerprints('a.pdf', ['one', 'two'])
+        after = self._fingerprints('b.pdf', ['one', 'two'], rotations=[0, 90])
+        self.assertEqual([b == a for b, a in zip(before, after)], [True, False])
+
+
+class TestUnchangedPages(unittest.TestCase):
+    """PageResultStore.unchanged_pagesのテスト"""
+
+    def test_no_previous_result(self):
+        self.assertEqual(PageResultStore.unchanged_pages(None, ['a', 'b']), set())
+
+    def test_same_page_number_only(self):
+        previous = {'fingerprints': ['a', 'b', 'c', 'd']}
+        self.assertEqual(PageResultStore.unchanged_pages(previous, ['a', 'x', 'c', 'd']), {1, 3, 4})
+        # ページが挿入されて後ろがずれた場合は再チェックする
+        self.assertEqual(PageResultStore.unchanged_pages(previous, ['a', 'x', 'b', 'c', 'd']), {1})
+        # ページが減った場合
+        self.assertEqual(PageResultStore.unchanged_pages(previous, ['a', 'b']), {1, 2})
+
+
+class TestPageResultStore(unittest.TestCase):
+    """PageResultStoreのテスト"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store_path = Path(self.temp_dir.name) / 'page_results.json'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip(self):
+        PageResultStore(self.store_path, version='1.0.0').save('a.pdf', 'rect_based', ['x', 'y'], [2, 1])
+
+        entry = PageResultStore(self.store_path, version='1.0.0').lookup('a.pdf', 'rect_based')
+        self.assertEqual(entry['fingerprints'], ['x', 'y'])
+        self.assertEqual(entry['overflow_pages'], [1, 2])
+        self.assertEqual(entry['app_version'], '1.0.0')
+
+    def test_other_detector_is_not_reused(self):
+        store = PageResultStore(self.store_path, version='1.0.0')
+        store.save('a.pdf', 'rect_based', ['x'], [1])
+        self.assertIsNone(store.lookup('a.pdf', 'ocr'))
+        self.assertIsNone(store.lookup('b.pdf', 'rect_based'))
+
+    def test_other_version_is_not_reused(self):
+        PageResultStore(self.store_path, version='1.0.0').save('a.pdf', 'rect_based', ['x'], [1])
+        self.assertIsNone(PageResultStore(self.store_path, version='1.1.0').lookup('a.pdf', 'rect_based'))
+
+    def test_entry_without_version_is_not_reused(self):
+        """バージョンを記録していなかった頃の結果は再利用しない"""
+        entries = {'a.pdf': {'detector': 'rect_based', 'fingerprints': ['x'], 'overflow_pages': [1]}}
+        self.store_path.write_text(json.dumps({'version': PageResultStore.VERSION, 'entries': entries}),
+                                   encoding='utf-8')
+        self.assertIsNone(PageResultStore(self.store_path, version='1.0.0').lookup('a.pdf', 'rect_based'))
+
+    def test_default_version_comes_from_version_file(self):
+        import version
+        store = PageResultStore(self.store_path)
+        self.assertEqual(store.app_version, app_version())
+        self.assertTrue(store.app_version.startswith(f"{version.VERSION}+{version.BUILD_DATE}"))
+
+    def test_oldest_entries_are_evicted(self):
+        store = PageResultStore(self.store_path, version='1.0.0')
+        with patch.object(PageResultStore, 'MAX_ENTRIES', 2):
+            for name in ('a.pdf', 'b.pdf', 'c.pdf'):
+                store.save(name, 'rect_based', ['x'], [])
+        data = json.loads(self.store_path.read_text(encoding='utf-8'))
+        self.assertEqual(sorted(data['entries']), ['b.pdf', 'c.pdf'])
+
+    def test_corrupt_file_is_ignored(self):
+        self.store_path.write_text('{broken', encoding='utf-8')
+        store = PageResultStore(self.store_path, version='1.0.0')
+        self.assertIsNone(store.lookup('a.pdf', 'rect_based'))
+        store.save('a.pdf', 'rect_based', ['x'], [1])
+        self.assertIsNotNone(PageResultStore(self.store_path, version='1.0.0').lookup('a.pdf', 'rect_based'))
+
+
+@unittest.skipUnless(HAS_FITZ, "PyMuPDF not available")
+class TestReuseStage(unittest.TestCase):
+    """PDFOverflowProcessorの差分再チェック（再利用段）のテスト"""
+
+    def setUp(self):
+        from core import pdf_processor
+        self.pdf_processor = pdf_processor
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        self.store_path = self.folder / 'page_results.json'
+        self.pdf_path = self.folder / 'book.pdf'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _processor(self, version='1.0.0'):
+        config = {'incremental': True, 'page_results_path': str(self.store_path), 'prescreen': 'off'}
+        with patch.object(self.pdf_processor, 'PageResultStore',
+                          lambda path: PageResultStore(path, version=version)):
+            return self.pdf_processor.PDFOverflowProcessor(config)
+
+    def _run(self, processor, texts, detected):
+        """検出器は指定したページを検出したことにする（渡されたページ番号を記録）"""
+        _build_pdf(self.pdf_path, texts)
+        calls = []
+
+        def detect_file(pdf_path, pages=None):
+            calls.append(None if pages is None else list(pages))
+            checked = range(1, len(texts) + 1) if pages is None else pages
+            return [n for n in checked if n in detected]
+
+        with patch.object(processor.detector, 'detect_file', side_effect=detect_file):
+            result = processor.process_pdf(self.pdf_path)
+        return result, calls
+
+    def test_unchanged_pages_are_reused(self):
+        texts = ['page one', 'page two', 'page three', 'page four']
+        first, calls = self._run(self._processor(), texts, detected={2, 3})
+        self.assertEqual(calls, [[1, 2, 3, 4]])
+        self.assertEqual([p['page_number'] for p in first.overflow_pages], [2, 3])
+        self.assertEqual(first.reused_pages, 0)
+
+        # 3ページ目だけ修正（はみ出しが解消）
+        texts[2] = 'page three (fixed)'
+        second, calls = self._run(self._processor(), texts, detected={2})
+        self.assertEqual(calls, [[3]])
+        self.assertEqual([p['page_number'] for p in second.overflow_pages], [2])
+        self.assertEqual(second.reused_pages, 3)
+        self.assertEqual(second.total_pages, 4)
+        reuse = second.stage_stats[0]
+        self.assertEqual((reuse['name'], reuse['pages_in'], reuse['pages_out']), ('reuse', 4, 1))
+
+    def test_nothing_changed_skips_detector(self):
+        texts = ['page one', 'page two']
+        self._run(self._processor(), texts, detected={1})
+        result, calls = self._run(self._processor(), texts, detected=set())
+        self.assertEqual(calls, [])
+        self.assertEqual([p['page_number'] for p in result.overflow_pages], [1])
+        self.assertEqual(result.reused_pages, 2)
+
+    def test_detector_error_is_not_stored(self):
+        """検出器がエラーを記録した実行の結果は、次回に再利用しない"""
+        texts = ['page one', 'page two']
+        _build_pdf(self.pdf_path, texts)
+        processor = self._processor()
+        processor.detector.errors = []
+
+        def failing_detect_file(pdf_path, pages=None):
+            # OCR検出器と同様に、失敗をerrorsに記録して空の結果を返す
+            processor.detector.errors.append('エラー: tesseract is not installed')
+            return []
+
+        with patch.object(processor.detector, 'detect_file', side_effect=failing_detect_file):
+            failed = processor.process_pdf(self.pdf_path)
+        self.assertEqual(failed.overflow_pages, [])
+        self.assertIsNone(PageResultStore(self.store_path, version='1.0.0').lookup('book.pdf', 'rect_based'))
+
+        result, calls = self._run(self._processor(), texts, detected={2})
+        self.assertEqual(calls, [[1, 2]])
+        self.assertEqual([p['page_number'] for p in result.overflow_pages], [2])
+        self.assertEqual(result.reused_pages, 0)
+
+    def test_new_version_rechecks_all_pages(self):
+        texts = ['page one', 'page two']
+        self._run(self._processor('1.0.0'), texts, detected={1})
+        result, calls = self._run(self._processor('1.1.0'), texts, detected={2})
+        self.assertEqual(calls, [[1, 2]])
+        self.assertEqual([p['page_number'] for p in result.overflow_pages], [2])
+        self.assertEqual(result.reused_pages, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unit tests for page_geometry_cache - ページジオメトリキャッシュ
+"""
+
+import tempfile
+import unittest
+import sys
+from pathlib import Path
+from unittest.mock import patch
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pdfplumber
+
+from page_geometry_cache import CachedPDF, PageGeometryCache
+
+
+class TestPageGeometryCache(unittest.TestCase):
+    """PageGeometryCacheのテスト"""
+
+    def setUp(self):
+        try:
+            import fitz
+        except ImportError:
+            self.skipTest("PyMuPDF not available")
+        self.temp_dir = tempfile.TemporaryDirectory()
+        temp_path = Path(self.temp_dir.name)
+        self.cache = PageGeometryCache(temp_path / 'cache')
+        self.pdf_path = temp_path / 'doc.pdf'
+
+        # 文字と塗りつぶし矩形を含むPDFを作成
+        doc = fitz.open()
+        for i in range(3):
+            page = doc.new_page(width=515.9, height=728.5)
+            page.draw_rect(fitz.Rect(40, 100, 440, 160), color=None, fill=(0.85, 0.85, 0.85))
+            page.insert_text((50, 120 + i), "def main(): # ページ%d" % i, fontsize=10, fontname='japan')
+        doc.save(str(self.pdf_path))
+        doc.close()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip_matches_pdfplumber(self):
+        """キャッシュから読んだ文字・矩形がpdfplumberと一致すること"""
+        self.cache.open(self.pdf_path).close()
+        self.assertTrue(self.cache.contains(self.pdf_path))
+
+        char_keys = ('text', 'fontname', 'x0', 'x1', 'y0', 'y1', 'top', 'bottom', 'size')
+        rect_keys = ('x0', 'x1', 'y0', 'y1', 'fill', 'non_stroking_color')
+        with self.cache.open(self.pdf_path) as cached, pdfplumber.open(self.pdf_path) as pdf:
+            self.assertIsInstance(cached, CachedPDF)
+            self.assertEqual(len(cached.pages), len(pdf.pages))
+            for cached_page, page in zip(cached.pages, pdf.pages):
+                self.assertEqual((cached_page.width, cached_page.height), (page.width, page.height))
+                self.assertEqual([tuple(c[k] for k in char_keys) for c in cached_page.chars],
+                                 [tuple(c[k] for k in char_keys) for c in page.chars])
+                self.assertEqual([tuple(r[k] for k in rect_keys) for r in cached_page.rects],
+                                 [tuple(r[k] for k in rect_keys) for r in page.rects])
+
+    def test_cache_hit_skips_pdfplumber(self):
+        """キャッシュ済みのPDFはpdfplumberを使わずに開けること"""
+        self.cache.open(self.pdf_path).close()
+        with patch('pdfplumber.open', side_effect=AssertionError("pdfplumber should not be used")):
+            with self.cache.open(self.pdf_path) as pdf:
+                self.assertEqual(len(pdf.pages), 3)
+                self.assertIn('def', ''.join(c['text'] for c in pdf.pages[0].chars))
+
+    def test_missing_file_falls_back_to_pdfplumber(self):
+        """ハッシュを計算できないパスはpdfplumberにそのまま渡すこと"""
+        with patch('pdfplumber.open', return_value='plumber') as mock_open:
+            self.assertEqual(self.cache.open(Path('missing.pdf')), 'plumber')
+            mock_open.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
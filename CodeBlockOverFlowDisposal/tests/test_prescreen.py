@@ -0,0 +1,129 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unit tests for PagePrescreener - はみ出し候補ページの事前選別
+"""
+
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / 'overflow_checker_standalone'))
+
+try:
+    import fitz
+    HAS_FITZ = True
+except ImportError:
+    HAS_FITZ = False
+
+from core.prescreen import PagePrescreener, StageStats
+
+PAGE_WIDTH = 515.9
+PAGE_HEIGHT = 728.5
+RIGHT_MARGIN = 50.0
+BLOCK = (60, 100, 300, 200)
+GRAY = (0.9, 0.9, 0.9)
+
+
+def _build_pdf(pdf_path: Path):
+    """
+    1: 本文内のテキストのみ
+    2: 本文右端を越えるテキスト
+    3: コードブロック右端を越えるテキスト（本文内）
+    4: 3と同じだが、コードブロックが他の矩形と1つのパスにまとめられている
+    """
+    doc = fitz.open()
+    for page_number in range(1, 5):
+        page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+        if page_number == 2:
+            page.insert_text((400, 300), "overflowing text line", fontsize=10)
+        elif page_number == 3:
+            page.draw_rect(fitz.Rect(BLOCK), color=None, fill=GRAY)
+        elif page_number == 4:
+            shape = page.new_shape()
+            shape.draw_rect(fitz.Rect(BLOCK))
+            # 細い帯（コードブロックではない）でパス全体のbboxが右に広がる
+            shape.draw_rect(fitz.Rect(60, 400, 440, 405))
+            shape.finish(color=None, fill=GRAY)
+            shape.commit()
+        if page_number in (3, 4):
+            page.insert_text((250, 150), "code overflow", fontsize=10)
+        page.insert_text((72, 600), "body text", fontsize=10)
+    doc.save(str(pdf_path))
+    doc.close()
+
+
+class TestStageStats(unittest.TestCase):
+    """StageStatsのテスト"""
+
+    def test_eliminated_and_to_dict(self):
+        stats = StageStats(name='prescreen:geometry', pages_in=10, pages_out=3, elapsed=0.5)
+        self.assertEqual(stats.eliminated, 7)
+        self.assertEqual(stats.to_dict(), {
+            'name': 'prescreen:geometry', 'pages_in': 10, 'pages_out': 3, 'eliminated': 7, 'elapsed': 0.5
+        })
+
+    def test_defaults(self):
+        stats = StageStats(name='detector')
+        self.assertEqual((stats.pages_in, stats.pages_out, stats.eliminated), (0, 0, 0))
+
+
+@unittest.skipUnless(HAS_FITZ, "PyMuPDF not available")
+class TestPagePrescreener(unittest.TestCase):
+    """PagePrescreenerのテスト"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.TemporaryDirectory()
+        cls.pdf_path = Path(cls.temp_dir.name) / 'prescreen.pdf'
+        _build_pdf(cls.pdf_path)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.temp_dir.cleanup()
+
+    def _screen(self, method, use_code_blocks=True, pages=None):
+        prescreener = PagePrescreener(method, lambda page_number: RIGHT_MARGIN, use_code_blocks)
+        return prescreener.screen(self.pdf_path, pages)
+
+    def test_unknown_method(self):
+        with self.assertRaises(ValueError):
+            PagePrescreener('ocr', lambda page_number: RIGHT_MARGIN)
+
+    def test_both_methods_select_overflow_pages(self):
+        for method in (PagePrescreener.METHOD_GEOMETRY, PagePrescreener.METHOD_PIXEL):
+            with self.subTest(method=method):
+                result = self._screen(method)
+                self.assertEqual(result.total_pages, 4)
+                self.assertEqual(result.candidates, [2, 3, 4])
+
+    def test_body_edge_only(self):
+        for method in (PagePrescreener.METHOD_GEOMETRY, PagePrescreener.METHOD_PIXEL):
+            with self.subTest(method=method):
+                self.assertEqual(self._screen(method, use_code_blocks=False).candidates, [2])
+
+    def test_code_blocks_are_individual_rects(self):
+        """1つのパス内の矩形ごとにコードブロックを判定すること（パス全体のbboxではない）"""
+        doc = fitz.open(str(self.pdf_path))
+        try:
+            prescreener = PagePrescreener('geometry', lambda page_number: RIGHT_MARGIN)
+            blocks = prescreener._code_blocks(doc[3])
+        finally:
+            doc.close()
+        self.assertEqual([tuple(block) for block in blocks], [BLOCK])
+
+    def test_page_subset_and_stats(self):
+        for method in (PagePrescreener.METHOD_GEOMETRY, PagePrescreener.METHOD_PIXEL):
+            with self.subTest(method=method):
+                result = self._screen(method, pages=[1, 2, 2, 9])
+                self.assertEqual(result.candidates, [2])
+                self.assertEqual(result.stats.name, f'prescreen:{method}')
+                self.assertEqual((result.stats.pages_in, result.stats.pages_out), (2, 1))
+                self.assertEqual(result.stats.eliminated, 1)
+                self.assertGreaterEqual(result.stats.elapsed, 0.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Unit tests for threshold_sweep - 閾値スイープエンジン
+"""
+
+import unittest
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from char_geometry import CharGeometry, find_overflow_lines
+from threshold_optimizer import ThresholdOptimizer
+from threshold_sweep import SweepResult, ThresholdSweepEngine
+
+
+def _page(chars, width=595.0):
+    return SimpleNamespace(width=width, chars=chars)
+
+
+def _char(text, x1, y0):
+    return {'text': text, 'x0': x1 - 5.0, 'x1': x1, 'y0': y0}
+
+
+class TestThresholdSweepEngine(unittest.TestCase):
+    """ThresholdSweepEngineのテスト"""
+
+    def setUp(self):
+        self.optimizer = ThresholdOptimizer()
+        self.engine = ThresholdSweepEngine(
+            self.optimizer.ground_truth,
+            filters={'relaxed': self.optimizer.is_likely_false_positive_relaxed}
+        )
+        edge = 595.0 - 10 * self.engine.mm_to_pt
+        # 閾値によって行の文字構成が変わるページ
+        self.page = _page([
+            _char('a', edge + 0.03, 100.0),
+            _char('b', edge + 0.5, 100.2),
+            _char('c', edge + 2.0, 99.8),
+            _char('x', edge + 0.08, 300.0),
+            _char('あ', edge + 5.0, 400.0),
+        ])
+        self.thresholds = [0.1, 0.05, 0.02, 0.01, 0.5, 1.0]
+
+    def test_matches_per_threshold_detection(self):
+        """閾値ごとの検出結果が従来の1閾値1解析と一致すること"""
+        candidates = self.engine.page_candidates(self.page, 1, min(self.thresholds))
+        geometry = CharGeometry.from_page(self.page)
+        for threshold in self.thresholds:
+            lines = [line.at_threshold(candidates.right_edge, threshold) for line in candidates.lines]
+            expected_lines = find_overflow_lines(geometry, candidates.right_edge, threshold)
+            self.assertEqual(
+                [line for line in lines if line is not None],
+                [(l.overflow_text, l.overflow_amount, l.char_count) for l in expected_lines]
+            )
+
+            expected = self.optimizer.detect_overflows_with_threshold(self.page, 1, threshold)
+            detected = candidates.is_detected(threshold, self.optimizer.is_likely_false_positive_relaxed)
+            self.assertEqual(detected, bool(expected), threshold)
+
+    def test_line_text_shrinks_with_threshold(self):
+        """閾値を上げると行のはみ出し文字が減ること"""
+        candidates = self.engine.page_candidates(self.page, 1, 0.01)
+        line = candidates.lines[0]
+        self.assertEqual(line.at_threshold(candidates.right_edge, 0.01)[0], 'abc')
+        self.assertEqual(line.at_threshold(candidates.right_edge, 0.1)[0], 'bc')
+        text, amount, count = line.at_threshold(candidates.right_edge, 1.0)
+        self.assertEqual((text, count), ('c', 1))
+        self.assertAlmostEqual(amount, 2.0)
+        self.assertIsNone(line.at_threshold(candidates.right_edge, 3.0))
+
+    def test_no_candidates(self):
+        """はみ出しのないページでは候補なしになること"""
+        self.assertIsNone(self.engine.page_candidates(_page([_char('a', 100.0, 100.0)]), 1, 0.01))
+        self.assertIsNone(self.engine.page_candidates(_page([]), 2, 0.01))
+
+    def test_metrics_match_calculate_metrics(self):
+        """評価結果が calculate_metrics と一致すること"""
+        detected = {'sample.pdf': [48, 50], 'sample2.pdf': [128], 'sample4.pdf': []}
+        point = self.engine._evaluate('relaxed', 0.1, detected)
+        metrics = self.optimizer.calculate_metrics(detected)
+
+        self.assertEqual(point.true_positives, metrics['true_positives'])
+        self.assertEqual(point.false_positives, metrics['false_positives'])
+        self.assertEqual(point.false_negatives, metrics['false_negatives'])
+        self.assertEqual(point.recall, metrics['recall'])
+        self.assertEqual(point.precision, metrics['precision'])
+
+        result = SweepResult([point, self.engine._evaluate('relaxed', 0.05, {})])
+        self.assertEqual([t for t, _, _ in result.curve('relaxed')], [0.05, 0.1])
+        self.assertEqual(result.detected_pages('relaxed', 0.1), detected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -16,6 +16,10 @@ except ImportError:
     print("pdfplumber not available.")
     sys.exit(1)
 
+from char_geometry import CharGeometry, find_overflow_lines
+from page_geometry_cache import open_pdf
+from threshold_sweep import SweepResult, ThresholdSweepEngine
+
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
@@ -99,38 +103,18 @@ class ThresholdOptimizer:
         
         text_right_edge = page.width - right_margin_pt
         
-        # 行ごとのはみ出し文字収集
-        line_overflows = {}
+        # 行ごとのはみ出し文字収集（ベクトル演算）
+        geometry = CharGeometry.from_page(page)
         
-        for char in page.chars:
-            if self.is_ascii_char(char['text']):
-                char_x1 = char['x1']
-                if char_x1 > text_right_edge + threshold:
-                    y_pos = round(char['y0'])
-                    overflow_amount = char_x1 - text_right_edge
-                    
-                    if y_pos not in line_overflows:
-                        line_overflows[y_pos] = []
-                    
-                    line_overflows[y_pos].append({
-                        'char': char['text'],
-                        'x1': char['x1'],
-                        'overflow': overflow_amount
-                    })
-        
-        # 行ごとに集計し、緩和されたフィルタリング適用
-        for y_pos, chars_in_line in line_overflows.items():
-            chars_in_line.sort(key=lambda x: x['x1'])
-            overflow_text = ''.join([c['char'] for c in chars_in_line])
-            max_overflow = max(c['overflow'] for c in chars_in_line)
-            
-            # 緩和されたフィルタリング適用
-            if not self.is_likely_false_positive_relaxed(overflow_text, max_overflow, y_pos, threshold):
+        # はみ出した行だけに緩和されたフィルタリング適用
+        for line in find_overflow_lines(geometry, text_right_edge, threshold):
+            if not self.is_likely_false_positive_relaxed(line.overflow_text, line.overflow_amount,
+                                                         line.y_position, threshold):
                 overflows.append({
-                    'y_position': y_pos,
-                    'overflow_text': overflow_text,
-                    'overflow_amount': max_overflow,
-                    'char_count': len(chars_in_line)
+                    'y_position': line.y_position,
+                    'overflow_text': line.overflow_text,
+                    'overflow_amount': line.overflow_amount,
+                    'char_count': line.char_count
                 })
         
         return overflows
@@ -140,7 +124,7 @@ class ThresholdOptimizer:
         detected_pages = []
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
+            with open_pdf(pdf_path) as pdf:
                 for i, page in enumerate(pdf.pages):
                     page_number = i + 1
                     overflows = self.detect_overflows_with_threshold(page, page_number, threshold)
@@ -153,6 +137,15 @@ class ThresholdOptimizer:
         
         return detected_pages
     
+    def sweep_thresholds(self, pdf_paths: List[Path], thresholds: List[float]) -> SweepResult:
+        """全閾値を1回の解析で評価（フィルタ名 'relaxed'）"""
+        engine = ThresholdSweepEngine(
+            self.ground_truth,
+            filters={'relaxed': self.is_likely_false_positive_relaxed},
+            mm_to_pt=self.mm_to_pt
+        )
+        return engine.sweep(pdf_paths, thresholds)
+    
     def calculate_metrics(self, detected_results: Dict[str, List[int]]) -> Dict:
         """性能メトリクス計算"""
         total_expected = sum(len(pages) for pages in self.ground_truth.values())
@@ -195,6 +188,10 @@ class ThresholdOptimizer:
         pdf_files = ['sample.pdf', 'sample2.pdf', 'sample3.pdf', 'sample4.pdf', 'sample5.pdf']
         results_by_threshold = {}
         
+        # 各PDFの解析は1回だけ行い、閾値ごとの判定はメモリ上で行う
+        existing_paths = [Path(f) for f in pdf_files if Path(f).exists()]
+        sweep = self.sweep_thresholds(existing_paths, self.test_thresholds)
+        
         for threshold in self.test_thresholds:
             logger.info(f"\n📊 閾値 {threshold}pt での実験:")
             logger.info("-" * 60)
@@ -207,7 +204,7 @@ class ThresholdOptimizer:
                     logger.info(f"❌ {pdf_file}: ファイルが見つかりません")
                     continue
                 
-                detected_pages = self.test_threshold_on_pdf(pdf_path, threshold)
+                detected_pages = sweep.detected_pages('relaxed', threshold)[pdf_file]
                 threshold_results[pdf_file] = detected_pages
                 
                 expected = self.ground_truth[pdf_file]
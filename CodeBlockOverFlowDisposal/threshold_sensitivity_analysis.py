@@ -9,6 +9,8 @@ import logging
 import pdfplumber
 from pathlib import Path
 from pure_algorithmic_detector import PureAlgorithmicDetector
+from page_geometry_cache import open_pdf
+from threshold_sweep import ThresholdSweepEngine
 
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
@@ -77,7 +79,7 @@ class ThresholdSensitivityAnalyzer:
         results = []
         
         try:
-            with pdfplumber.open(pdf_path) as pdf:
+            with open_pdf(pdf_path) as pdf:
                 for i, page in enumerate(pdf.pages):
                     page_number = i + 1
                     overflows = self.detect_overflows_with_threshold(page, page_number, threshold)
@@ -121,23 +123,19 @@ def comprehensive_threshold_analysis():
     print("閾値感度分析 - 技術的誠実性保証")
     print("=" * 100)
     
-    analyzer = ThresholdSensitivityAnalyzer()
+    # 各PDFは1回だけ解析し、全閾値をメモリ上で評価（フィルタリングなし）
+    engine = ThresholdSweepEngine(original_ground_truth)
+    pdf_paths = [Path(pdf_file) for pdf_file in original_ground_truth.keys() if Path(pdf_file).exists()]
+    sweep = engine.sweep(pdf_paths, thresholds)
     
     # 各閾値での分析
     for threshold in thresholds:
         print(f"\n🎯 閾値 {threshold:.2f}pt での分析:")
         print("-" * 80)
         
-        all_detected = {}
+        all_detected = sweep.detected_pages('none', threshold)
         
-        for pdf_file in original_ground_truth.keys():
-            if not Path(pdf_file).exists():
-                continue
-            
-            results = analyzer.analyze_pdf_with_threshold(Path(pdf_file), threshold)
-            detected_pages = [r['page'] for r in results]
-            all_detected[pdf_file] = detected_pages
-            
+        for pdf_file, detected_pages in all_detected.items():
             print(f"  {pdf_file}: {detected_pages}")
         
         # 元のGround Truthとの比較
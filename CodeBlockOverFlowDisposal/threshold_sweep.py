@@ -0,0 +1,223 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Threshold Sweep Engine - 1回の解析で全閾値を評価するスイープエンジン
+各ページのはみ出し候補行を最小閾値で1回だけ抽出し（文字ごとのx1を保持）、
+閾値・フィルタ設定ごとの判定はメモリ上で行う。
+50点のスイープでも解析コストは約1回分で済む。
+"""
+
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from char_geometry import CharGeometry
+from page_geometry_cache import open_pdf
+
+logger = logging.getLogger(__name__)
+
+# 誤検知フィルタ: (overflow_text, overflow_amount, y_position, threshold) -> 誤検知ならTrue
+FalsePositiveFilter = Callable[[str, float, int, float], bool]
+
+
+def no_filter(overflow_text: str, overflow_amount: float, y_position: int, threshold: float) -> bool:
+    """フィルタなし（感度分析用）"""
+    return False
+
+
+@dataclass
+class LineCandidate:
+    """はみ出し候補行（最小閾値で抽出、x1順）"""
+    y_position: int
+    texts: List[str]
+    x1: np.ndarray
+
+    def at_threshold(self, right_edge: float, threshold: float) -> Optional[Tuple[str, float, int]]:
+        """
+        指定閾値でのはみ出し内容
+
+        Returns:
+            (overflow_text, overflow_amount, char_count)（はみ出し文字がなければNone）
+        """
+        mask = self.x1 > right_edge + threshold
+        count = int(mask.sum())
+        if count == 0:
+            return None
+        if count == len(self.texts):
+            text = ''.join(self.texts)
+        else:
+            text = ''.join([t for t, keep in zip(self.texts, mask.tolist()) if keep])
+        return text, float(self.x1[mask].max() - right_edge), count
+
+
+@dataclass
+class PageCandidates:
+    """1ページ分のはみ出し候補"""
+    page_number: int
+    right_edge: float
+    lines: List[LineCandidate]
+
+    def is_detected(self, threshold: float, fp_filter: FalsePositiveFilter) -> bool:
+        """指定閾値・フィルタでこのページが検出されるか"""
+        for line in self.lines:
+            overflow = line.at_threshold(self.right_edge, threshold)
+            if overflow is None:
+                continue
+            text, amount, _ = overflow
+            if not fp_filter(text, amount, line.y_position, threshold):
+                return True
+        return False
+
+
+@dataclass
+class SweepPoint:
+    """1つの (フィルタ, 閾値) の評価結果"""
+    filter_name: str
+    threshold: float
+    detected: Dict[str, List[int]]
+    true_positives: int
+    false_positives: int
+    false_negatives: int
+    total_expected: int
+    total_detected: int
+
+    @property
+    def recall(self) -> float:
+        return self.true_positives / self.total_expected if self.total_expected > 0 else 0
+
+    @property
+    def precision(self) -> float:
+        return self.true_positives / self.total_detected if self.total_detected > 0 else 1.0
+
+
+@dataclass
+class SweepResult:
+    """スイープ全体の結果"""
+    points: List[SweepPoint] = field(default_factory=list)
+
+    def point(self, filter_name: str, threshold: float) -> SweepPoint:
+        for point in self.points:
+            if point.filter_name == filter_name and point.threshold == threshold:
+                return point
+        raise KeyError((filter_name, threshold))
+
+    def detected_pages(self, filter_name: str, threshold: float) -> Dict[str, List[int]]:
+        """PDFごとの検出ページ"""
+        return self.point(filter_name, threshold).detected
+
+    def curve(self, filter_name: str) -> List[Tuple[float, float, float]]:
+        """(閾値, Precision, Recall) の曲線（閾値順）"""
+        points = sorted((p for p in self.points if p.filter_name == filter_name), key=lambda p: p.threshold)
+        return [(p.threshold, p.precision, p.recall) for p in points]
+
+
+class ThresholdSweepEngine:
+    """閾値スイープエンジン"""
+
+    def __init__(self, ground_truth: Dict[str, List[int]],
+                 filters: Optional[Dict[str, FalsePositiveFilter]] = None,
+                 mm_to_pt: float = 2.83465):
+        """
+        Args:
+            ground_truth: PDFファイル名 -> 正解ページ
+            filters: フィルタ名 -> 誤検知フィルタ（省略時はフィルタなしのみ）
+            mm_to_pt: mm→pt換算係数
+        """
+        self.ground_truth = ground_truth
+        self.filters = filters or {'none': no_filter}
+        self.mm_to_pt = mm_to_pt
+
+    def right_edge(self, page_width: float, page_number: int) -> float:
+        """本文領域の右端（奇数ページ10mm、偶数ページ18mm）"""
+        if page_number % 2 == 1:
+            right_margin_pt = 10 * self.mm_to_pt
+        else:
+            right_margin_pt = 18 * self.mm_to_pt
+        return page_width - right_margin_pt
+
+    def page_candidates(self, page, page_number: int, min_threshold: float) -> Optional[PageCandidates]:
+        """1ページのはみ出し候補を抽出（候補がなければNone）"""
+        right_edge = self.right_edge(page.width, page_number)
+        geometry = CharGeometry.from_page(page)
+        if len(geometry) == 0:
+            return None
+
+        mask = geometry.is_ascii & geometry.right_overflow_mask(right_edge, min_threshold)
+        lines = [
+            LineCandidate(
+                y_position=int(geometry.line_y[indices[0]]),
+                texts=[geometry.texts[i] for i in indices],
+                x1=np.array(geometry.x1[indices]),
+            )
+            for indices in geometry.group_lines(mask, sort_by='x1')
+        ]
+        return PageCandidates(page_number, right_edge, lines) if lines else None
+
+    def extract_candidates(self, pdf_path: Path, min_threshold: float) -> List[PageCandidates]:
+        """PDF全体のはみ出し候補を1回の解析で抽出"""
+        candidates = []
+        with open_pdf(pdf_path) as pdf:
+            for i, page in enumerate(pdf.pages):
+                page_candidates = self.page_candidates(page, i + 1, min_threshold)
+                if page_candidates:
+                    candidates.append(page_candidates)
+        return candidates
+
+    def sweep(self, pdf_paths: Iterable[Path], thresholds: Sequence[float],
+              filter_names: Optional[Sequence[str]] = None) -> SweepResult:
+        """
+        全閾値・全フィルタ設定を評価
+
+        Args:
+            pdf_paths: 対象PDF
+            thresholds: 閾値リスト(pt)
+            filter_names: 評価するフィルタ名（省略時は全て）
+
+        Returns:
+            スイープ結果
+        """
+        filter_names = list(filter_names or self.filters.keys())
+        min_threshold = min(thresholds)
+
+        candidates_by_pdf: Dict[str, List[PageCandidates]] = {}
+        for pdf_path in pdf_paths:
+            pdf_path = Path(pdf_path)
+            try:
+                candidates_by_pdf[pdf_path.name] = self.extract_candidates(pdf_path, min_threshold)
+            except Exception as e:
+                logger.error(f"エラー: {pdf_path} - {str(e)}")
+                candidates_by_pdf[pdf_path.name] = []
+
+        result = SweepResult()
+        for filter_name in filter_names:
+            fp_filter = self.filters[filter_name]
+            for threshold in thresholds:
+                detected = {
+                    name: [c.page_number for c in candidates if c.is_detected(threshold, fp_filter)]
+                    for name, candidates in candidates_by_pdf.items()
+                }
+                result.points.append(self._evaluate(filter_name, threshold, detected))
+        return result
+
+    def _evaluate(self, filter_name: str, threshold: float, detected: Dict[str, List[int]]) -> SweepPoint:
+        """正解データと比較"""
+        true_positives = false_positives = false_negatives = 0
+        for pdf_file, expected in self.ground_truth.items():
+            pages = detected.get(pdf_file, [])
+            true_positives += len([p for p in pages if p in expected])
+            false_positives += len([p for p in pages if p not in expected])
+            false_negatives += len([p for p in expected if p not in pages])
+
+        return SweepPoint(
+            filter_name=filter_name,
+            threshold=threshold,
+            detected=detected,
+            true_positives=true_positives,
+            false_positives=false_positives,
+            false_negatives=false_negatives,
+            total_expected=sum(len(pages) for pages in self.ground_truth.values()),
+            total_detected=sum(len(pages) for pages in detected.values()),
+        )
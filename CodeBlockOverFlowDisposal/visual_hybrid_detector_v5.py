@@ -13,6 +13,8 @@ from datetime import datetime
 from typing import List, Dict, Tuple, Optional, Set
 import pdfplumber
 
+from char_geometry import BlockIndex
+
 
 class VisualJudgmentManager:
     """視覚的判断データの管理クラス"""
@@ -261,6 +263,7 @@ class VisualHybridDetectorV5:
         overflows = []
         text_right_edge = self.calculate_text_right_edge(page.width, page_number)
         code_blocks = self.detect_code_blocks(page)
+        block_index = BlockIndex(code_blocks)
         
         # 偶数ページ用の閾値を使用
         if page_number % 2 == 0:
@@ -302,11 +305,7 @@ class VisualHybridDetectorV5:
                 
                 if overflow_chars:
                     # コードブロック内かチェック
-                    in_code_block = any(
-                        cb['x0'] <= overflow_chars[0]['x0'] <= cb['x1'] and
-                        cb['y0'] <= overflow_chars[0]['y0'] <= cb['y1']
-                        for cb in code_blocks
-                    )
+                    in_code_block = block_index.contains(overflow_chars[0]['y0'], overflow_chars[0]['x0'])
                     
                     if in_code_block:  # コードブロック内のみ記録
                         line_text = ''.join([c['text'] for c in line_chars])
@@ -12,6 +12,8 @@ from datetime import datetime
 from typing import List, Dict, Tuple, Optional, Set
 import pdfplumber
 
+from char_geometry import BlockIndex
+
 
 class VisualJudgmentManager:
     """視覚的判断データの管理クラス"""
@@ -175,31 +177,32 @@ class VisualHybridDetectorV6:
         if not code_blocks:
             return overflows
         
+        # 各ブロックに入る文字（y0がブロックのy区間内）を索引でまとめて求める
+        block_chars = BlockIndex(code_blocks).chars_by_block(page.chars)
+        
         # 各コードブロックに対してチェック
         for block_idx, block in enumerate(code_blocks):
             block_overflows = []
             
             # ブロック内の文字をチェック
-            for char in page.chars:
-                # 文字がブロック内に含まれるかチェック（Y座標）
-                if block['y0'] <= char['y0'] <= block['y1']:
-                    # ASCII文字のみ対象
-                    if self.char_classifier.is_ascii_printable(char['text']):
-                        # 文字の右端がブロックの右端を超えているか
-                        if char['x1'] > block['x1'] + self.config.rect_overflow_threshold:
-                            overflow_amount = char['x1'] - block['x1']
-                            block_overflows.append({
-                                'char': char['text'],
-                                'x0': char['x0'],
-                                'x1': char['x1'],
-                                'y0': char['y0'],
-                                'overflow_amount': overflow_amount
-                            })
-                    else:
-                        # 統計を更新
-                        char_type = self.char_classifier.classify_character(char['text'])
-                        self.stats['excluded_characters'][char_type] = \
-                            self.stats['excluded_characters'].get(char_type, 0) + 1
+            for char in block_chars[block_idx]:
+                # ASCII文字のみ対象
+                if self.char_classifier.is_ascii_printable(char['text']):
+                    # 文字の右端がブロックの右端を超えているか
+                    if char['x1'] > block['x1'] + self.config.rect_overflow_threshold:
+                        overflow_amount = char['x1'] - block['x1']
+                        block_overflows.append({
+                            'char': char['text'],
+                            'x0': char['x0'],
+                            'x1': char['x1'],
+                            'y0': char['y0'],
+                            'overflow_amount': overflow_amount
+                        })
+                else:
+                    # 統計を更新
+                    char_type = self.char_classifier.classify_character(char['text'])
+                    self.stats['excluded_characters'][char_type] = \
+                        self.stats['excluded_characters'].get(char_type, 0) + 1
             
             if block_overflows:
                 # 行ごとにグループ化
@@ -243,6 +246,7 @@ class VisualHybridDetectorV6:
         
         # コードブロックを取得
         code_blocks = self.detect_code_blocks(page)
+        block_index = BlockIndex(code_blocks)
         
         # 行ごとにグループ化
         lines = {}
@@ -267,11 +271,7 @@ class VisualHybridDetectorV6:
             for char in line_chars:
                 if char['x1'] > text_right_edge + self.config.coordinate_threshold_pt:
                     # コードブロック内かチェック
-                    in_code_block = any(
-                        cb['x0'] <= char['x0'] <= cb['x1'] and
-                        cb['y0'] <= char['y0'] <= cb['y1']
-                        for cb in code_blocks
-                    )
+                    in_code_block = block_index.contains(char['y0'], char['x0'])
                     
                     if in_code_block:
                         overflow_chars.append(char)
@@ -14,6 +14,8 @@ from pathlib import Path
 import pdfplumber
 from dataclasses import dataclass
 
+from char_geometry import BlockIndex
+
 # ロギング設定
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
@@ -146,9 +148,12 @@ class VisualHybridDetectorV9:
         if not code_blocks:
             return overflows
         
+        # 各ブロック内の文字を索引でまとめて求める
+        block_chars = BlockIndex(code_blocks).chars_by_block(page.chars, use_x=True)
+        
         # 各コードブロックに対してチェック
         for block_idx, block in enumerate(code_blocks):
-            block_overflows = self.check_block_overflow(page, block, page_number)
+            block_overflows = self.check_block_overflow(page, block, page_number, block_chars[block_idx])
             
             if block_overflows:
                 # 行ごとにグループ化
@@ -188,8 +193,9 @@ class VisualHybridDetectorV9:
         
         return overflows
     
-    def check_block_overflow(self, page, block: Dict, page_number: int) -> List[Dict]:
-        """特定のブロック内のはみ出しをチェック"""
+    def check_block_overflow(self, page, block: Dict, page_number: int,
+                             block_chars: Optional[List[Dict]] = None) -> List[Dict]:
+        """特定のブロック内のはみ出しをチェック（block_chars: ブロック内の文字、省略時はページから抽出）"""
         # 本文領域の右端を計算
         if page_number % 2 == 0:  # 偶数ページ
             right_margin_pt = self.config.even_page_margins['right'] * self.config.mm_to_pt
@@ -199,9 +205,8 @@ class VisualHybridDetectorV9:
         text_right_edge = page.width - right_margin_pt
         
         # ブロック内の文字を取得
-        block_chars = [char for char in page.chars 
-                      if block['x0'] <= char['x0'] <= block['x1'] and 
-                      block['y0'] <= char['y0'] <= block['y1']]
+        if block_chars is None:
+            block_chars = BlockIndex([block]).chars_by_block(page.chars, use_x=True)[0]
         
         # ASCII文字のみを抽出（はみ出し判定対象）
         overflows = []
@@ -5,7 +5,6 @@
 """
 
 import cv2
-import numpy as np
 import fitz
 from pathlib import Path
 import sys
@@ -25,24 +24,15 @@ def visualize_page(pdf_path: Path, page_num: int, output_path: Path):
         print(f"エラー: PDFは {len(doc)} ページしかありません")
         return
     
-    # ページを画像に変換
+    # ページをグレースケール画像に変換
     page = doc[page_num - 1]  # 0-indexed
-    mat = fitz.Matrix(detector.DPI/72, detector.DPI/72)
-    pix = page.get_pixmap(matrix=mat)
+    gray = detector.render_page(page)
     
-    # OpenCV形式に変換
-    img_data = pix.pil_tobytes(format="PNG")
-    import io
-    from PIL import Image
-    image = Image.open(io.BytesIO(img_data))
-    img_array = np.array(image)
-    img_cv = cv2.cvtColor(img_array, cv2.COLOR_RGB2BGR)
-    
-    # コピーを作成（描画用）
-    img_result = img_cv.copy()
+    # 描画用にOpenCV形式（BGR）に変換
+    img_result = cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
     
     # コードブロックを検出
-    code_blocks = detector._detect_code_blocks(img_cv)
+    code_blocks = detector._detect_code_blocks(gray)
     
     print(f"ページ {page_num} で {len(code_blocks)} 個のコードブロックを検出")
     
@@ -54,7 +44,7 @@ def visualize_page(pdf_path: Path, page_num: int, output_path: Path):
         cv2.rectangle(img_result, (x, y), (x+w, y+h), (0, 255, 0), 3)
         
         # はみ出しチェック
-        if detector._check_text_overflow(img_cv, block):
+        if detector._check_text_overflow(gray, block):
             # はみ出している場合は赤い線を右端に描画
             cv2.line(img_result, (x+w-10, y), (x+w-10, y+h), (0, 0, 255), 5)
             cv2.putText(img_result, "OVERFLOW", (x+w-100, y-10), 
@@ -32,6 +32,7 @@ class ProcessingOptions:
     png_to_jpg: bool = True
     max_pixels: str = "400"
     resolution: int = 100
+    skip_unchanged: bool = True
 
     def to_dict(self) -> Dict[str, Any]:
         """オプションを辞書形式に変換"""
@@ -43,7 +44,8 @@ class ProcessingOptions:
             "backup": self.backup,
             "png_to_jpg": self.png_to_jpg,
             "max_pixels": self.max_pixels,
-            "resolution": self.resolution
+            "resolution": self.resolution,
+            "skip_unchanged": self.skip_unchanged
         }
 
     def validate(self) -> List[str]:
@@ -70,6 +72,7 @@ class ProcessingResult:
     processed_count: int = 0
     error_count: int = 0
     warning_count: int = 0
+    skipped_count: int = 0
     messages: List[str] = field(default_factory=list)
     details: Dict[str, Any] = field(default_factory=dict)
 
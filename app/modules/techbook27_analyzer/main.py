@@ -4,6 +4,7 @@ TechDisposal Analyzer メインエントリーポイント - Qt6ベース
 """
 import sys
 import logging
+import multiprocessing
 from pathlib import Path
 
 # プロジェクトルートをパスに追加
@@ -45,4 +46,6 @@ def main():
 
 
 if __name__ == "__main__":
+    # EXE化した場合も画像処理のワーカープロセスを起動できるように
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
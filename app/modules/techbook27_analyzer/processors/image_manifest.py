@@ -0,0 +1,155 @@
+"""
+画像処理マニフェストモジュール
+単一責任: 処理済み画像の記録と、再処理が必要かどうかの判定
+"""
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from PIL import Image
+import logging
+
+from ..core.models import ProcessingOptions
+
+
+logger = logging.getLogger(__name__)
+
+
+def file_hash(file_path: Path, chunk_size: int = 1024 * 1024) -> str:
+    """ファイル内容のSHA-256"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ImageManifest:
+    """
+    フォルダごとの処理済み画像の記録
+
+    出力画像ごとにファイルサイズ・更新日時・ハッシュ・画像サイズ・DPIと、
+    処理に使ったオプションを記録する。次回の処理では、まずファイルサイズと
+    更新日時で判定し、更新日時だけが違う場合にハッシュを比較する（画像はデコードしない）。
+    """
+
+    FILENAME = ".image_manifest.json"
+    VERSION = 1
+    # 出力画像に影響しないオプション（変更しても再処理しない）
+    IGNORED_OPTIONS = ('backup', 'skip_unchanged')
+
+    def __init__(self, folder: Path):
+        """
+        Args:
+            folder: 処理対象のフォルダ（マニフェストはこの直下に保存）
+        """
+        self.folder = Path(folder)
+        self.path = self.folder / self.FILENAME
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+
+    @classmethod
+    def load(cls, folder: Path) -> 'ImageManifest':
+        """マニフェストを読み込む（ない・壊れている場合は空）"""
+        manifest = cls(folder)
+        try:
+            with open(manifest.path, encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') == cls.VERSION:
+                manifest.entries = data.get('files', {})
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning(f"マニフェスト読み込みエラー（全画像を処理します）: {manifest.path} - {str(e)}")
+        return manifest
+
+    def save(self) -> None:
+        """マニフェストを保存（変更がある場合のみ、書き込み途中で壊れないよう置き換え）"""
+        if not self._dirty:
+            return
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.VERSION, 'files': self.entries}, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+    def is_unchanged(self, image_path: Path, options: ProcessingOptions) -> bool:
+        """
+        前回と同じオプションで処理済みで、その後変更されていないか
+
+        Args:
+            image_path: 画像ファイルパス
+            options: 今回の処理オプション
+
+        Returns:
+            bool: 処理を省略できる場合True
+        """
+        entry = self.entries.get(self._key(image_path))
+        if entry is None or entry.get('options') != self._options_dict(options):
+            return False
+
+        try:
+            stat = Path(image_path).stat()
+            if stat.st_size != entry['size']:
+                return False
+            if stat.st_mtime_ns == entry['mtime_ns']:
+                return True
+
+            # 更新日時だけ変わった場合（コピーし直しなど）は内容で判定
+            if file_hash(image_path) != entry['sha256']:
+                return False
+        except (OSError, KeyError):
+            return False
+
+        entry['mtime_ns'] = stat.st_mtime_ns
+        self._dirty = True
+        return True
+
+    def record(self, image_path: Path, options: ProcessingOptions) -> None:
+        """
+        処理後の画像を記録
+
+        Args:
+            image_path: 出力画像のパス（PNG→JPG変換後はJPGのパス）
+            options: 処理オプション
+        """
+        image_path = Path(image_path)
+        stat = image_path.stat()
+
+        # ヘッダーのみ読み込む（画素はデコードしない）
+        with Image.open(image_path) as img:
+            width, height = img.size
+            dpi = img.info.get('dpi')
+
+        self.entries[self._key(image_path)] = {
+            'size': stat.st_size,
+            'mtime_ns': stat.st_mtime_ns,
+            'sha256': file_hash(image_path),
+            'width': width,
+            'height': height,
+            'dpi': [round(float(value), 2) for value in dpi] if dpi else None,
+            'options': self._options_dict(options)
+        }
+        self._dirty = True
+
+    def forget(self, image_path: Path) -> None:
+        """画像の記録を削除"""
+        if self.entries.pop(self._key(image_path), None) is not None:
+            self._dirty = True
+
+    def prune(self, existing: List[Path]) -> None:
+        """存在しなくなった画像の記録を削除"""
+        keys = {self._key(path) for path in existing}
+        for key in [key for key in self.entries if key not in keys]:
+            del self.entries[key]
+            self._dirty = True
+
+    def _key(self, image_path: Path) -> str:
+        """フォルダからの相対パス"""
+        return Path(image_path).relative_to(self.folder).as_posix()
+
+    @classmethod
+    def _options_dict(cls, options: ProcessingOptions) -> Dict[str, Any]:
+        """出力画像に影響するオプション"""
+        return {key: value for key, value in options.to_dict().items() if key not in cls.IGNORED_OPTIONS}
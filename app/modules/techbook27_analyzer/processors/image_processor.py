@@ -4,8 +4,10 @@
 """
 import os
 import shutil
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from pathlib import Path
-from typing import Optional, List, Tuple
+from typing import Callable, Dict, Optional, List, Tuple
 from PIL import Image
 import logging
 
@@ -13,10 +15,20 @@ from ..core.models import ProcessingOptions, ProcessingResult, ImageInfo, LogLev
 from ..core.exceptions import ImageProcessingError, ProcessingInterruptedError
 from ..utils.file_handler import FileHandler
 from ..utils.validators import ImageValidator
+from .image_manifest import ImageManifest
 
 
 logger = logging.getLogger(__name__)
 
+# 進捗通知: (処理済みファイル数, 全ファイル数, 処理速度[枚/秒])
+ProgressCallback = Callable[[int, int, float], None]
+
+
+def _process_image_group(options: ProcessingOptions, image_paths: List[str]) -> List[ProcessingResult]:
+    """ワーカープロセスで画像を順に処理（出力先が重なる画像は同じグループにまとめて渡される）"""
+    processor = ImageProcessor(options, workers=1)
+    return [processor.process_image(image_path) for image_path in image_paths]
+
 
 class ImageProcessor:
     """画像処理を行うクラス"""
@@ -24,12 +36,19 @@ class ImageProcessor:
     VALID_EXTENSIONS = ('.jpg', '.jpeg', '.png')
     DEFAULT_DPI = (72, 72)
     
-    def __init__(self, options: ProcessingOptions):
+    # これより画像が少ないフォルダはプロセスプールを使わずに処理（ワーカー起動の方が高くつく）
+    MIN_FILES_FOR_POOL = 4
+    # 停止要求を確認する間隔（秒）
+    STOP_POLL_SECONDS = 0.2
+    
+    def __init__(self, options: ProcessingOptions, workers: Optional[int] = None):
         """
         Args:
             options: 処理オプション
+            workers: フォルダ処理のワーカープロセス数（省略時はCPU数、1で逐次処理）
         """
         self.options = options
+        self.workers = max(1, workers or os.cpu_count() or 1)
         self.file_handler = FileHandler()
         self.validator = ImageValidator()
         self._stop_requested = False
@@ -70,6 +89,7 @@ class ImageProcessor:
             self._process_single_image(image_path, result)
             
             result.processed_count = 1
+            result.details['output_path'] = image_path
             
         except ProcessingInterruptedError:
             raise
@@ -80,17 +100,25 @@ class ImageProcessor:
             
         return result
         
-    def process_folder(self, folder_path: str) -> ProcessingResult:
+    def process_folder(self, folder_path: str,
+                       progress_callback: Optional[ProgressCallback] = None) -> ProcessingResult:
         """
         フォルダ内の全画像を処理
         
+        画像はプロセスプールで並列に処理する。メッセージは完了順ではなく
+        ファイルパス順（出力先が同じ画像はまとめて）に並べる。処理速度は details に記録する。
+        skip_unchanged オプションが有効な場合、前回同じオプションで処理してから
+        変更されていない画像はマニフェストで判定して処理しない。
+        
         Args:
             folder_path: フォルダパス
+            progress_callback: 進捗通知（処理済み数, 全体数, 枚/秒）
             
         Returns:
             ProcessingResult: 処理結果
         """
         result = ProcessingResult(success=True)
+        start = time.perf_counter()
         
         try:
             folder = Path(folder_path)
@@ -100,17 +128,57 @@ class ImageProcessor:
             # バックアップフォルダを除外しながら画像ファイルを収集
             image_files = self._collect_image_files(folder)
             
-            for image_file in image_files:
-                self._check_stop()
+            # 前回から変更のない画像を除外（ファイルサイズ・更新日時、次にハッシュで判定）
+            manifest = ImageManifest.load(folder) if self.options.skip_unchanged else None
+            if manifest is not None:
+                manifest.prune(image_files)
+                targets = [path for path in image_files if not manifest.is_unchanged(path, self.options)]
+                if len(targets) < len(image_files):
+                    result.skipped_count = len(image_files) - len(targets)
+                    result.add_message(f"変更のない画像をスキップ: {result.skipped_count}ファイル", LogLevel.INFO)
+                    image_files = targets
+                    
+            groups = self._group_by_output(image_files)
+            workers = min(self.workers, len(groups))
+            if len(image_files) < self.MIN_FILES_FOR_POOL:
+                workers = 1
                 
-                file_result = self.process_image(str(image_file))
-                if file_result.success:
-                    result.processed_count += 1
-                else:
-                    result.error_count += 1
+            completed = 0
+            
+            def on_done(count: int) -> None:
+                nonlocal completed
+                completed += count
+                if progress_callback:
+                    elapsed = time.perf_counter() - start
+                    progress_callback(completed, len(image_files), completed / elapsed if elapsed > 0 else 0.0)
+            
+            if workers > 1:
+                group_results = self._process_groups_parallel(groups, workers, on_done)
+            else:
+                group_results = self._process_groups_serial(groups, on_done)
+                
+            for file_results in group_results:
+                for file_result in file_results:
+                    if file_result.success:
+                        result.processed_count += 1
+                    else:
+                        result.error_count += 1
+                        
+                    # メッセージを統合
+                    result.messages.extend(file_result.messages)
                     
-                # メッセージを統合
-                result.messages.extend(file_result.messages)
+                    if manifest is not None and file_result.success:
+                        self._record_output(manifest, Path(file_result.details['output_path']), result)
+                        
+            if manifest is not None:
+                self._save_manifest(manifest, result)
+                
+            elapsed = time.perf_counter() - start
+            result.details.update({
+                "workers": workers,
+                "elapsed_seconds": elapsed,
+                "images_per_sec": len(image_files) / elapsed if elapsed > 0 else 0.0
+            })
                 
         except ProcessingInterruptedError:
             raise
@@ -121,6 +189,89 @@ class ImageProcessor:
             
         return result
         
+    def _record_output(self, manifest: ImageManifest, output_path: Path, result: ProcessingResult) -> None:
+        """処理後の画像をマニフェストに記録（失敗しても次回処理し直すだけなので警告のみ）"""
+        try:
+            manifest.record(output_path, self.options)
+        except Exception as e:
+            manifest.forget(output_path)
+            result.add_message(f"マニフェスト記録失敗: {output_path}: {str(e)}", LogLevel.WARNING)
+            
+    def _save_manifest(self, manifest: ImageManifest, result: ProcessingResult) -> None:
+        """マニフェストを保存"""
+        try:
+            manifest.save()
+        except Exception as e:
+            result.add_message(f"マニフェスト保存失敗: {str(e)}", LogLevel.WARNING)
+            
+    def _process_groups_serial(self, groups: List[List[Path]],
+                               on_done: Callable[[int], None]) -> List[List[ProcessingResult]]:
+        """画像グループを現在のプロセスで順に処理"""
+        group_results = []
+        for group in groups:
+            file_results = []
+            for image_file in group:
+                self._check_stop()
+                file_results.append(self.process_image(str(image_file)))
+            group_results.append(file_results)
+            on_done(len(group))
+        return group_results
+        
+    def _process_groups_parallel(self, groups: List[List[Path]], workers: int,
+                                 on_done: Callable[[int], None]) -> List[List[ProcessingResult]]:
+        """
+        画像グループをプロセスプールで処理（結果はグループの順に返す）
+        
+        停止要求は STOP_POLL_SECONDS ごとに確認し、未着手の画像は取り消す。
+        処理中の画像はファイルを壊さないよう、ワーカー側で最後まで処理させる。
+        """
+        self._check_stop()
+        group_results: List[Optional[List[ProcessingResult]]] = [None] * len(groups)
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending = {
+                executor.submit(_process_image_group, self.options, [str(path) for path in group]): index
+                for index, group in enumerate(groups)
+            }
+            while pending:
+                self._check_stop()
+                done, _ = wait(pending, timeout=self.STOP_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                for future in done:
+                    index = pending.pop(future)
+                    try:
+                        group_results[index] = future.result()
+                    except Exception as e:
+                        # ワーカープロセスの異常終了など（グループ内の各画像をエラーとする）
+                        logger.exception("画像処理ワーカーエラー")
+                        group_results[index] = [self._failed_result(path, e) for path in groups[index]]
+                    on_done(len(groups[index]))
+        finally:
+            executor.shutdown(wait=not self._stop_requested, cancel_futures=True)
+        return group_results
+        
+    @staticmethod
+    def _failed_result(image_path: Path, error: Exception) -> ProcessingResult:
+        """処理できなかった画像の結果"""
+        result = ProcessingResult(success=False)
+        result.add_message(f"画像処理エラー: {image_path}: {error}", LogLevel.ERROR)
+        return result
+        
+    def _group_by_output(self, image_files: List[Path]) -> List[List[Path]]:
+        """
+        出力先のファイルが同じになる画像をまとめる
+        
+        PNG→JPG変換では a.png が a.jpg に書き出されるため、同じフォルダの a.jpg と
+        別のワーカーで同時に処理しないよう1つのグループにする（順序は入力順のまま）。
+        """
+        groups: Dict[str, List[Path]] = {}
+        for image_file in image_files:
+            output = image_file
+            if self.options.png_to_jpg and image_file.suffix.lower() == '.png':
+                output = image_file.with_suffix('.jpg')
+            # 大文字小文字を区別しないファイルシステムでも衝突しないよう小文字で比較
+            groups.setdefault(str(output).lower(), []).append(image_file)
+        return list(groups.values())
+        
     def _collect_image_files(self, folder: Path) -> List[Path]:
         """画像ファイルを収集（バックアップフォルダを除外）"""
         image_files = []
@@ -134,7 +285,8 @@ class ImageProcessor:
             if file_path.is_file() and file_path.suffix.lower() in self.VALID_EXTENSIONS:
                 image_files.append(file_path)
                 
-        return image_files
+        # 並列処理でも結果の順序が変わらないようパス順に並べる
+        return sorted(image_files)
         
     def _convert_png_to_jpg(self, png_path: str, result: ProcessingResult) -> str:
         """PNG画像をJPGに変換"""
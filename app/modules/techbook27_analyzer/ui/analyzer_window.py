@@ -31,24 +31,29 @@ class ImageProcessingThread(QThread):
     message_ready = pyqtSignal(str)
     finished_processing = pyqtSignal(bool, str)
     
+    # 停止要求後、処理中の画像の完了を待つ時間（ミリ秒）
+    STOP_TIMEOUT_MS = 10000
+    
     def __init__(self, target: str, options: ProcessingOptions, is_folder: bool):
         super().__init__()
         self.target = target
         self.options = options
         self.is_folder = is_folder
         self._stop_requested = False
+        self.processor = ImageProcessor(self.options)
+        self._progress_decile = 0
         
     def run(self):
         """処理実行"""
         try:
-            processor = ImageProcessor(self.options)
+            processor = self.processor
             
             self.message_ready.emit("画像処理を開始します...")
             self.message_ready.emit(f"対象: {self.target}")
             
             # 処理実行
             if self.is_folder:
-                result = processor.process_folder(self.target)
+                result = processor.process_folder(self.target, progress_callback=self._on_progress)
             else:
                 result = processor.process_image(self.target)
                 
@@ -58,6 +63,12 @@ class ImageProcessingThread(QThread):
                 
             if result.success:
                 summary = f"\n処理完了: {result.processed_count}ファイル処理, {result.error_count}エラー, {result.warning_count}警告"
+                if result.skipped_count:
+                    summary += f", {result.skipped_count}ファイル変更なし"
+                if 'images_per_sec' in result.details:
+                    summary += (f" ({result.details['elapsed_seconds']:.1f}秒, "
+                                f"{result.details['images_per_sec']:.1f}枚/秒, "
+                                f"{result.details['workers']}プロセス)")
                 self.message_ready.emit(summary)
                 self.finished_processing.emit(True, "処理が完了しました")
             else:
@@ -69,11 +80,20 @@ class ImageProcessingThread(QThread):
             self.message_ready.emit(f"エラー: {str(e)}")
             self.finished_processing.emit(False, f"エラー: {str(e)}")
             
+    def _on_progress(self, completed: int, total: int, images_per_sec: float):
+        """進捗表示（10%ごと）"""
+        decile = completed * 10 // total
+        if decile > self._progress_decile:
+            self._progress_decile = decile
+            self.message_ready.emit(f"進捗: {completed}/{total} ({images_per_sec:.1f}枚/秒)")
+            
     def stop(self):
-        """処理停止"""
+        """処理停止（処理中の画像は完了を待ち、応答がなければ強制終了）"""
         self._stop_requested = True
-        self.terminate()
-        self.wait()
+        self.processor.stop()
+        if not self.wait(self.STOP_TIMEOUT_MS):
+            self.terminate()
+            self.wait()
 
 
 class WordProcessingThread(QThread):
@@ -253,7 +273,8 @@ class TechDisposalAnalyzerWindow(BaseWindow):
             'change_resolution': ("指定解像度への変更", True),
             'resize': ("最大画素数でリサイズ", True),
             'backup': ("処理前の自動バックアップ", True),
-            'png_to_jpg': ("PNG→JPG変換", True)
+            'png_to_jpg': ("PNG→JPG変換", True),
+            'skip_unchanged': ("処理済みで変更のない画像をスキップ", True)
         }
         
         self.image_options = {}
@@ -376,7 +397,8 @@ Word文書（.docx）の先頭行を削除します。
             backup=self.image_options.get('backup', QCheckBox()).isChecked() if 'backup' in self.image_options else True,
             png_to_jpg=self.image_options.get('png_to_jpg', QCheckBox()).isChecked() if 'png_to_jpg' in self.image_options else True,
             max_pixels=str(max_pixels),
-            resolution=resolution
+            resolution=resolution,
+            skip_unchanged=self.image_options.get('skip_unchanged', QCheckBox()).isChecked() if 'skip_unchanged' in self.image_options else True
         )
         
         # 処理対象を取得
@@ -10,10 +10,11 @@ import shutil
 import re
 import io
 from pathlib import Path
-from typing import Optional, Tuple, List
+from typing import Callable, Optional, Tuple, List
 from PyQt6.QtCore import QObject, pyqtSignal
 
 from utils.logger import get_logger
+from utils.tracer import traced
 
 # Phase 3-2: DI Container統合によりConfigManager条件分岐import完全解消
 from core.configuration_provider import ConfigurationProvider
@@ -104,6 +105,7 @@ class ApiProcessor(QObject):
         
         return False, None
     
+    @traced("api.upload_zip", "api")
     def upload_zip(self, zip_path: Path) -> Optional[str]:
         """
         ZIPファイルをAPIにアップロード（進捗追跡付き）
@@ -271,6 +273,7 @@ class ApiProcessor(QObject):
         
         return None
     
+    @traced("api.check_status", "api")
     def check_status(self, jobid: str) -> Tuple[Optional[str], Optional[str], Optional[List[str]]]:
         """
         変換ジョブのステータスを確認
@@ -444,6 +447,7 @@ class ApiProcessor(QObject):
         self.log_message.emit("変換処理がタイムアウトしました", "ERROR")
         return None, None, []
     
+    @traced("api.download_file", "api")
     def download_file(self, download_url: str, output_dir: Path) -> Optional[Path]:
         """
         変換済みファイルをダウンロード
@@ -535,25 +539,36 @@ class ApiProcessor(QObject):
         
         self.log_message.emit("================================", "WARNING")
     
-    def process_zip_file(self, zip_path: Path) -> Tuple[bool, Optional[Path], List[str]]:
+    @traced("api.process_zip_file", "api")
+    def process_zip_file(self, zip_path: Optional[Path], jobid: Optional[str] = None,
+                         on_uploaded: Optional[Callable[[str], None]] = None) -> Tuple[bool, Optional[Path], List[str]]:
         """
         ZIPファイルをAPI経由で処理
         
         Args:
-            zip_path: 処理するZIPファイルのパス
+            zip_path: 処理するZIPファイルのパス（jobid指定時は不要）
+            jobid: 送信済みジョブのID（指定時は再アップロードせずステータス確認から再開）
+            on_uploaded: アップロード成功直後にジョブIDを受け取るコールバック
             
         Returns:
             (成功フラグ, ダウンロードしたファイルのパス, 警告メッセージリスト) のタプル
         """
-        self.log_message.emit(f"API処理開始: {zip_path}", "INFO")
-        self.log_message.emit(f"ファイルサイズ: {zip_path.stat().st_size:,} bytes", "DEBUG")
+        if jobid:
+            self.log_message.emit(f"API処理再開: Job ID {jobid}", "INFO")
+        else:
+            self.log_message.emit(f"API処理開始: {zip_path}", "INFO")
+            self.log_message.emit(f"ファイルサイズ: {zip_path.stat().st_size:,} bytes", "DEBUG")
         
         # 一時ディレクトリを作成
         temp_dir = Path(tempfile.mkdtemp())
         self.log_message.emit(f"一時ディレクトリ作成: {temp_dir}", "DEBUG")
         
         try:
-            # 1. アップロード
+            # 1. アップロード（送信済みジョブの再開時はスキップ）
+            if jobid:
+                self.log_message.emit("送信済みジョブのステータス確認から再開します", "INFO")
+                return self._finish_job(jobid, temp_dir)
+            
             self.log_message.emit("アップロード処理を開始...", "INFO")
             jobid = self.upload_zip(zip_path)
             if not jobid:
@@ -566,45 +581,10 @@ class ApiProcessor(QObject):
                 return False, None, ["APIアップロードに失敗しました。メールベースワークフローをお試しください。"]
             
             self.log_message.emit(f"アップロード成功 - Job ID: {jobid}", "INFO")
+            if on_uploaded:
+                on_uploaded(jobid)
             
-            # 2. ステータス確認
-            self.log_message.emit("ステータス確認を開始...", "INFO")
-            result, download_url, messages = self.check_status(jobid)
-            
-            self.log_message.emit(f"ステータス確認結果: result={result}", "INFO")
-            self.log_message.emit(f"ダウンロードURL: {download_url}", "DEBUG")
-            self.log_message.emit(f"メッセージ数: {len(messages) if messages else 0}", "DEBUG")
-            
-            if result == 'failure' or not download_url:
-                # 失敗の場合もエラーダイアログを表示
-                self.log_message.emit(f"処理失敗: result={result}, download_url={download_url}", "ERROR")
-                
-                # サーバーエラーが原因の場合はガイダンスを表示
-                if messages and any("サーバー設定エラー" in str(msg) for msg in messages):
-                    self._show_server_error_guidance("サーバー設定エラー")
-                
-                if messages:
-                    self.log_message.emit(f"エラーメッセージ: {messages[:3]}", "ERROR")
-                    self.log_message.emit(f"エラーダイアログを表示: {len(messages)}件のメッセージ", "ERROR")
-                    self.warning_dialog_needed.emit(messages, 'failure')
-                return False, None, messages
-            
-            # 3. ダウンロード
-            self.log_message.emit("ダウンロード処理を開始...", "INFO")
-            downloaded_file = self.download_file(download_url, temp_dir)
-            if not downloaded_file:
-                self.log_message.emit("download_fileがNoneを返しました", "ERROR")
-                return False, None, ["ファイルのダウンロードに失敗しました"]
-            
-            self.log_message.emit(f"ダウンロード成功: {downloaded_file}", "INFO")
-            
-            # 警告がある場合はダイアログを表示
-            if result == 'partial_success' and messages:
-                self.log_message.emit(f"警告ダイアログを表示: {len(messages)}件のメッセージ", "INFO")
-                self.warning_dialog_needed.emit(messages, 'partial_success')
-            
-            # 成功または一部成功
-            return True, downloaded_file, messages
+            return self._finish_job(jobid, temp_dir)
             
         except Exception as e:
             self.log_message.emit(f"API処理エラー: {str(e)}", "ERROR")
@@ -615,4 +595,54 @@ class ApiProcessor(QObject):
         
         finally:
             # 一時ディレクトリのクリーンアップは呼び出し側で行う
-            self.log_message.emit(f"process_zip_file終了", "DEBUG")
\ No newline at end of file
+            self.log_message.emit(f"process_zip_file終了", "DEBUG")
+    
+    def _finish_job(self, jobid: str, temp_dir: Path) -> Tuple[bool, Optional[Path], List[str]]:
+        """
+        送信済みジョブの完了を待ってダウンロード
+        
+        Args:
+            jobid: ジョブID
+            temp_dir: ダウンロード先ディレクトリ
+            
+        Returns:
+            (成功フラグ, ダウンロードしたファイルのパス, 警告メッセージリスト) のタプル
+        """
+        # 2. ステータス確認
+        self.log_message.emit("ステータス確認を開始...", "INFO")
+        result, download_url, messages = self.check_status(jobid)
+        
+        self.log_message.emit(f"ステータス確認結果: result={result}", "INFO")
+        self.log_message.emit(f"ダウンロードURL: {download_url}", "DEBUG")
+        self.log_message.emit(f"メッセージ数: {len(messages) if messages else 0}", "DEBUG")
+        
+        if result == 'failure' or not download_url:
+            # 失敗の場合もエラーダイアログを表示
+            self.log_message.emit(f"処理失敗: result={result}, download_url={download_url}", "ERROR")
+            
+            # サーバーエラーが原因の場合はガイダンスを表示
+            if messages and any("サーバー設定エラー" in str(msg) for msg in messages):
+                self._show_server_error_guidance("サーバー設定エラー")
+            
+            if messages:
+                self.log_message.emit(f"エラーメッセージ: {messages[:3]}", "ERROR")
+                self.log_message.emit(f"エラーダイアログを表示: {len(messages)}件のメッセージ", "ERROR")
+                self.warning_dialog_needed.emit(messages, 'failure')
+            return False, None, messages
+        
+        # 3. ダウンロード
+        self.log_message.emit("ダウンロード処理を開始...", "INFO")
+        downloaded_file = self.download_file(download_url, temp_dir)
+        if not downloaded_file:
+            self.log_message.emit("download_fileがNoneを返しました", "ERROR")
+            return False, None, ["ファイルのダウンロードに失敗しました"]
+        
+        self.log_message.emit(f"ダウンロード成功: {downloaded_file}", "INFO")
+        
+        # 警告がある場合はダイアログを表示
+        if result == 'partial_success' and messages:
+            self.log_message.emit(f"警告ダイアログを表示: {len(messages)}件のメッセージ", "INFO")
+            self.warning_dialog_needed.emit(messages, 'partial_success')
+        
+        # 成功または一部成功
+        return True, downloaded_file, messages
\ No newline at end of file
@@ -0,0 +1,193 @@
+from __future__ import annotations
+"""N-codeバッチ処理のジャーナル（チェックポイント・再開用）
+
+複数N-codeの一括処理で、各N-codeがどの段階まで進んだか
+（ZIP作成、アップロード済みのジョブID、ダウンロード済みファイル、
+Word処理済みファイル）を逐次チェックポイントに書き出す。
+アプリの異常終了やPCのスリープで中断しても、次回同じN-codeで
+処理を開始したときに完了済みのN-codeを飛ばし、未完了の段階だけをやり直せる。
+"""
+import hashlib
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from core.preflight.state_manager import PreflightStateManager
+from utils.logger import get_logger
+
+
+class BatchJournal:
+    """N-codeバッチの進捗ジャーナル"""
+
+    # 段階（この順に進む）
+    STAGE_PENDING = "pending"
+    STAGE_ZIP_CREATED = "zip_created"
+    STAGE_UPLOADED = "uploaded"
+    STAGE_DOWNLOADED = "downloaded"
+    STAGE_CONVERTED = "converted"
+    STAGE_DONE = "done"
+
+    STAGES = [
+        STAGE_PENDING,
+        STAGE_ZIP_CREATED,
+        STAGE_UPLOADED,
+        STAGE_DOWNLOADED,
+        STAGE_CONVERTED,
+        STAGE_DONE,
+    ]
+
+    CHECKPOINT_PREFIX = "batch_"
+
+    def __init__(self, n_codes: List[str], process_mode: str,
+                 state_manager: Optional[PreflightStateManager] = None,
+                 state: Optional[Dict[str, Any]] = None):
+        """
+        Args:
+            n_codes: バッチのN-codeリスト
+            process_mode: 処理方式
+            state_manager: 状態管理インスタンス
+            state: 復元する状態データ（新規バッチの場合はNone）
+        """
+        self.logger = get_logger(__name__)
+        self.state_manager = state_manager or PreflightStateManager()
+        self.name = self.checkpoint_name(n_codes)
+        self._lock = threading.Lock()
+
+        if state is None:
+            state = {
+                'n_codes': list(n_codes),
+                'process_mode': process_mode,
+                'created_at': datetime.now().isoformat(),
+                'entries': {
+                    n_code: {'stage': self.STAGE_PENDING} for n_code in n_codes
+                },
+            }
+        self.state = state
+
+    @classmethod
+    def checkpoint_name(cls, n_codes: List[str]) -> str:
+        """N-codeの組み合わせからチェックポイント名を決める（順序は問わない）"""
+        key = ",".join(sorted(set(n_codes)))
+        digest = hashlib.sha1(key.encode('utf-8')).hexdigest()[:12]
+        return f"{cls.CHECKPOINT_PREFIX}{digest}"
+
+    @classmethod
+    def find_unfinished(cls, n_codes: List[str], process_mode: str,
+                        state_manager: Optional[PreflightStateManager] = None) -> Optional['BatchJournal']:
+        """
+        同じN-codeの未完了バッチを探す
+
+        Args:
+            n_codes: バッチのN-codeリスト
+            process_mode: 処理方式（異なる方式のジャーナルは再開しない）
+            state_manager: 状態管理インスタンス
+
+        Returns:
+            未完了のジャーナル（なければNone）
+        """
+        state_manager = state_manager or PreflightStateManager()
+        state = state_manager.load_checkpoint(cls.checkpoint_name(n_codes))
+        if not state or state.get('process_mode') != process_mode:
+            return None
+
+        journal = cls(n_codes, process_mode, state_manager, state)
+        if set(journal.state.get('entries', {})) != set(n_codes) or journal.is_finished():
+            return None
+        return journal
+
+    def save(self):
+        """チェックポイントに書き出す"""
+        with self._lock:
+            self.state_manager.save_checkpoint(self.name, self.state)
+
+    def discard(self):
+        """チェックポイントを削除"""
+        self.state_manager.remove_checkpoint(self.name)
+
+    def entry(self, n_code: str) -> Dict[str, Any]:
+        """N-codeの記録（段階と成果物）"""
+        return self.state['entries'].setdefault(n_code, {'stage': self.STAGE_PENDING})
+
+    def stage(self, n_code: str) -> str:
+        """N-codeの現在の段階"""
+        return self.entry(n_code).get('stage', self.STAGE_PENDING)
+
+    def reached(self, n_code: str, stage: str) -> bool:
+        """N-codeが指定段階まで進んでいるか"""
+        return self.STAGES.index(self.stage(n_code)) >= self.STAGES.index(stage)
+
+    def is_done(self, n_code: str) -> bool:
+        """N-codeの処理が完了しているか"""
+        return self.stage(n_code) == self.STAGE_DONE
+
+    def is_finished(self) -> bool:
+        """すべてのN-codeが完了しているか"""
+        return all(self.is_done(n_code) for n_code in self.state['entries'])
+
+    def pending_n_codes(self) -> List[str]:
+        """未完了のN-code（バッチ内の順序）"""
+        return [n_code for n_code in self.state['n_codes'] if not self.is_done(n_code)]
+
+    def advance(self, n_code: str, stage: str, **artifacts: Any):
+        """
+        N-codeの段階を進めて保存
+
+        Args:
+            n_code: N-code
+            stage: 到達した段階
+            **artifacts: 記録する成果物（zip_path, job_id, download_path, filesなど）
+        """
+        entry = self.entry(n_code)
+        entry['stage'] = stage
+        entry['updated_at'] = datetime.now().isoformat()
+        entry.pop('error', None)
+        for key, value in artifacts.items():
+            entry[key] = self._serialize(value)
+        self.save()
+
+    def mark_failed(self, n_code: str, error: str):
+        """
+        N-codeの失敗を記録（段階は据え置き、次回はその段階から再開）
+
+        Args:
+            n_code: N-code
+            error: エラーメッセージ
+        """
+        entry = self.entry(n_code)
+        entry['error'] = error
+        entry['updated_at'] = datetime.now().isoformat()
+        self.save()
+
+    def artifact_path(self, n_code: str, key: str) -> Optional[Path]:
+        """記録済みの成果物パス（ファイルが残っていない場合はNone）"""
+        value = self.entry(n_code).get(key)
+        if not value:
+            return None
+        path = Path(value)
+        return path if path.exists() else None
+
+    def artifact_paths(self, n_code: str, key: str) -> Optional[List[Path]]:
+        """記録済みの成果物パスのリスト（1つでも欠けていればNone）"""
+        values = self.entry(n_code).get(key)
+        if not values:
+            return None
+        paths = [Path(value) for value in values]
+        return paths if all(path.exists() for path in paths) else None
+
+    def summary(self) -> Dict[str, int]:
+        """段階ごとのN-code数"""
+        counts: Dict[str, int] = {}
+        for n_code in self.state['entries']:
+            stage = self.stage(n_code)
+            counts[stage] = counts.get(stage, 0) + 1
+        return counts
+
+    @staticmethod
+    def _serialize(value: Any) -> Any:
+        """JSONに書ける形に変換"""
+        if isinstance(value, Path):
+            return str(value)
+        if isinstance(value, (list, tuple)):
+            return [str(v) if isinstance(v, Path) else v for v in value]
+        return value
@@ -10,6 +10,7 @@ from datetime import datetime, timedelta
 
 from utils.logger import get_logger
 from utils.config import get_config
+from utils.tracer import traced
 
 
 class EmailMonitor:
@@ -59,6 +60,7 @@ class EmailMonitor:
             self.logger.error(f"接続中にエラーが発生: {e}")
             raise
     
+    @traced("email.wait_for_email", "email")
     def wait_for_email(self, subject_pattern: str = "Re:VIEW to 超原稿用紙", 
                       timeout: int = 600, check_interval: int = 10,
                       return_with_filename: bool = False,
@@ -9,6 +9,7 @@ from datetime import datetime, timedelta
 
 from utils.logger import get_logger
 from utils.config import get_config
+from utils.tracer import traced
 from core.email_processors import EmailProcessor, create_email_processor
 
 
@@ -72,6 +73,7 @@ class EmailMonitorEnhanced:
         self.processed_email_ids.clear()
         self.logger.info(f"メール監視開始時刻: {self.monitoring_start_time}")
     
+    @traced("email_enhanced.wait_for_email", "email")
     def wait_for_email(self, subject_pattern: str = "ダウンロード用URLのご案内", 
                       timeout: int = 1200, check_interval: int = 30,
                       file_stem: Optional[str] = None,
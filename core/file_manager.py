@@ -12,6 +12,7 @@ from typing import Optional, List, Dict
 
 from utils.logger import get_logger
 from utils.config import get_config
+from utils.tracer import traced
 from core.git_repository_manager import GitRepositoryManager
 
 
@@ -42,6 +43,7 @@ class FileManager:
             self.logger.warning(f"ConfigManagerからの設定取得に失敗: {e}")
             self.settings_file = Path.home() / ".techzip" / "folder_settings.json"
     
+    @traced("file_manager.find_repository_folder", "file")
     def find_repository_folder(self, repo_name: str, prefer_remote: bool = True) -> Optional[Path]:
         """
         リポジトリフォルダを検索（リモート優先、ローカルフォールバック）
@@ -87,6 +89,7 @@ class FileManager:
         self.logger.warning(f"リポジトリフォルダが見つかりません: {repo_name}")
         return None
     
+    @traced("file_manager.find_work_folder", "file")
     def find_work_folder(self, repo_path: Path) -> Optional[Path]:
         """
         作業フォルダ（.re, config.yml, catalog.ymlを含む）を検索
@@ -155,6 +158,7 @@ class FileManager:
         
         return has_re_file and has_required_files
     
+    @traced("file_manager.create_zip", "file")
     def create_zip(self, folder_path: Path, zip_name: Optional[str] = None) -> Path:
         """
         フォルダをZIP圧縮
@@ -182,6 +186,7 @@ class FileManager:
         self.logger.info(f"ZIP作成完了: {zip_path} (サイズ: {zip_path.stat().st_size:,} bytes)")
         return zip_path
     
+    @traced("file_manager.extract_zip", "file")
     def extract_zip(self, zip_path: Path, target_path: Path) -> List[Path]:
         """
         ZIPファイルを展開
@@ -10,6 +10,7 @@ from urllib.parse import urlparse
 
 from utils.logger import get_logger
 from utils.config import get_config
+from utils.tracer import traced
 
 # ConfigManagerをインポート
 try:
@@ -43,6 +44,7 @@ class GitRepositoryManager:
         
         self.logger.info(f"GitRepositoryManager初期化完了 (キャッシュ: {self.cache_dir})")
     
+    @traced("git.get_repository", "git")
     def get_repository(self, repo_name: str, force_update: bool = False) -> Optional[Path]:
         """
         リポジトリを取得（リモート優先、ローカルフォールバック）
@@ -90,6 +92,7 @@ class GitRepositoryManager:
         # 新規クローンまたは強制更新
         return self._clone_repository(repo_name, cache_path)
     
+    @traced("git.clone", "git")
     def _clone_repository(self, repo_name: str, target_path: Path) -> Optional[Path]:
         """
         リポジトリをクローン
@@ -142,6 +145,7 @@ class GitRepositoryManager:
             self.logger.error(f"クローンエラー: {e}")
             return None
     
+    @traced("git.update", "git")
     def _update_repository(self, repo_path: Path) -> bool:
         """
         既存のリポジトリを更新
@@ -15,6 +15,7 @@ from googleapiclient.errors import HttpError
 
 from utils.logger import get_logger
 from utils.config import get_config
+from utils.tracer import traced
 
 
 class GmailAPIMonitor:
@@ -217,6 +218,7 @@ class GmailAPIMonitor:
         
         return body_text
     
+    @traced("gmail_api.wait_for_email", "email")
     def wait_for_email(self, 
                       subject_pattern: str = "ダウンロード用URLのご案内",
                       since_time: Optional[datetime] = None,
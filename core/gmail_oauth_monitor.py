@@ -18,6 +18,7 @@ from googleapiclient.errors import HttpError
 
 from utils.logger import get_logger
 from utils.config import get_config
+from utils.tracer import traced
 from core.email_processors import EmailProcessor, create_email_processor
 
 
@@ -306,6 +307,7 @@ class GmailOAuthMonitor:
         
         return body_text
     
+    @traced("gmail_oauth.wait_for_email", "email")
     def wait_for_email(self, 
                       subject_pattern: str = "ダウンロード用URLのご案内",
                       timeout: int = 600,
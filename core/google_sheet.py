@@ -12,6 +12,7 @@ from googleapiclient.errors import HttpError
 
 from utils.logger import get_logger
 from utils.config import get_config
+from utils.tracer import traced
 
 
 class GoogleSheetClient:
@@ -58,6 +59,7 @@ class GoogleSheetClient:
             self.logger.error(f"Google Sheets APIの認証に失敗: {e}")
             raise
     
+    @traced("sheet.search_n_code", "sheet")
     def search_n_code(self, n_code: str) -> Optional[Dict[str, Any]]:
         """
         NコードをA列から検索し、該当行の情報を取得
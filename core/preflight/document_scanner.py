@@ -0,0 +1,268 @@
+"""DOCX文書の単一パス・パターン走査エンジン"""
+from __future__ import annotations
+
+import codecs
+import os
+import re
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from utils.logger import get_logger
+
+
+@dataclass(frozen=True)
+class ScanPattern:
+    """走査パターン（リテラル文字列）"""
+    pattern_id: str
+    literal: str
+    # Trueなら大文字小文字を区別する
+    case_sensitive: bool = False
+
+
+@dataclass
+class DocumentScanReport:
+    """1文書の走査結果"""
+    file_path: str
+    member_names: List[str] = field(default_factory=list)
+    # パターンID -> 一致したZIPメンバー名
+    member_hits: Dict[str, List[str]] = field(default_factory=dict)
+    # パターンID -> 一致したXMLパート名
+    content_hits: Dict[str, Set[str]] = field(default_factory=dict)
+    parts_scanned: int = 0
+    bytes_scanned: int = 0
+    error: Optional[str] = None
+
+    def members_matching(self, pattern_id: str) -> List[str]:
+        """指定パターンに一致したZIPメンバー名"""
+        return self.member_hits.get(pattern_id, [])
+
+    def content_matched(self, pattern_id: str, part_name: Optional[str] = None) -> bool:
+        """指定パターンが（指定パートの）本文に出現したか"""
+        parts = self.content_hits.get(pattern_id)
+        if not parts:
+            return False
+        return part_name is None or part_name in parts
+
+
+class MultiPatternMatcher:
+    """複数のリテラルパターンを1本の正規表現にまとめた照合器
+
+    先読み(?=...)で全位置を試すため、重なり合う出現も取りこぼさない。
+    同じ位置から一致するパターン同士は必ず一方が他方の接頭辞になるので、
+    長い順に並べて最長一致を取り、その接頭辞にあたるパターンも一致扱いにする。
+    大文字小文字を区別するパターンと区別しないパターンは別の正規表現にまとめる
+    （接頭辞の判定を同じ比較方法の中で行うため）。
+    """
+
+    def __init__(self, patterns: List[ScanPattern]):
+        self.patterns = list(patterns)
+        self._group_to_ids: Dict[str, Set[str]] = {}
+        self._regexes = []
+        for case_sensitive in (False, True):
+            group_patterns = [p for p in self.patterns if p.case_sensitive == case_sensitive]
+            if group_patterns:
+                self._regexes.append(self._compile(group_patterns, case_sensitive))
+        # チャンク境界をまたぐ一致を拾うために残す文字数
+        self.overlap = max((len(p.literal) for p in self.patterns), default=1) - 1
+
+    def _compile(self, patterns: List[ScanPattern], case_sensitive: bool):
+        """同じ比較方法のパターンを1本の正規表現にまとめる"""
+        def normalize(literal: str) -> str:
+            return literal if case_sensitive else literal.lower()
+
+        ordered = sorted(patterns, key=lambda p: len(p.literal), reverse=True)
+        alternatives = []
+        for pattern in ordered:
+            group = f"p{len(self._group_to_ids)}"
+            literal = normalize(pattern.literal)
+            self._group_to_ids[group] = {
+                other.pattern_id for other in patterns
+                if literal.startswith(normalize(other.literal))
+            }
+            alternatives.append(f"(?P<{group}>{re.escape(pattern.literal)})")
+        flags = 0 if case_sensitive else re.IGNORECASE
+        return re.compile("(?=(?:" + "|".join(alternatives) + "))", flags)
+
+    def __bool__(self) -> bool:
+        return bool(self._regexes)
+
+    def find_ids(self, text: str) -> Set[str]:
+        """テキスト中に出現したパターンIDの集合"""
+        found: Set[str] = set()
+        for regex in self._regexes:
+            for match in regex.finditer(text):
+                found |= self._group_to_ids[match.lastgroup]
+        return found
+
+
+class DocumentScanner:
+    """DOCXを1回だけ開き、メンバー名とXMLパートを全パターンで一括照合する"""
+
+    CHUNK_SIZE = 64 * 1024
+
+    # メンバー名に対する組み込みパターン（詳細セキュリティチェック用）
+    SUSPICIOUS_MEMBER_PATTERNS = [
+        ScanPattern('suspicious:macro', 'macro'),
+        ScanPattern('suspicious:vba', 'vba'),
+        ScanPattern('suspicious:script', 'script'),
+        ScanPattern('suspicious:active', 'active'),
+        ScanPattern('suspicious:ole', 'ole'),
+        ScanPattern('external', 'external'),
+    ]
+
+    # 本文に対する組み込みパターン（メタデータ分析用、タグ名は大文字小文字を区別）
+    METADATA_PATTERNS = [
+        ScanPattern('meta:creator', '<dc:creator>', case_sensitive=True),
+        ScanPattern('meta:unknown', 'unknown'),
+    ]
+
+    CORE_PROPERTIES_PART = 'docProps/core.xml'
+    CUSTOM_PATTERN_PREFIX = 'custom:'
+
+    def __init__(self, custom_patterns: Optional[List[str]] = None,
+                 max_workers: Optional[int] = None):
+        """
+        Args:
+            custom_patterns: ユーザー定義パターン（ファイル名・メンバー名・本文に適用）
+            max_workers: 並列走査数
+        """
+        self.logger = get_logger(__name__)
+        self.custom_patterns = [p for p in (custom_patterns or []) if p]
+        self.max_workers = max_workers or min(8, (os.cpu_count() or 1) + 4)
+
+        custom = [ScanPattern(self.custom_id(p), p) for p in self.custom_patterns]
+        self._member_matcher = MultiPatternMatcher(self.SUSPICIOUS_MEMBER_PATTERNS + custom)
+        self._content_matcher = MultiPatternMatcher(self.METADATA_PATTERNS + custom)
+
+    @classmethod
+    def custom_id(cls, pattern: str) -> str:
+        """カスタムパターンのパターンID"""
+        return f"{cls.CUSTOM_PATTERN_PREFIX}{pattern.lower()}"
+
+    def _should_scan_part(self, name: str) -> bool:
+        """本文走査の対象パートか"""
+        if name == self.CORE_PROPERTIES_PART:
+            return True
+        # カスタムパターンがある場合のみ全XMLパートを読む
+        return bool(self.custom_patterns) and name.endswith(('.xml', '.rels'))
+
+    def scan_file(self, file_path: str) -> DocumentScanReport:
+        """1文書を走査
+
+        Args:
+            file_path: DOCXファイルのパス
+
+        Returns:
+            走査結果
+        """
+        try:
+            with zipfile.ZipFile(file_path, 'r') as zip_file:
+                return self.scan_archive(zip_file, file_path)
+        except Exception as e:
+            return DocumentScanReport(file_path=file_path, error=str(e))
+
+    def scan_archive(self, zip_file: zipfile.ZipFile, file_path: str) -> DocumentScanReport:
+        """開いているDOCXを走査（ファイル検証で開いたアーカイブをそのまま使う）
+
+        Args:
+            zip_file: 開いているZIPアーカイブ
+            file_path: DOCXファイルのパス
+
+        Returns:
+            走査結果（例外は送出せず error に記録する）
+        """
+        report = DocumentScanReport(file_path=file_path)
+        try:
+            infos = zip_file.infolist()
+            report.member_names = [info.filename for info in infos]
+
+            for name in report.member_names:
+                for pattern_id in self._member_matcher.find_ids(name):
+                    report.member_hits.setdefault(pattern_id, []).append(name)
+
+            for info in infos:
+                if info.is_dir() or not self._should_scan_part(info.filename):
+                    continue
+                for pattern_id in self._scan_part(zip_file, info, report):
+                    report.content_hits.setdefault(pattern_id, set()).add(info.filename)
+                report.parts_scanned += 1
+        except Exception as e:
+            report.error = str(e)
+        return report
+
+    def _scan_part(self, zip_file: zipfile.ZipFile, info: zipfile.ZipInfo,
+                   report: DocumentScanReport) -> Set[str]:
+        """XMLパートをチャンク単位で展開しながら照合"""
+        found: Set[str] = set()
+        total_patterns = len({p.pattern_id for p in self._content_matcher.patterns})
+        decoder = codecs.getincrementaldecoder('utf-8')(errors='ignore')
+        tail = ''
+        overlap = self._content_matcher.overlap
+
+        with zip_file.open(info, 'r') as stream:
+            while True:
+                chunk = stream.read(self.CHUNK_SIZE)
+                final = not chunk
+                text = tail + decoder.decode(chunk, final=final)
+                report.bytes_scanned += len(chunk)
+                found |= self._content_matcher.find_ids(text)
+                # 全パターンが見つかったら残りは読まない
+                if final or len(found) == total_patterns:
+                    break
+                tail = text[-overlap:] if overlap else ''
+        return found
+
+    def scan_files(self, file_paths: List[str],
+                   scanned: Optional[Dict[str, DocumentScanReport]] = None) -> Dict[str, DocumentScanReport]:
+        """複数文書を並列に走査
+
+        Args:
+            file_paths: DOCXファイルのパスリスト
+            scanned: 走査済みの結果（ファイル検証中に scan_archive で走査したもの、開き直さない）
+
+        Returns:
+            ファイルパス -> 走査結果（入力順）
+        """
+        unique_paths = list(dict.fromkeys(file_paths))
+        scanned = scanned or {}
+        pending = [path for path in unique_paths if path not in scanned]
+        if len(pending) <= 1:
+            reports = {path: self.scan_file(path) for path in pending}
+        else:
+            workers = min(self.max_workers, len(pending))
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docx-scanner") as executor:
+                reports = dict(zip(pending, executor.map(self.scan_file, pending)))
+        return {path: scanned[path] if path in scanned else reports[path] for path in unique_paths}
+
+    def archive_collector(self, reports: Dict[str, DocumentScanReport]
+                          ) -> Callable[[str, zipfile.ZipFile], None]:
+        """ファイル検証が開いたアーカイブを走査して reports に入れるコールバック
+
+        WordFileValidator.validate_batch(on_archive=...) に渡す。
+        """
+        def collect(file_path: str, zip_file: zipfile.ZipFile) -> None:
+            reports[file_path] = self.scan_archive(zip_file, file_path)
+        return collect
+
+    def filename_hits(self, file_path: str) -> List[str]:
+        """ファイル名に含まれるカスタムパターン（設定順）"""
+        filename = os.path.basename(file_path).lower()
+        return [p for p in self.custom_patterns if p.lower() in filename]
+
+    def content_custom_hits(self, report: DocumentScanReport) -> List[str]:
+        """文書内（メンバー名・本文）に出現したカスタムパターン（設定順）"""
+        hits = []
+        for pattern in self.custom_patterns:
+            pattern_id = self.custom_id(pattern)
+            if report.members_matching(pattern_id) or report.content_matched(pattern_id):
+                hits.append(pattern)
+        return hits
+
+    @staticmethod
+    def summarize(reports: Dict[str, DocumentScanReport]) -> Tuple[int, int]:
+        """(走査したパート数, 展開したバイト数)"""
+        parts = sum(r.parts_scanned for r in reports.values())
+        scanned = sum(r.bytes_scanned for r in reports.values())
+        return parts, scanned
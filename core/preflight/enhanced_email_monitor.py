@@ -241,92 +241,16 @@ class EnhancedEmailMonitor(PreflightEmailResultMonitor):
                     self.logger.warning(f"最大待機時間に達しました: {max_wait_minutes}分")
                     break
                 
-                # 信頼できる送信者からのメールを検索
-                search_criteria = []
-                for sender_domain in self.TRUSTED_SENDERS:
-                    search_criteria.append(f'(FROM "{sender_domain}")')
+                found = self._search_once(job_ids, since_str)
                 
-                search_query = f'(SINCE {since_str}) (OR {" ".join(search_criteria)})'
-                
-                self.logger.debug(f"IMAP検索クエリ: {search_query}")
-                
-                # メール検索実行
-                _, message_ids = self.mail.search(None, search_query)
-                
-                if not message_ids[0]:
-                    self.logger.debug("該当するメールが見つかりません")
+                if found is None:
                     # ConfigManagerから待機時間を取得
-                    wait_time = self.config_manager.get("email.search_retry_interval", 30) if self.config_manager else 30
+                    wait_time = self.search_retry_interval
                     time.sleep(wait_time)  # ConfigManagerから取得した秒数で待機して再検索
                     continue
                 
-                # メッセージIDを処理
-                for msg_id in message_ids[0].split():
-                    msg_id_str = msg_id.decode()
-                    
-                    # 既に処理済みのメッセージはスキップ
-                    if msg_id_str in self._processed_message_ids:
-                        continue
-                    
-                    try:
-                        # メール取得
-                        _, msg_data = self.mail.fetch(msg_id, '(RFC822)')
-                        email_msg = email.message_from_bytes(msg_data[0][1])
-                        
-                        # 送信者チェック
-                        sender = email_msg.get('From', '')
-                        if not self._is_trusted_sender(sender):
-                            self.logger.debug(f"信頼できない送信者をスキップ: {sender}")
-                            continue
-                        
-                        # 件名デコード
-                        subject_raw = email_msg.get('Subject', '')
-                        subject = self._decode_header(subject_raw)
-                        
-                        # 本文取得
-                        body = self._get_email_body(email_msg)
-                        
-                        # ジョブID抽出
-                        extracted_job_id = self._extract_job_id_enhanced(subject, body)
-                        
-                        if extracted_job_id and extracted_job_id in job_ids:
-                            # 受信時刻取得
-                            date_header = email_msg.get('Date')
-                            received_time = parsedate_to_datetime(date_header) if date_header else datetime.now()
-                            
-                            # ダウンロードリンク抽出
-                            download_links = self._extract_download_links(body)
-                            
-                            # メールタイプ分類
-                            is_success, is_error = self._classify_email_type(subject, body)
-                            
-                            # 結果作成
-                            result = EmailSearchResult(
-                                message_id=msg_id_str,
-                                subject=subject,
-                                sender=sender,
-                                received_time=received_time,
-                                job_id=extracted_job_id,
-                                download_links=download_links,
-                                body_text=body[:1000],  # 最初の1000文字のみ
-                                is_success=is_success,
-                                is_error=is_error
-                            )
-                            
-                            results[extracted_job_id] = result
-                            found_job_ids.add(extracted_job_id)
-                            
-                            self.logger.info(
-                                f"結果メール発見: {extracted_job_id} - "
-                                f"{'成功' if is_success else 'エラー' if is_error else '不明'}"
-                            )
-                        
-                        # 処理済みとしてマーク
-                        self._processed_message_ids.add(msg_id_str)
-                        
-                    except Exception as e:
-                        self.logger.error(f"メール処理エラー: {msg_id_str} - {e}")
-                        continue
+                results.update(found)
+                found_job_ids.update(found.keys())
                 
                 # 全て見つかった場合は終了
                 if len(found_job_ids) >= len(job_ids):
@@ -366,6 +290,130 @@ class EnhancedEmailMonitor(PreflightEmailResultMonitor):
         self.logger.info(f"強化版検索完了: {len(found_job_ids)}/{len(job_ids)}件発見")
         return results
     
+    def _search_once(self, job_ids: List[str], since_str: str) -> Optional[Dict[str, EmailSearchResult]]:
+        """IMAPを1回検索して、未処理メールからジョブIDの結果を集める（接続済み前提）
+        
+        Returns:
+            ジョブID -> 検索結果の辞書（該当メールが1通もない場合はNone）
+        """
+        # 信頼できる送信者からのメールを検索
+        search_criteria = []
+        for sender_domain in self.TRUSTED_SENDERS:
+            search_criteria.append(f'(FROM "{sender_domain}")')
+        
+        search_query = f'(SINCE {since_str}) (OR {" ".join(search_criteria)})'
+        
+        self.logger.debug(f"IMAP検索クエリ: {search_query}")
+        
+        # メール検索実行
+        _, message_ids = self.mail.search(None, search_query)
+        
+        if not message_ids[0]:
+            self.logger.debug("該当するメールが見つかりません")
+            return None
+        
+        results: Dict[str, EmailSearchResult] = {}
+        
+        # メッセージIDを処理
+        for msg_id in message_ids[0].split():
+            msg_id_str = msg_id.decode()
+            
+            # 既に処理済みのメッセージはスキップ
+            if msg_id_str in self._processed_message_ids:
+                continue
+            
+            try:
+                # メール取得
+                _, msg_data = self.mail.fetch(msg_id, '(RFC822)')
+                email_msg = email.message_from_bytes(msg_data[0][1])
+                
+                # 送信者チェック
+                sender = email_msg.get('From', '')
+                if not self._is_trusted_sender(sender):
+                    self.logger.debug(f"信頼できない送信者をスキップ: {sender}")
+                    continue
+                
+                # 件名デコード
+                subject_raw = email_msg.get('Subject', '')
+                subject = self._decode_header(subject_raw)
+                
+                # 本文取得
+                body = self._get_email_body(email_msg)
+                
+                # ジョブID抽出
+                extracted_job_id = self._extract_job_id_enhanced(subject, body)
+                
+                if extracted_job_id and extracted_job_id in job_ids:
+                    # 受信時刻取得
+                    date_header = email_msg.get('Date')
+                    received_time = parsedate_to_datetime(date_header) if date_header else datetime.now()
+                    
+                    # ダウンロードリンク抽出
+                    download_links = self._extract_download_links(body)
+                    
+                    # メールタイプ分類
+                    is_success, is_error = self._classify_email_type(subject, body)
+                    
+                    # 結果作成
+                    result = EmailSearchResult(
+                        message_id=msg_id_str,
+                        subject=subject,
+                        sender=sender,
+                        received_time=received_time,
+                        job_id=extracted_job_id,
+                        download_links=download_links,
+                        body_text=body[:1000],  # 最初の1000文字のみ
+                        is_success=is_success,
+                        is_error=is_error
+                    )
+                    
+                    results[extracted_job_id] = result
+                    
+                    self.logger.info(
+                        f"結果メール発見: {extracted_job_id} - "
+                        f"{'成功' if is_success else 'エラー' if is_error else '不明'}"
+                    )
+                
+                # 処理済みとしてマーク
+                self._processed_message_ids.add(msg_id_str)
+                
+            except Exception as e:
+                self.logger.error(f"メール処理エラー: {msg_id_str} - {e}")
+                continue
+        
+        return results
+    
+    @property
+    def search_retry_interval(self) -> float:
+        """結果メールを再検索するまでの待機時間（秒）"""
+        return self.config_manager.get("email.search_retry_interval", 30) if self.config_manager else 30
+    
+    def check_results_once(self, job_ids: List[str],
+                           search_hours: Optional[int] = None) -> Dict[str, EmailSearchResult]:
+        """待機せずに1回だけ結果メールを検索する（パイプラインのポーリング用）
+        
+        Args:
+            job_ids: 検索対象のジョブIDリスト
+            search_hours: 検索範囲（時間）
+            
+        Returns:
+            見つかったジョブID -> 検索結果の辞書
+        """
+        if search_hours is None:
+            search_hours = self.config_manager.get("email.search_hours", 24) if self.config_manager else 24
+        if not job_ids:
+            return {}
+        
+        since_str = (datetime.now() - timedelta(hours=search_hours)).strftime("%d-%b-%Y")
+        try:
+            self.connect()
+            return self._search_once(job_ids, since_str) or {}
+        except Exception as e:
+            self.logger.error(f"結果メール検索エラー: {e}", exc_info=True)
+            return {}
+        finally:
+            self.disconnect()
+    
     def disconnect(self) -> None:
         """IMAP接続を切断"""
         try:
@@ -4,9 +4,15 @@ from __future__ import annotations
 import os
 import zipfile
 import mimetypes
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
-from dataclasses import dataclass
+from typing import Callable, List, Dict, Tuple, Optional
+from dataclasses import dataclass, replace
+
+# 検証で開いたDOCXアーカイブを受け取るコールバック(file_path, zip_file)
+ArchiveCallback = Callable[[str, zipfile.ZipFile], None]
 
 from utils.logger import get_logger
 
@@ -54,6 +60,9 @@ class WordFileValidator:
         self.MAX_FILE_SIZE = self.config_provider.get("validation.max_file_size", 50 * 1024 * 1024)  # デフォルト50MB
         self.MIN_FILE_SIZE = self.config_provider.get("validation.min_file_size", 512)  # デフォルト512 bytes
         
+        # バッチ検証の並列数
+        self.max_workers = self.config_provider.get("validation.batch_workers", min(8, (os.cpu_count() or 1) + 4))
+        
         self.logger.info(f"ファイルサイズ制限: {self.MIN_FILE_SIZE} - {self.MAX_FILE_SIZE:,} bytes")
     
     # 許可されるMIMEタイプ
@@ -79,15 +88,91 @@ class WordFileValidator:
         'https://',
     ]
     
-    def validate_single(self, file_path: str) -> ValidationResult:
+    # DOCX内部の必須ファイル
+    REQUIRED_DOCX_MEMBERS = (
+        '[Content_Types].xml',
+        '_rels/.rels',
+        'word/document.xml'
+    )
+    
+    # ZIPボム判定（展開率・展開後サイズ）
+    ZIP_BOMB_RATIO = 100
+    MAX_UNCOMPRESSED_SIZE = 500 * 1024 * 1024  # 500MB
+    
+    # 検証結果のメモ（(パス, サイズ, 更新時刻, サイズ制限) -> 結果）
+    # 検証ダイアログは呼び出しごとにインスタンスを作り直すためクラス全体で共有する
+    _CACHE_MAX_ENTRIES = 512
+    _result_cache: "OrderedDict[tuple, ValidationResult]" = OrderedDict()
+    _cache_lock = threading.Lock()
+    
+    def _cache_key(self, file_path: str) -> Optional[tuple]:
+        """メモ用キーを生成（ファイルが存在しない場合はNone）"""
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (os.path.abspath(file_path), stat.st_size, stat.st_mtime_ns,
+                self.MIN_FILE_SIZE, self.MAX_FILE_SIZE)
+    
+    @classmethod
+    def _get_cached(cls, key: Optional[tuple], file_path: str) -> Optional[ValidationResult]:
+        """メモ済みの検証結果を取得"""
+        if key is None:
+            return None
+        with cls._cache_lock:
+            cached = cls._result_cache.get(key)
+            if cached is None:
+                return None
+            cls._result_cache.move_to_end(key)
+        # 呼び出し側がリストを書き換えてもメモが汚れないようコピーを返す
+        return replace(cached, file_path=file_path,
+                       issues=list(cached.issues), warnings=list(cached.warnings))
+    
+    @classmethod
+    def _store_cached(cls, key: Optional[tuple], result: ValidationResult) -> None:
+        """検証結果をメモ"""
+        if key is None:
+            return
+        with cls._cache_lock:
+            cls._result_cache[key] = replace(result, issues=list(result.issues),
+                                             warnings=list(result.warnings))
+            cls._result_cache.move_to_end(key)
+            while len(cls._result_cache) > cls._CACHE_MAX_ENTRIES:
+                cls._result_cache.popitem(last=False)
+    
+    @classmethod
+    def clear_cache(cls) -> None:
+        """検証結果のメモをクリア"""
+        with cls._cache_lock:
+            cls._result_cache.clear()
+    
+    def validate_single(self, file_path: str,
+                        on_archive: Optional[ArchiveCallback] = None) -> ValidationResult:
         """単一ファイルの検証
         
         Args:
             file_path: 検証対象のファイルパス
+            on_archive: 内部構造に問題のない.docxを開いている間に呼ばれるコールバック
+                (file_path, zip_file)（メモ済みの結果を返す場合は呼ばれない）
             
         Returns:
             検証結果
         """
+        cache_key = self._cache_key(file_path)
+        cached = self._get_cached(cache_key, file_path)
+        if cached is not None:
+            self.logger.debug(f"ファイル検証（メモ済み）: {file_path}")
+            return cached
+        
+        result = self._validate_single_impl(file_path, on_archive)
+        # ファイルが検証中に変更されていなければメモする
+        if result.file_size and self._cache_key(file_path) == cache_key:
+            self._store_cached(cache_key, result)
+        return result
+    
+    def _validate_single_impl(self, file_path: str,
+                              on_archive: Optional[ArchiveCallback] = None) -> ValidationResult:
+        """validate_singleの実装（メモなし）"""
         issues = []
         warnings = []
         
@@ -137,7 +222,7 @@ class WordFileValidator:
             
             # Word文書の内部構造検証（.docxのみ）
             if file_extension == '.docx' and len(issues) == 0:
-                docx_issues, docx_warnings = self._validate_docx_structure(file_path)
+                docx_issues, docx_warnings = self._validate_docx_structure(file_path, on_archive)
                 issues.extend(docx_issues)
                 warnings.extend(docx_warnings)
             
@@ -176,11 +261,13 @@ class WordFileValidator:
                 warnings=warnings
             )
     
-    def _validate_docx_structure(self, file_path: str) -> Tuple[List[str], List[str]]:
+    def _validate_docx_structure(self, file_path: str,
+                                 on_archive: Optional[ArchiveCallback] = None) -> Tuple[List[str], List[str]]:
         """DOCX形式の内部構造を検証
         
         Args:
             file_path: DOCXファイルのパス
+            on_archive: 問題がなければ、開いているアーカイブを渡すコールバック
             
         Returns:
             (issues, warnings)のタプル
@@ -189,44 +276,60 @@ class WordFileValidator:
         warnings = []
         
         try:
+            compressed_size = os.path.getsize(file_path)
+            ratio_limit = compressed_size * self.ZIP_BOMB_RATIO
+            
             with zipfile.ZipFile(file_path, 'r') as zip_file:
-                # 必須ファイルの存在確認
-                required_files = [
-                    '[Content_Types].xml',
-                    '_rels/.rels',
-                    'word/document.xml'
-                ]
-                
-                zip_namelist = zip_file.namelist()
+                found_required = set()
+                has_macro = False
+                has_embeddings = False
+                total_uncompressed_size = 0
+                size_check_done = False
                 
-                for required_file in required_files:
-                    if required_file not in zip_namelist:
-                        issues.append(f"必須ファイルが不足: {required_file}")
-                
-                # 危険なファイルの検出
-                dangerous_files = []
-                for file_name in zip_namelist:
+                # 中央ディレクトリを1回だけ走査して全項目を確認
+                for info in zip_file.infolist():
+                    file_name = info.filename
+                    if file_name in self.REQUIRED_DOCX_MEMBERS:
+                        found_required.add(file_name)
+                    
                     # マクロファイルの検出
                     if file_name.startswith('word/vbaProject'):
-                        warnings.append("VBAマクロが含まれています")
+                        has_macro = True
                     
                     # 外部参照の検出
                     if file_name.startswith('word/embeddings/'):
-                        warnings.append("埋め込みオブジェクトが含まれています")
+                        has_embeddings = True
                     
                     # 危険なパスの検出
                     if '../' in file_name or '..\\' in file_name:
                         issues.append(f"危険なファイルパス: {file_name}")
+                    
+                    # ZIPボム検証（展開サイズ確認）: 両方の閾値を超えた時点で集計を打ち切る
+                    if not size_check_done:
+                        total_uncompressed_size += info.file_size
+                        if (total_uncompressed_size > ratio_limit and
+                                total_uncompressed_size > self.MAX_UNCOMPRESSED_SIZE):
+                            size_check_done = True
+                
+                for required_file in self.REQUIRED_DOCX_MEMBERS:
+                    if required_file not in found_required:
+                        issues.append(f"必須ファイルが不足: {required_file}")
                 
-                # ZIPボム検証（展開サイズ確認）
-                total_uncompressed_size = sum(info.file_size for info in zip_file.infolist())
-                compressed_size = os.path.getsize(file_path)
+                if has_macro:
+                    warnings.append("VBAマクロが含まれています")
+                if has_embeddings:
+                    warnings.append("埋め込みオブジェクトが含まれています")
                 
-                if total_uncompressed_size > compressed_size * 100:  # 100倍以上の展開率
-                    warnings.append(f"高い圧縮率を検出: {total_uncompressed_size/compressed_size:.1f}倍")
+                size_note = "以上" if size_check_done else ""
+                if total_uncompressed_size > ratio_limit:  # 100倍以上の展開率
+                    warnings.append(f"高い圧縮率を検出: {total_uncompressed_size/compressed_size:.1f}倍{size_note}")
                 
-                if total_uncompressed_size > 500 * 1024 * 1024:  # 500MB
-                    warnings.append(f"展開後サイズが大きい: {total_uncompressed_size:,} bytes")
+                if total_uncompressed_size > self.MAX_UNCOMPRESSED_SIZE:  # 500MB
+                    warnings.append(f"展開後サイズが大きい: {total_uncompressed_size:,} bytes{size_note}")
+                
+                # 内容の走査などを開き直さずに行う
+                if on_archive is not None and not issues:
+                    on_archive(file_path, zip_file)
                 
         except zipfile.BadZipFile:
             issues.append("不正なZIPファイル形式")
@@ -235,22 +338,44 @@ class WordFileValidator:
         
         return issues, warnings
     
-    def validate_batch(self, file_paths: List[str]) -> Dict[str, ValidationResult]:
-        """複数ファイルの一括検証
+    def validate_batch(self, file_paths: List[str],
+                       on_result: Optional[Callable[[str, ValidationResult], None]] = None,
+                       max_workers: Optional[int] = None,
+                       on_archive: Optional[ArchiveCallback] = None) -> Dict[str, ValidationResult]:
+        """複数ファイルの一括検証（スレッドプールで並列実行）
         
         Args:
             file_paths: 検証対象のファイルパスリスト
+            on_result: 1ファイルの検証が終わるたびに呼ばれるコールバック(file_path, result)
+            max_workers: 並列数（省略時は設定値）
+            on_archive: 内部構造に問題のない.docxを開いている間に呼ばれるコールバック
+                (file_path, zip_file)（ワーカースレッドから呼ばれる）
             
         Returns:
-            ファイルパス -> 検証結果の辞書
+            ファイルパス -> 検証結果の辞書（入力順）
         """
-        results = {}
+        results: Dict[str, ValidationResult] = {}
+        unique_paths = list(dict.fromkeys(file_paths))
+        total = len(unique_paths)
         
-        self.logger.info(f"バッチ検証開始: {len(file_paths)}ファイル")
+        self.logger.info(f"バッチ検証開始: {total}ファイル")
         
-        for i, file_path in enumerate(file_paths, 1):
-            self.logger.info(f"検証中 ({i}/{len(file_paths)}): {file_path}")
-            results[file_path] = self.validate_single(file_path)
+        workers = max(1, min(max_workers or self.max_workers, total or 1))
+        if workers == 1:
+            for i, file_path in enumerate(unique_paths, 1):
+                self.logger.info(f"検証中 ({i}/{total}): {file_path}")
+                results[file_path] = self._notify(on_result, file_path,
+                                                  self.validate_single(file_path, on_archive))
+        else:
+            completed: Dict[str, ValidationResult] = {}
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="docx-validator") as executor:
+                futures = {executor.submit(self.validate_single, path, on_archive): path
+                           for path in unique_paths}
+                for done, future in enumerate(as_completed(futures), 1):
+                    file_path = futures[future]
+                    self.logger.info(f"検証完了 ({done}/{total}): {file_path}")
+                    completed[file_path] = self._notify(on_result, file_path, future.result())
+            results = {path: completed[path] for path in unique_paths}
         
         # 統計情報のログ出力
         valid_count = sum(1 for result in results.values() if result.is_valid)
@@ -263,6 +388,16 @@ class WordFileValidator:
         
         return results
     
+    def _notify(self, on_result: Optional[Callable[[str, ValidationResult], None]],
+                file_path: str, result: ValidationResult) -> ValidationResult:
+        """検証結果コールバックを呼び出す（コールバックの例外は検証結果に影響させない）"""
+        if on_result is not None:
+            try:
+                on_result(file_path, result)
+            except Exception as e:
+                self.logger.error(f"検証結果コールバックエラー: {e}")
+        return result
+    
     def get_validation_summary(self, results: Dict[str, ValidationResult]) -> Dict[str, any]:
         """検証結果のサマリーを生成
         
@@ -11,6 +11,7 @@ from collections import deque, defaultdict
 from contextlib import contextmanager
 
 from utils.logger import get_logger
+from utils.tracer import span
 
 # Configuration Provider統合
 from core.configuration_provider import ConfigurationProvider
@@ -366,10 +367,11 @@ class PerformanceMonitor:
     
     @contextmanager
     def measure_operation(self, operation_name: str = "operation"):
-        """操作実行時間測定"""
+        """操作実行時間測定（トレース有効時はスパンとしても記録）"""
         start_time = time.time()
         try:
-            yield
+            with span(operation_name, "preflight"):
+                yield
         finally:
             execution_time = time.time() - start_time
             self._operation_times.append(execution_time)
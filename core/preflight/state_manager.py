@@ -2,6 +2,7 @@
 from __future__ import annotations
 
 import json
+import os
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 from datetime import datetime
@@ -105,6 +106,76 @@ class PreflightStateManager:
         except Exception as e:
             self.logger.error(f"チェックポイント作成エラー: {e}")
             
+    def save_checkpoint(self, name: str, state: Dict[str, Any]) -> Optional[Path]:
+        """固定名のチェックポイントを上書き保存（処理中に繰り返し更新する用途）
+        
+        create_checkpointと同じ形式で書き出すため、list_checkpointsにも表示される。
+        一時ファイルに書いてから置き換えるので、途中でクラッシュしても壊れない。
+        
+        Args:
+            name: チェックポイント名
+            state: 保存する状態データ
+            
+        Returns:
+            チェックポイントファイルのパス（失敗時はNone）
+        """
+        checkpoint_file = self._checkpoint_path(name)
+        try:
+            state['checkpoint_name'] = name
+            state['checkpoint_time'] = datetime.now().isoformat()
+            
+            tmp_file = checkpoint_file.with_suffix('.json.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(state, f, ensure_ascii=False, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_file, checkpoint_file)
+            return checkpoint_file
+            
+        except Exception as e:
+            self.logger.error(f"チェックポイント保存エラー: {e}")
+            return None
+            
+    def load_checkpoint(self, name: str) -> Optional[Dict[str, Any]]:
+        """固定名のチェックポイントを読み込み
+        
+        Args:
+            name: チェックポイント名
+            
+        Returns:
+            状態データ（存在しない場合はNone）
+        """
+        checkpoint_file = self._checkpoint_path(name)
+        try:
+            if not checkpoint_file.exists():
+                return None
+                
+            with open(checkpoint_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+                
+        except Exception as e:
+            self.logger.error(f"チェックポイント読み込みエラー: {e}")
+            return None
+            
+    def remove_checkpoint(self, name: str):
+        """固定名のチェックポイントを削除
+        
+        Args:
+            name: チェックポイント名
+        """
+        try:
+            checkpoint_file = self._checkpoint_path(name)
+            if checkpoint_file.exists():
+                checkpoint_file.unlink()
+                self.logger.info(f"チェックポイントを削除: {checkpoint_file.name}")
+                
+        except Exception as e:
+            self.logger.error(f"チェックポイント削除エラー: {e}")
+            
+    def _checkpoint_path(self, name: str) -> Path:
+        """固定名チェックポイントのファイルパス"""
+        return self.state_dir / f"checkpoint_{name}.json"
+            
     def list_checkpoints(self) -> List[Dict[str, str]]:
         """利用可能なチェックポイントをリスト
         
@@ -22,6 +22,9 @@ from utils.logger import get_logger
 class PreflightManager:
     """統合Pre-flight管理システム"""
     
+    # パイプライン段間キューの上限（バックプレッシャー）
+    PIPELINE_QUEUE_SIZE = 4
+    
     def __init__(self, config_path: Optional[str] = None):
         self.logger = get_logger(__name__)
         
@@ -37,6 +40,7 @@ class PreflightManager:
         # 実行状態
         self._is_running = False
         self._executor = ThreadPoolExecutor(max_workers=4)
+        self._pipeline_tasks: List[asyncio.Future] = []
         
         # 統計情報
         self._session_start_time = datetime.now()
@@ -119,6 +123,11 @@ class PreflightManager:
     ) -> Dict[str, str]:
         """非同期ファイル処理
         
+        検証・送信・結果監視の3段をasyncio.Queueでつないだパイプラインで実行する。
+        ブロッキング処理（検証、HTTP送信、IMAP検索）はすべてエグゼキューターで動かすため、
+        ファイルk+1の検証、ファイルkの送信、送信済みジョブの結果監視が並行して進む。
+        キューは上限付きなので、送信が詰まれば検証も待機する（バックプレッシャー）。
+        
         Args:
             file_paths: 処理対象ファイルパスのリスト
             email: 通知メールアドレス
@@ -140,27 +149,45 @@ class PreflightManager:
                 job_state = self.job_manager.create_job(job_id, file_path, email, priority)
                 file_to_job[file_path] = job_id
             
-            # 検証フェーズ
-            await self._validate_files_async(file_to_job, verification_mode)
+            submit_queue: asyncio.Queue = asyncio.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
+            monitor_queue: asyncio.Queue = asyncio.Queue(maxsize=self.PIPELINE_QUEUE_SIZE)
             
-            # 送信フェーズ（有効なファイルのみ）
-            valid_jobs = {}
-            for file_path, job_id in file_to_job.items():
-                job_state = self.job_manager.get_job(job_id)
-                if job_state and job_state.status != JobStatus.FAILED:
-                    valid_jobs[file_path] = job_id
+            stages = [
+                asyncio.ensure_future(self._validate_files_async(file_to_job, verification_mode, submit_queue)),
+                asyncio.ensure_future(self._submit_files_async(submit_queue, monitor_queue, email)),
+                asyncio.ensure_future(self._monitor_results_async(monitor_queue)),
+            ]
+            self._pipeline_tasks.extend(stages)
             
-            if valid_jobs:
-                await self._submit_files_async(valid_jobs, email)
-                
-                # 結果監視フェーズ
-                await self._monitor_results_async(list(valid_jobs.values()))
+            try:
+                await asyncio.gather(*stages)
+            except BaseException:
+                # いずれかの段が失敗・キャンセルされたら残りの段も止める
+                for stage in stages:
+                    stage.cancel()
+                await asyncio.gather(*stages, return_exceptions=True)
+                raise
+            finally:
+                for stage in stages:
+                    if stage in self._pipeline_tasks:
+                        self._pipeline_tasks.remove(stage)
             
             self._total_files_processed += len(file_paths)
             return file_to_job
     
-    async def _validate_files_async(self, file_to_job: Dict[str, str], mode: VerificationMode) -> None:
-        """非同期ファイル検証"""
+    def _is_cancelled(self, job_id: str) -> bool:
+        """ジョブがキャンセル済みか"""
+        job_state = self.job_manager.get_job(job_id)
+        return job_state is None or job_state.status == JobStatus.CANCELLED
+    
+    async def _run_blocking(self, func: Callable, *args):
+        """ブロッキング処理をエグゼキューターで実行"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    async def _validate_files_async(self, file_to_job: Dict[str, str], mode: VerificationMode,
+                                    submit_queue: asyncio.Queue) -> None:
+        """検証段: 全ファイルを1回のバッチで検証し、結果が出た順に有効なものを送信キューへ流す"""
         self.logger.info(f"検証開始: {len(file_to_job)}ファイル, モード: {mode.value}")
         
         # 検証設定取得
@@ -177,63 +204,111 @@ class PreflightManager:
                 progress=0, phase="検証開始"
             )
         
-        # パフォーマンス監視更新
-        self.performance_monitor.update_custom_metric('pending_validations', len(file_to_job))
+        targets = [file_path for file_path, job_id in file_to_job.items() if not self._is_cancelled(job_id)]
+        counts = {'valid': 0, 'invalid': 0}
+        handled = set()
+        self.performance_monitor.update_custom_metric('pending_validations', len(targets))
         
-        # 検証実行（非同期）
-        loop = asyncio.get_event_loop()
-        verification_result = await loop.run_in_executor(
-            self._executor, 
-            strategy.execute, 
-            list(file_to_job.keys())
-        )
+        # 検証スレッドから届いた結果をイベントループ側のキューに移す
+        loop = asyncio.get_running_loop()
+        result_queue: asyncio.Queue = asyncio.Queue()
+        
+        def on_result(file_path: str, file_result: ValidationResult) -> None:
+            loop.call_soon_threadsafe(result_queue.put_nowait, (file_path, file_result))
         
-        # 結果をジョブに反映
-        for file_path, job_id in file_to_job.items():
-            file_result = verification_result.file_results.get(file_path)
+        batch = asyncio.ensure_future(self._run_blocking(strategy.execute, targets, on_result))
+        
+        try:
+            while not (batch.done() and result_queue.empty()):
+                getter = asyncio.ensure_future(result_queue.get())
+                await asyncio.wait({getter, batch}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                
+                file_path, file_result = getter.result()
+                if file_path in handled or file_path not in file_to_job:
+                    continue
+                handled.add(file_path)
+                self.performance_monitor.update_custom_metric('pending_validations', len(targets) - len(handled))
+                # 送信段が詰まっている間はここで待機する
+                await self._handle_validation_result(file_path, file_to_job[file_path], file_result,
+                                                     submit_queue, counts)
             
-            if file_result and file_result.is_valid:
-                self.job_manager.update_job_status(
-                    job_id, JobStatus.SUBMITTING,
-                    progress=50, phase="検証完了",
-                    validation_result=file_result.to_dict() if hasattr(file_result, 'to_dict') else None
-                )
-            else:
-                error_msg = ', '.join(file_result.issues) if file_result else "検証失敗"
-                self.job_manager.update_job_status(
-                    job_id, JobStatus.FAILED,
-                    progress=0, phase="検証失敗",
-                    error_message=error_msg
-                )
+            # コールバックで届かなかったファイル（戦略の例外時など）はバッチ結果で判定
+            try:
+                file_results = batch.result().file_results
+            except Exception as e:
+                self.logger.error(f"検証エラー: {e}")
+                file_results = {}
+            for file_path in targets:
+                if file_path not in handled:
+                    await self._handle_validation_result(file_path, file_to_job[file_path],
+                                                         file_results.get(file_path), submit_queue, counts)
+        finally:
+            if not batch.done():
+                batch.cancel()
+            self.performance_monitor.update_custom_metric('pending_validations', 0)
         
-        self.performance_monitor.update_custom_metric('pending_validations', 0)
-        self.logger.info(f"検証完了: 有効{verification_result.valid_files}, 無効{verification_result.invalid_files}")
+        # 終了を後段に通知
+        await submit_queue.put(None)
+        self.logger.info(f"検証完了: 有効{counts['valid']}, 無効{counts['invalid']}")
     
-    async def _submit_files_async(self, valid_jobs: Dict[str, str], email: str) -> None:
-        """非同期ファイル送信"""
-        self.logger.info(f"送信開始: {len(valid_jobs)}ファイル")
+    async def _handle_validation_result(self, file_path: str, job_id: str,
+                                        file_result: Optional[ValidationResult],
+                                        submit_queue: asyncio.Queue, counts: Dict[str, int]) -> None:
+        """1ファイルの検証結果をジョブに反映し、有効なら送信キューへ流す"""
+        if self._is_cancelled(job_id):
+            return
         
-        scraper = self._ensure_scraper()
+        if file_result and file_result.is_valid:
+            counts['valid'] += 1
+            self.job_manager.update_job_status(
+                job_id, JobStatus.SUBMITTING,
+                progress=50, phase="検証完了",
+                validation_result=file_result.to_dict() if hasattr(file_result, 'to_dict') else None
+            )
+            await submit_queue.put((file_path, job_id))
+        else:
+            counts['invalid'] += 1
+            error_msg = ', '.join(file_result.issues) if file_result else "検証失敗"
+            self.job_manager.update_job_status(
+                job_id, JobStatus.FAILED,
+                progress=0, phase="検証失敗",
+                error_message=error_msg
+            )
+    
+    async def _submit_files_async(self, submit_queue: asyncio.Queue,
+                                  monitor_queue: asyncio.Queue, email: str) -> None:
+        """送信段: 検証済みファイルを順に送信し、サーバージョブIDを監視キューへ流す"""
+        self.logger.info("送信開始")
         
-        # 送信実行
-        loop = asyncio.get_event_loop()
-        job_ids = await loop.run_in_executor(
-            self._executor,
-            scraper.submit_batch,
-            list(valid_jobs.keys()),
-            email
-        )
+        scraper = self._ensure_scraper()
+        success_count = 0
         
-        # 結果をジョブに反映
-        for i, (file_path, job_id) in enumerate(valid_jobs.items()):
-            server_job_id = job_ids[i] if i < len(job_ids) and job_ids[i] else None
+        while True:
+            item = await submit_queue.get()
+            if item is None:
+                break
+            
+            file_path, job_id = item
+            if self._is_cancelled(job_id):
+                continue
+            
+            # 送信実行（レート制限の待機もエグゼキューター側で行う）
+            server_job_id = await self._run_blocking(scraper.submit_one, file_path, email)
+            
+            if self._is_cancelled(job_id):
+                continue
             
             if server_job_id:
+                success_count += 1
                 self.job_manager.update_job_status(
                     job_id, JobStatus.SUBMITTED,
                     progress=75, phase="送信完了",
                     server_job_id=server_job_id
                 )
+                await monitor_queue.put(job_id)
             else:
                 self.job_manager.update_job_status(
                     job_id, JobStatus.FAILED,
@@ -241,71 +316,120 @@ class PreflightManager:
                     error_message="サーバー送信失敗"
                 )
         
-        self.logger.info(f"送信完了: {len([j for j in job_ids if j])}件成功")
+        await monitor_queue.put(None)
+        self.logger.info(f"送信完了: {success_count}件成功")
     
-    async def _monitor_results_async(self, job_ids: List[str]) -> None:
-        """非同期結果監視"""
-        self.logger.info(f"結果監視開始: {len(job_ids)}ジョブ")
+    async def _monitor_results_async(self, monitor_queue: asyncio.Queue) -> None:
+        """結果監視段: 送信済みジョブの結果メールを定期的に検索する"""
+        self.logger.info("結果監視開始")
         
-        email_monitor = self._ensure_email_monitor()
         monitoring_config = self.config_manager.get_monitoring_config()
-        
-        # サーバージョブIDを取得
-        server_job_ids = []
-        job_id_mapping = {}
-        
-        for job_id in job_ids:
-            job_state = self.job_manager.get_job(job_id)
-            if job_state and job_state.server_job_id:
-                server_job_ids.append(job_state.server_job_id)
-                job_id_mapping[job_state.server_job_id] = job_id
+        max_wait_seconds = monitoring_config.max_wait_minutes * 60
+        
+        # サーバージョブID -> (ジョブID, 監視開始時刻)
+        pending: Dict[str, tuple] = {}
+        submissions_done = False
+        email_monitor: Optional[EnhancedEmailMonitor] = None
+        
+        while not submissions_done or pending:
+            # 監視対象がなければ次の送信完了を待つ
+            if not pending and not submissions_done:
+                item = await monitor_queue.get()
+                if item is None:
+                    submissions_done = True
+                    continue
+                self._add_monitored_job(item, pending)
+            
+            # 待機中に届いた送信完了をまとめて取り込む
+            while not monitor_queue.empty():
+                item = monitor_queue.get_nowait()
+                if item is None:
+                    submissions_done = True
+                else:
+                    self._add_monitored_job(item, pending)
+            
+            # キャンセルされたジョブは監視対象から外す
+            for server_job_id, (job_id, _) in list(pending.items()):
+                if self._is_cancelled(job_id):
+                    del pending[server_job_id]
+            if not pending:
+                continue
+            
+            if email_monitor is None:
+                email_monitor = self._ensure_email_monitor()
+                # 再検索の間隔（従来の一括検索と同じ設定値、既定30秒）
+                poll_interval = email_monitor.search_retry_interval
+            
+            # 結果監視実行（1回分のIMAP検索）
+            search_results = await self._run_blocking(
+                email_monitor.check_results_once,
+                list(pending.keys()),
+                monitoring_config.search_hours
+            )
+            
+            # 結果をジョブに反映
+            for server_job_id, email_result in search_results.items():
+                entry = pending.pop(server_job_id, None)
+                if not entry or self._is_cancelled(entry[0]):
+                    continue
+                job_id = entry[0]
                 
-                # 処理中ステータスに更新
-                self.job_manager.update_job_status(
-                    job_id, JobStatus.PROCESSING,
-                    progress=80, phase="サーバー処理中"
-                )
+                if email_result.is_success and email_result.download_links:
+                    self.job_manager.update_job_status(
+                        job_id, JobStatus.COMPLETED,
+                        progress=100, phase="処理完了",
+                        download_links=email_result.download_links
+                    )
+                elif email_result.is_error:
+                    self.job_manager.update_job_status(
+                        job_id, JobStatus.FAILED,
+                        progress=0, phase="サーバーエラー",
+                        error_message="サーバー側処理エラー"
+                    )
+                else:
+                    self.job_manager.update_job_status(
+                        job_id, JobStatus.TIMEOUT,
+                        progress=80, phase="タイムアウト",
+                        error_message="結果取得タイムアウト"
+                    )
+            
+            # 最大待機時間を超えたジョブはタイムアウト
+            now = time.time()
+            for server_job_id, (job_id, started_at) in list(pending.items()):
+                if now - started_at >= max_wait_seconds:
+                    del pending[server_job_id]
+                    self.job_manager.update_job_status(
+                        job_id, JobStatus.TIMEOUT,
+                        progress=80, phase="タイムアウト",
+                        error_message="結果取得タイムアウト"
+                    )
+            
+            if pending:
+                # 次の検索まで待機（新しい送信完了が来たら早めに起きる）
+                try:
+                    item = await asyncio.wait_for(monitor_queue.get(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    continue
+                if item is None:
+                    submissions_done = True
+                else:
+                    self._add_monitored_job(item, pending)
         
-        if not server_job_ids:
-            self.logger.warning("監視対象のサーバージョブIDがありません")
+        self.logger.info("結果監視完了")
+    
+    def _add_monitored_job(self, job_id: str, pending: Dict[str, tuple]) -> None:
+        """送信済みジョブを監視対象に追加"""
+        job_state = self.job_manager.get_job(job_id)
+        if not job_state or not job_state.server_job_id or self._is_cancelled(job_id):
             return
         
-        # 結果監視実行
-        loop = asyncio.get_event_loop()
-        search_results = await loop.run_in_executor(
-            self._executor,
-            email_monitor.search_results_enhanced,
-            server_job_ids,
-            monitoring_config.search_hours,
-            monitoring_config.max_wait_minutes
-        )
+        pending[job_state.server_job_id] = (job_id, time.time())
         
-        # 結果をジョブに反映
-        for server_job_id, email_result in search_results.items():
-            job_id = job_id_mapping.get(server_job_id)
-            if not job_id:
-                continue
-            
-            if email_result.is_success and email_result.download_links:
-                self.job_manager.update_job_status(
-                    job_id, JobStatus.COMPLETED,
-                    progress=100, phase="処理完了",
-                    download_links=email_result.download_links
-                )
-            elif email_result.is_error:
-                self.job_manager.update_job_status(
-                    job_id, JobStatus.FAILED,
-                    progress=0, phase="サーバーエラー",
-                    error_message="サーバー側処理エラー"
-                )
-            else:
-                self.job_manager.update_job_status(
-                    job_id, JobStatus.TIMEOUT,
-                    progress=80, phase="タイムアウト",
-                    error_message="結果取得タイムアウト"
-                )
-        
-        self.logger.info("結果監視完了")
+        # 処理中ステータスに更新
+        self.job_manager.update_job_status(
+            job_id, JobStatus.PROCESSING,
+            progress=80, phase="サーバー処理中"
+        )
     
     def process_files_sync(
         self,
@@ -384,9 +508,18 @@ class PreflightManager:
         }
     
     def cancel_job(self, job_id: str) -> bool:
-        """ジョブキャンセル"""
+        """ジョブキャンセル
+        
+        実行中のパイプラインは各段の区切りでキャンセル状態を確認し、
+        以降の検証・送信・監視を行わない。
+        """
         return self.job_manager.cancel_job(job_id)
     
+    def cancel_all(self) -> None:
+        """実行中のパイプラインをすべて停止"""
+        for task in list(self._pipeline_tasks):
+            task.cancel()
+    
     def retry_job(self, job_id: str) -> bool:
         """ジョブ再試行"""
         return self.job_manager.retry_job(job_id)
@@ -396,6 +529,9 @@ class PreflightManager:
         self.logger.info("リソースクリーンアップ開始")
         
         try:
+            # 実行中のパイプライン停止
+            self.cancel_all()
+            
             # パフォーマンス監視停止
             self.performance_monitor.stop_monitoring()
             
@@ -2,11 +2,15 @@
 from __future__ import annotations
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Optional, Any
-from dataclasses import dataclass
+from typing import Callable, List, Dict, Optional, Any
+from dataclasses import dataclass, field
 from enum import Enum
 
 from .file_validator import ValidationResult
+from .document_scanner import DocumentScanner, DocumentScanReport
+
+# 1ファイルの検証が終わるたびに呼ばれるコールバック(file_path, result)
+ResultCallback = Callable[[str, ValidationResult], None]
 
 # ConfigManagerをインポート
 try:
@@ -65,6 +69,8 @@ class VerificationResult:
     warnings: List[str]
     statistics: Dict[str, Any]
     execution_time_seconds: float
+    # 段階ごとの処理時間（秒）: file_validation / content_scan など
+    timings: Dict[str, float] = field(default_factory=dict)
     
     @property
     def total_files(self) -> int:
@@ -91,11 +97,14 @@ class VerificationStrategy(ABC):
         self.name = self.__class__.__name__
     
     @abstractmethod
-    def execute(self, file_paths: List[str]) -> VerificationResult:
+    def execute(self, file_paths: List[str],
+                on_result: Optional[ResultCallback] = None) -> VerificationResult:
         """検証を実行
         
         Args:
             file_paths: 検証対象のファイルパスリスト
+            on_result: ファイル単位の検証結果が出るたびに呼ばれるコールバック
+                （検証スレッドから呼ばれる。内容走査の結果は含まない）
             
         Returns:
             検証結果
@@ -107,6 +116,15 @@ class VerificationStrategy(ABC):
         """戦略の説明を返す"""
         pass
     
+    @staticmethod
+    def _notify(on_result: Optional[ResultCallback], file_path: str, result: ValidationResult) -> None:
+        """ファイル単位の検証結果を通知（コールバックの例外は検証結果に影響させない）"""
+        if on_result is not None:
+            try:
+                on_result(file_path, result)
+            except Exception:
+                pass
+    
     def _create_base_result(self, file_paths: List[str], execution_time: float) -> VerificationResult:
         """基本的な結果オブジェクトを作成"""
         return VerificationResult(
@@ -123,7 +141,8 @@ class VerificationStrategy(ABC):
 class QuickVerificationStrategy(VerificationStrategy):
     """高速検証戦略 - 基本チェックのみ"""
     
-    def execute(self, file_paths: List[str]) -> VerificationResult:
+    def execute(self, file_paths: List[str],
+                on_result: Optional[ResultCallback] = None) -> VerificationResult:
         import time
         from .file_validator import WordFileValidator
         
@@ -181,6 +200,8 @@ class QuickVerificationStrategy(VerificationStrategy):
                     issues=[f"検証エラー: {str(e)}"],
                     warnings=[]
                 )
+            
+            self._notify(on_result, file_path, file_results[file_path])
         
         execution_time = time.time() - start_time
         
@@ -194,7 +215,11 @@ class QuickVerificationStrategy(VerificationStrategy):
                 'total_files': len(file_paths),
                 'processing_time_per_file': execution_time / len(file_paths) if file_paths else 0
             },
-            execution_time_seconds=execution_time
+            execution_time_seconds=execution_time,
+            timings={
+                'file_validation': execution_time,
+                'total': execution_time
+            }
         )
     
     def get_description(self) -> str:
@@ -204,7 +229,8 @@ class QuickVerificationStrategy(VerificationStrategy):
 class StandardVerificationStrategy(VerificationStrategy):
     """標準検証戦略 - 通常の全チェック"""
     
-    def execute(self, file_paths: List[str]) -> VerificationResult:
+    def execute(self, file_paths: List[str],
+                on_result: Optional[ResultCallback] = None) -> VerificationResult:
         import time
         from .file_validator import WordFileValidator
         
@@ -212,7 +238,7 @@ class StandardVerificationStrategy(VerificationStrategy):
         validator = WordFileValidator(self.config.config_manager)
         
         # 通常の検証を実行
-        file_results = validator.validate_batch(file_paths)
+        file_results = validator.validate_batch(file_paths, on_result=on_result)
         security_issues = []
         warnings = []
         
@@ -233,7 +259,11 @@ class StandardVerificationStrategy(VerificationStrategy):
             security_issues=security_issues,
             warnings=warnings,
             statistics=summary,
-            execution_time_seconds=execution_time
+            execution_time_seconds=execution_time,
+            timings={
+                'file_validation': execution_time,
+                'total': execution_time
+            }
         )
     
     def get_description(self) -> str:
@@ -243,7 +273,8 @@ class StandardVerificationStrategy(VerificationStrategy):
 class ThoroughVerificationStrategy(VerificationStrategy):
     """徹底検証戦略 - 詳細セキュリティチェック含む"""
     
-    def execute(self, file_paths: List[str]) -> VerificationResult:
+    def execute(self, file_paths: List[str],
+                on_result: Optional[ResultCallback] = None) -> VerificationResult:
         import time
         from .file_validator import WordFileValidator
         
@@ -251,14 +282,27 @@ class ThoroughVerificationStrategy(VerificationStrategy):
         validator = WordFileValidator(self.config.config_manager)
         
         # 標準検証 + 追加セキュリティチェック
-        file_results = validator.validate_batch(file_paths)
+        # （検証で開いた.docxはそのまま走査する。メモ済みの検証結果のファイルだけ後で開く）
+        scanner = DocumentScanner()
+        archive_reports = {}
+        file_results = validator.validate_batch(file_paths, on_result=on_result,
+                                                on_archive=scanner.archive_collector(archive_reports))
+        validation_time = time.time() - start_time
         security_issues = []
         warnings = []
         
-        # 追加のセキュリティ分析
+        # 追加のセキュリティ分析（有効な.docxの走査結果）
+        scan_start = time.time()
+        scan_targets = [
+            file_path for file_path, result in file_results.items()
+            if result.is_valid and file_path.endswith('.docx')
+        ]
+        scan_reports = scanner.scan_files(scan_targets, scanned=archive_reports)
+        scan_time = time.time() - scan_start
+        
         for file_path, result in file_results.items():
-            if result.is_valid and file_path.endswith('.docx'):
-                additional_issues = self._perform_deep_security_check(file_path)
+            if file_path in scan_reports:
+                additional_issues = self._perform_deep_security_check(scan_reports[file_path])
                 security_issues.extend(additional_issues)
             
             # 既存の問題を分類
@@ -270,12 +314,15 @@ class ThoroughVerificationStrategy(VerificationStrategy):
         
         execution_time = time.time() - start_time
         summary = validator.get_validation_summary(file_results)
+        parts_scanned, bytes_scanned = DocumentScanner.summarize(scan_reports)
         
         # 統計に詳細情報を追加
         summary.update({
             'deep_security_checks': len(file_paths),
             'security_issues_found': len(security_issues),
-            'warnings_total': len(warnings)
+            'warnings_total': len(warnings),
+            'parts_scanned': parts_scanned,
+            'bytes_scanned': bytes_scanned
         })
         
         return VerificationResult(
@@ -285,50 +332,48 @@ class ThoroughVerificationStrategy(VerificationStrategy):
             security_issues=security_issues,
             warnings=warnings,
             statistics=summary,
-            execution_time_seconds=execution_time
+            execution_time_seconds=execution_time,
+            timings={
+                'file_validation': validation_time,
+                'content_scan': scan_time,
+                'total': execution_time
+            }
         )
     
-    def _perform_deep_security_check(self, file_path: str) -> List[str]:
-        """詳細セキュリティチェックを実行"""
+    def _perform_deep_security_check(self, report: DocumentScanReport) -> List[str]:
+        """詳細セキュリティチェックを実行（走査結果から問題を組み立てる）"""
         issues = []
         
-        try:
-            import zipfile
-            from pathlib import Path
-            
-            with zipfile.ZipFile(file_path, 'r') as zip_file:
-                namelist = zip_file.namelist()
-                
-                # 詳細なファイル分析
-                suspicious_files = [
-                    name for name in namelist 
-                    if any(pattern in name.lower() for pattern in [
-                        'macro', 'vba', 'script', 'active', 'ole'
-                    ])
-                ]
-                
-                if suspicious_files:
-                    issues.append(f"疑わしいファイル検出: {', '.join(suspicious_files[:3])}")
-                
-                # メタデータ分析
-                try:
-                    doc_props = zip_file.read('docProps/core.xml').decode('utf-8', errors='ignore')
-                    if '<dc:creator>' in doc_props and 'unknown' not in doc_props.lower():
-                        issues.append("作成者情報が含まれています（プライバシー注意）")
-                except:
-                    pass
-                
-                # 外部参照チェック
-                external_refs = [
-                    name for name in namelist
-                    if name.startswith('word/embeddings/') or 'external' in name.lower()
-                ]
-                
-                if external_refs:
-                    issues.append(f"外部参照検出: {len(external_refs)}件")
-                    
-        except Exception as e:
-            issues.append(f"詳細分析エラー: {str(e)}")
+        if report.error is not None:
+            issues.append(f"詳細分析エラー: {report.error}")
+            return issues
+        
+        # 詳細なファイル分析
+        suspicious_ids = [p.pattern_id for p in DocumentScanner.SUSPICIOUS_MEMBER_PATTERNS
+                          if p.pattern_id.startswith('suspicious:')]
+        suspicious_files = [
+            name for name in report.member_names
+            if any(name in report.members_matching(pattern_id) for pattern_id in suspicious_ids)
+        ]
+        
+        if suspicious_files:
+            issues.append(f"疑わしいファイル検出: {', '.join(suspicious_files[:3])}")
+        
+        # メタデータ分析
+        core_part = DocumentScanner.CORE_PROPERTIES_PART
+        if (report.content_matched('meta:creator', core_part) and
+                not report.content_matched('meta:unknown', core_part)):
+            issues.append("作成者情報が含まれています（プライバシー注意）")
+        
+        # 外部参照チェック
+        external_names = set(report.members_matching('external'))
+        external_refs = [
+            name for name in report.member_names
+            if name.startswith('word/embeddings/') or name in external_names
+        ]
+        
+        if external_refs:
+            issues.append(f"外部参照検出: {len(external_refs)}件")
         
         return issues
     
@@ -339,25 +384,46 @@ class ThoroughVerificationStrategy(VerificationStrategy):
 class CustomVerificationStrategy(VerificationStrategy):
     """カスタム検証戦略 - ユーザー定義ルール"""
     
-    def execute(self, file_paths: List[str]) -> VerificationResult:
+    def execute(self, file_paths: List[str],
+                on_result: Optional[ResultCallback] = None) -> VerificationResult:
         import time
         from .file_validator import WordFileValidator
         
         start_time = time.time()
         validator = WordFileValidator(self.config.config_manager)
         
-        # 基本検証を実行
-        file_results = validator.validate_batch(file_paths)
+        # 基本検証を実行（カスタムパターンがあれば、検証で開いた.docxの内容もそのまま照合）
+        scanner = DocumentScanner(self.config.custom_patterns)
+        archive_reports = {}
+        on_archive = scanner.archive_collector(archive_reports) if self.config.custom_patterns else None
+        file_results = validator.validate_batch(file_paths, on_result=on_result, on_archive=on_archive)
+        validation_time = time.time() - start_time
         security_issues = []
         warnings = []
         
         # カスタムパターンによる追加チェック
+        scan_start = time.time()
+        scan_reports = {}
+        if self.config.custom_patterns:
+            scan_targets = [
+                file_path for file_path, result in file_results.items()
+                if result.is_valid and file_path.endswith('.docx')
+            ]
+            scan_reports = scanner.scan_files(scan_targets, scanned=archive_reports)
+        scan_time = time.time() - scan_start
+        
         for file_path, result in file_results.items():
-            custom_issues = self._apply_custom_patterns(file_path, result)
+            custom_issues = self._apply_custom_patterns(file_path, result, scanner,
+                                                        scan_reports.get(file_path))
             security_issues.extend(custom_issues)
         
         execution_time = time.time() - start_time
         summary = validator.get_validation_summary(file_results)
+        parts_scanned, bytes_scanned = DocumentScanner.summarize(scan_reports)
+        summary.update({
+            'parts_scanned': parts_scanned,
+            'bytes_scanned': bytes_scanned
+        })
         
         return VerificationResult(
             success=all(result.is_valid for result in file_results.values()),
@@ -366,20 +432,31 @@ class CustomVerificationStrategy(VerificationStrategy):
             security_issues=security_issues,
             warnings=warnings,
             statistics=summary,
-            execution_time_seconds=execution_time
+            execution_time_seconds=execution_time,
+            timings={
+                'file_validation': validation_time,
+                'content_scan': scan_time,
+                'total': execution_time
+            }
         )
     
-    def _apply_custom_patterns(self, file_path: str, result: ValidationResult) -> List[str]:
+    def _apply_custom_patterns(self, file_path: str, result: ValidationResult,
+                               scanner: DocumentScanner,
+                               report: Optional[DocumentScanReport] = None) -> List[str]:
         """カスタムパターンを適用"""
         issues = []
         
         # ファイル名パターンチェック
-        from pathlib import Path
-        filename = Path(file_path).name.lower()
+        for pattern in scanner.filename_hits(file_path):
+            issues.append(f"カスタムパターン検出: {pattern}")
         
-        for pattern in self.config.custom_patterns:
-            if pattern.lower() in filename:
-                issues.append(f"カスタムパターン検出: {pattern}")
+        # 文書内パターンチェック
+        if report is not None:
+            if report.error is not None:
+                issues.append(f"カスタムパターン分析エラー: {report.error}")
+            else:
+                for pattern in scanner.content_custom_hits(report):
+                    issues.append(f"カスタムパターン検出（文書内）: {pattern}")
         
         return issues
     
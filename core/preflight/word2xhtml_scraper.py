@@ -150,21 +150,29 @@ class Word2XhtmlScrapingVerifier(PreflightVerifier):
         for i, file_path in enumerate(file_paths):
             self.logger.info(f"送信中 ({i+1}/{len(file_paths)}): {file_path}")
             
-            # レート制限
-            if i > 0:  # 最初のファイルは待機不要
-                self.rate_limiter.wait_if_needed()
-            
-            # ファイル送信
-            job_id = self._submit_single(file_path, email)
-            if job_id:
-                job_ids.append(job_id)
-                self.job_file_mapping[job_id] = file_path
-            else:
-                # 失敗した場合も空のIDを追加（順序を保つため）
-                job_ids.append("")
+            # 失敗した場合も空のIDを追加（順序を保つため）
+            job_ids.append(self.submit_one(file_path, email) or "")
                 
         return job_ids
     
+    def submit_one(self, file_path: str, email: str) -> Optional[str]:
+        """レート制限を守って1ファイルを送信（パイプライン処理用）
+        
+        Args:
+            file_path: Wordファイルのパス
+            email: メールアドレス
+            
+        Returns:
+            ジョブID（失敗時はNone）
+        """
+        # レート制限（前回送信から最小間隔が経過するまで待機）
+        self.rate_limiter.wait_if_needed()
+        
+        job_id = self._submit_single(file_path, email)
+        if job_id:
+            self.job_file_mapping[job_id] = file_path
+        return job_id
+    
     def check_all_status(self, job_ids: List[str]) -> Dict[str, Tuple[str, Optional[str]]]:
         """全ジョブのステータスを確認
         
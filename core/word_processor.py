@@ -7,6 +7,7 @@ from typing import List, Optional
 import docx
 
 from utils.logger import get_logger
+from utils.tracer import traced
 from core.di_container import inject
 from core.configuration_provider import ConfigurationProvider
 
@@ -25,6 +26,7 @@ class WordProcessor:
         self.logger = get_logger(__name__)
         self.config_provider = config_provider
     
+    @traced("word.process_word_files", "word")
     def process_word_files(self, folder_path: Path) -> int:
         """
         フォルダ内のすべてのWordファイルを処理
@@ -121,6 +123,7 @@ class WordProcessor:
         
         return word_files
     
+    @traced("word.process_zip_file", "word")
     def process_zip_file(self, zip_path: Path, temp_dir: Optional[Path] = None) -> List[Path]:
         """
         ZIPファイルからWordファイルを抽出し、1行目を削除
@@ -10,8 +10,10 @@ from PyQt6.QtCore import QObject, pyqtSignal, pyqtSlot
 from core.google_sheet import GoogleSheetClient
 from core.file_manager import FileManager
 from core.word_processor import WordProcessor
+from core.batch_journal import BatchJournal
 from utils.logger import get_logger
 from utils.config import get_config
+from utils.tracer import span, trace_context, traced
 
 
 class WorkflowProcessor(QObject):
@@ -254,6 +256,10 @@ class WorkflowOrchestrator(QObject):
         self.file_placement_result = None
         self.selected_work_folder = None
         self.folder_selection_completed = False
+        self.resume_confirmed = None
+        
+        # 実行中バッチのジャーナル（中断からの再開用）
+        self.batch_journal: Optional[BatchJournal] = None
         
         # 処理エンジンのシグナルを転送
         self._connect_processing_engine_signals()
@@ -276,16 +282,34 @@ class WorkflowOrchestrator(QObject):
         total = len(n_codes)
         self.emit_log(f"処理開始: {total}個のN-code", "INFO")
         
+        journal = self._prepare_batch_journal(n_codes)
+        self.batch_journal = journal
+        
         for idx, n_code in enumerate(n_codes):
             self.emit_status(f"処理中: {n_code} ({idx + 1}/{total})")
             self.emit_progress(int((idx / total) * 100))
             
+            if journal and journal.is_done(n_code):
+                self.emit_log(f"スキップ: {n_code} は前回の処理で完了済みです", "INFO")
+                continue
+            
             try:
                 self.process_single_n_code(n_code)
                 self.emit_log(f"✓ {n_code} の処理が完了しました", "INFO")
             except Exception as e:
                 self.emit_log(f"✗ {n_code} の処理に失敗: {str(e)}", "ERROR")
                 self.logger.error(f"処理エラー {n_code}: {e}", exc_info=True)
+                if journal:
+                    journal.mark_failed(n_code, str(e))
+        
+        # 全件完了したらジャーナルは不要（失敗が残る場合は次回再開用に残す）
+        if journal:
+            if journal.is_finished():
+                journal.discard()
+            else:
+                self.emit_log(f"未完了のN-codeがあります。同じN-codeで再実行すると続きから再開できます: "
+                              f"{', '.join(journal.pending_n_codes())}", "WARNING")
+        self.batch_journal = None
         
         self.emit_progress(100)
         self.emit_status("すべての処理が完了しました")
@@ -298,8 +322,93 @@ class WorkflowOrchestrator(QObject):
         Args:
             n_code: 処理するN-code
         """
+        # 以降の各段階のスパンにN-codeを付与してトレース
+        with trace_context(n_code), span("workflow.process_single_n_code"):
+            self._process_single_n_code_impl(n_code)
+    
+    def _process_single_n_code_impl(self, n_code: str):
+        """process_single_n_codeの実装"""
         self.logger.info(f"N-code処理開始: {n_code}")
+        journal = self.batch_journal
+        
+        def advance(stage: str, **artifacts):
+            if journal:
+                journal.advance(n_code, stage, **artifacts)
+        
+        # 1-5. 変換処理（前回変換済みのファイルが残っていればそれを使う）
+        processed_files = None
+        if journal and journal.reached(n_code, BatchJournal.STAGE_CONVERTED):
+            processed_files = journal.artifact_paths(n_code, 'files')
+            if processed_files:
+                self.emit_log(f"前回変換済みのファイルを使用: {len(processed_files)}個", "INFO")
+        
+        if not processed_files:
+            conversion_result = self._run_conversion(n_code, advance)
+            if not conversion_result['success']:
+                raise ValueError(f"変換処理に失敗: {conversion_result['error']}")
+            processed_files = conversion_result['files']
+            advance(BatchJournal.STAGE_CONVERTED, files=processed_files)
+        
+        # 6. ファイル配置確認（インタラクティブ）
+        placement_result = self._handle_file_placement_interactive(n_code, processed_files)
+        if not placement_result:
+            raise ValueError("ファイル配置がキャンセルされました")
         
+        advance(BatchJournal.STAGE_DONE)
+        self.emit_log(f"✓ {n_code} の処理が完了しました", "INFO")
+    
+    def _run_conversion(self, n_code: str, advance: Callable[..., None]) -> Dict[str, Any]:
+        """
+        変換処理（ジャーナルに記録済みの段階は飛ばす）
+        
+        Args:
+            n_code: N-code
+            advance: 段階到達時のコールバック
+            
+        Returns:
+            変換結果
+        """
+        journal = self.batch_journal
+        zip_path = None
+        
+        if journal:
+            # ダウンロード済みなら展開から
+            if journal.reached(n_code, BatchJournal.STAGE_DOWNLOADED):
+                download_path = journal.artifact_path(n_code, 'download_path')
+                if download_path:
+                    self.emit_log(f"前回ダウンロード済みのファイルから再開: {download_path.name}", "INFO")
+                    return self.processing_engine.process_downloaded_zip(download_path)
+            
+            # 送信済みのジョブがあれば再アップロードせずステータス確認から
+            job_id = journal.entry(n_code).get('job_id')
+            if (job_id and journal.reached(n_code, BatchJournal.STAGE_UPLOADED)
+                    and self.config_manager.get_process_mode() == "api"):
+                self.emit_log(f"送信済みジョブに再接続: {job_id}", "INFO")
+                result = self.processing_engine.execute_conversion(None, jobid=job_id, on_stage=advance)
+                if result['success']:
+                    return result
+                self.emit_log("送信済みジョブの再開に失敗したため、再アップロードします", "WARNING")
+            
+            if journal.reached(n_code, BatchJournal.STAGE_ZIP_CREATED):
+                zip_path = journal.artifact_path(n_code, 'zip_path')
+        
+        if not zip_path:
+            zip_path = self._create_work_zip_for(n_code)
+            advance(BatchJournal.STAGE_ZIP_CREATED, zip_path=zip_path)
+        
+        # 5. 変換処理実行
+        return self.processing_engine.execute_conversion(zip_path, on_stage=advance)
+    
+    def _create_work_zip_for(self, n_code: str) -> Path:
+        """
+        N-codeの作業フォルダを特定してZIPを作成
+        
+        Args:
+            n_code: N-code
+            
+        Returns:
+            作成されたZIPファイルのパス
+        """
         # 1. リポジトリ情報取得
         repo_info = self.processing_engine.get_repository_info(n_code)
         if not repo_info:
@@ -325,19 +434,60 @@ class WorkflowOrchestrator(QObject):
                 raise ValueError("作業フォルダが選択されませんでした")
         
         # 4. ZIPファイル作成
-        zip_path = self.processing_engine.create_work_zip(work_folder)
+        return self.processing_engine.create_work_zip(work_folder)
+    
+    def _prepare_batch_journal(self, n_codes: List[str]) -> Optional[BatchJournal]:
+        """
+        バッチのジャーナルを用意（同じN-codeの未完了バッチがあれば再開を確認）
         
-        # 5. 変換処理実行
-        conversion_result = self.processing_engine.execute_conversion(zip_path)
-        if not conversion_result['success']:
-            raise ValueError(f"変換処理に失敗: {conversion_result['error']}")
+        Args:
+            n_codes: 処理するN-codeのリスト
+            
+        Returns:
+            ジャーナル（用意できない場合はNone、その場合も処理自体は続行）
+        """
+        process_mode = self.config_manager.get_process_mode()
+        try:
+            journal = BatchJournal.find_unfinished(n_codes, process_mode)
+            if journal:
+                if self._confirm_resume(journal):
+                    self.emit_log(f"前回の続きから再開します（残り{len(journal.pending_n_codes())}件）", "INFO")
+                    return journal
+                journal.discard()
+            
+            journal = BatchJournal(n_codes, process_mode)
+            journal.save()
+            return journal
+        except Exception as e:
+            self.logger.warning(f"バッチジャーナルを利用できません: {e}")
+            return None
+    
+    def _confirm_resume(self, journal: BatchJournal) -> bool:
+        """
+        中断したバッチを再開するか確認
         
-        # 6. ファイル配置確認（インタラクティブ）
-        placement_result = self._handle_file_placement_interactive(n_code, conversion_result['files'])
-        if not placement_result:
-            raise ValueError("ファイル配置がキャンセルされました")
+        Args:
+            journal: 未完了のジャーナル
+            
+        Returns:
+            再開する場合True（応答がない場合も二重送信を避けるため再開する）
+        """
+        total = len(journal.state['n_codes'])
+        remaining = journal.pending_n_codes()
+        message = (
+            f"前回中断したバッチが見つかりました（完了 {total - len(remaining)}/{total}件）。\n\n"
+            f"未完了: {', '.join(remaining)}\n\n"
+            f"完了済みのN-codeを飛ばし、送信済みのジョブはアップロードせずに続きから再開しますか？"
+        )
         
-        self.emit_log(f"✓ {n_code} の処理が完了しました", "INFO")
+        self.resume_confirmed = None
+        self.confirmation_needed.emit("処理の再開", message, self.on_resume_confirmed)
+        self._wait_for_dialog_result('resume_confirmed', 60)
+        
+        if self.resume_confirmed is None:
+            self.emit_log("再開確認の応答がないため、前回の続きから再開します", "WARNING")
+            return True
+        return self.resume_confirmed
     
     def _select_work_folder_interactive(self, repo_path: Path, repo_name: str) -> Optional[Path]:
         """
@@ -443,6 +593,9 @@ class WorkflowOrchestrator(QObject):
             elif result_attribute == 'file_placement_result' and self.file_placement_result is not None:
                 self.emit_log(f"ダイアログ応答受信: {result_attribute}", "INFO")
                 break
+            elif result_attribute == 'resume_confirmed' and self.resume_confirmed is not None:
+                self.emit_log(f"ダイアログ応答受信: {result_attribute}", "INFO")
+                break
             
             time.sleep(0.1)
             QCoreApplication.processEvents()
@@ -461,6 +614,10 @@ class WorkflowOrchestrator(QObject):
         self.file_placement_result = selected_files
         self.emit_log(f"ファイル配置確認結果: {len(selected_files)}個のファイルを選択", "INFO")
     
+    def on_resume_confirmed(self, resume: bool):
+        """中断バッチ再開確認の結果を受信"""
+        self.resume_confirmed = bool(resume)
+    
     def emit_log(self, message: str, level: str = "INFO"):
         """ログメッセージを送信"""
         import logging
@@ -655,6 +812,7 @@ class ProcessingEngine(QObject):
             # 最後のフォールバック: エラーを上位に伝播
             raise AttributeError(f"api_processor property failed: {prop_error}") from prop_error
     
+    @traced("engine.get_repository_info")
     def get_repository_info(self, n_code: str) -> Optional[Dict[str, str]]:
         """
         GoogleシートからN-codeのリポジトリ情報を取得
@@ -668,6 +826,7 @@ class ProcessingEngine(QObject):
         self.emit_log(f"Googleシートから {n_code} を検索中...", "INFO")
         return self.google_client.search_n_code(n_code)
     
+    @traced("engine.find_repository_folder")
     def find_repository_folder(self, repo_name: str) -> Optional[Path]:
         """
         リポジトリフォルダを検索
@@ -694,6 +853,7 @@ class ProcessingEngine(QObject):
         """
         return self.file_manager.find_work_folder_interactive(repo_path, repo_name)
     
+    @traced("engine.create_work_zip")
     def create_work_zip(self, work_folder: Path) -> Path:
         """
         作業フォルダからZIPファイルを作成
@@ -707,12 +867,16 @@ class ProcessingEngine(QObject):
         self.emit_log("ZIPファイルを作成中...", "INFO")
         return self.file_manager.create_zip(work_folder)
     
-    def execute_conversion(self, zip_path: Path) -> Dict[str, Any]:
+    @traced("engine.execute_conversion")
+    def execute_conversion(self, zip_path: Optional[Path], jobid: Optional[str] = None,
+                           on_stage: Optional[Callable[..., None]] = None) -> Dict[str, Any]:
         """
         変換処理を実行（処理方式に応じて分岐）
         
         Args:
-            zip_path: 変換対象ZIPファイルパス
+            zip_path: 変換対象ZIPファイルパス（jobid指定時は不要）
+            jobid: 送信済みジョブのID（API方式の再開用）
+            on_stage: 段階到達時のコールバック on_stage(stage, **artifacts)
             
         Returns:
             変換結果
@@ -726,17 +890,40 @@ class ProcessingEngine(QObject):
         process_mode = self.config_manager.get_process_mode()
         self.logger.info(f"変換処理開始: {process_mode}方式")
         
+        on_stage = on_stage or (lambda stage, **artifacts: None)
         if process_mode == "api":
-            return self._execute_api_conversion(zip_path)
+            return self._execute_api_conversion(zip_path, jobid, on_stage)
         else:
-            return self._execute_traditional_conversion(zip_path)
+            return self._execute_traditional_conversion(zip_path, on_stage)
+    
+    def process_downloaded_zip(self, download_path: Path) -> Dict[str, Any]:
+        """
+        ダウンロード済みの変換結果ZIPを処理（展開 + 1行目削除）
+        
+        Args:
+            download_path: 変換結果ZIPファイルパス
+            
+        Returns:
+            変換結果（execute_conversionと同じ形式）
+        """
+        processed_files = self.word_processor.process_zip_file(download_path)
+        return {
+            'success': True,
+            'files': processed_files,
+            'error': '',
+            'warnings': []
+        }
     
-    def _execute_api_conversion(self, zip_path: Path) -> Dict[str, Any]:
+    def _execute_api_conversion(self, zip_path: Optional[Path], jobid: Optional[str],
+                                on_stage: Callable[..., None]) -> Dict[str, Any]:
         """API方式での変換処理（Enhanced Debug対応）"""
         self.emit_log("API方式で変換処理を開始...", "INFO")
-        self.logger.info(f"[API_CONVERSION] ZIP path: {zip_path}")
-        self.logger.info(f"[API_CONVERSION] ZIP exists: {zip_path.exists()}")
-        self.logger.info(f"[API_CONVERSION] ZIP size: {zip_path.stat().st_size if zip_path.exists() else 'N/A'} bytes")
+        if jobid:
+            self.logger.info(f"[API_CONVERSION] Resume job: {jobid}")
+        else:
+            self.logger.info(f"[API_CONVERSION] ZIP path: {zip_path}")
+            self.logger.info(f"[API_CONVERSION] ZIP exists: {zip_path.exists()}")
+            self.logger.info(f"[API_CONVERSION] ZIP size: {zip_path.stat().st_size if zip_path.exists() else 'N/A'} bytes")
         
         try:
             # APIプロセッサーのインスタンス化を確認（Enhanced Debug）
@@ -756,7 +943,11 @@ class ProcessingEngine(QObject):
             
             # API処理実行
             self.logger.info("[API_CONVERSION] Starting ZIP file processing...")
-            success, download_path, warnings = api_proc.process_zip_file(zip_path)
+            success, download_path, warnings = api_proc.process_zip_file(
+                zip_path,
+                jobid=jobid,
+                on_uploaded=lambda uploaded_jobid: on_stage("uploaded", job_id=uploaded_jobid)
+            )
             self.logger.info(f"[API_CONVERSION] Processing result - success: {success}, download_path: {download_path}")
             if warnings:
                 self.logger.info(f"[API_CONVERSION] Warnings ({len(warnings)}): {warnings[:3]}...")  # 最初の3つのみログ
@@ -795,6 +986,8 @@ class ProcessingEngine(QObject):
                     'warnings': warnings or []
                 }
             
+            on_stage("downloaded", download_path=download_path)
+            
             # ZIPファイルを処理（展開 + 1行目削除）
             processed_files = self.word_processor.process_zip_file(download_path)
             
@@ -852,7 +1045,7 @@ class ProcessingEngine(QObject):
                 'warnings': []
             }
     
-    def _execute_traditional_conversion(self, zip_path: Path) -> Dict[str, Any]:
+    def _execute_traditional_conversion(self, zip_path: Path, on_stage: Callable[..., None]) -> Dict[str, Any]:
         """従来方式/Gmail API方式での変換処理"""
         process_mode = self.config_manager.get_process_mode()
         mode_text = "Gmail API方式" if process_mode == "gmail_api" else "従来方式"
@@ -923,6 +1116,8 @@ class ProcessingEngine(QObject):
                     'warnings': []
                 }
             
+            on_stage("downloaded", download_path=download_path)
+            
             # ZIPファイルを処理
             processed_files = self.word_processor.process_zip_file(download_path)
             
@@ -942,6 +1137,7 @@ class ProcessingEngine(QObject):
                 'warnings': []
             }
     
+    @traced("engine.find_honbun_folder")
     def find_honbun_folder(self, n_code: str) -> Optional[Path]:
         """
         N-codeから本文フォルダを特定
@@ -958,6 +1154,7 @@ class ProcessingEngine(QObject):
         
         return self.word_processor.find_honbun_folder(ncode_folder)
     
+    @traced("engine.copy_files_to_folder")
     def copy_files_to_folder(self, files: List[Path], target_folder: Path) -> bool:
         """
         ファイルを指定フォルダにコピー
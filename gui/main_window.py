@@ -30,6 +30,7 @@ class ProcessWorker(QThread):
     folder_selection_needed = pyqtSignal(object, str, object)  # repo_path, repo_name, default_folder
     file_placement_confirmation_needed = pyqtSignal(str, list, object)  # honbun_folder_path, file_list, callback
     warning_dialog_needed = pyqtSignal(list, str)  # messages, result_type
+    resume_confirmation_needed = pyqtSignal(str, str, object)  # title, message, callback
     finished = pyqtSignal()
     
     def __init__(self, n_codes, email_password=None, process_mode="traditional"):
@@ -57,6 +58,7 @@ class ProcessWorker(QThread):
             self.workflow_processor.folder_selection_needed.connect(self.folder_selection_needed.emit)
             self.workflow_processor.file_placement_confirmation_needed.connect(self.file_placement_confirmation_needed.emit)
             self.workflow_processor.warning_dialog_needed.connect(self.warning_dialog_needed.emit)
+            self.workflow_processor.confirmation_needed.connect(self.resume_confirmation_needed.emit)
             
             # 処理を実行
             self.workflow_processor.process_n_codes(self.n_codes)
@@ -392,6 +394,7 @@ class MainWindow(QMainWindow):
         self.worker_thread.folder_selection_needed.connect(self.on_folder_selection_needed)
         self.worker_thread.file_placement_confirmation_needed.connect(self.on_file_placement_confirmation_needed)
         self.worker_thread.warning_dialog_needed.connect(self.on_warning_dialog_needed)
+        self.worker_thread.resume_confirmation_needed.connect(self.on_resume_confirmation_needed)
         self.worker_thread.finished.connect(self.on_processing_finished)
         self.worker_thread.start()
         
@@ -578,6 +581,14 @@ class MainWindow(QMainWindow):
             if self.worker_thread and self.worker_thread.workflow_processor:
                 self.worker_thread.workflow_processor.set_selected_work_folder(None)
     
+    @pyqtSlot(str, str, object)
+    def on_resume_confirmation_needed(self, title, message, callback):
+        """中断したバッチの再開確認ダイアログを表示"""
+        resume = self.show_confirmation_dialog(title, message)
+        self.log_panel.append_log("前回の続きから再開します" if resume else "最初から処理し直します")
+        if callback:
+            callback(resume)
+    
     @pyqtSlot(str, list, object)
     def on_file_placement_confirmation_needed(self, honbun_folder_path, file_list, callback):
         """ファイル配置確認ダイアログを表示"""
@@ -0,0 +1,332 @@
+from __future__ import annotations
+"""Re:VIEW PDFのはみ出し自動チェック（ヘッドレス監視サービス）
+
+変換ワークフローで処理したN-codeのフォルダ（<ベースパス>/<N-code>/out/*.pdf）を
+定期的に走査し、新しく出力された（または更新された）PDFを
+ワーカープロセスのプールで矩形基準検出器にかける。
+結果はN-codeごとに out/overflow_check.json へ書き出すので、
+編集者が本を開く時点でははみ出しページの一覧ができている。
+
+    python -m services.overflow_watch_service            # 監視を続ける
+    python -m services.overflow_watch_service --once     # 1回走査して終了
+
+書き込み途中のPDFを拾わないよう、最終更新から SETTLE_SECONDS 経過したものだけを
+対象にする。チェック済みのPDFは更新時刻とサイズが変わるまで再チェックしない。
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from utils.logger import get_logger
+
+# 検出器はスタンドアロン版のものを使う。
+# スタンドアロン版のcore/utilsパッケージと名前が衝突しないよう、
+# sys.pathの末尾に追加して rect_based_detector だけを読み込む。
+DETECTOR_DIR = Path(__file__).resolve().parent.parent / "CodeBlockOverFlowDisposal" / "overflow_checker_standalone"
+
+
+def _check_pdf(pdf_path: str) -> Dict[str, Any]:
+    """1つのPDFのはみ出しページを検出（ワーカープロセスで実行）"""
+    if str(DETECTOR_DIR) not in sys.path:
+        sys.path.append(str(DETECTOR_DIR))
+    from rect_based_detector import RectBasedOverflowDetector
+
+    start = time.perf_counter()
+    detector = RectBasedOverflowDetector()
+    overflow_pages = detector.detect_file(Path(pdf_path))
+    return {
+        'overflow_pages': overflow_pages,
+        'total_pages': detector.stats['total_pages'],
+        'elapsed': round(time.perf_counter() - start, 3),
+    }
+
+
+class OverflowWatchService:
+    """N-codeのoutフォルダを監視してPDFのはみ出しをチェックするサービス"""
+
+    RESULT_FILENAME = "overflow_check.json"
+    PDF_PATTERN = "N*/out/*.pdf"
+
+    # 走査間隔（秒）
+    POLL_INTERVAL = 10.0
+    # 最終更新からこの秒数が経過したPDFだけを対象にする（書き込み途中のものを避ける）
+    SETTLE_SECONDS = 5.0
+
+    WORKER_CRASHED = "ワーカープロセスが異常終了しました"
+
+    def __init__(self, base_path: Optional[Path] = None, workers: Optional[int] = None,
+                 n_codes: Optional[List[str]] = None, config_manager=None):
+        """
+        Args:
+            base_path: N-codeフォルダのあるベースパス（省略時は設定の paths.base_repository_path）
+            workers: ワーカープロセス数（省略時はCPU数）
+            n_codes: 対象のN-code（省略時はベースパス配下のすべて）
+            config_manager: 設定管理インスタンス
+        """
+        self.logger = get_logger(__name__)
+        if base_path is None:
+            if config_manager is None:
+                from core.config_manager import get_config_manager
+                config_manager = get_config_manager()
+            base_path = config_manager.get("paths.base_repository_path", "")
+        self.base_path = Path(base_path)
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.n_codes = {n_code.upper() for n_code in n_codes} if n_codes else None
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Dict[Future, Tuple[Path, Tuple[int, int]]] = {}
+        # N-codeごとの結果（結果ファイルの内容）
+        self._results: Dict[str, Dict[str, Any]] = {}
+        # ワーカーの異常終了に巻き込まれたPDF（原因を特定するため1件ずつ再チェックする）
+        self._suspects: Set[Path] = set()
+        self._stop_event = threading.Event()
+
+    @classmethod
+    def result_path(cls, pdf_path: Path) -> Path:
+        """PDFのチェック結果を書き出すファイル（N-codeのoutフォルダ内）"""
+        return pdf_path.parent / cls.RESULT_FILENAME
+
+    def scan(self) -> List[Tuple[Path, Tuple[int, int]]]:
+        """
+        チェックが必要なPDFを探す
+
+        Returns:
+            (PDFパス, (更新時刻ns, サイズ)) のリスト
+        """
+        if not self.base_path.is_dir():
+            self.logger.error(f"ベースパスが見つかりません: {self.base_path}")
+            return []
+
+        in_flight = {pdf_path for pdf_path, _ in self._pending.values()}
+        now = time.time()
+        targets = []
+        for pdf_path in sorted(self.base_path.glob(self.PDF_PATTERN)):
+            n_code = pdf_path.parent.parent.name.upper()
+            if self.n_codes is not None and n_code not in self.n_codes:
+                continue
+            if pdf_path in in_flight:
+                continue
+            try:
+                stat = pdf_path.stat()
+            except OSError:
+                continue
+            if now - stat.st_mtime < self.SETTLE_SECONDS:
+                continue
+
+            signature = (stat.st_mtime_ns, stat.st_size)
+            checked = self._load_results(pdf_path).get('pdfs', {}).get(pdf_path.name)
+            if checked and (checked.get('mtime_ns'), checked.get('size')) == signature:
+                continue
+            targets.append((pdf_path, signature))
+        return targets
+
+    def submit(self, targets: List[Tuple[Path, Tuple[int, int]]]) -> int:
+        """
+        PDFをワーカープールに投入
+
+        ワーカーの異常終了に巻き込まれたPDFは、ほかに処理中のものがないときに1件ずつ投入する。
+
+        Returns:
+            投入したPDF数
+        """
+        if any(pdf_path in self._suspects for pdf_path, _ in self._pending.values()):
+            return 0
+
+        submitted = 0
+        for pdf_path, signature in targets:
+            if pdf_path in self._suspects:
+                if self._pending:
+                    continue
+                self._submit_one(pdf_path, signature)
+                return 1
+        for pdf_path, signature in targets:
+            if pdf_path not in self._suspects:
+                self._submit_one(pdf_path, signature)
+                submitted += 1
+        return submitted
+
+    def _submit_one(self, pdf_path: Path, signature: Tuple[int, int]):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        self.logger.info(f"はみ出しチェック開始: {pdf_path}")
+        future = self._executor.submit(_check_pdf, str(pdf_path))
+        self._pending[future] = (pdf_path, signature)
+
+    def collect(self, timeout: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        完了したチェックの結果を結果ファイルに書き出す
+
+        Args:
+            timeout: 完了を待つ最大秒数（Noneで1件以上完了するまで待つ、0で待たない）
+
+        Returns:
+            書き出したPDFごとの結果
+        """
+        if not self._pending:
+            return []
+        done, _ = wait(list(self._pending), timeout=timeout, return_when=FIRST_COMPLETED)
+
+        records = []
+        pool_broken = False
+        for future in done:
+            pdf_path, signature = self._pending.pop(future)
+            try:
+                result = future.result()
+                error = None
+            except BrokenProcessPool:
+                pool_broken = True
+                if pdf_path not in self._suspects:
+                    # 巻き込まれただけかもしれないので、次回1件ずつチェックし直す
+                    self._suspects.add(pdf_path)
+                    continue
+                result, error = {}, self.WORKER_CRASHED
+            except Exception as e:
+                result, error = {}, f"{type(e).__name__}: {e}"
+
+            self._suspects.discard(pdf_path)
+            records.append(self._record(pdf_path, signature, result, error))
+
+        if pool_broken:
+            self.logger.warning(self.WORKER_CRASHED)
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            for future, (pdf_path, _) in list(self._pending.items()):
+                self._suspects.add(pdf_path)
+                del self._pending[future]
+        return records
+
+    def run_once(self) -> List[Dict[str, Any]]:
+        """
+        1回走査し、見つかったPDFをすべてチェックし終えるまで待つ
+
+        Returns:
+            PDFごとの結果
+        """
+        records = []
+        targets = self.scan()
+        self.submit(targets)
+        while self._pending:
+            records.extend(self.collect())
+            if not self._pending and self._suspects:
+                self.submit(self.scan())
+        return records
+
+    def run_forever(self, interval: Optional[float] = None):
+        """stop() が呼ばれるまで走査とチェックを繰り返す"""
+        interval = self.POLL_INTERVAL if interval is None else interval
+        self.logger.info(f"はみ出しチェックの監視を開始: {self.base_path} (ワーカー数: {self.workers})")
+        try:
+            while not self._stop_event.is_set():
+                self.submit(self.scan())
+                deadline = time.monotonic() + interval
+                while not self._stop_event.is_set():
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    if self._pending:
+                        self.collect(timeout=remaining)
+                    else:
+                        self._stop_event.wait(remaining)
+        finally:
+            self.shutdown()
+
+    def stop(self):
+        """run_forever を止める"""
+        self._stop_event.set()
+
+    def shutdown(self):
+        """ワーカープールを終了（処理中のチェックは破棄）"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._pending.clear()
+
+    def _load_results(self, pdf_path: Path) -> Dict[str, Any]:
+        """N-codeの結果ファイルを読み込み（メモリにキャッシュ）"""
+        n_code = pdf_path.parent.parent.name
+        results = self._results.get(n_code)
+        if results is None:
+            results = {'n_code': n_code, 'pdfs': {}}
+            result_file = self.result_path(pdf_path)
+            if result_file.exists():
+                try:
+                    with open(result_file, 'r', encoding='utf-8') as f:
+                        results = json.load(f)
+                except (OSError, ValueError) as e:
+                    self.logger.warning(f"結果ファイル読み込みエラー: {result_file}: {e}")
+            self._results[n_code] = results
+        return results
+
+    def _record(self, pdf_path: Path, signature: Tuple[int, int],
+                result: Dict[str, Any], error: Optional[str]) -> Dict[str, Any]:
+        """1つのPDFの結果をN-codeの結果ファイルに反映"""
+        record = {
+            'mtime_ns': signature[0],
+            'size': signature[1],
+            'checked_at': datetime.now().isoformat(),
+            'overflow_pages': result.get('overflow_pages', []),
+            'total_pages': result.get('total_pages', 0),
+            'elapsed': result.get('elapsed', 0.0),
+            'error': error,
+        }
+        if error:
+            self.logger.error(f"はみ出しチェックエラー: {pdf_path}: {error}")
+        else:
+            self.logger.info(f"はみ出しチェック完了: {pdf_path} "
+                             f"(はみ出しページ: {record['overflow_pages'] or 'なし'})")
+
+        results = self._load_results(pdf_path)
+        # 消えたPDFの結果は残さない
+        results['pdfs'] = {name: checked for name, checked in results['pdfs'].items()
+                           if (pdf_path.parent / name).exists()}
+        results['pdfs'][pdf_path.name] = record
+        results['updated_at'] = record['checked_at']
+
+        result_file = self.result_path(pdf_path)
+        try:
+            tmp_file = result_file.with_suffix('.json.tmp')
+            with open(tmp_file, 'w', encoding='utf-8') as f:
+                json.dump(results, f, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, result_file)
+        except OSError as e:
+            self.logger.error(f"結果ファイル書き出しエラー: {result_file}: {e}")
+
+        return dict(record, n_code=results['n_code'], pdf=str(pdf_path))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Re:VIEW PDFのはみ出し自動チェック（ヘッドレス）")
+    parser.add_argument('--base-path', help='N-codeフォルダのあるベースパス（省略時は設定値）')
+    parser.add_argument('--n-code', action='append', dest='n_codes', metavar='N_CODE',
+                        help='対象のN-code（複数指定可、省略時はすべて）')
+    parser.add_argument('--workers', type=int, help='ワーカープロセス数（省略時はCPU数）')
+    parser.add_argument('--interval', type=float, default=OverflowWatchService.POLL_INTERVAL,
+                        help='走査間隔（秒）')
+    parser.add_argument('--once', action='store_true', help='1回走査してチェックし終えたら終了')
+    args = parser.parse_args(argv)
+
+    service = OverflowWatchService(base_path=args.base_path, workers=args.workers, n_codes=args.n_codes)
+    if args.once:
+        try:
+            records = service.run_once()
+        finally:
+            service.shutdown()
+        return 1 if any(record['error'] for record in records) else 0
+
+    try:
+        service.run_forever(args.interval)
+    except KeyboardInterrupt:
+        service.stop()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+バッチジャーナル（中断・再開）のテストケース
+"""
+import tempfile
+import unittest
+from pathlib import Path
+
+from core.batch_journal import BatchJournal
+from core.preflight.state_manager import PreflightStateManager
+
+
+class _TempConfig:
+    """キャッシュディレクトリだけを返す設定"""
+
+    def __init__(self, cache_dir: str):
+        self.cache_dir = cache_dir
+
+    def get(self, key, default=None):
+        return self.cache_dir if key == "paths.cache_directory" else default
+
+
+class TestBatchJournal(unittest.TestCase):
+    """BatchJournalクラスのテストケース"""
+
+    def setUp(self):
+        """テストの初期設定"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_manager = PreflightStateManager(_TempConfig(self.temp_dir.name))
+        self.n_codes = ["N01234", "N05678", "N09999"]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _new_journal(self):
+        journal = BatchJournal(self.n_codes, "api", self.state_manager)
+        journal.save()
+        return journal
+
+    def test_progress_survives_restart(self):
+        """記録した段階とジョブIDが再読み込み後も復元されること"""
+        journal = self._new_journal()
+        journal.advance("N01234", BatchJournal.STAGE_DONE)
+        journal.advance("N05678", BatchJournal.STAGE_UPLOADED, job_id="job-42")
+
+        restored = BatchJournal.find_unfinished(list(reversed(self.n_codes)), "api", self.state_manager)
+        self.assertIsNotNone(restored)
+        self.assertTrue(restored.is_done("N01234"))
+        self.assertTrue(restored.reached("N05678", BatchJournal.STAGE_ZIP_CREATED))
+        self.assertFalse(restored.reached("N05678", BatchJournal.STAGE_DOWNLOADED))
+        self.assertEqual(restored.entry("N05678")["job_id"], "job-42")
+        self.assertEqual(restored.pending_n_codes(), ["N05678", "N09999"])
+
+    def test_failure_keeps_stage(self):
+        """失敗時は段階を据え置いてエラーだけ記録すること"""
+        journal = self._new_journal()
+        journal.advance("N09999", BatchJournal.STAGE_DOWNLOADED, download_path=Path("/nonexistent.zip"))
+        journal.mark_failed("N09999", "timeout")
+
+        entry = journal.entry("N09999")
+        self.assertEqual(entry["stage"], BatchJournal.STAGE_DOWNLOADED)
+        self.assertEqual(entry["error"], "timeout")
+        # 成果物が残っていなければ使わない
+        self.assertIsNone(journal.artifact_path("N09999", "download_path"))
+
+    def test_finished_or_other_mode_not_resumed(self):
+        """完了済み・処理方式違いのバッチは再開対象にならないこと"""
+        journal = self._new_journal()
+        self.assertIsNone(BatchJournal.find_unfinished(self.n_codes, "traditional", self.state_manager))
+
+        for n_code in self.n_codes:
+            journal.advance(n_code, BatchJournal.STAGE_DONE)
+        self.assertIsNone(BatchJournal.find_unfinished(self.n_codes, "api", self.state_manager))
+
+    def test_discard_removes_checkpoint(self):
+        """discardでチェックポイントが削除されること"""
+        journal = self._new_journal()
+        self.assertTrue(any(c["name"] == journal.name for c in self.state_manager.list_checkpoints()))
+        journal.discard()
+        self.assertIsNone(self.state_manager.load_checkpoint(journal.name))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+DOCX文書の一括走査（DocumentScanner）のテストケース
+"""
+import random
+import tempfile
+import unittest
+import zipfile
+from pathlib import Path
+from typing import List
+from unittest.mock import Mock, patch
+
+from core.preflight.document_scanner import DocumentScanner, MultiPatternMatcher, ScanPattern
+from core.preflight.file_validator import WordFileValidator
+from core.preflight.verification_strategy import (
+    CustomVerificationStrategy, ThoroughVerificationStrategy, VerificationConfig, VerificationMode
+)
+
+
+def _config_manager(custom_patterns: str = ''):
+    values = {'validation.custom_patterns': custom_patterns}
+    return Mock(get=lambda key, default=None: values.get(key, default))
+
+
+def _write_docx(path: Path, core_xml: str = '', extra_members: List[str] = ()):
+    """検証を通る最小限の.docxを作成"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zip_file:
+        zip_file.writestr('[Content_Types].xml', '<Types/>')
+        zip_file.writestr('_rels/.rels', '<Relationships/>')
+        zip_file.writestr('word/document.xml', '<w:document>' + 'x' * 600 + '</w:document>')
+        if core_xml:
+            zip_file.writestr('docProps/core.xml', core_xml)
+        for name in extra_members:
+            zip_file.writestr(name, 'data')
+
+
+def _legacy_deep_security_check(file_path: str) -> List[str]:
+    """DocumentScanner導入前の詳細セキュリティチェック（パターンごとの検索）"""
+    issues = []
+    with zipfile.ZipFile(file_path, 'r') as zip_file:
+        namelist = zip_file.namelist()
+        suspicious_files = [
+            name for name in namelist
+            if any(pattern in name.lower() for pattern in ['macro', 'vba', 'script', 'active', 'ole'])
+        ]
+        if suspicious_files:
+            issues.append(f"疑わしいファイル検出: {', '.join(suspicious_files[:3])}")
+        try:
+            doc_props = zip_file.read('docProps/core.xml').decode('utf-8', errors='ignore')
+            if '<dc:creator>' in doc_props and 'unknown' not in doc_props.lower():
+                issues.append("作成者情報が含まれています（プライバシー注意）")
+        except KeyError:
+            pass
+        external_refs = [
+            name for name in namelist
+            if name.startswith('word/embeddings/') or 'external' in name.lower()
+        ]
+        if external_refs:
+            issues.append(f"外部参照検出: {len(external_refs)}件")
+    return issues
+
+
+def _naive_ids(patterns: List[ScanPattern], text: str) -> set:
+    """パターンごとに検索した結果"""
+    return {
+        p.pattern_id for p in patterns
+        if (p.literal in text if p.case_sensitive else p.literal.lower() in text.lower())
+    }
+
+
+class TestMultiPatternMatcher(unittest.TestCase):
+    """MultiPatternMatcherとパターンごとの検索の一致のテストケース"""
+
+    PATTERNS = [
+        ScanPattern('ab', 'ab'),
+        ScanPattern('abc', 'abc'),
+        ScanPattern('ABC-cs', 'ABC', case_sensitive=True),
+        ScanPattern('ab-cs', 'ab', case_sensitive=True),
+        ScanPattern('bca', 'bca'),
+        ScanPattern('a', 'a'),
+        ScanPattern('tag-cs', '<x:Y>', case_sensitive=True),
+        ScanPattern('tag', '<x:y>'),
+        ScanPattern('jp', '作成者'),
+    ]
+
+    def test_random_texts_match_naive_search(self):
+        rng = random.Random(20261019)
+        alphabet = 'aAbBcC<>:xXyY作成者 '
+        matcher = MultiPatternMatcher(self.PATTERNS)
+        for _ in range(3000):
+            text = ''.join(rng.choice(alphabet) for _ in range(rng.randint(0, 24)))
+            self.assertEqual(matcher.find_ids(text), _naive_ids(self.PATTERNS, text), text)
+
+    def test_creator_tag_is_case_sensitive(self):
+        matcher = MultiPatternMatcher(DocumentScanner.METADATA_PATTERNS)
+        self.assertEqual(matcher.find_ids('<DC:CREATOR>UNKNOWN'), {'meta:unknown'})
+        self.assertEqual(matcher.find_ids('<dc:creator>Taro'), {'meta:creator'})
+
+    def test_empty_matcher(self):
+        matcher = MultiPatternMatcher([])
+        self.assertFalse(matcher)
+        self.assertEqual(matcher.find_ids('anything'), set())
+
+
+class TestDocumentScanner(unittest.TestCase):
+    """DocumentScannerのテストケース"""
+
+    def setUp(self):
+        """テストの初期設定"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        WordFileValidator.clear_cache()
+
+    def tearDown(self):
+        WordFileValidator.clear_cache()
+        self.temp_dir.cleanup()
+
+    def _docx(self, name: str, core_xml: str = '', extra_members: List[str] = ()) -> str:
+        path = self.folder / name
+        _write_docx(path, core_xml, extra_members)
+        return str(path)
+
+    def test_content_matches_across_chunk_boundaries(self):
+        patterns = ['secret', 'confidential', 'SECRET-PLAN']
+        scanner = DocumentScanner(patterns)
+        scanner.CHUNK_SIZE = 7
+        text = '<cp:coreProperties>' + 'Top SeCrEt-plan, ' * 3 + 'confidential</cp:coreProperties>'
+        report = scanner.scan_file(self._docx('chunks.docx', text))
+
+        expected = {DocumentScanner.custom_id(p) for p in patterns if p.lower() in text.lower()}
+        found = {pattern_id for pattern_id in report.content_hits if pattern_id.startswith('custom:')}
+        self.assertEqual(found, expected)
+        self.assertIsNone(report.error)
+
+    def test_deep_security_check_matches_legacy(self):
+        cases = {
+            'plain.docx': ('', []),
+            'creator.docx': ('<cp:coreProperties><dc:creator>Taro</dc:creator></cp:coreProperties>', []),
+            'creator_upper.docx': ('<cp:coreProperties><DC:CREATOR>Taro</DC:CREATOR></cp:coreProperties>', []),
+            'unknown.docx': ('<dc:creator>UNKNOWN</dc:creator>', []),
+            'macro.docx': ('', ['word/vbaProject.bin', 'word/activeX/activeX1.xml', 'word/Scripts/a.js',
+                                'customXml/OLEObject.bin']),
+            'external.docx': ('', ['word/embeddings/oleObject1.bin', 'word/_rels/External.rels']),
+        }
+        strategy = ThoroughVerificationStrategy(
+            VerificationConfig(mode=VerificationMode.THOROUGH, config_manager=_config_manager()))
+        scanner = DocumentScanner()
+        for name, (core_xml, members) in cases.items():
+            with self.subTest(name=name):
+                path = self._docx(name, core_xml, members)
+                self.assertEqual(strategy._perform_deep_security_check(scanner.scan_file(path)),
+                                 _legacy_deep_security_check(path))
+
+    def test_thorough_strategy_opens_each_docx_once(self):
+        paths = [self._docx(f'doc{i}.docx', '<dc:creator>Taro</dc:creator>') for i in range(3)]
+        strategy = ThoroughVerificationStrategy(
+            VerificationConfig(mode=VerificationMode.THOROUGH, config_manager=_config_manager()))
+
+        with patch('zipfile.ZipFile', wraps=zipfile.ZipFile) as opened:
+            result = strategy.execute(paths)
+        self.assertEqual(opened.call_count, 3)
+        self.assertEqual(result.statistics['parts_scanned'], 3)
+        self.assertEqual(len([i for i in result.security_issues if 'プライバシー' not in i]), 0)
+        self.assertEqual(len(result.security_issues), 3)
+
+        # メモ済みの検証結果のファイルは走査のためだけに開く
+        with patch('zipfile.ZipFile', wraps=zipfile.ZipFile) as opened:
+            again = strategy.execute(paths)
+        self.assertEqual(opened.call_count, 3)
+        self.assertEqual(again.security_issues, result.security_issues)
+
+    def test_custom_strategy_scans_validated_archive(self):
+        paths = [self._docx('report.docx', '<dc:title>Project Falcon</dc:title>'),
+                 self._docx('falcon_notes.docx')]
+        strategy = CustomVerificationStrategy(
+            VerificationConfig(mode=VerificationMode.CUSTOM, config_manager=_config_manager('FALCON')))
+
+        with patch('zipfile.ZipFile', wraps=zipfile.ZipFile) as opened:
+            result = strategy.execute(paths)
+        self.assertEqual(opened.call_count, 2)
+        self.assertEqual(result.security_issues, [
+            "カスタムパターン検出（文書内）: FALCON",
+            "カスタムパターン検出: FALCON",
+        ])
+
+    def test_invalid_archive_is_not_scanned(self):
+        path = self.folder / 'broken.docx'
+        path.write_bytes(b'not a zip' * 100)
+        reports = {}
+        scanner = DocumentScanner()
+        validator = WordFileValidator(_config_manager())
+
+        results = validator.validate_batch([str(path)], on_archive=scanner.archive_collector(reports))
+        self.assertFalse(results[str(path)].is_valid)
+        self.assertEqual(reports, {})
+        self.assertIsNotNone(scanner.scan_file(str(path)).error)
+
+
+if __name__ == '__main__':
+    unittest.main()
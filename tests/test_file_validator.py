@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Word文書ファイル検証（バッチ検証・検証結果のメモ）のテストケース
+"""
+import os
+import tempfile
+import threading
+import unittest
+import zipfile
+from pathlib import Path
+from unittest.mock import Mock, patch
+
+from core.preflight.file_validator import WordFileValidator
+
+
+def _write_docx(path: Path, body: str = 'x' * 600):
+    """検証を通る最小限の.docxを作成"""
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as zip_file:
+        zip_file.writestr('[Content_Types].xml', '<Types/>')
+        zip_file.writestr('_rels/.rels', '<Relationships/>')
+        zip_file.writestr('word/document.xml', f'<w:document>{body}</w:document>')
+
+
+class _FileValidatorTestCase(unittest.TestCase):
+    """テスト用ファイルの作成とメモのリセット"""
+
+    def setUp(self):
+        """テストの初期設定"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        WordFileValidator.clear_cache()
+        self.validator = self._validator()
+
+    def tearDown(self):
+        WordFileValidator.clear_cache()
+        self.temp_dir.cleanup()
+
+    @staticmethod
+    def _validator(**settings) -> WordFileValidator:
+        return WordFileValidator(Mock(get=lambda key, default=None: settings.get(key, default)))
+
+    def _docx(self, name: str, body: str = 'x' * 600) -> str:
+        path = self.folder / name
+        _write_docx(path, body)
+        return str(path)
+
+    def _files(self):
+        """有効な.docx 4件と無効なファイル2件"""
+        paths = [self._docx(f'doc{i}.docx') for i in range(4)]
+        (self.folder / 'note.txt').write_bytes(b'x' * 1024)
+        (self.folder / 'broken.docx').write_bytes(b'not a zip' * 100)
+        return paths[:2] + [str(self.folder / 'note.txt')] + paths[2:] + [str(self.folder / 'broken.docx')]
+
+
+class TestValidateBatch(_FileValidatorTestCase):
+    """validate_batchのテストケース"""
+
+    def test_pool_matches_serial(self):
+        paths = self._files()
+        serial = self.validator.validate_batch(paths, max_workers=1)
+        WordFileValidator.clear_cache()
+
+        threads = set()
+        validate_single = self.validator.validate_single
+
+        def record_thread(file_path, on_archive=None):
+            threads.add(threading.current_thread().name)
+            return validate_single(file_path, on_archive)
+
+        with patch.object(self.validator, 'validate_single', side_effect=record_thread):
+            pooled = self.validator.validate_batch(paths, max_workers=3)
+
+        self.assertTrue(threads)
+        self.assertTrue(all(name.startswith('docx-validator') for name in threads))
+        self.assertEqual(list(pooled), paths)
+        self.assertEqual({path: (r.is_valid, r.issues, r.warnings) for path, r in pooled.items()},
+                         {path: (r.is_valid, r.issues, r.warnings) for path, r in serial.items()})
+        self.assertEqual([pooled[path].is_valid for path in paths], [True, True, False, True, True, False])
+
+    def test_on_result_runs_in_completion_order(self):
+        paths = [self._docx(f'doc{i}.docx') for i in range(4)]
+        others_done = threading.Event()
+        received = []
+        validate_single = self.validator.validate_single
+
+        def slow_first(file_path, on_archive=None):
+            # 先頭のファイルは他のファイルの結果が届くまで終わらない
+            if file_path == paths[0]:
+                others_done.wait(5)
+            return validate_single(file_path, on_archive)
+
+        def on_result(file_path, result):
+            received.append((file_path, threading.current_thread() is threading.main_thread()))
+            if len(received) == len(paths) - 1:
+                others_done.set()
+
+        with patch.object(self.validator, 'validate_single', side_effect=slow_first):
+            results = self.validator.validate_batch(paths, on_result=on_result, max_workers=4)
+
+        self.assertEqual(received[-1], (paths[0], True))
+        self.assertEqual(sorted(path for path, _ in received), sorted(paths))
+        self.assertTrue(all(in_caller_thread for _, in_caller_thread in received))
+        # 戻り値は入力順
+        self.assertEqual(list(results), paths)
+
+    def test_duplicates_and_callback_errors(self):
+        paths = [self._docx('a.docx'), self._docx('b.docx')]
+        received = []
+
+        def failing(file_path, result):
+            received.append(file_path)
+            raise RuntimeError('callback failed')
+
+        results = self.validator.validate_batch(paths + paths[:1], on_result=failing, max_workers=2)
+        self.assertEqual(list(results), paths)
+        self.assertEqual(sorted(received), sorted(paths))
+        self.assertTrue(all(result.is_valid for result in results.values()))
+
+    def test_batch_workers_setting(self):
+        validator = self._validator(**{'validation.batch_workers': 1})
+        self.assertEqual(validator.max_workers, 1)
+        paths = [self._docx('a.docx'), self._docx('b.docx')]
+        with patch('core.preflight.file_validator.ThreadPoolExecutor') as pool:
+            validator.validate_batch(paths)
+        pool.assert_not_called()
+
+
+class TestValidationMemo(_FileValidatorTestCase):
+    """検証結果のメモのテストケース"""
+
+    def _count_validations(self, validator=None):
+        validator = validator or self.validator
+        return patch.object(validator, '_validate_single_impl', wraps=validator._validate_single_impl)
+
+    def test_unchanged_file_is_served_from_memo(self):
+        path = self._docx('a.docx')
+        first = self.validator.validate_single(path)
+
+        # 検証ダイアログは呼び出しごとにインスタンスを作り直すため、メモはクラスで共有する
+        other = self._validator()
+        with self._count_validations(other) as impl:
+            second = other.validate_single(path)
+        impl.assert_not_called()
+        self.assertEqual(second, first)
+
+    def test_size_change_invalidates(self):
+        path = self._docx('a.docx')
+        self.validator.validate_single(path)
+        _write_docx(Path(path), 'y' * 900)
+
+        with self._count_validations() as impl:
+            result = self.validator.validate_single(path)
+        impl.assert_called_once()
+        self.assertEqual(result.file_size, os.path.getsize(path))
+
+    def test_mtime_change_invalidates(self):
+        path = self._docx('a.docx')
+        self.validator.validate_single(path)
+        stat = os.stat(path)
+        os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+
+        with self._count_validations() as impl:
+            self.validator.validate_single(path)
+            self.validator.validate_single(path)
+        impl.assert_called_once()
+
+    def test_size_limits_are_part_of_key(self):
+        path = self._docx('a.docx')
+        self.assertTrue(self.validator.validate_single(path).is_valid)
+
+        strict = self._validator(**{'validation.max_file_size': 100})
+        self.assertFalse(strict.validate_single(path).is_valid)
+        self.assertTrue(self.validator.validate_single(path).is_valid)
+
+    def test_returned_results_are_copies(self):
+        path = str(self.folder / 'note.txt')
+        Path(path).write_bytes(b'x' * 1024)
+        first = self.validator.validate_single(path)
+        first.issues.append('changed by caller')
+
+        self.assertNotIn('changed by caller', self.validator.validate_single(path).issues)
+
+    def test_missing_file_is_not_memoized(self):
+        path = str(self.folder / 'missing.docx')
+        self.assertFalse(self.validator.validate_single(path).is_valid)
+        _write_docx(Path(path))
+        self.assertTrue(self.validator.validate_single(path).is_valid)
+
+    def test_least_recently_used_entry_is_evicted(self):
+        paths = [self._docx(f'doc{i}.docx') for i in range(3)]
+        with patch.object(WordFileValidator, '_CACHE_MAX_ENTRIES', 2):
+            for path in paths[:2]:
+                self.validator.validate_single(path)
+            self.validator.validate_single(paths[0])
+            self.validator.validate_single(paths[2])
+
+            with self._count_validations() as impl:
+                self.validator.validate_single(paths[0])
+                self.validator.validate_single(paths[1])
+        impl.assert_called_once_with(paths[1], None)
+
+
+if __name__ == '__main__':
+    unittest.main()
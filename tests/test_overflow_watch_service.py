@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+はみ出し自動チェック（監視サービス）のテストケース
+"""
+import json
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from pathlib import Path
+
+from services.overflow_watch_service import OverflowWatchService
+
+SAMPLE_PDF = Path(__file__).parent.parent / "CodeBlockOverFlowDisposal" / "sampleOverflow.pdf"
+
+
+@unittest.skipUnless(SAMPLE_PDF.exists(), "sampleOverflow.pdf がありません")
+class TestOverflowWatchService(unittest.TestCase):
+    """OverflowWatchServiceクラスのテストケース"""
+
+    def setUp(self):
+        """テストの初期設定"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_path = Path(self.temp_dir.name)
+        self.pdf_path = self._put_pdf("N01234")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _put_pdf(self, n_code: str, age: float = 60.0) -> Path:
+        out_dir = self.base_path / n_code / "out"
+        out_dir.mkdir(parents=True, exist_ok=True)
+        pdf_path = out_dir / "book.pdf"
+        shutil.copyfile(SAMPLE_PDF, pdf_path)
+        mtime = time.time() - age
+        os.utime(pdf_path, (mtime, mtime))
+        return pdf_path
+
+    def _run_once(self, **kwargs):
+        service = OverflowWatchService(base_path=self.base_path, workers=1, **kwargs)
+        try:
+            return service.run_once()
+        finally:
+            service.shutdown()
+
+    def test_writes_result_per_n_code(self):
+        records = self._run_once()
+
+        self.assertEqual(len(records), 1)
+        self.assertIsNone(records[0]['error'])
+        result_file = OverflowWatchService.result_path(self.pdf_path)
+        with open(result_file, encoding='utf-8') as f:
+            results = json.load(f)
+        self.assertEqual(results['n_code'], "N01234")
+        checked = results['pdfs']['book.pdf']
+        self.assertEqual(checked['overflow_pages'], [1])
+        self.assertEqual(checked['total_pages'], 1)
+        self.assertEqual(checked['size'], self.pdf_path.stat().st_size)
+
+    def test_checked_pdf_is_skipped_until_changed(self):
+        self._run_once()
+        self.assertEqual(self._run_once(), [])
+
+        mtime = time.time() - 30
+        os.utime(self.pdf_path, (mtime, mtime))
+        self.assertEqual(len(self._run_once()), 1)
+
+    def test_pdf_being_written_is_not_checked(self):
+        self._put_pdf("N05678", age=0.0)
+        records = self._run_once()
+        self.assertEqual([record['n_code'] for record in records], ["N01234"])
+
+    def test_n_code_filter(self):
+        self._put_pdf("N05678")
+        records = self._run_once(n_codes=["n05678"])
+        self.assertEqual([record['n_code'] for record in records], ["N05678"])
+        self.assertFalse(OverflowWatchService.result_path(self.pdf_path).exists())
+
+    def test_broken_pdf_is_recorded_as_error(self):
+        broken = self.base_path / "N05678" / "out" / "broken.pdf"
+        broken.parent.mkdir(parents=True)
+        broken.write_bytes(b"not a pdf")
+        mtime = time.time() - 60
+        os.utime(broken, (mtime, mtime))
+
+        records = {record['n_code']: record for record in self._run_once()}
+        self.assertIsNone(records["N01234"]['error'])
+        self.assertTrue(records["N05678"]['error'])
+
+
+if __name__ == '__main__':
+    unittest.main()
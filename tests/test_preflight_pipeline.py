@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Pre-flight パイプライン（検証・送信・結果監視）のテストケース
+"""
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import MagicMock, Mock, patch
+
+from core.preflight import unified_preflight_manager
+from core.preflight.config_manager import MonitoringConfig
+from core.preflight.email_result_monitor import PreflightEmailResultMonitor
+from core.preflight.enhanced_email_monitor import EnhancedEmailMonitor
+from core.preflight.file_validator import ValidationResult
+from core.preflight.job_state_manager import JobStateManager, JobStatus
+from core.preflight.verification_strategy import (
+    QuickVerificationStrategy, VerificationConfig, VerificationMode, VerificationResult
+)
+from core.preflight.word2xhtml_scraper import Word2XhtmlScrapingVerifier
+
+
+def _validation(file_path: str, is_valid: bool) -> ValidationResult:
+    return ValidationResult(is_valid=is_valid, file_path=file_path, file_size=1, mime_type="",
+                            issues=[] if is_valid else ["不正なファイル"], warnings=[])
+
+
+class _FakeStrategy:
+    """呼び出しを記録し、ファイルごとに on_result を呼ぶ検証戦略"""
+
+    def __init__(self, invalid=(), after_first=None):
+        self.calls = []
+        self.invalid = set(invalid)
+        self.after_first = after_first
+
+    def execute(self, file_paths, on_result=None):
+        self.calls.append(list(file_paths))
+        file_results = {}
+        for i, file_path in enumerate(file_paths):
+            file_results[file_path] = _validation(file_path, file_path not in self.invalid)
+            on_result(file_path, file_results[file_path])
+            if i == 0 and self.after_first:
+                self.after_first()
+        return VerificationResult(success=True, mode=VerificationMode.STANDARD, file_results=file_results,
+                                  security_issues=[], warnings=[], statistics={}, execution_time_seconds=0.0)
+
+
+class TestPreflightPipeline(unittest.TestCase):
+    """PreflightManagerのパイプラインのテストケース"""
+
+    def setUp(self):
+        """テストの初期設定"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.job_manager = JobStateManager(storage_path=str(Path(self.temp_dir.name) / "jobs.json"))
+        config_manager = Mock()
+        config_manager.get_verification_strategy_config.return_value = VerificationConfig(
+            mode=VerificationMode.STANDARD)
+        config_manager.get_monitoring_config.return_value = MonitoringConfig(max_wait_minutes=1)
+
+        with patch.object(unified_preflight_manager, 'get_config_manager', return_value=config_manager), \
+                patch.object(unified_preflight_manager, 'get_job_manager', return_value=self.job_manager), \
+                patch.object(unified_preflight_manager, 'get_performance_monitor', return_value=MagicMock()):
+            self.manager = unified_preflight_manager.PreflightManager()
+
+        self.submitted = []
+        self.manager.scraper = Mock()
+        self.manager.scraper.submit_one.side_effect = self._submit_one
+        self.manager.email_monitor = Mock(search_retry_interval=0.01)
+        self.manager.email_monitor.check_results_once.side_effect = self._check_results_once
+        self.searches = []
+
+    def tearDown(self):
+        self.manager._executor.shutdown(wait=True)
+        self.temp_dir.cleanup()
+
+    def _submit_one(self, file_path, email):
+        self.submitted.append(file_path)
+        return f"server-{Path(file_path).stem}"
+
+    def _check_results_once(self, server_job_ids, search_hours):
+        self.searches.append(sorted(server_job_ids))
+        # 1回目の検索では結果が届いていない
+        if len(self.searches) == 1:
+            return {}
+        return {job_id: SimpleNamespace(is_success=True, is_error=False, download_links=["http://example.com/a.zip"])
+                for job_id in server_job_ids}
+
+    def _run(self, strategy, file_paths):
+        with patch.object(unified_preflight_manager.VerificationStrategyFactory, 'create_strategy',
+                          return_value=strategy):
+            return self.manager.process_files_sync(file_paths, "user@example.com")
+
+    def _status(self, job_id):
+        return self.job_manager.get_job(job_id).status
+
+    def test_batch_is_validated_once(self):
+        strategy = _FakeStrategy(invalid={"b.docx"})
+        file_to_job = self._run(strategy, ["a.docx", "b.docx", "c.docx"])
+
+        self.assertEqual(strategy.calls, [["a.docx", "b.docx", "c.docx"]])
+        self.assertEqual(self.submitted, ["a.docx", "c.docx"])
+        self.assertEqual(self._status(file_to_job["a.docx"]), JobStatus.COMPLETED)
+        self.assertEqual(self._status(file_to_job["b.docx"]), JobStatus.FAILED)
+        self.assertEqual(self._status(file_to_job["c.docx"]), JobStatus.COMPLETED)
+
+    def test_results_are_submitted_before_batch_finishes(self):
+        first_submitted = threading.Event()
+        self.manager.scraper.submit_one.side_effect = (
+            lambda file_path, email: (first_submitted.set(), self._submit_one(file_path, email))[1])
+        overlapped = []
+        strategy = _FakeStrategy(after_first=lambda: overlapped.append(first_submitted.wait(5)))
+
+        self._run(strategy, ["a.docx", "b.docx"])
+        self.assertEqual(overlapped, [True])
+        self.assertEqual(self.submitted, ["a.docx", "b.docx"])
+
+    def test_results_are_polled_at_retry_interval(self):
+        start = time.monotonic()
+        file_to_job = self._run(_FakeStrategy(), ["a.docx"])
+
+        self.assertLess(time.monotonic() - start, 5)
+        self.assertEqual(self.searches, [["server-a"], ["server-a"]])
+        self.assertEqual(self._status(file_to_job["a.docx"]), JobStatus.COMPLETED)
+
+    def test_failed_submission(self):
+        self.manager.scraper.submit_one.side_effect = lambda file_path, email: None
+        file_to_job = self._run(_FakeStrategy(), ["a.docx"])
+
+        self.assertEqual(self._status(file_to_job["a.docx"]), JobStatus.FAILED)
+        self.assertEqual(self.searches, [])
+
+    def test_strategy_error_fails_remaining_jobs(self):
+        strategy = Mock()
+        strategy.execute.side_effect = RuntimeError("boom")
+        file_to_job = self._run(strategy, ["a.docx"])
+
+        self.assertEqual(self._status(file_to_job["a.docx"]), JobStatus.FAILED)
+        self.assertEqual(self.submitted, [])
+
+
+class TestPipelineComponents(unittest.TestCase):
+    """パイプラインで使う1件単位の処理のテストケース"""
+
+    def test_quick_strategy_reports_each_file(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            paths = [str(Path(temp_dir) / name) for name in ("a.docx", "b.txt")]
+            for path in paths:
+                Path(path).write_bytes(b"x")
+            received = []
+            config = VerificationConfig(mode=VerificationMode.QUICK,
+                                        config_manager=Mock(get=lambda key, default=None: default))
+            result = QuickVerificationStrategy(config).execute(
+                paths, on_result=lambda path, file_result: received.append((path, file_result.is_valid)))
+
+        self.assertEqual(received, [(paths[0], True), (paths[1], False)])
+        self.assertEqual(set(result.file_results), set(paths))
+
+    def test_submit_one_records_job(self):
+        scraper = Word2XhtmlScrapingVerifier.__new__(Word2XhtmlScrapingVerifier)
+        scraper.rate_limiter = Mock()
+        scraper.job_file_mapping = {}
+        scraper._submit_single = Mock(side_effect=["job-1", None])
+
+        self.assertEqual(scraper.submit_one("a.docx", "user@example.com"), "job-1")
+        self.assertIsNone(scraper.submit_one("b.docx", "user@example.com"))
+        self.assertEqual(scraper.job_file_mapping, {"job-1": "a.docx"})
+        self.assertEqual(scraper.rate_limiter.wait_if_needed.call_count, 2)
+
+    def test_check_results_once(self):
+        with patch.object(PreflightEmailResultMonitor, '__init__', return_value=None):
+            monitor = EnhancedEmailMonitor("user@example.com", "password", config_manager=Mock(
+                get=lambda key, default=None: default))
+        monitor.connect = Mock()
+        monitor.disconnect = Mock()
+        monitor._search_once = Mock(side_effect=[{"job-1": "result"}, None, RuntimeError("imap")])
+
+        self.assertEqual(monitor.check_results_once(["job-1"]), {"job-1": "result"})
+        self.assertEqual(monitor.check_results_once(["job-1"]), {})
+        self.assertEqual(monitor.check_results_once(["job-1"]), {})
+        self.assertEqual(monitor.check_results_once([]), {})
+        self.assertEqual(monitor.disconnect.call_count, 3)
+        self.assertEqual(monitor.search_retry_interval, 30)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,154 @@
+#!/usr/bin/env python3
+"""
+TechDisposal Analyzer 画像処理（フォルダの並列処理・処理済み画像のスキップ）のテストケース
+"""
+import json
+import os
+import tempfile
+import unittest
+from pathlib import Path
+
+from PIL import Image
+
+from app.modules.techbook27_analyzer.core.exceptions import ProcessingInterruptedError
+from app.modules.techbook27_analyzer.core.models import ProcessingOptions
+from app.modules.techbook27_analyzer.processors.image_manifest import ImageManifest
+from app.modules.techbook27_analyzer.processors.image_processor import ImageProcessor
+
+
+class TestImageProcessorFolder(unittest.TestCase):
+    """ImageProcessor.process_folderのテストケース"""
+
+    def setUp(self):
+        """テストの初期設定"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.options = ProcessingOptions(grayscale=True, max_pixels="1", backup=True)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _make_folder(self, name: str) -> Path:
+        folder = Path(self.temp_dir.name) / name
+        (folder / "sub").mkdir(parents=True)
+        for i in range(6):
+            Image.new("RGB", (200 + i, 150), (i * 30, 80, 160)).save(folder / f"img{i}.png")
+            Image.new("RGB", (180, 120 + i), (40, i * 30, 90)).save(folder / "sub" / f"shot{i}.jpg")
+        # PNG→JPG変換の出力先が既存のJPGと重なる
+        Image.new("RGB", (220, 160), (10, 20, 30)).save(folder / "img0.jpg")
+        return folder
+
+    @staticmethod
+    def _snapshot(folder: Path):
+        snapshot = {}
+        for path in sorted(folder.rglob("*")):
+            if path.is_file() and path.suffix in (".jpg", ".png"):
+                with Image.open(path) as img:
+                    snapshot[str(path.relative_to(folder))] = (img.size, img.mode, img.tobytes())
+        return snapshot
+
+    @staticmethod
+    def _relative_messages(result, folder: Path):
+        return [message.replace(str(folder), "") for message in result.messages]
+
+    def test_parallel_matches_serial(self):
+        serial_folder = self._make_folder("serial")
+        parallel_folder = self._make_folder("parallel")
+
+        serial = ImageProcessor(self.options, workers=1).process_folder(str(serial_folder))
+        progress = []
+        parallel = ImageProcessor(self.options, workers=3).process_folder(
+            str(parallel_folder), progress_callback=lambda done, total, rate: progress.append((done, total)))
+
+        self.assertTrue(parallel.success)
+        self.assertEqual(parallel.details['workers'], 3)
+        self.assertEqual(serial.details['workers'], 1)
+        self.assertGreater(parallel.details['images_per_sec'], 0)
+        self.assertEqual(parallel.processed_count, 13)
+        self.assertEqual(parallel.error_count, serial.error_count)
+        self.assertEqual(self._relative_messages(parallel, parallel_folder),
+                         self._relative_messages(serial, serial_folder))
+        self.assertEqual(self._snapshot(parallel_folder), self._snapshot(serial_folder))
+        self.assertEqual(progress[-1], (13, 13))
+
+    def test_png_and_jpg_with_same_output_are_grouped(self):
+        folder = self._make_folder("group")
+        processor = ImageProcessor(self.options)
+        groups = processor._group_by_output(processor._collect_image_files(folder))
+
+        self.assertEqual(len(groups), 12)
+        self.assertIn([folder / "img0.jpg", folder / "img0.png"], groups)
+
+    def test_stop_interrupts_folder(self):
+        folder = self._make_folder("stop")
+        processor = ImageProcessor(self.options, workers=2)
+        processor.stop()
+
+        with self.assertRaises(ProcessingInterruptedError):
+            processor.process_folder(str(folder))
+        self.assertEqual(len(list(folder.glob("*.png"))), 6)
+
+
+class TestImageManifest(unittest.TestCase):
+    """処理済み画像のスキップのテストケース"""
+
+    def setUp(self):
+        """テストの初期設定"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.folder = Path(self.temp_dir.name)
+        self.options = ProcessingOptions(max_pixels="1")
+        for i in range(3):
+            Image.new("RGB", (300, 200), (i * 60, 40, 80)).save(self.folder / f"fig{i}.png")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _run(self, options=None):
+        return ImageProcessor(options or self.options, workers=1).process_folder(str(self.folder))
+
+    def test_second_run_skips_unchanged_images(self):
+        first = self._run()
+        self.assertEqual((first.processed_count, first.skipped_count), (3, 0))
+        with open(self.folder / ImageManifest.FILENAME, encoding='utf-8') as f:
+            entry = json.load(f)['files']['fig0.jpg']
+        self.assertEqual(entry['dpi'], [100, 100])
+        self.assertLessEqual(entry['width'] * entry['height'], 10000)
+        mtimes = {path: path.stat().st_mtime_ns for path in self.folder.glob("*.jpg")}
+
+        second = self._run()
+        self.assertEqual((second.processed_count, second.skipped_count), (0, 3))
+        self.assertEqual({path: path.stat().st_mtime_ns for path in self.folder.glob("*.jpg")}, mtimes)
+
+    def test_edited_image_is_processed_again(self):
+        self._run()
+        Image.new("RGB", (300, 200), (0, 0, 0)).save(self.folder / "fig1.jpg")
+
+        result = self._run()
+        self.assertEqual((result.processed_count, result.skipped_count), (1, 2))
+        self.assertIn("fig1.jpg", "".join(result.messages))
+
+    def test_touched_image_is_skipped_by_hash(self):
+        self._run()
+        path = self.folder / "fig2.jpg"
+        os.utime(path, ns=(path.stat().st_atime_ns, path.stat().st_mtime_ns + 10 ** 9))
+
+        self.assertEqual(self._run().skipped_count, 3)
+        manifest = ImageManifest.load(self.folder)
+        self.assertEqual(manifest.entries['fig2.jpg']['mtime_ns'], path.stat().st_mtime_ns)
+
+    def test_changed_options_process_all_images(self):
+        self._run()
+        result = self._run(ProcessingOptions(max_pixels="1", resolution=150))
+        self.assertEqual((result.processed_count, result.skipped_count), (3, 0))
+
+        # バックアップ設定は出力画像に影響しない
+        result = self._run(ProcessingOptions(max_pixels="1", resolution=150, backup=False))
+        self.assertEqual(result.skipped_count, 3)
+
+    def test_skip_unchanged_disabled(self):
+        self._run()
+        result = self._run(ProcessingOptions(max_pixels="1", skip_unchanged=False))
+        self.assertEqual((result.processed_count, result.skipped_count), (3, 0))
+
+
+if __name__ == '__main__':
+    unittest.main()
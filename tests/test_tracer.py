@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+ワークフロートレーサーのテストケース
+"""
+import json
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from utils.tracer import Tracer, trace_context, current_n_code
+
+
+class TestTracer(unittest.TestCase):
+    """Tracerクラスのテストケース"""
+
+    def setUp(self):
+        """テストの初期設定"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.trace_path = Path(self.temp_dir.name) / "trace.json"
+        self.tracer = Tracer()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_disabled_span_records_nothing(self):
+        """無効時はスパンが記録されないこと"""
+        with self.tracer.span("noop") as s:
+            s.set(size=1)
+        self.assertEqual(self.tracer.get_events(), [])
+
+    def test_span_written_as_chrome_trace(self):
+        """スパンがChrome trace形式で書き出されること"""
+        self.tracer.enable(self.trace_path)
+        with self.tracer.span("api.upload_zip", "api", size=10):
+            pass
+        self.tracer.disable()
+
+        data = json.loads(self.trace_path.read_text(encoding="utf-8"))
+        events = [e for e in data if e["ph"] == "X"]
+        self.assertEqual(len(events), 1)
+        self.assertEqual(events[0]["name"], "api.upload_zip")
+        self.assertEqual(events[0]["cat"], "api")
+        self.assertEqual(events[0]["args"]["size"], 10)
+        self.assertGreaterEqual(events[0]["dur"], 0)
+
+    def test_n_code_context_tags_spans(self):
+        """trace_context内のスパンにN-codeが付与されること"""
+        self.tracer.enable(self.trace_path)
+        with trace_context("N01234"):
+            self.assertEqual(current_n_code(), "N01234")
+            with self.tracer.span("git.clone"):
+                pass
+        with self.tracer.span("outside"):
+            pass
+        self.assertIsNone(current_n_code())
+
+        events = {e["name"]: e for e in self.tracer.get_events() if e["ph"] == "X"}
+        self.assertEqual(events["git.clone"]["args"]["n_code"], "N01234")
+        self.assertNotIn("n_code", events["outside"]["args"])
+
+    def test_exception_is_recorded_and_propagated(self):
+        """例外がスパンに記録され、そのまま送出されること"""
+        self.tracer.enable(self.trace_path)
+        with self.assertRaises(ValueError):
+            with self.tracer.span("failing"):
+                raise ValueError("boom")
+        event = [e for e in self.tracer.get_events() if e["ph"] == "X"][0]
+        self.assertEqual(event["args"]["error"], "ValueError")
+
+    def test_threads_get_name_metadata(self):
+        """スレッドごとにthread_nameメタデータが出力されること"""
+        self.tracer.enable(self.trace_path)
+
+        def worker():
+            with self.tracer.span("in_thread"):
+                pass
+
+        thread = threading.Thread(target=worker, name="email-worker")
+        thread.start()
+        thread.join()
+
+        names = [e["args"]["name"] for e in self.tracer.get_events() if e["ph"] == "M"]
+        self.assertIn("email-worker", names)
+
+    def test_flushed_events_are_streamed_and_freed(self):
+        """しきい値を超えたイベントがファイルに追記され、メモリから解放されること"""
+        self.tracer.FLUSH_THRESHOLD = 3
+        self.tracer.enable(self.trace_path)
+        for i in range(10):
+            with self.tracer.span(f"step{i}"):
+                pass
+            self.assertLessEqual(len(self.tracer._events), 3)
+        self.assertEqual(len([e for e in self.tracer.get_events() if e["ph"] == "X"]), 10)
+        self.tracer.disable()
+
+        self.tracer.flush()
+
+        data = json.loads(self.trace_path.read_text(encoding="utf-8"))
+        self.assertEqual([e["name"] for e in data if e["ph"] == "X"], [f"step{i}" for i in range(10)])
+        self.assertEqual(data, self.tracer.get_events())
+        self.assertEqual(self.tracer._events, [])
+
+    def test_unclosed_trace_is_readable(self):
+        """無効化前（異常終了時）のファイルも閉じ括弧を補えば読めること"""
+        self.tracer.enable(self.trace_path)
+        with self.tracer.span("before_crash"):
+            pass
+        self.tracer.flush()
+
+        text = self.trace_path.read_text(encoding="utf-8")
+        self.assertFalse(text.rstrip().endswith("]"))
+        events = json.loads(text + "]")
+        self.assertIn("before_crash", [e["name"] for e in events])
+
+    def test_enable_again_starts_new_trace(self):
+        """再度有効化すると新しいトレースファイルになること"""
+        self.tracer.enable(self.trace_path)
+        with self.tracer.span("first"):
+            pass
+        self.tracer.disable()
+        self.tracer.enable(self.trace_path)
+        with self.tracer.span("second"):
+            pass
+        self.tracer.disable()
+
+        data = json.loads(self.trace_path.read_text(encoding="utf-8"))
+        self.assertEqual([e["name"] for e in data if e["ph"] == "X"], ["second"])
+
+
+if __name__ == '__main__':
+    unittest.main()
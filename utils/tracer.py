@@ -0,0 +1,330 @@
+from __future__ import annotations
+"""ホットパス計測用の軽量トレーサー
+
+変換ワークフローの各段階（Git取得、ZIP作成、アップロード、サーバー変換、
+メール待機、Word処理など）をスパンとして記録し、Chrome trace形式の
+JSON（イベントの配列）に書き出す。chrome://tracing や https://ui.perfetto.dev で
+タイムラインとして表示できる。
+
+イベントは一定数たまるたびにファイルへ追記してメモリから解放する。
+無効化（終了時）に配列を閉じるが、途中で終了して閉じ括弧がないファイルも
+トレースビューアーで読み込める。
+
+有効化:
+    - 環境変数 TECHZIP_TRACE_FILE にトレースファイルのパスを設定する
+    - または get_tracer().enable(path) を呼び出す
+
+無効時の span() は共有のNo-opオブジェクトを返すだけなので、
+計測コードを常時残しておいても処理時間への影響はほぼない。
+"""
+import atexit
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from utils.logger import get_logger
+
+TRACE_FILE_ENV = "TECHZIP_TRACE_FILE"
+
+# 現在処理中のN-code（スレッド・asyncioタスク単位で保持）
+_current_n_code: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "techzip_trace_n_code", default=None
+)
+
+
+class _NullSpan:
+    """トレース無効時に返すNo-opスパン"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **args: Any) -> None:
+        """属性を追加（無効時は何もしない）"""
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Span:
+    """1区間の計測スパン（Chrome traceの完了イベントとして記録される）"""
+
+    __slots__ = ("_tracer", "name", "category", "args", "_start_ns")
+
+    def __init__(self, tracer: "Tracer", name: str, category: str, args: Dict[str, Any]):
+        self._tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self._start_ns = 0
+
+    def __enter__(self) -> "Span":
+        self._start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self._tracer._record(self, self._start_ns, end_ns)
+        return False
+
+    def set(self, **args: Any) -> None:
+        """スパンに属性を追加（ファイルサイズやジョブIDなど）"""
+        self.args.update(args)
+
+
+class Tracer:
+    """ワークフロー全体のスパンを収集してトレースファイルに書き出すクラス"""
+
+    # メモリ上に溜めるイベント数の上限（超えたらファイルに追記して解放する）
+    FLUSH_THRESHOLD = 5000
+
+    def __init__(self):
+        self.logger = get_logger(__name__)
+        self._enabled = False
+        self._trace_path: Optional[Path] = None
+        self._events: List[Dict[str, Any]] = []
+        self._written_count = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        # ファイルへの追記を直列化するロック（記録側の _lock はファイルI/O中に保持しない）
+        self._write_lock = threading.Lock()
+        self._pid = os.getpid()
+        self._origin_ns = time.perf_counter_ns()
+        self._named_threads: Dict[int, str] = {}
+
+    @property
+    def enabled(self) -> bool:
+        """トレースが有効かどうか"""
+        return self._enabled
+
+    @property
+    def trace_path(self) -> Optional[Path]:
+        """トレースファイルのパス"""
+        return self._trace_path
+
+    def enable(self, trace_path: Optional[str | Path] = None) -> Path:
+        """
+        トレースを有効化
+
+        Args:
+            trace_path: 出力先（省略時は logs/trace_YYYYmmdd_HHMMSS.json）
+
+        Returns:
+            トレースファイルのパス
+        """
+        if trace_path is None:
+            timestamp = time.strftime("%Y%m%d_%H%M%S")
+            trace_path = Path("logs") / f"trace_{timestamp}.json"
+
+        with self._write_lock, self._lock:
+            self._trace_path = Path(trace_path)
+            self._events = []
+            self._written_count = 0
+            self._closed = False
+            self._named_threads = {}
+            self._origin_ns = time.perf_counter_ns()
+            self._enabled = True
+
+        self.logger.info(f"トレース有効化: {self._trace_path}")
+        return self._trace_path
+
+    def disable(self) -> Optional[Path]:
+        """
+        トレースを無効化してファイルに書き出す
+
+        Returns:
+            書き出したトレースファイルのパス（無効だった場合はNone）
+        """
+        if not self._enabled:
+            return None
+        self._enabled = False
+        path = self._write_pending(close=True)
+        self.logger.info(f"トレース無効化: {path}")
+        return path
+
+    def span(self, name: str, category: str = "workflow", **args: Any):
+        """
+        計測スパンを作成（with文で使用）
+
+        Args:
+            name: スパン名（例: "api.upload_zip"）
+            category: カテゴリ（タイムライン上のフィルタ用）
+            **args: 付加情報
+
+        Returns:
+            コンテキストマネージャー
+        """
+        if not self._enabled:
+            return _NULL_SPAN
+
+        n_code = args.pop("n_code", None) or _current_n_code.get()
+        if n_code:
+            args["n_code"] = n_code
+        return Span(self, name, category, args)
+
+    def get_events(self) -> List[Dict[str, Any]]:
+        """記録済みイベントを取得（ファイルに書き出し済みのものを含む）"""
+        with self._write_lock:
+            written: List[Dict[str, Any]] = []
+            if (self._written_count or self._closed) and self._trace_path is not None:
+                try:
+                    text = self._trace_path.read_text(encoding="utf-8").rstrip()
+                    written = json.loads(text if text.endswith("]") else text + "]")
+                except (OSError, ValueError) as e:
+                    self.logger.warning(f"トレースファイル読み込みエラー: {e}")
+            with self._lock:
+                return written + list(self._events)
+
+    def flush(self) -> Optional[Path]:
+        """
+        未書き出しのイベントをトレースファイルに追記してメモリから解放する
+
+        Returns:
+            トレースファイルのパス
+        """
+        return self._write_pending(close=False)
+
+    def _write_pending(self, close: bool) -> Optional[Path]:
+        """
+        未書き出しのイベントを追記（書き出したイベント数に比例した処理量）
+
+        Args:
+            close: イベント配列を閉じるか（無効化時）
+        """
+        if self._trace_path is None:
+            return None
+
+        with self._write_lock:
+            # 閉じたファイルには追記しない（無効化後のflush呼び出し）
+            if self._closed:
+                return self._trace_path
+            with self._lock:
+                events = self._events
+                self._events = []
+                path = self._trace_path
+
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                # 最初の書き出しでファイルを作り直し、以降は追記する
+                mode = "a" if self._written_count else "w"
+                with open(path, mode, encoding="utf-8") as f:
+                    if not self._written_count:
+                        f.write("[")
+                    for event in events:
+                        f.write(",\n" if self._written_count else "\n")
+                        f.write(json.dumps(event, ensure_ascii=False))
+                        self._written_count += 1
+                    if close:
+                        f.write("\n]\n")
+                if close:
+                    self._closed = True
+            except OSError as e:
+                self.logger.warning(f"トレースファイル書き出しエラー: {e}")
+        return path
+
+    def _record(self, span: Span, start_ns: int, end_ns: int) -> None:
+        """完了したスパンをイベントとして記録"""
+        thread_id = threading.get_ident()
+        event = {
+            "name": span.name,
+            "cat": span.category,
+            "ph": "X",
+            "ts": (start_ns - self._origin_ns) / 1000.0,
+            "dur": (end_ns - start_ns) / 1000.0,
+            "pid": self._pid,
+            "tid": thread_id,
+            "args": span.args,
+        }
+
+        with self._lock:
+            if thread_id not in self._named_threads:
+                thread_name = threading.current_thread().name
+                self._named_threads[thread_id] = thread_name
+                self._events.append({
+                    "name": "thread_name", "ph": "M", "pid": self._pid,
+                    "tid": thread_id, "args": {"name": thread_name},
+                })
+            self._events.append(event)
+            should_flush = len(self._events) >= self.FLUSH_THRESHOLD
+
+        if should_flush:
+            self.flush()
+
+
+@contextmanager
+def trace_context(n_code: Optional[str]):
+    """
+    以降のスパンにN-codeを付与するコンテキスト
+
+    Args:
+        n_code: 処理中のN-code
+    """
+    token = _current_n_code.set(n_code)
+    try:
+        yield
+    finally:
+        _current_n_code.reset(token)
+
+
+def current_n_code() -> Optional[str]:
+    """現在のトレースコンテキストのN-codeを取得"""
+    return _current_n_code.get()
+
+
+# シングルトンインスタンス
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def get_tracer() -> Tracer:
+    """トレーサーのシングルトンインスタンスを取得"""
+    global _tracer
+    if _tracer is None:
+        with _tracer_lock:
+            if _tracer is None:
+                _tracer = Tracer()
+                trace_file = os.environ.get(TRACE_FILE_ENV)
+                if trace_file:
+                    _tracer.enable(trace_file)
+                atexit.register(_tracer.disable)
+    return _tracer
+
+
+def span(name: str, category: str = "workflow", **args: Any):
+    """get_tracer().span() のショートカット"""
+    return get_tracer().span(name, category, **args)
+
+
+def traced(name: Optional[str] = None, category: str = "workflow") -> Callable:
+    """
+    関数をスパンで囲むデコレーター
+
+    トレーサーの有効・無効は呼び出し時に判定するため、
+    モジュール読み込み後に enable() しても計測される。
+    """
+    def decorator(func: Callable) -> Callable:
+        span_name = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*func_args, **func_kwargs):
+            tracer = get_tracer()
+            if not tracer.enabled:
+                return func(*func_args, **func_kwargs)
+            with tracer.span(span_name, category):
+                return func(*func_args, **func_kwargs)
+
+        return wrapper
+
+    return decorator